@@ -0,0 +1,755 @@
+"""Benchmarks of the reading, writing, export, and analysis features.
+
+Each benchmark compares a feature with the former way, or with the
+alternatives it offers, on a synthetic project.
+
+Usage: python -m benchmarks.bench_features [name ...]
+
+Without names, all benchmarks are run. Names:
+yw7_read, yw7_index, file_export, yw7_save, word_count, yw7_journal,
+yw7_revisions, batch_converter, file_export_parallel, data_files,
+scene_table, scene_query, export_filter.
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import date
+from string import Template
+
+from test.synthetic_project import create_novel
+from ywriter7.converter.batch_converter import BatchConverter
+from ywriter7.file.compiled_filter import ChapterFilter, SceneFilter, TagFilter
+from ywriter7.file.file_export import FileExport
+from ywriter7.file.filter import Filter
+from ywriter7.model.character import Character
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import ADDITIONAL_WORD_LIMITS
+from ywriter7.model.scene import NO_WORD_LIMITS
+from ywriter7.model.scene import NON_LETTERS
+from ywriter7.model.scene import Scene
+from ywriter7.model.scene import count_words_and_letters
+from ywriter7.model.scene_query import ChapterRange, HasCharacter, HasTag, Status, Viewpoint
+from ywriter7.model.world_element import WorldElement
+from ywriter7.pywriter_globals import SCENE_PREFIX
+from ywriter7.yw.data_files import DataFiles
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_index import Yw7Index
+from ywriter7.yw.yw7_journal import Yw7Journal
+from ywriter7.yw.yw7_revisions import Yw7Revisions
+
+REPEAT = 5
+
+
+def measure(function):
+    """Return the execution time and the peak of traced memory allocations."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_yw7_read():
+    """Reading a 2,000-scene yWriter project.
+
+    Compares time and peak memory of reading the project the former way
+    (read the file into a string, filter control characters, parse the
+    string, then build the novel) and with the incremental parser, keeping
+    or discarding the xml tree.
+    """
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'bench.yw7')
+        yw7File = Yw7File(filePath)
+        yw7File.novel = create_novel(chapters=100, scenesPerChapter=20, paragraphs=20)
+        yw7File.write()
+        size = os.path.getsize(filePath) / 1e6
+
+        def legacy_read():
+            with open(filePath, 'r', encoding='utf-8') as f:
+                xmlText = f.read()
+            xmlText = re.sub('[\x00-\x08|\x0b-\x0c|\x0e-\x1f]', '', xmlText)
+            root = ET.fromstring(xmlText)
+            xmlText = None
+            yw7File = Yw7File(filePath)
+            yw7File.novel = Novel()
+            yw7File._read_project(root)
+            for xmlCharacter in root.find('CHARACTERS'):
+                yw7File._read_character(xmlCharacter)
+            for xmlScene in root.find('SCENES'):
+                yw7File._read_scene(xmlScene)
+            for xmlChapter in root.find('CHAPTERS'):
+                yw7File._read_chapter(xmlChapter)
+
+        def read(keepTree):
+            yw7File = Yw7File(filePath)
+            yw7File.novel = Novel()
+            yw7File.read(keep_tree=keepTree)
+
+        print(f'{len(yw7File.novel.scenes)} scenes, {size:.1f} MB')
+        for label, function in (
+                ('whole-file read', legacy_read),
+                ('incremental read, keep tree', lambda: read(True)),
+                ('incremental read, discard tree', lambda: read(False)),
+                ):
+            elapsed, peak = measure(function)
+            print(f'{label:32} {elapsed * 1000:8.1f} ms  peak {peak / 1e6:6.1f} MB')
+
+
+def bench_yw7_index():
+    """Opening a 1,000-scene yWriter project.
+
+    Compares the time of opening the project by parsing the whole file,
+    by parsing with lazy scene contents, and from the sidecar index.
+    """
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'bench.yw7')
+        yw7File = Yw7File(filePath)
+        yw7File.novel = create_novel(chapters=50, scenesPerChapter=20, paragraphs=20)
+        yw7File.write()
+        size = os.path.getsize(filePath) / 1e6
+
+        def read(**kwargs):
+            yw7File = Yw7File(filePath)
+            yw7File.novel = Novel()
+            yw7File.read(**kwargs)
+
+        def read_index():
+            yw7File = Yw7File(filePath)
+            yw7File.novel = Novel()
+            Yw7Index(filePath).read_project(yw7File)
+
+        read_index()
+        # Build the index.
+        print(f'{len(yw7File.novel.scenes)} scenes, {size:.1f} MB')
+        for label, function in (
+                ('full read', read),
+                ('lazy content read', lambda: read(keep_tree=False, lazy_content=True)),
+                ('sidecar index', read_index),
+                ):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            print(f'{label:20} {elapsed * 1000:8.1f} ms')
+
+
+class HtmlExport(FileExport):
+    DESCRIPTION = 'HTML outline'
+    EXTENSION = '.html'
+    _fileHeader = '<html><body><h1>$Title</h1>\n'
+    _chapterTemplate = '<h2>$ChapterNumber. $Title</h2>\n'
+    _sceneTemplate = '<h3>$Title</h3><p>$Desc</p><p>$Characters @ $Locations, $ScDate</p>\n'
+    _fileFooter = '</body></html>\n'
+
+    def _convert_from_yw(self, text, quick=False):
+        if text is None:
+            return ''
+
+        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        if not quick:
+            text = re.sub(r'\[i\](.*?)\[/i\]', r'<em>\1</em>', text)
+            text = re.sub(r'\[lang=(.*?)\](.*?)\[/lang=.*?\]', r'<span lang="\1">\2</span>', text)
+            text = '</p><p>'.join(text.split('\n'))
+        return text
+
+
+class LegacyHtmlExport(HtmlExport):
+
+    def _get_template(self, template):
+        return Template(template)
+
+    def _get_sceneMapping(self, scId, sceneNumber, wordsTotal, lettersTotal):
+        mapping = super()._get_sceneMapping(scId, sceneNumber, wordsTotal, lettersTotal)
+        return {key: mapping[key] for key in mapping}
+
+    def _get_chapterMapping(self, chId, chapterNumber):
+        mapping = super()._get_chapterMapping(chId, chapterNumber)
+        return {key: mapping[key] for key in mapping}
+
+
+def bench_file_export():
+    """Template-based export of a 2,000-scene novel.
+
+    Compares exporting with templates compiled once and lazily computed
+    mappings, and the former way (a new string.Template for every chapter
+    and scene, and all mapping values computed).
+    The exporter converts yWriter markup to HTML, like a typical subclass.
+    """
+    novel = create_novel(chapters=100, scenesPerChapter=20, paragraphs=20)
+    with tempfile.TemporaryDirectory() as tempDir:
+        print(f'{len(novel.scenes)} scenes')
+        results = {}
+        for label, exportClass in (('former', LegacyHtmlExport), ('compiled', HtmlExport)):
+            exporter = exportClass(os.path.join(tempDir, f'{label}.html'))
+            exporter.novel = novel
+            start = time.perf_counter()
+            exporter.write()
+            elapsed = time.perf_counter() - start
+            with open(exporter.filePath, encoding='utf-8') as f:
+                results[label] = f.read()
+            print(f'{label:10} {elapsed * 1000:8.1f} ms')
+        print('identical output:', results['former'] == results['compiled'])
+
+
+def bench_yw7_save():
+    """Saving a 2,000-scene yWriter project after editing one scene.
+
+    Compares the incremental rebuild of Yw7File, which rebuilds only the subtrees
+    of changed elements, with a complete rebuild of the xml element tree.
+    Serializing the tree takes the same time in both cases, so the building
+    of the tree is also timed on its own.
+    """
+    with tempfile.TemporaryDirectory() as tempDir:
+        yw7Path = os.path.join(tempDir, 'bench.yw7')
+        yw7File = Yw7File(yw7Path)
+        yw7File.novel = create_novel(chapters=100, scenesPerChapter=20, paragraphs=10)
+        yw7File.write()
+        yw7File = Yw7File(yw7Path)
+        yw7File.novel = Novel()
+        yw7File.read()
+        yw7File.write()
+        scene = yw7File.novel.scenes['1000']
+        edits = iter(range(1000000))
+
+        def incremental(method):
+            scene.title = f'Edit {next(edits)}'
+            method()
+
+        def complete(method):
+            scene.title = f'Edit {next(edits)}'
+            yw7File._syncTree = None
+            method()
+
+        results = {}
+        for name, method in (('build', yw7File._build_element_tree), ('save', yw7File.write)):
+            tComplete = min(timeit.repeat(lambda: complete(method), number=1, repeat=REPEAT))
+            tIncremental = min(timeit.repeat(lambda: incremental(method), number=1, repeat=REPEAT))
+            results[name] = (tComplete, tIncremental)
+
+        yw7File.write()
+        with open(yw7Path, 'rb') as f:
+            incrementalOutput = f.read()
+        yw7File._syncTree = None
+        yw7File.write()
+        with open(yw7Path, 'rb') as f:
+            same = f.read() == incrementalOutput
+        size = os.path.getsize(yw7Path) / 1e6
+        print(f'{len(yw7File.novel.scenes)} scenes, {size:.1f} MB, identical output: {same}')
+        for name, (tComplete, tIncremental) in results.items():
+            print(f'{name}, complete rebuild:    {tComplete * 1000:8.1f} ms')
+            print(f'{name}, incremental rebuild: {tIncremental * 1000:8.1f} ms ({tComplete / tIncremental:.1f}x)')
+
+
+def legacy_count(text):
+    wordText = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+    wordText = NO_WORD_LIMITS.sub('', wordText)
+    return len(wordText.split()), len(NON_LETTERS.sub('', text))
+
+
+def bench_word_count():
+    """Word and letter counting of a 5,000-scene project.
+
+    Compares the former counting with three regular expression passes with
+    count_words_and_letters(), and Novel.recount() in this process with a
+    process pool. Also times setting all scene contents, which used to count
+    on every assignment and now defers counting until the counts are accessed.
+    """
+    novel = create_novel(chapters=250, scenesPerChapter=20, paragraphs=20)
+    texts = [scene.sceneContent for scene in novel.scenes.values()]
+    size = sum(len(text) for text in texts) / 1e6
+    print(f'{len(texts)} scenes, {size:.1f} million characters')
+
+    def set_contents():
+        for scene, text in zip(novel.scenes.values(), texts):
+            scene.sceneContent = text
+
+    def set_contents_counting():
+        for scene, text in zip(novel.scenes.values(), texts):
+            scene.sceneContent = text
+            legacy_count(text)
+
+    def recount(processes):
+        set_contents()
+        novel.recount(processes)
+
+    tLegacy = min(timeit.repeat(lambda: [legacy_count(text) for text in texts], number=1, repeat=REPEAT))
+    tScanner = min(timeit.repeat(lambda: [count_words_and_letters(text) for text in texts], number=1, repeat=REPEAT))
+    print(f'three regex passes:          {tLegacy * 1000:8.1f} ms')
+    print(f'count_words_and_letters():   {tScanner * 1000:8.1f} ms ({tLegacy / tScanner:.1f}x)')
+
+    tCounting = min(timeit.repeat(set_contents_counting, number=1, repeat=REPEAT))
+    tDeferred = min(timeit.repeat(set_contents, number=1, repeat=REPEAT))
+    print(f'set contents, counting:      {tCounting * 1000:8.1f} ms')
+    print(f'set contents, deferred:      {tDeferred * 1000:8.1f} ms')
+
+    processes = os.cpu_count() or 1
+    for n in sorted({1, max(2, processes)}):
+        elapsed = min(timeit.repeat(lambda: recount(n), number=1, repeat=REPEAT)) - tDeferred
+        print(f'recount, {n} process(es):     {elapsed * 1000:8.1f} ms')
+
+
+def bench_yw7_journal():
+    """Committing a scene content update in a 2,000-scene yWriter project.
+
+    Compares appending the change to the edit journal with rewriting the .yw7 file,
+    and times reading the project with a journal holding all changes made.
+    """
+    edits = 20
+    with tempfile.TemporaryDirectory() as tempDir:
+        yw7Path = os.path.join(tempDir, 'bench.yw7')
+        yw7File = Yw7File(yw7Path)
+        yw7File.novel = create_novel(chapters=100, scenesPerChapter=20, paragraphs=10)
+        yw7File.write()
+        yw7File = Yw7File(yw7Path)
+        yw7File.novel = Novel()
+        yw7File.read()
+        scene = yw7File.novel.scenes['1000']
+        text = scene.sceneContent
+        editNumbers = iter(range(1000000))
+
+        def edit():
+            scene.sceneContent = f'{text}\nEdit {next(editNumbers)}'
+
+        def write():
+            edit()
+            yw7File.write()
+
+        def journal():
+            edit()
+            yw7File.journal_change(SCENE_PREFIX, '1000')
+
+        tWrite = min(timeit.repeat(write, number=edits, repeat=REPEAT)) / edits
+        tJournal = min(timeit.repeat(journal, number=edits, repeat=REPEAT)) / edits
+        journalSize = os.path.getsize(f'{yw7Path}{Yw7Journal.EXTENSION}') / 1e6
+
+        def read():
+            yw7Reader = Yw7File(yw7Path)
+            yw7Reader.novel = Novel()
+            yw7Reader.read()
+            return yw7Reader
+
+        tRead = min(timeit.repeat(read, number=1, repeat=REPEAT))
+        same = read().novel.scenes['1000'].sceneContent == scene.sceneContent
+        size = os.path.getsize(yw7Path) / 1e6
+        print(f'{len(yw7File.novel.scenes)} scenes, {size:.1f} MB')
+        print(f'commit, rewrite file:   {tWrite * 1000:8.1f} ms')
+        print(f'commit, journal record: {tJournal * 1000:8.1f} ms ({tWrite / tJournal:.0f}x)')
+        print(f'read with {edits * REPEAT} journaled changes ({journalSize:.1f} MB): {tRead * 1000:8.1f} ms, replayed: {same}')
+
+
+def bench_yw7_revisions():
+    """Storing all drafts of a 100,000-word novel in the revision store.
+
+    Each of 170 scenes of about 600 words goes through 8 drafts, each draft
+    rewriting about a quarter of the scene's paragraphs. The store size is
+    compared with the final text size and with storing full copies of all drafts,
+    and revision lookups and diffs are timed.
+    """
+    scenes = 170
+    paragraphsPerScene = 10
+    wordsPerParagraph = 60
+    drafts = 8
+    rng = random.Random(1)
+    vocabulary = [''.join(rng.choice('etaoinshrdlu') for __ in range(rng.randint(2, 9))) for __ in range(5000)]
+
+    def paragraph():
+        return ' '.join(rng.choice(vocabulary) for __ in range(wordsPerParagraph)) + '.'
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        revisions = Yw7Revisions(os.path.join(tempDir, 'bench.yw7'))
+        fullCopies = 0
+        finalSize = 0
+        words = 0
+        for scNumber in range(1, scenes + 1):
+            scId = str(scNumber)
+            paragraphs = [paragraph() for __ in range(paragraphsPerScene)]
+            for draft in range(drafts):
+                if draft:
+                    for i in rng.sample(range(len(paragraphs)), len(paragraphs) // 4):
+                        paragraphs[i] = paragraph()
+                text = '\n'.join(paragraphs)
+                revisions.add(scId, text)
+                fullCopies += len(text.encode('utf-8'))
+            finalSize += len(text.encode('utf-8'))
+            words += len(text.split())
+        storeSize = os.path.getsize(revisions.filePath)
+
+        tGet = min(timeit.repeat(lambda: revisions.get('85', 3), number=100, repeat=REPEAT)) / 100
+        tDiff = min(timeit.repeat(lambda: revisions.diff('85', 1), number=100, repeat=REPEAT)) / 100
+        print(f'{scenes} scenes, {words} words, {drafts} drafts per scene')
+        print(f'final text:        {finalSize / 1e6:6.2f} MB')
+        print(f'all drafts, full:  {fullCopies / 1e6:6.2f} MB ({fullCopies / finalSize:.1f}x final)')
+        print(f'revision store:    {storeSize / 1e6:6.2f} MB ({storeSize / finalSize:.1f}x final)')
+        print(f'get revision:      {tGet * 1000:6.2f} ms')
+        print(f'diff revisions:    {tDiff * 1000:6.2f} ms')
+
+
+def bench_batch_converter():
+    """Converting a batch of yWriter projects.
+
+    Converts 12 projects of 500 scenes each to yWriter 7 and XML data files,
+    in this process and in a process pool with one worker per CPU (at least two).
+    Each project gets a fresh worker process, which costs an interpreter start;
+    the speedup is bounded by the number of CPUs.
+    """
+    projects = 12
+    with tempfile.TemporaryDirectory() as tempDir:
+        sourceDir = os.path.join(tempDir, 'projects')
+        os.mkdir(sourceDir)
+        for i in range(projects):
+            yw7File = Yw7File(os.path.join(sourceDir, f'project{i}.yw7'))
+            yw7File.novel = create_novel(chapters=25, scenesPerChapter=20, paragraphs=10)
+            yw7File.write()
+        sources = [os.path.join(sourceDir, '*.yw7')]
+        processes = max(os.cpu_count() or 1, 2)
+        pool = BatchConverter(processes=processes, memoryLimit=2 * 1024 ** 3, targetDir=tempDir)
+        times = {}
+        for name, converter in (('serial', BatchConverter(processes=1, targetDir=tempDir)),
+                                (f'{processes} workers', pool)):
+            startTime = time.perf_counter()
+            results = converter.run(sources, [Yw7File, DataFiles])
+            times[name] = time.perf_counter() - startTime
+            failures = sum(1 for __, __, errors in results if errors)
+            slowest = max(seconds for __, seconds, __ in results)
+            print(f'{name:12} {times[name]:6.2f} s, slowest project {slowest:.2f} s, {failures} failures')
+        tSerial, tPool = times.values()
+        print(f'speedup: {tSerial / tPool:.1f}x on {os.cpu_count()} CPUs')
+
+
+MARKUP = [(re.compile(pattern), replacement) for pattern, replacement in (
+    (r'\[i\](.*?)\[/i\]', r'<em>\1</em>'),
+    (r'\[b\](.*?)\[/b\]', r'<strong>\1</strong>'),
+    (r'\[lang=(.*?)\](.*?)\[/lang=.*?\]', r'<span lang="\1">\2</span>'),
+    (r' -- ', ' &mdash; '),
+    (r'"(.*?)"', r'&ldquo;\1&rdquo;'),
+    (r"'", '&rsquo;'),
+    )]
+
+
+class ManuscriptExport(FileExport):
+    DESCRIPTION = 'HTML manuscript'
+    EXTENSION = '.html'
+    _fileHeader = '<html><body><h1>$Title</h1>\n'
+    _chapterTemplate = '<h2>$ChapterNumber. $Title</h2>\n'
+    _sceneTemplate = '<!-- $SceneNumber, $WordsTotal words -->\n<p>$SceneContent</p>\n'
+    _sceneDivider = '<hr/>\n'
+    _fileFooter = '</body></html>\n'
+
+    def _convert_from_yw(self, text, quick=False):
+        if text is None:
+            return ''
+
+        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        if not quick:
+            paragraphs = []
+            for paragraph in text.split('\n'):
+                for pattern, replacement in MARKUP:
+                    paragraph = pattern.sub(replacement, paragraph)
+                paragraphs.append(paragraph)
+            text = '</p>\n<p>'.join(paragraphs)
+        return text
+
+
+def bench_file_export_parallel():
+    """Chapter-parallel rendering of a 2,000-scene manuscript export.
+
+    Exports the scene contents with a costly markup conversion, rendering
+    the chapters in this process and in a process pool with one worker per
+    CPU (at least two). The prefix pass computing the chapter starts is also
+    timed on its own. The speedup is bounded by the number of CPUs.
+    """
+    novel = create_novel(chapters=100, scenesPerChapter=20, paragraphs=40)
+    processes = max(os.cpu_count() or 1, 2)
+    with tempfile.TemporaryDirectory() as tempDir:
+        results = {}
+        times = {}
+        for label, kwargs in (('serial', {}), (f'{processes} workers', {'processes': processes})):
+            exporter = ManuscriptExport(os.path.join(tempDir, 'manuscript.html'), **kwargs)
+            exporter.novel = novel
+            start = time.perf_counter()
+            exporter.write()
+            times[label] = time.perf_counter() - start
+            with open(exporter.filePath, encoding='utf-8') as f:
+                results[label] = f.read()
+        start = time.perf_counter()
+        exporter._get_chapter_starts()
+        tStarts = time.perf_counter() - start
+        print(f'{len(novel.scenes)} scenes, {len(results["serial"]) / 1e6:.1f} MB exported')
+        print(f'chapter starts (prefix pass): {tStarts * 1000:8.1f} ms')
+        for label, elapsed in times.items():
+            print(f'{label:12} {elapsed * 1000:8.1f} ms')
+        tSerial, tParallel = times.values()
+        print(f'speedup: {tSerial / tParallel:.1f}x on {os.cpu_count()} CPUs, '
+              f'identical output: {len(set(results.values())) == 1}')
+
+
+def bench_data_files():
+    """Writing the character/location/item xml data files.
+
+    Compares the single-pass writer of DataFiles, sequential and concurrent,
+    with the former ElementTree.write + _postprocess_xml_file pipeline, which
+    wrote each file twice and read it once. The world has 3,000 elements of each kind.
+    """
+    elements = 3000
+    text = 'Grew up by the sea -- "quiet" & stubborn.\nLeft home early.\n' * 5
+    novel = create_novel(chapters=1, scenesPerChapter=1)
+    for i in range(11, elements + 1):
+        elemId = str(i)
+        character = Character()
+        character.title = f'Character {i}'
+        character.bio = text
+        character.notes = text
+        novel.characters[elemId] = character
+        novel.srtCharacters.append(elemId)
+        for collection, sortOrder in ((novel.locations, novel.srtLocations), (novel.items, novel.srtItems)):
+            element = WorldElement()
+            element.title = f'Element {i}'
+            element.desc = text
+            collection[elemId] = element
+            sortOrder.append(elemId)
+    with tempfile.TemporaryDirectory() as tempDir:
+        dataFiles = DataFiles(os.path.join(tempDir, 'world.xml'))
+        dataFiles.novel = novel
+        dataFiles.write()
+        legacyPath = os.path.join(tempDir, 'legacy')
+
+        def legacy():
+            for tag, suffix in DataFiles._DATA_FILES:
+                filePath = f'{legacyPath}{suffix}'
+                ET.ElementTree(dataFiles.tree.find(tag)).write(filePath, xml_declaration=False, encoding='utf-8')
+                dataFiles._postprocess_xml_file(filePath)
+
+        def single_pass(concurrent):
+            dataFiles.concurrent = concurrent
+            dataFiles._write_element_tree(dataFiles)
+
+        tLegacy = min(timeit.repeat(legacy, number=1, repeat=REPEAT))
+        tSequential = min(timeit.repeat(lambda: single_pass(False), number=1, repeat=REPEAT))
+        tConcurrent = min(timeit.repeat(lambda: single_pass(True), number=1, repeat=REPEAT))
+        same = True
+        size = 0
+        for __, suffix in DataFiles._DATA_FILES:
+            with open(f'{legacyPath}{suffix}', 'rb') as f1, open(os.path.join(tempDir, f'world{suffix}'), 'rb') as f2:
+                data = f2.read()
+                same = same and f1.read() == data
+                size += len(data)
+        print(f'{elements} elements per kind, {size / 1e6:.1f} MB, identical output: {same}')
+        print(f'ElementTree + postprocessing: {tLegacy * 1000:8.1f} ms')
+        print(f'single pass, sequential:      {tSequential * 1000:8.1f} ms ({tLegacy / tSequential:.1f}x)')
+        print(f'single pass, concurrent:      {tConcurrent * 1000:8.1f} ms ({tLegacy / tConcurrent:.1f}x)')
+
+
+def python_statistics(novel):
+    wordsPerChapter = []
+    status = [0] * len(Scene.STATUS)
+    first = None
+    last = None
+    for chId in novel.srtChapters:
+        words = 0
+        for scId in novel.chapters[chId].srtScenes:
+            scene = novel.scenes[scId]
+            words += scene.wordCount
+            status[scene.status or 0] += 1
+            if scene.date:
+                start = date.fromisoformat(scene.date).toordinal()
+                days = int(scene.lastsDays or 0) + (int(scene.lastsHours or 0) * 60 + int(scene.lastsMinutes or 0)) // 1440
+                first = start if first is None else min(first, start)
+                last = start + days if last is None else max(last, start + days)
+        wordsPerChapter.append(words)
+    return wordsPerChapter, status, (date.fromordinal(first), date.fromordinal(last))
+
+
+def table_statistics(table):
+    return table.words_per_chapter(), table.status_distribution(), table.timeline_span()
+
+
+def bench_scene_table():
+    """Scene statistics of a 10,000-scene novel, with and without the scene table.
+
+    Computes the words per chapter, the status distribution and the timeline span
+    with Python loops over the scenes, and with the NumPy scene table: unchanged,
+    after editing one scene, and after moving scenes (rebuild). Requires NumPy.
+    """
+    rng = random.Random(1)
+    novel = create_novel(chapters=100, scenesPerChapter=100, paragraphs=1)
+    for scene in novel.scenes.values():
+        scene.status = rng.randint(1, 5)
+        scene.date = date.fromordinal(date(2023, 1, 1).toordinal() + rng.randint(0, 365)).isoformat()
+        scene.lastsHours = str(rng.randint(0, 30))
+    table = novel.get_scene_table()
+    expected = python_statistics(novel)
+    result = table_statistics(table)
+    same = (list(result[0]), list(result[1]), result[2]) == expected
+    scene = novel.scenes['1']
+
+    def edit_one():
+        scene.status = rng.randint(1, 5)
+        table_statistics(table)
+
+    def move():
+        srtScenes = novel.chapters['1'].srtScenes
+        srtScenes.append(srtScenes.pop(0))
+        table_statistics(table)
+
+    tPython = min(timeit.repeat(lambda: python_statistics(novel), number=1, repeat=REPEAT))
+    tTable = min(timeit.repeat(lambda: table_statistics(table), number=1, repeat=REPEAT))
+    tEdit = min(timeit.repeat(edit_one, number=1, repeat=REPEAT))
+    tMove = min(timeit.repeat(move, number=1, repeat=REPEAT))
+    print(f'{len(novel.scenes)} scenes, same results: {same}')
+    print(f'Python loops:             {tPython * 1e3:8.3f} ms')
+    print(f'scene table, unchanged:   {tTable * 1e3:8.3f} ms ({tPython / tTable:.0f}x)')
+    print(f'scene table, one edit:    {tEdit * 1e3:8.3f} ms ({tPython / tEdit:.0f}x)')
+    print(f'scene table, rebuilt:     {tMove * 1e3:8.3f} ms ({tPython / tMove:.1f}x)')
+
+
+def scan_scenes(novel):
+    draftScenes = []
+    taggedScenes = []
+    chapters = set(novel.srtChapters[29:70])
+    for chId in novel.srtChapters:
+        for scId in novel.chapters[chId].srtScenes:
+            scene = novel.scenes[scId]
+            if scene.status == 2 and chId in chapters and '4' in (scene.characters or []):
+                draftScenes.append(scId)
+            if 'arc1' in (scene.tags or []) and (scene.characters or [None])[0] == '2':
+                taggedScenes.append(scId)
+    return draftScenes, taggedScenes
+
+
+def query_scenes(novel):
+    return (
+        novel.query_scenes(Status(2), ChapterRange('30', '70'), HasCharacter('4')),
+        novel.query_scenes(HasTag('arc1'), Viewpoint('2')),
+    )
+
+
+def bench_scene_query():
+    """Querying the scenes of a 10,000-scene novel.
+
+    Selects "scenes with status Draft in chapters 30 to 70 featuring character 4"
+    and "scenes tagged arc1 with viewpoint character 2" by looping over the
+    chapters and scenes, and with Novel.query_scenes(): with an unchanged index,
+    after editing one scene, and including the index build.
+    """
+    novel = create_novel(chapters=100, scenesPerChapter=100, paragraphs=1)
+    same = scan_scenes(novel) == query_scenes(novel)
+    scene = novel.scenes['1']
+
+    def edit_one():
+        scene.status = 3 - scene.status % 2
+        query_scenes(novel)
+
+    def rebuild():
+        novel._sceneIndex = None
+        query_scenes(novel)
+
+    tScan = min(timeit.repeat(lambda: scan_scenes(novel), number=1, repeat=REPEAT))
+    tQuery = min(timeit.repeat(lambda: query_scenes(novel), number=1, repeat=REPEAT))
+    tEdit = min(timeit.repeat(edit_one, number=1, repeat=REPEAT))
+    tBuild = min(timeit.repeat(rebuild, number=1, repeat=REPEAT))
+    print(f'{len(novel.scenes)} scenes, {sum(map(len, query_scenes(novel)))} scenes found, same results: {same}')
+    print(f'loop over all scenes:  {tScan * 1e3:8.3f} ms')
+    print(f'index, unchanged:      {tQuery * 1e3:8.3f} ms ({tScan / tQuery:.0f}x)')
+    print(f'index, one edit:       {tEdit * 1e3:8.3f} ms ({tScan / tEdit:.1f}x)')
+    print(f'index, built:          {tBuild * 1e3:8.3f} ms')
+
+
+class OutlineExport(FileExport):
+    DESCRIPTION = 'Outline'
+    EXTENSION = '.txt'
+    _chapterTemplate = '$ChapterNumber. $Title\n'
+    _sceneTemplate = '$SceneNumber $Title ($Viewpoint) $WordsTotal\n'
+
+
+class TagScanFilter(Filter):
+
+    def accept(self, source, eId):
+        return 'selected' in source.novel.scenes[eId].tags
+
+
+class DraftScanFilter(Filter):
+
+    def accept(self, source, eId):
+        scene = source.novel.scenes[eId]
+        return scene.status == 2 and scene.characters[0] == '2'
+
+
+def export_outline(novel, sceneFilter, chapterFilter=None):
+    exporter = OutlineExport('')
+    exporter.novel = novel
+    exporter._sceneFilter = sceneFilter
+    if chapterFilter is not None:
+        exporter._chapterFilter = chapterFilter
+    return ''.join(exporter.iter_text())
+
+
+def bench_export_filter():
+    """Filtered export of a 10,000-scene novel.
+
+    Exports the scenes tagged "selected" (in 5 of 100 chapters), and the scenes
+    with viewpoint character 2 and status Draft, with scene filters inspecting
+    every scene, and with compiled filters selecting the scenes once per export
+    from the novel's scene index. The compiled filters are also used as chapter
+    filters, omitting the chapters without selected scenes.
+    """
+    novel = create_novel(chapters=100, scenesPerChapter=100, paragraphs=1)
+    for chId in novel.srtChapters[40:45]:
+        for scId in novel.chapters[chId].srtScenes:
+            novel.scenes[scId].tags.append('selected')
+    draft = Status(2) & Viewpoint('2')
+    cases = (
+        ('tag', TagScanFilter(), TagFilter('selected'), ChapterFilter(HasTag('selected'))),
+        ('viewpoint+status', DraftScanFilter(), SceneFilter(draft), ChapterFilter(draft)),
+    )
+    print(f'{len(novel.scenes)} scenes')
+    for label, scanFilter, compiledFilter, chapterFilter in cases:
+        same = export_outline(novel, scanFilter) == export_outline(novel, compiledFilter)
+        tScan = min(timeit.repeat(lambda: export_outline(novel, scanFilter), number=1, repeat=REPEAT))
+        tCompiled = min(timeit.repeat(lambda: export_outline(novel, compiledFilter), number=1, repeat=REPEAT))
+        tChapters = min(timeit.repeat(lambda: export_outline(novel, compiledFilter, chapterFilter),
+                                      number=1, repeat=REPEAT))
+        print(f'{label}: same output: {same}')
+        print(f'  scan filter:                  {tScan * 1e3:8.2f} ms')
+        print(f'  compiled filter:              {tCompiled * 1e3:8.2f} ms ({tScan / tCompiled:.1f}x)')
+        print(f'  compiled, chapters filtered:  {tChapters * 1e3:8.2f} ms ({tScan / tChapters:.1f}x)')
+
+
+BENCHMARKS = {
+    'yw7_read': bench_yw7_read,
+    'yw7_index': bench_yw7_index,
+    'file_export': bench_file_export,
+    'yw7_save': bench_yw7_save,
+    'word_count': bench_word_count,
+    'yw7_journal': bench_yw7_journal,
+    'yw7_revisions': bench_yw7_revisions,
+    'batch_converter': bench_batch_converter,
+    'file_export_parallel': bench_file_export_parallel,
+    'data_files': bench_data_files,
+    'scene_table': bench_scene_table,
+    'scene_query': bench_scene_query,
+    'export_filter': bench_export_filter,
+    }
+# key: name given on the command line, value: benchmark function
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        if not name in BENCHMARKS:
+            sys.exit(f'Unknown benchmark: {name}. Choose from: {", ".join(BENCHMARKS)}.')
+
+    for name in names or BENCHMARKS:
+        print(f'--- {name}: {BENCHMARKS[name].__doc__.splitlines()[0]}')
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
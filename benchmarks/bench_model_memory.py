@@ -0,0 +1,85 @@
+"""Benchmark: memory footprint of the model elements of a 10,000-scene project.
+
+Reads a synthetic project and measures the per-element overhead of the
+slotted Scene and Chapter instances with tracemalloc, compared with the
+former layout: the same instance variables in an instance dictionary.
+The attribute values are shared in both cases, so only the object layout
+is measured. Also counts the string objects of the IDs and tags referenced
+by the scenes, which are interned when read.
+
+Usage: python -m benchmarks.bench_model_memory
+"""
+import os
+import tempfile
+import tracemalloc
+
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.yw.yw7_file import Yw7File
+
+
+def measure(create, states):
+    """Return the bytes allocated per element by create(state)."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    elements = [create(state) for state in states]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del elements
+    return size / len(states)
+
+
+def create_legacy(elementClass):
+    """Return a function creating elements with an instance dictionary, like before."""
+    legacyClass = type(f'Legacy{elementClass.__name__}', (), {})
+
+    def create(state):
+        element = legacyClass()
+        for name, value in state.items():
+            setattr(element, name, value)
+        return element
+
+    return create
+
+
+def create_slotted(elementClass):
+    """Return a function creating slotted elements."""
+
+    def create(state):
+        element = elementClass.__new__(elementClass)
+        element.set_state(state)
+        return element
+
+    return create
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tempDir:
+        yw7File = Yw7File(os.path.join(tempDir, 'bench.yw7'))
+        yw7File.novel = create_novel(chapters=100, scenesPerChapter=100, paragraphs=1)
+        yw7File.write()
+        yw7File.novel = Novel()
+        tracemalloc.start()
+        yw7File.read(lazy_content=True)
+        projectSize = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    novel = yw7File.novel
+    print(f'{len(novel.scenes)} scenes, {len(novel.chapters)} chapters; '
+          f'project read with lazy content: {projectSize / 1e6:.1f} MB')
+    for name, elements in (('scene', novel.scenes), ('chapter', novel.chapters)):
+        states = [element.get_state() for element in elements.values()]
+        elementClass = type(next(iter(elements.values())))
+        legacy = measure(create_legacy(elementClass), states)
+        slotted = measure(create_slotted(elementClass), states)
+        print(f'per {name:7} instance dictionary: {legacy:6.0f} bytes, slots: {slotted:6.0f} bytes '
+              f'({1 - slotted / legacy:.0%} less)')
+    references = []
+    for scene in novel.scenes.values():
+        for values in (scene.tags, scene.characters, scene.locations, scene.items):
+            references.extend(values or ())
+    distinct = len({id(value) for value in references})
+    print(f'scene tags and references: {len(references)} strings, {distinct} distinct objects')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark: splitting a 500,000-word single-scene import.
+
+The scene has 10,000 paragraphs, a part divider every 20,000 words, a
+chapter divider every 5,000 words, and a scene divider every 250 words.
+Compares the former splitting, which examines every line and creates the
+IDs one by one, with the single regex pass and bulk ID allocation.
+Counting the words of the resulting scenes is timed separately.
+
+Usage: python -m benchmarks.bench_splitter
+"""
+import timeit
+
+from ywriter7.model.novel import Novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.scene import Scene
+from ywriter7.model.splitter import Splitter
+from ywriter7.pywriter_globals import *
+
+REPEAT = 5
+WORDS = 500000
+PARAGRAPH_WORDS = 50
+
+
+class LegacySplitter(Splitter):
+    """The former line-by-line splitting, for dividers followed by text only."""
+
+    def split_scenes(self, file):
+        novel = file.novel
+        srtChapters = []
+        for chId in novel.srtChapters:
+            srtChapters.append(chId)
+            chapterId = chId
+            srtScenes = []
+            for scId in novel.chapters[chId].srtScenes:
+                srtScenes.append(scId)
+                sceneId = scId
+                newLines = []
+                inScene = True
+                sceneCount = 0
+                for line in novel.scenes[scId].sceneContent.split('\n'):
+                    heading = line.strip('# ').split(self.DESC_SEPARATOR)
+                    title = heading[0]
+                    desc = heading[1] if len(heading) > 1 else ''
+                    if line.startswith(self.SCENE_SEPARATOR):
+                        if inScene:
+                            novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+                        newLines = []
+                        sceneCount += 1
+                        sceneId = novel.get_id_allocator(SCENE_PREFIX).create_id()
+                        self._create_scene(novel, sceneId, novel.scenes[scId], sceneCount, title, desc, '')
+                        srtScenes.append(sceneId)
+                        inScene = True
+                    elif line.startswith(self.PART_SEPARATOR):
+                        if inScene:
+                            novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+                            newLines = []
+                            inScene = False
+                        sceneCount = 0
+                        novel.chapters[chapterId].srtScenes = srtScenes
+                        srtScenes = []
+                        chapterId = novel.get_id_allocator(CHAPTER_PREFIX).create_id()
+                        self._create_chapter(novel, chapterId, title, desc, 0)
+                        srtChapters.append(chapterId)
+                    else:
+                        newLines.append(line)
+                if inScene:
+                    novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
+            novel.chapters[chapterId].srtScenes = srtScenes
+        novel.srtChapters = srtChapters
+        return True
+
+
+class Import:
+
+    def __init__(self, text):
+        self.novel = Novel()
+        chapter = Chapter()
+        chapter.title = 'Imported'
+        self.novel.chapters['1'] = chapter
+        self.novel.srtChapters.append('1')
+        scene = Scene()
+        scene.title = 'Imported manuscript'
+        scene.status = 1
+        scene.sceneContent = text
+        self.novel.scenes['1'] = scene
+        chapter.srtScenes.append('1')
+
+
+def create_manuscript():
+    lines = []
+    paragraph = ' '.join(['word'] * (PARAGRAPH_WORDS - 1))
+    for i in range(WORDS // PARAGRAPH_WORDS):
+        words = i * PARAGRAPH_WORDS
+        if words % 20000 == 0:
+            lines.append(f'# Part {words // 20000 + 1}')
+        if words % 5000 == 0:
+            lines.append(f'## Chapter {words // 5000 + 1}|Chapter description')
+        if words % 250 == 0:
+            lines.append(f'### Scene {words // 250 + 1}')
+        lines.append(f'Paragraph{i} {paragraph}')
+    return '\n'.join(lines)
+
+
+def main():
+    text = create_manuscript()
+    structures = []
+    for splitter in (LegacySplitter(), Splitter()):
+        file = Import(text)
+        splitter.split_scenes(file)
+        novel = file.novel
+        structures.append([novel.chapters[chId].srtScenes for chId in novel.srtChapters])
+        words = sum(scene.wordCount for scene in novel.scenes.values())
+    print(f'{words} words, {len(novel.chapters)} chapters, {len(novel.scenes)} scenes, '
+          f'same structure: {structures[0] == structures[1]}')
+
+    def split(splitterClass):
+        file = Import(text)
+        splitterClass().split_scenes(file)
+        return file.novel
+
+    def split_and_count():
+        split(Splitter).recount()
+
+    tLegacy = min(timeit.repeat(lambda: split(LegacySplitter), number=1, repeat=REPEAT))
+    tSplit = min(timeit.repeat(lambda: split(Splitter), number=1, repeat=REPEAT))
+    tCount = min(timeit.repeat(split_and_count, number=1, repeat=REPEAT))
+    print(f'former splitting:       {tLegacy * 1e3:8.1f} ms')
+    print(f'single regex pass:      {tSplit * 1e3:8.1f} ms ({tLegacy / tSplit:.1f}x)')
+    print(f'including word count:   {tCount * 1e3:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark: building scenes and chapters from the xml tree of a 5,000-scene project.
+
+Compares the single-pass scene and chapter readers of Yw7File with the former
+readers, which call find() for each attribute. The file is parsed once; only
+the building of the novel's elements from the xml tree is timed. Creating the
+Scene and Chapter instances and counting the words is the same for both readers;
+it is timed separately and subtracted to get the readers' own overhead.
+
+Usage: python -m benchmarks.bench_yw7_reader
+"""
+import os
+import tempfile
+import timeit
+import xml.etree.ElementTree as ET
+
+from test.test_yw7_reader import LegacyYw7File
+from test.synthetic_project import create_novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import Scene
+from ywriter7.yw.yw7_file import Yw7File
+
+REPEAT = 5
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'bench.yw7')
+        yw7File = Yw7File(filePath)
+        yw7File.novel = create_novel(chapters=250, scenesPerChapter=20, paragraphs=1)
+        yw7File.write()
+        root = ET.parse(filePath).getroot()
+
+        def read_elements(fileClass):
+            yw7File = fileClass(filePath)
+            yw7File.novel = Novel()
+            for xmlCharacter in root.find('CHARACTERS'):
+                yw7File._read_character(xmlCharacter)
+            for xmlLocation in root.find('LOCATIONS'):
+                yw7File._read_location(xmlLocation)
+            for xmlItem in root.find('ITEMS'):
+                yw7File._read_item(xmlItem)
+            for xmlScene in root.find('SCENES'):
+                yw7File._read_scene(xmlScene)
+            for xmlChapter in root.find('CHAPTERS'):
+                yw7File._read_chapter(xmlChapter)
+
+        def create_elements():
+            for xmlScene in root.find('SCENES'):
+                Scene().sceneContent = xmlScene.find('SceneContent').text
+            for __ in root.find('CHAPTERS'):
+                Chapter()
+
+        tBase = min(timeit.repeat(create_elements, number=1, repeat=REPEAT))
+        tLegacy = min(timeit.repeat(lambda: read_elements(LegacyYw7File), number=1, repeat=REPEAT))
+        tSinglePass = min(timeit.repeat(lambda: read_elements(Yw7File), number=1, repeat=REPEAT))
+        print(f'{len(root.find("SCENES"))} scenes, {len(root.find("CHAPTERS"))} chapters')
+        print(f'creating the elements: {tBase * 1000:8.1f} ms')
+        for label, elapsed in (('find() per attribute', tLegacy), ('single-pass dispatch', tSinglePass)):
+            print(f'{label}: {elapsed * 1000:8.1f} ms, reader overhead {(elapsed - tBase) * 1000:8.1f} ms')
+        print(f'reader overhead reduced {(tLegacy - tBase) / (tSinglePass - tBase):.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark: saving a 1,000-scene yWriter project.
+
+Compares the single-pass CDATA serializer of Yw7File with the former
+ElementTree.write + _postprocess_xml_file pipeline.
+
+Usage: python -m benchmarks.bench_yw7_write
+"""
+import os
+import tempfile
+import timeit
+
+from test.synthetic_project import create_novel
+from ywriter7.yw.yw7_file import Yw7File
+
+REPEAT = 5
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tempDir:
+        yw7File = Yw7File(os.path.join(tempDir, 'bench.yw7'))
+        yw7File.novel = create_novel(chapters=50, scenesPerChapter=20, paragraphs=10)
+        yw7File.write()
+        legacyPath = os.path.join(tempDir, 'legacy.yw7')
+
+        def legacy():
+            yw7File.tree.write(legacyPath, xml_declaration=False, encoding='utf-8')
+            yw7File._postprocess_xml_file(legacyPath)
+
+        def streamed():
+            yw7File._write_element_tree(yw7File)
+
+        tLegacy = min(timeit.repeat(legacy, number=1, repeat=REPEAT))
+        tStreamed = min(timeit.repeat(streamed, number=1, repeat=REPEAT))
+        with open(legacyPath, 'rb') as f1, open(yw7File.filePath, 'rb') as f2:
+            same = f1.read() == f2.read()
+        size = os.path.getsize(yw7File.filePath) / 1e6
+        print(f'{len(yw7File.novel.scenes)} scenes, {size:.1f} MB, identical output: {same}')
+        print(f'ElementTree + postprocessing: {tLegacy * 1000:8.1f} ms')
+        print(f'single-pass serializer:       {tStreamed * 1000:8.1f} ms ({tLegacy / tStreamed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -35,6 +35,8 @@ from tools.ywriter_tools import (
 # Progress monitoring and writing state imports
 from tools.writing_progress import WritingProgressMonitor
 from tools.writing_state import WritingState
+from tools.write_behind import WriteBehindSession
+from tools.coordination import compact_projects
 
 # Load environment variables
 load_dotenv()
@@ -174,6 +176,20 @@ class BookWritingCrew:
         return Researcher(config=config)
 
     def kickoff(self):
-        """Initialize and start the crew's work."""
-        # Add your kickoff logic here
-        pass
\ No newline at end of file
+        """Initialize and start the crew's work.
+
+        yWriter project writes made by the tools are batched in a
+        write-behind session that is always flushed when the crew ends.
+        Flushing is configured by YW7_FLUSH_INTERVAL (seconds) and
+        YW7_FLUSH_OPS (number of operations). Projects with journaled
+        changes are then compacted, so yWriter can open them.
+        """
+        flush_interval = os.environ.get("YW7_FLUSH_INTERVAL")
+        flush_ops = os.environ.get("YW7_FLUSH_OPS")
+        with WriteBehindSession(
+            flush_interval=float(flush_interval) if flush_interval else None,
+            flush_ops=int(flush_ops) if flush_ops else None,
+        ):
+            # Add your kickoff logic here
+            pass
+        compact_projects()
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""Provide a generator for synthetic yWriter projects.
+
+Used by the tests and benchmarks that need projects of a given size.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from ywriter7.model.novel import Novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.scene import Scene
+from ywriter7.model.character import Character
+from ywriter7.model.world_element import WorldElement
+from ywriter7.model.project_note import ProjectNote
+
+_PARAGRAPH = ('The [i]old[/i] lighthouse keeper -- tired & wary -- climbed the stairs. '
+              '"Who\'s there?" she asked, holding the lamp <high>.\n'
+              'Nobody answered; only the sea [lang=de-DE]rauschte[/lang=de-DE] below.\n')
+
+
+def create_novel(chapters=10, scenesPerChapter=10, paragraphs=3):
+    """Return a Novel instance with generated contents.
+
+    Optional arguments:
+        chapters: int -- number of chapters.
+        scenesPerChapter: int -- number of scenes per chapter.
+        paragraphs: int -- number of text paragraphs per scene.
+    """
+    novel = Novel()
+    novel.title = 'Synthetic Project'
+    novel.desc = 'Generated for testing & benchmarking.'
+    novel.authorName = 'Test Author'
+    novel.languageCode = 'en'
+    novel.countryCode = 'US'
+    for i in range(1, 11):
+        crId = str(i)
+        character = Character()
+        character.title = f'Character {i}'
+        character.fullName = f'Character Number {i}'
+        character.desc = f'Description of character {i}.'
+        character.tags = ['cast', f'group{i % 3}']
+        character.isMajor = i <= 3
+        novel.characters[crId] = character
+        novel.srtCharacters.append(crId)
+
+        location = WorldElement()
+        location.title = f'Location {i}'
+        location.tags = [f'region{i % 2}']
+        novel.locations[crId] = location
+        novel.srtLocations.append(crId)
+
+        item = WorldElement()
+        item.title = f'Item {i}'
+        novel.items[crId] = item
+        novel.srtItems.append(crId)
+
+    note = ProjectNote()
+    note.title = 'Note'
+    note.desc = 'A project note.'
+    novel.projectNotes['1'] = note
+    novel.srtPrjNotes.append('1')
+
+    scNumber = 0
+    for i in range(1, chapters + 1):
+        chId = str(i)
+        chapter = Chapter()
+        chapter.title = f'Chapter {i}'
+        chapter.desc = f'Summary of chapter {i}.'
+        chapter.chLevel = 0
+        chapter.chType = 0
+        chapter.srtScenes = []
+        novel.chapters[chId] = chapter
+        novel.srtChapters.append(chId)
+        for __ in range(scenesPerChapter):
+            scNumber += 1
+            scId = str(scNumber)
+            scene = Scene()
+            scene.title = f'Scene {scNumber}'
+            scene.desc = f'Summary of scene {scNumber}.'
+            scene.sceneContent = _PARAGRAPH * paragraphs
+            scene.scType = 0
+            scene.status = scNumber % 5 + 1
+            scene.tags = ['synthetic', f'arc{scNumber % 4}']
+            scene.characters = [str(scNumber % 10 + 1), str((scNumber + 3) % 10 + 1)]
+            scene.locations = [str(scNumber % 10 + 1)]
+            scene.items = [str(scNumber % 10 + 1)]
+            scene.date = f'2020-01-{scNumber % 28 + 1:02}'
+            scene.time = '08:30:00'
+            scene.lastsHours = '1'
+            scene.goal = 'Find out who is there.'
+            scene.notes = 'Some notes.'
+            novel.scenes[scId] = scene
+            chapter.srtScenes.append(scId)
+    return novel
@@ -0,0 +1,48 @@
+import copy
+import pickle
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.character import Character
+from ywriter7.model.scene import Scene
+
+
+class SlottedElementTest(unittest.TestCase):
+
+    def test_no_instance_dictionary(self):
+        for element in (Scene(), Chapter(), Character()):
+            self.assertFalse(hasattr(element, "__dict__"), type(element).__name__)
+        with self.assertRaises(AttributeError):
+            Scene().sceneNumber = 1
+
+    def test_state(self):
+        scene = Scene()
+        scene.title = "Title"
+        scene.sceneContent = "Two words."
+        state = scene.get_state()
+        self.assertEqual(state["title"], "Title")
+        self.assertEqual(state["_sceneContent"], "Two words.")
+        self.assertNotIn("minute", state)
+
+        copied = Scene.__new__(Scene)
+        copied.set_state(state)
+        self.assertEqual(copied.changeStamp, scene.changeStamp)
+        self.assertEqual(copied.wordCount, 2)
+
+    def test_copy_and_pickle(self):
+        novel = create_novel(chapters=2, scenesPerChapter=2)
+        novel.register_client(self)
+        for copied in (copy.deepcopy(novel), pickle.loads(pickle.dumps(novel))):
+            self.assertEqual(copied.title, novel.title)
+            self.assertEqual(copied._clients, [])
+            for scId, scene in novel.scenes.items():
+                self.assertEqual(copied.scenes[scId].get_state(), scene.get_state())
+            self.assertEqual(copied.chapters["1"].srtScenes, novel.chapters["1"].srtScenes)
+
+    def on_element_change(self, novel, elemType, elemId):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
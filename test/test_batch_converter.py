@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.converter.batch_converter import BatchConverter
+from ywriter7.model.novel import Novel
+from ywriter7.yw.data_files import DataFiles
+from ywriter7.yw.yw7_file import Yw7File
+
+
+class BatchConverterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "projects")
+        self.target_dir = os.path.join(self.temp_dir, "export")
+        os.mkdir(self.source_dir)
+        os.mkdir(self.target_dir)
+        for name in ("a", "b", "c"):
+            yw7_file = Yw7File(os.path.join(self.source_dir, f"{name}.yw7"))
+            yw7_file.novel = create_novel(chapters=2, scenesPerChapter=2)
+            yw7_file.novel.title = name
+            yw7_file.write()
+        with open(os.path.join(self.source_dir, "broken.yw7"), "w") as f:
+            f.write("<YWRITER7><PROJECT>")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _check(self, processes):
+        converter = BatchConverter(processes=processes, targetDir=self.target_dir)
+        missing = os.path.join(self.source_dir, "missing.yw7")
+        results = converter.run([os.path.join(self.source_dir, "*.yw7"), missing], [Yw7File, DataFiles])
+        self.assertEqual(
+            [os.path.basename(sourcePath) for sourcePath, __, __ in results],
+            ["a.yw7", "b.yw7", "broken.yw7", "c.yw7", "missing.yw7"],
+        )
+        errors = {os.path.basename(sourcePath): errors for sourcePath, __, errors in results}
+        self.assertEqual(errors["a.yw7"], [])
+        self.assertEqual(errors["c.yw7"], [])
+        self.assertEqual(len(errors["broken.yw7"]), 1)
+        self.assertEqual(len(errors["missing.yw7"]), 1)
+        for name in ("a", "b", "c"):
+            yw7_file = Yw7File(os.path.join(self.target_dir, f"{name}.yw7"))
+            yw7_file.novel = Novel()
+            yw7_file.read()
+            self.assertEqual(yw7_file.novel.title, name)
+            self.assertTrue(os.path.isfile(os.path.join(self.target_dir, f"{name}_Characters.xml")))
+        self.assertTrue(converter.ui.infoHowText)
+
+    def test_serial(self):
+        self._check(processes=1)
+
+    def test_process_pool(self):
+        self._check(processes=2)
+
+    def test_same_file(self):
+        results = BatchConverter(processes=1).run([os.path.join(self.source_dir, "a.yw7")], [Yw7File])
+        self.assertEqual(len(results[0][2]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from tools.coordination import (
+    LOCK_EXTENSION,
+    MergeConflictError,
+    ProjectLock,
+    commit_project,
+    compact_projects,
+    journal_change,
+    track_change,
+)
+from tools.project_cache import ProjectCache
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.model.project_note import ProjectNote
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, PRJ_NOTE_PREFIX, SCENE_PREFIX
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_journal import Yw7Journal
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class CommitProjectTest(unittest.TestCase):
+    """Two writers change the same project; the second one merges on commit."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=2, scenesPerChapter=2)
+        yw7_file.write()
+        self.cache = ProjectCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read()
+        return yw7_file
+
+    def _add_note(self, yw7_file, title):
+        note_id = yw7_file.novel.get_id_allocator(PRJ_NOTE_PREFIX).create_id()
+        track_change(yw7_file, PRJ_NOTE_PREFIX, note_id)
+        note = ProjectNote()
+        note.title = title
+        yw7_file.novel.projectNotes[note_id] = note
+        yw7_file.novel.srtPrjNotes.append(note_id)
+        return note_id
+
+    def _write_scene(self, yw7_file, scene_id, content):
+        track_change(yw7_file, SCENE_PREFIX, scene_id)
+        yw7_file.novel.scenes[scene_id].sceneContent = content
+
+    def test_unchanged_file(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Our content.")
+        self.assertEqual(commit_project(ours, self.cache), {})
+        self.assertIs(self.cache.get(self.yw7_path), ours)
+        self.assertEqual(self._read().novel.scenes["1"].sceneContent, "Our content.")
+
+    def test_merge(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Our content.")
+        track_change(ours, CHAPTER_PREFIX, "2")
+        ours.novel.chapters["2"].title = "Our title"
+
+        theirs = self._read()
+        theirs.novel.scenes["2"].sceneContent = "Their content."
+        theirs.novel.chapters["1"].title = "Their title"
+        theirs.write()
+
+        self.assertEqual(commit_project(ours, self.cache), {})
+        novel = self._read().novel
+        self.assertEqual(novel.scenes["1"].sceneContent, "Our content.")
+        self.assertEqual(novel.scenes["2"].sceneContent, "Their content.")
+        self.assertEqual(novel.chapters["1"].title, "Their title")
+        self.assertEqual(novel.chapters["2"].title, "Our title")
+        self.assertEqual(self.cache.get(self.yw7_path).novel.scenes["2"].sceneContent, "Their content.")
+
+    def test_same_id_added(self):
+        ours = self.cache.get(self.yw7_path)
+        our_id = self._add_note(ours, "Our note")
+        theirs = self._read()
+        their_id = self._add_note(theirs, "Their note")
+        theirs.write()
+        self.assertEqual(our_id, their_id)
+
+        renumbered = commit_project(ours, self.cache)
+        new_id = renumbered[PRJ_NOTE_PREFIX, our_id]
+        novel = self._read().novel
+        self.assertEqual(novel.projectNotes[their_id].title, "Their note")
+        self.assertEqual(novel.projectNotes[new_id].title, "Our note")
+        self.assertEqual(novel.srtPrjNotes[-2:], [their_id, new_id])
+
+    def test_conflict(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Our content.")
+        theirs = self._read()
+        theirs.novel.scenes["1"].sceneContent = "Their content."
+        theirs.write()
+
+        with self.assertRaises(MergeConflictError):
+            commit_project(ours, self.cache)
+        self.assertNotIn(self.yw7_path, self.cache)
+        self.assertEqual(self._read().novel.scenes["1"].sceneContent, "Their content.")
+
+    def test_same_change(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Same content.")
+        theirs = self._read()
+        theirs.novel.scenes["1"].sceneContent = "Same content."
+        theirs.write()
+        self.assertEqual(commit_project(ours, self.cache), {})
+
+    def test_journal_and_compact(self):
+        journal_path = f"{self.yw7_path}{Yw7Journal.EXTENSION}"
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Journaled content.")
+        self.assertTrue(journal_change(ours, (SCENE_PREFIX, "1"), self.cache))
+        self.assertTrue(os.path.isfile(journal_path))
+        self.assertIs(self.cache.get(self.yw7_path), ours)
+        self.assertEqual(self._read().novel.scenes["1"].sceneContent, "Journaled content.")
+
+        # Nothing is compacted until the caller asks for it.
+        compact_projects(self.cache)
+        self.assertFalse(os.path.isfile(journal_path))
+        self.assertEqual(self._read().novel.scenes["1"].sceneContent, "Journaled content.")
+
+    def test_journal_full(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Journaled content.")
+        self.assertFalse(journal_change(ours, (SCENE_PREFIX, "1"), self.cache, compact_bytes=1))
+        self.assertEqual(commit_project(ours, self.cache), {})
+        self.assertFalse(os.path.isfile(f"{self.yw7_path}{Yw7Journal.EXTENSION}"))
+
+    def test_journal_changed_file(self):
+        ours = self.cache.get(self.yw7_path)
+        self._write_scene(ours, "1", "Our content.")
+        theirs = self._read()
+        theirs.novel.scenes["2"].sceneContent = "Their content."
+        theirs.write()
+        self.assertFalse(journal_change(ours, (SCENE_PREFIX, "1"), self.cache))
+        self.assertFalse(os.path.isfile(f"{self.yw7_path}{Yw7Journal.EXTENSION}"))
+
+
+class ProjectLockTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_reentrant(self):
+        with ProjectLock(self.yw7_path, timeout=0.5):
+            with ProjectLock(self.yw7_path, timeout=0.5):
+                pass
+            self.assertTrue(os.path.isfile(f"{self.yw7_path}{LOCK_EXTENSION}"))
+        with ProjectLock(self.yw7_path, timeout=0.5):
+            pass
+
+    def test_other_thread_waits(self):
+        errors = []
+
+        def acquire():
+            try:
+                with ProjectLock(self.yw7_path, timeout=0.1):
+                    pass
+            except TimeoutError as e:
+                errors.append(e)
+
+        with ProjectLock(self.yw7_path):
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+        self.assertEqual(len(errors), 1)
+
+    @unittest.skipIf(fcntl is None, "requires fcntl")
+    def test_other_process_waits(self):
+        with open(f"{self.yw7_path}{LOCK_EXTENSION}", "a+b") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            with self.assertRaises(TimeoutError):
+                ProjectLock(self.yw7_path, timeout=0.1).acquire()
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        with ProjectLock(self.yw7_path, timeout=0.1):
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
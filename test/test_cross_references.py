@@ -0,0 +1,146 @@
+import gc
+import random
+import unittest
+import weakref
+
+from test.synthetic_project import create_novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.character import Character
+from ywriter7.model.cross_references import CrossReferences
+from ywriter7.model.scene import Scene
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, CHARACTER_PREFIX, LOCATION_PREFIX, SCENE_PREFIX
+
+
+class CrossReferencesTest(unittest.TestCase):
+    """Incrementally maintained cross references must equal regenerated ones."""
+
+    def setUp(self):
+        self.novel = create_novel(chapters=4, scenesPerChapter=5)
+        self.xref = CrossReferences()
+        self.xref.generate_xref(self.novel)
+
+    def assert_up_to_date(self):
+        expected = CrossReferences()
+        expected.generate_xref(self.novel)
+        for attribute in (
+            "scnPerChr", "scnPerLoc", "scnPerItm", "scnPerTag",
+            "chrPerTag", "locPerTag", "itmPerTag", "chpPerScn", "srtScenes",
+        ):
+            self.assertEqual(getattr(self.xref, attribute), getattr(expected, attribute), attribute)
+
+    def test_scene_edits(self):
+        scene = self.novel.scenes["7"]
+        scene.characters = ["1", "2", "9"]
+        scene.tags = ["new tag", "synthetic"]
+        scene.locations = []
+        self.novel.notify(SCENE_PREFIX, "7")
+        self.assert_up_to_date()
+
+    def test_scene_moves(self):
+        chapters = self.novel.chapters
+        scId = chapters["1"].srtScenes.pop(0)
+        chapters["3"].srtScenes.insert(2, scId)
+        self.novel.notify(CHAPTER_PREFIX, "1")
+        self.novel.notify(CHAPTER_PREFIX, "3")
+        self.assert_up_to_date()
+        chapters["2"].srtScenes.reverse()
+        self.novel.notify(CHAPTER_PREFIX, "2")
+        self.assert_up_to_date()
+        self.novel.srtChapters.remove("4")
+        self.novel.srtChapters.insert(0, "4")
+        self.novel.notify(CHAPTER_PREFIX, "4")
+        self.assert_up_to_date()
+
+    def test_scene_added_and_removed(self):
+        scene = Scene()
+        scene.characters = ["3"]
+        scene.tags = ["added"]
+        self.novel.scenes["100"] = scene
+        self.novel.chapters["2"].srtScenes.insert(1, "100")
+        self.novel.notify(CHAPTER_PREFIX, "2")
+        self.assert_up_to_date()
+        self.novel.chapters["2"].srtScenes.remove("100")
+        del self.novel.scenes["100"]
+        self.novel.notify(CHAPTER_PREFIX, "2")
+        self.assert_up_to_date()
+
+    def test_target_chapter_notified_first(self):
+        chapters = self.novel.chapters
+        chapters["1"].srtScenes.remove("2")
+        chapters["4"].srtScenes.append("2")
+        self.novel.notify(CHAPTER_PREFIX, "4")
+        self.assertEqual(self.xref.srtScenes.count("2"), 1)
+        self.assertEqual(self.xref.chpPerScn["2"], "4")
+        self.novel.notify(CHAPTER_PREFIX, "1")
+        self.assert_up_to_date()
+
+    def test_chapter_removed(self):
+        self.novel.srtChapters.remove("2")
+        del self.novel.chapters["2"]
+        self.novel.notify(CHAPTER_PREFIX, "2")
+        self.assert_up_to_date()
+
+    def test_chapter_added(self):
+        chapter = Chapter()
+        chapter.srtScenes = ["5"]
+        self.novel.chapters["1"].srtScenes.remove("5")
+        self.novel.chapters["9"] = chapter
+        self.novel.srtChapters.insert(1, "9")
+        self.novel.notify(CHAPTER_PREFIX, "9")
+        self.assert_up_to_date()
+
+    def test_element_tags(self):
+        self.novel.characters["2"].tags = ["villain", "cast"]
+        self.novel.notify(CHARACTER_PREFIX, "2")
+        self.novel.locations["4"].tags = []
+        self.novel.notify(LOCATION_PREFIX, "4")
+        character = Character()
+        character.tags = ["cast"]
+        self.novel.characters["11"] = character
+        self.novel.srtCharacters.insert(0, "11")
+        self.novel.notify(CHARACTER_PREFIX, "11")
+        self.assert_up_to_date()
+
+    def test_random_changes(self):
+        rng = random.Random(7)
+        for __ in range(200):
+            scId = rng.choice(list(self.novel.scenes))
+            if rng.random() < 0.5:
+                self.novel.scenes[scId].characters = rng.sample(self.novel.srtCharacters, rng.randint(0, 3))
+                self.novel.scenes[scId].tags = rng.sample(["a", "b", "c", "d"], rng.randint(0, 2))
+                self.novel.notify(SCENE_PREFIX, scId)
+            else:
+                source = self.xref.chpPerScn[scId]
+                target = rng.choice(self.novel.srtChapters)
+                self.novel.chapters[source].srtScenes.remove(scId)
+                srtScenes = self.novel.chapters[target].srtScenes
+                srtScenes.insert(rng.randint(0, len(srtScenes)), scId)
+                self.novel.notify(CHAPTER_PREFIX, source)
+                self.novel.notify(CHAPTER_PREFIX, target)
+        self.assert_up_to_date()
+
+    def test_in_place_edits(self):
+        # Changes are collected without notification.
+        self.assertIn("4", self.xref.scnPerChr["5"])
+        self.novel.scenes["4"].tags.append("in place")
+        self.novel.scenes["7"].tags.remove("synthetic")
+        self.novel.scenes["4"].characters.remove("5")
+        self.novel.characters["3"].tags.append("in place")
+        self.assert_up_to_date()
+        self.assertEqual(self.xref.scnPerTag["in place"], ["4"])
+        self.assertNotIn("4", self.xref.scnPerChr["5"])
+        self.assertEqual(self.xref.chrPerTag["in place"], ["3"])
+        self.novel.chapters["3"].srtScenes.append(self.novel.chapters["1"].srtScenes.pop(0))
+        self.novel.srtChapters.reverse()
+        self.novel.srtCharacters.reverse()
+        self.assert_up_to_date()
+
+    def test_discarded_instance(self):
+        xref = weakref.ref(self.xref)
+        self.xref = None
+        gc.collect()
+        self.assertIsNone(xref())
+        self.novel.scenes["1"].tags.append("after")
+
+if __name__ == "__main__":
+    unittest.main()
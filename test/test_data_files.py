@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from test.synthetic_project import create_novel
+from ywriter7.yw.data_files import DataFiles
+
+
+class DataFilesWriteTest(unittest.TestCase):
+    """The single-pass writer must produce the same bytes as ElementTree + postprocessing."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.xml_path = os.path.join(self.temp_dir, "project.xml")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _legacy_write(self, data_files, path):
+        """Write the data files the way DataFiles did before single-pass serialization."""
+        for tag, suffix in DataFiles._DATA_FILES:
+            file_path = f"{path}{suffix}"
+            ET.ElementTree(data_files.tree.find(tag)).write(file_path, xml_declaration=False, encoding="utf-8")
+            data_files._postprocess_xml_file(file_path)
+
+    def _write(self, **kwargs):
+        novel = create_novel(chapters=2, scenesPerChapter=2)
+        novel.characters["1"].notes = " \nStarts with a blank line\r\nand CR LF ]] \n]] & <done>\n"
+        novel.characters["2"].bio = "A & B"
+        novel.locations["1"].aka = "[CDATA[ \n inside"
+        novel.items["1"].desc = ""
+        data_files = DataFiles(self.xml_path, **kwargs)
+        data_files.novel = novel
+        data_files.write()
+        return data_files
+
+    def _read_outputs(self, path):
+        outputs = []
+        for __, suffix in DataFiles._DATA_FILES:
+            with open(f"{path}{suffix}", "rb") as f:
+                outputs.append(f.read())
+        return outputs
+
+    def test_same_output(self):
+        data_files = self._write()
+        legacy_path = os.path.join(self.temp_dir, "legacy")
+        self._legacy_write(data_files, legacy_path)
+        self.assertEqual(self._read_outputs(os.path.join(self.temp_dir, "project")), self._read_outputs(legacy_path))
+
+    def test_concurrent(self):
+        self._write()
+        sequential = self._read_outputs(os.path.join(self.temp_dir, "project"))
+        self._write(concurrent=True)
+        self.assertEqual(self._read_outputs(os.path.join(self.temp_dir, "project")), sequential)
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            ["project_Characters.xml", "project_Items.xml", "project_Locations.xml"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+import os
+import shutil
+import tempfile
+import unittest
+from string import Template
+from unittest import mock
+
+from test.synthetic_project import create_novel
+from ywriter7.file.compiled_filter import ChapterFilter, ChapterRangeFilter, SceneFilter, TagFilter
+from ywriter7.file.compiled_template import CompiledTemplate, Deferred, LazyMapping
+from ywriter7.file.file_export import FileExport
+from ywriter7.file.filter import Filter
+from ywriter7.model.scene_query import HasTag, Status
+
+
+class CountingExport(FileExport):
+    """Exporter with a scene template using only a few placeholders."""
+    DESCRIPTION = "Test export"
+    EXTENSION = ".txt"
+    _fileHeader = "$Title by $AuthorName\n"
+    _chapterTemplate = "## ${ChapterNumber}. $Title\n"
+    _sceneTemplate = "$SceneNumber $Title ($Viewpoint) costs $$5 $Unknown\n"
+    _sceneDivider = "* * *\n"
+
+    def __init__(self, filePath, **kwargs):
+        super().__init__(filePath, **kwargs)
+        self.conversions = []
+
+    def _convert_from_yw(self, text, quick=False):
+        self.conversions.append(text)
+        return super()._convert_from_yw(text, quick)
+
+
+class TotalsExport(CountingExport):
+    """Exporter with part and unused scene templates, and running totals."""
+    _partTemplate = "# $Title\n"
+    _sceneTemplate = "$SceneNumber $Title $WordsTotal/$LettersTotal\n"
+    _unusedSceneTemplate = "unused $Title\n"
+
+
+class CompiledTemplateTest(unittest.TestCase):
+    """Compiled templates must substitute exactly like string.Template.safe_substitute()."""
+
+    def test_parity(self):
+        mapping = {"a": 1, "bc": "x$y", "d_e": None}
+        for text in (
+            "",
+            "plain text",
+            "$a",
+            "${a}b $bc-$d_e $missing ${missing}",
+            "$$a costs $$ $ 5 $",
+            "${a $1 $a$a$$",
+        ):
+            self.assertEqual(CompiledTemplate(text).safe_substitute(mapping), Template(text).safe_substitute(mapping))
+
+    def test_placeholders(self):
+        self.assertEqual(CompiledTemplate("$a ${b} $$c $a").placeholders, {"a", "b"})
+
+    def test_lazy_mapping(self):
+        calls = []
+        mapping = LazyMapping(a=Deferred(calls.append, "a"), b=Deferred(str.upper, "b"))
+        self.assertEqual(mapping["b"], "B")
+        self.assertEqual(mapping.get("b"), "B")
+        self.assertEqual(calls, [])
+
+
+class FileExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_export(self):
+        exporter = CountingExport(os.path.join(self.temp_dir, "novel.txt"))
+        exporter.novel = create_novel(chapters=2, scenesPerChapter=2)
+        exporter.write()
+        with open(exporter.filePath, encoding="utf-8") as f:
+            text = f.read()
+        self.assertEqual(
+            text,
+            "Synthetic Project by Test Author\n"
+            "## 1. Chapter 1\n"
+            "1 Scene 1 (Character 2) costs $5 $Unknown\n"
+            "* * *\n"
+            "2 Scene 2 (Character 3) costs $5 $Unknown\n"
+            "## 2. Chapter 2\n"
+            "3 Scene 3 (Character 4) costs $5 $Unknown\n"
+            "* * *\n"
+            "4 Scene 4 (Character 5) costs $5 $Unknown\n",
+        )
+        # Only the titles used by the templates are converted.
+        self.assertNotIn(exporter.novel.scenes["1"].sceneContent, exporter.conversions)
+        self.assertEqual(len(exporter.conversions), 2 + 2 + 4)
+
+    def test_iter_text(self):
+        exporter = CountingExport(os.path.join(self.temp_dir, "novel.txt"))
+        exporter.novel = create_novel(chapters=3, scenesPerChapter=2)
+        chunks = list(exporter.iter_text())
+        self.assertEqual(chunks[1], "## 1. Chapter 1\n1 Scene 1 (Character 2) costs $5 $Unknown\n* * *\n"
+                         "2 Scene 2 (Character 3) costs $5 $Unknown\n")
+        exporter.write()
+        with open(exporter.filePath, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "".join(chunks))
+        self.assertEqual("".join(chunks), exporter._get_text())
+
+    def test_overridden_get_chapters(self):
+
+        class ExtendedExport(CountingExport):
+
+            def _get_chapters(self):
+                return ["Chapters:\n"] + super()._get_chapters()
+
+        exporter = ExtendedExport(os.path.join(self.temp_dir, "novel.txt"))
+        exporter.novel = create_novel(chapters=1, scenesPerChapter=1)
+        self.assertEqual(
+            "".join(exporter.iter_text()),
+            "Synthetic Project by Test Author\nChapters:\n## 1. Chapter 1\n1 Scene 1 (Character 2) costs $5 $Unknown\n",
+        )
+
+    def test_failed_export_keeps_file(self):
+        exporter = CountingExport(os.path.join(self.temp_dir, "novel.txt"))
+        exporter.novel = create_novel(chapters=2, scenesPerChapter=1)
+        exporter.write()
+        with open(exporter.filePath, encoding="utf-8") as f:
+            before = f.read()
+        exporter.novel.chapters["2"].srtScenes.append("missing")
+        with self.assertRaises(KeyError):
+            exporter.write()
+        with open(exporter.filePath, encoding="utf-8") as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.temp_dir), ["novel.txt"])
+
+    def test_file_exists_while_replaced(self):
+        exporter = CountingExport(os.path.join(self.temp_dir, "novel.txt"))
+        exporter.novel = create_novel(chapters=1, scenesPerChapter=1)
+        exporter.write()
+        replace = os.replace
+
+        def checked_replace(src, dst):
+            self.assertTrue(os.path.isfile(exporter.filePath))
+            self.assertNotEqual(src, exporter.filePath)
+            replace(src, dst)
+
+        with mock.patch("os.replace", checked_replace):
+            exporter.write()
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ["novel.txt", "novel.txt.bak"])
+
+
+class NumberingAllScenes(TotalsExport):
+    """Exporter numbering all scenes, whatever their type."""
+
+    def _get_scenes(self, chId, sceneNumber, wordsTotal, lettersTotal, doNotExport):
+        lines = []
+        for scId in self.novel.chapters[chId].srtScenes:
+            sceneNumber += 1
+            template = self._get_template("SC $SceneNumber $Title\n")
+            lines.append(template.safe_substitute(self._get_sceneMapping(scId, sceneNumber, wordsTotal, lettersTotal)))
+        return lines, sceneNumber, wordsTotal, lettersTotal
+
+
+class ChapterParallelExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        novel = create_novel(chapters=8, scenesPerChapter=3)
+        novel.chapters["2"].chType = 1
+        novel.chapters["3"].chLevel = 1
+        for scId in novel.chapters["4"].srtScenes:
+            novel.scenes[scId].doNotExport = True
+        novel.scenes["14"].scType = 3
+        novel.scenes["15"].sceneContent = "<HTML>raw</HTML>"
+        novel.scenes["17"].doNotExport = True
+        novel.scenes["19"].sceneContent = "Short."
+        self.novel = novel
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _get_exporter(self, **kwargs):
+        exporter = TotalsExport(os.path.join(self.temp_dir, "novel.txt"), **kwargs)
+        exporter.novel = self.novel
+        return exporter
+
+    def test_chapter_starts(self):
+        exporter = self._get_exporter()
+        chapterStarts = exporter._get_chapter_starts()
+        self.assertEqual([(chId, number) for chId, number, *__ in chapterStarts],
+                         [("1", 1), ("2", 0), ("3", 0), ("4", 0), ("5", 2), ("6", 3), ("7", 4), ("8", 5)])
+        for (chId, __, doNotExport, *totals), nextStart in zip(chapterStarts, chapterStarts[1:]):
+            # The prefix sums must match the totals the scene processing accumulates.
+            __, *nextTotals = exporter._get_scenes(chId, *totals, doNotExport)
+            self.assertEqual(nextTotals, list(nextStart[3:]))
+
+    def test_overridden_scenes(self):
+        # The numbers and totals returned by an overridden _get_scenes() are passed on.
+        serial = "".join(self._get_exporter().iter_text())
+        for kwargs in ({}, {"processes": 2}):
+            exporter = NumberingAllScenes(os.path.join(self.temp_dir, "novel.txt"), **kwargs)
+            exporter.novel = self.novel
+            text = "".join(exporter.iter_text())
+            self.assertNotEqual(text, serial)
+            self.assertEqual(text.count("SC "), 24)
+            self.assertIn("SC 24 ", text)
+
+    def test_parallel_export(self):
+        serial = "".join(self._get_exporter().iter_text())
+        self.assertIn("# Chapter 3\n", serial)
+        self.assertIn("unused Scene 14\n", serial)
+        self.assertEqual("".join(self._get_exporter(processes=2).iter_text()), serial)
+
+
+
+class TagScanFilter(Filter):
+    """Scene filter inspecting each scene, to compare the compiled filters with."""
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def accept(self, source, eId):
+        return self.tag in source.novel.scenes[eId].tags
+
+
+class CompiledFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.novel = create_novel(chapters=6, scenesPerChapter=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _export(self, sceneFilter, chapterFilter=None, **kwargs):
+        exporter = TotalsExport(os.path.join(self.temp_dir, "novel.txt"), **kwargs)
+        exporter.novel = self.novel
+        exporter._sceneFilter = sceneFilter
+        if chapterFilter is not None:
+            exporter._chapterFilter = chapterFilter
+        return "".join(exporter.iter_text())
+
+    def test_same_as_scan(self):
+        # Scenes tagged "arc1" are in the chapters 1, 3, and 5 only.
+        expected = self._export(TagScanFilter("arc1"))
+        self.assertEqual(self._export(TagFilter("arc1")), expected)
+        self.assertEqual(self._export(SceneFilter(HasTag("arc1"))), expected)
+        self.assertEqual(self._export(TagFilter("arc1"), processes=2), expected)
+        self.assertIn("Chapter 2\n", expected)
+
+    def test_chapter_filter(self):
+        text = self._export(TagFilter("arc1"), ChapterFilter(HasTag("arc1")))
+        self.assertNotIn("Chapter 2\n", text)
+        self.assertIn("## 2. Chapter 3\n", text)
+        text = self._export(ChapterRangeFilter("2", "3"))
+        self.assertEqual(text.count("Scene"), 4)
+
+    def test_compiled_per_export(self):
+        sceneFilter = SceneFilter(Status(1) | HasTag("new"))
+        before = self._export(sceneFilter)
+        self.novel.scenes["2"].tags = ["new"]
+        after = self._export(sceneFilter)
+        self.assertNotIn("Scene 2 ", before)
+        self.assertIn("Scene 2 ", after)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from ywriter7.model.id_generator import IdAllocator, create_id
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import Scene
+from ywriter7.pywriter_globals import SCENE_PREFIX
+
+
+class IdAllocatorTest(unittest.TestCase):
+    """The allocator must return the IDs create_id() would return."""
+
+    def test_matches_create_id(self):
+        rng = random.Random(3)
+        elements = {}
+        allocator = IdAllocator(elements)
+        for __ in range(2000):
+            if elements and rng.random() < 0.3:
+                del elements[rng.choice(list(elements))]
+            else:
+                expected = create_id(elements)
+                self.assertEqual(allocator.create_id(), expected)
+                elements[expected] = None
+
+    def test_allocate(self):
+        elements = {"1": None, "2": None, "4": None, "x": None, "07": None}
+        ids = IdAllocator(elements).allocate(4)
+        self.assertEqual(ids, ["3", "5", "6", "7"])
+
+    def test_external_change(self):
+        elements = {}
+        allocator = IdAllocator(elements)
+        for elemId in allocator.allocate(3):
+            elements[elemId] = None
+        del elements["2"]
+        elements["5"] = None
+        # Same number of elements: the change is not detected, but no ID in use is returned.
+        ids = allocator.allocate(3)
+        self.assertFalse(set(ids) & set(elements))
+
+    def test_novel_allocators(self):
+        novel = Novel()
+        allocator = novel.get_id_allocator(SCENE_PREFIX)
+        self.assertIs(novel.get_id_allocator(SCENE_PREFIX), allocator)
+        for scId in allocator.allocate(3):
+            novel.scenes[scId] = Scene()
+        self.assertEqual(allocator.create_id(), "4")
+        novel.scenes = {"1": Scene()}
+        self.assertEqual(novel.get_id_allocator(SCENE_PREFIX).create_id(), "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
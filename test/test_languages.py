@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import LANGUAGE_TAG
+from ywriter7.model.scene import Scene
+from ywriter7.yw.yw7_file import Yw7File
+
+
+def legacy_languages(text):
+    """Scan like the former Novel.get_languages did."""
+    languages = []
+    m = LANGUAGE_TAG.search(text)
+    while m:
+        text = text[m.span()[1]:]
+        if not m.group(1) in languages:
+            languages.append(m.group(1))
+        m = LANGUAGE_TAG.search(text)
+    return languages
+
+
+class SceneLanguagesTest(unittest.TestCase):
+
+    def test_same_as_legacy(self):
+        for text in (
+                "",
+                "No markup.",
+                "[lang=en-AU]a[/lang=en-AU] [lang=de-DE]b[/lang=de-DE] [lang=en-AU]c",
+                "[lang=]x[lang=fr-FR][lang=fr-FR]",
+                "[lang=x]y]" * 100,
+        ):
+            scene = Scene()
+            scene.sceneContent = text
+            self.assertEqual(list(scene.languages), legacy_languages(text))
+
+    def test_cache_invalidated(self):
+        scene = Scene()
+        scene.sceneContent = "[lang=de-DE]Text[/lang=de-DE]"
+        self.assertEqual(scene.languages, ("de-DE",))
+        scene.sceneContent = "[lang=fr-FR]Texte[/lang=fr-FR]"
+        self.assertEqual(scene.languages, ("fr-FR",))
+        scene.set_content_loader(lambda: "[lang=it-IT]Testo[/lang=it-IT]")
+        self.assertEqual(scene.languages, ("it-IT",))
+
+    def test_novel_order(self):
+        novel = Novel()
+        for scId, text in (("1", "[lang=b-B]x [lang=a-A]y"), ("2", None), ("3", "[lang=a-A]z [lang=c-C]")):
+            novel.scenes[scId] = Scene()
+            novel.scenes[scId].sceneContent = text
+        novel.get_languages()
+        self.assertEqual(novel.languages, ["b-B", "a-A", "c-C"])
+
+    def test_contents_not_loaded(self):
+        novel = Novel()
+        novel.languages = ["de-DE"]
+        for scId in ("1", "2"):
+            novel.scenes[scId] = Scene()
+        novel.scenes["1"].set_content_loader(lambda: self.fail("Content loaded"))
+        novel.scenes["2"].sceneContent = "[lang=fr-FR]Bonjour[/lang=fr-FR]"
+        novel.get_languages(load=False)
+        self.assertEqual(novel.languages, ["de-DE", "fr-FR"])
+        self.assertFalse(novel.scenes["1"].contentLoaded)
+
+        # With all contents loaded, the languages no longer in use are dropped.
+        novel.scenes["1"].sceneContent = "No markup."
+        novel.get_languages(load=False)
+        self.assertEqual(novel.languages, ["fr-FR"])
+
+
+class Yw7LanguagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read()
+        return yw7_file
+
+    def test_language_added_after_reading(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=1, scenesPerChapter=2)
+        yw7_file.write()
+        yw7_file = self._read()
+        self.assertEqual(yw7_file.novel.languages, ["de-DE"])
+        yw7_file.novel.scenes["1"].sceneContent = "[lang=fr-FR]Bonjour[/lang=fr-FR]"
+        yw7_file.write()
+        self.assertEqual(self._read().novel.languages, ["de-DE", "fr-FR"])
+
+    def test_lazy_read(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=1, scenesPerChapter=3)
+        yw7_file.write()
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read(lazy_content=True)
+        yw7_file.novel.scenes["1"].sceneContent = "[lang=fr-FR]Bonjour[/lang=fr-FR]"
+        yw7_file.write()
+        self.assertEqual(self._read().novel.languages, ["de-DE", "fr-FR"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tools.project_cache import ProjectCache
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.yw.yw7_file import Yw7File
+
+
+class ProjectCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name in ("a", "b", "c"):
+            yw7_path = os.path.join(self.temp_dir, f"{name}.yw7")
+            yw7_file = Yw7File(yw7_path)
+            yw7_file.novel = create_novel(chapters=1, scenesPerChapter=2)
+            yw7_file.write()
+            self.paths.append(yw7_path)
+        self.cache = ProjectCache(max_projects=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write_externally(self, yw7_path, title):
+        yw7_file = Yw7File(yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read()
+        yw7_file.novel.title = title
+        yw7_file.write()
+
+    def test_hit(self):
+        first = self.cache.get(self.paths[0])
+        relative = os.path.relpath(self.paths[0])
+        self.assertIs(self.cache.get(relative), first)
+        self.assertIn(self.paths[0], self.cache)
+        self.assertEqual(len(self.cache), 1)
+        self.assertTrue(self.cache.is_current(first))
+
+    def test_external_write(self):
+        first = self.cache.get(self.paths[0])
+        self._write_externally(self.paths[0], "Changed elsewhere")
+        self.assertFalse(self.cache.is_current(first))
+        second = self.cache.get(self.paths[0])
+        self.assertIsNot(second, first)
+        self.assertEqual(second.novel.title, "Changed elsewhere")
+
+        # A pinned project is kept, regardless of changes on disk.
+        self.cache.pin(self.paths[0])
+        self._write_externally(self.paths[0], "Changed again")
+        self.assertIs(self.cache.get(self.paths[0]), second)
+        self.cache.unpin(self.paths[0])
+        self.assertEqual(self.cache.get(self.paths[0]).novel.title, "Changed again")
+
+    def test_eviction_skips_pinned(self):
+        first = self.cache.get(self.paths[0])
+        self.cache.pin(self.paths[0])
+        self.cache.get(self.paths[1])
+        self.cache.get(self.paths[2])
+        # The least recently used project is pinned, so the next one is evicted.
+        self.assertIn(self.paths[0], self.cache)
+        self.assertNotIn(self.paths[1], self.cache)
+        self.assertIn(self.paths[2], self.cache)
+        self.assertIs(self.cache.get(self.paths[0]), first)
+
+        self.cache.unpin(self.paths[0])
+        self.cache.get(self.paths[2])
+        self.cache.get(self.paths[1])
+        self.assertNotIn(self.paths[0], self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_replace(self):
+        first = self.cache.get(self.paths[0])
+        merged = Yw7File(self.paths[0])
+        merged.novel = create_novel(chapters=1, scenesPerChapter=3)
+        merged.write()
+        self.cache.replace(self.paths[0], merged)
+        self.assertIs(self.cache.get(self.paths[0]), merged)
+        self.assertTrue(self.cache.is_current(merged))
+        self.assertFalse(self.cache.is_current(first))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.scene_query import (
+    ChapterRange,
+    DateRange,
+    HasArc,
+    HasCharacter,
+    HasTag,
+    InChapters,
+    SceneType,
+    Status,
+    Viewpoint,
+    Where,
+)
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, SCENE_PREFIX
+
+
+class SceneQueryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.novel = create_novel(chapters=10, scenesPerChapter=10)
+
+    def _scan(self, accept):
+        """Return the IDs of the scenes accepted, by a full scan in the novel's order."""
+        result = []
+        for chId in self.novel.srtChapters:
+            for scId in self.novel.chapters[chId].srtScenes:
+                if accept(chId, self.novel.scenes[scId]):
+                    result.append(scId)
+        return result
+
+    def test_all_scenes(self):
+        self.assertEqual(self.novel.query_scenes(), self._scan(lambda chId, scene: True))
+
+    def test_combined(self):
+        chapters = self.novel.srtChapters[2:7]
+        self.assertEqual(
+            self.novel.query_scenes(Status(2), ChapterRange("3", "7"), HasCharacter("4")),
+            self._scan(lambda chId, scene: scene.status == 2 and chId in chapters and "4" in scene.characters),
+        )
+        self.assertEqual(
+            self.novel.query_scenes((HasTag("arc1") | Viewpoint("2")) & ~InChapters("1")),
+            self._scan(
+                lambda chId, scene: ("arc1" in scene.tags or scene.characters[0] == "2") and chId != "1"
+            ),
+        )
+        self.assertEqual(
+            self.novel.query_scenes(DateRange("2020-01-05", "2020-01-07"), Where(lambda scene: "9" in scene.title)),
+            self._scan(lambda chId, scene: "2020-01-05" <= scene.date <= "2020-01-07" and "9" in scene.title),
+        )
+
+    def test_scene_edits(self):
+        index = self.novel.get_scene_index()
+        self.assertEqual(self.novel.query_scenes(HasArc("A")), [])
+        rng = random.Random(2)
+        for __ in range(50):
+            scId = str(rng.randint(1, 100))
+            scene = self.novel.scenes[scId]
+            scene.status = rng.randint(1, 5)
+            scene.scnArcs = rng.choice(["A", "A;B", None])
+            scene.date = rng.choice([None, "2020-02-01", "2019-12-31"])
+            scene.characters.append(str(rng.randint(1, 10)))
+            # Changed in place, so this must be notified.
+            self.novel.notify(SCENE_PREFIX, scId)
+            self.assertEqual(
+                self.novel.query_scenes(Status(3), HasArc("A")),
+                self._scan(lambda chId, scene: scene.status == 3 and "A" in (scene.scnArcs or "").split(";")),
+            )
+            self.assertEqual(
+                self.novel.query_scenes(DateRange(end="2020-01-01"), HasCharacter("5")),
+                self._scan(lambda chId, scene: (scene.date or "9") <= "2020-01-01" and "5" in scene.characters),
+            )
+        self.assertIs(self.novel.get_scene_index(), index)
+
+    def test_moved_scenes(self):
+        self.assertEqual(len(self.novel.query_scenes(SceneType(0))), 100)
+        moved = self.novel.chapters["1"].srtScenes.pop()
+        self.novel.chapters["10"].srtScenes.insert(0, moved)
+        self.novel.notify(CHAPTER_PREFIX, "1")
+        self.novel.notify(CHAPTER_PREFIX, "10")
+        self.assertEqual(self.novel.query_scenes(InChapters("10"))[0], moved)
+
+        removed = self.novel.chapters["2"].srtScenes.pop(0)
+        del self.novel.scenes[removed]
+        self.novel.notify(SCENE_PREFIX, removed)
+        self.assertNotIn(removed, self.novel.query_scenes(SceneType(0)))
+        self.assertEqual(self.novel.query_scenes(), self._scan(lambda chId, scene: True))
+
+    def test_in_place_edits(self):
+        index = self.novel.get_scene_index()
+        self.assertEqual(self.novel.query_scenes(HasTag("new")), [])
+        self.novel.scenes["5"].tags.append("new")
+        self.novel.scenes["7"].characters[0] = "9"
+        self.assertEqual(self.novel.query_scenes(HasTag("new")), ["5"])
+        self.assertEqual(self.novel.query_scenes(Viewpoint("9")), self._scan(lambda chId, scene: scene.characters[0] == "9"))
+
+        moved = self.novel.chapters["1"].srtScenes.pop()
+        self.novel.chapters["10"].srtScenes.insert(0, moved)
+        self.novel.srtChapters.reverse()
+        self.assertEqual(self.novel.query_scenes(InChapters("10"))[0], moved)
+        self.assertEqual(self.novel.query_scenes(), self._scan(lambda chId, scene: True))
+
+        removed = self.novel.chapters["2"].srtScenes.pop(0)
+        del self.novel.scenes[removed]
+        self.assertEqual(self.novel.query_scenes(), self._scan(lambda chId, scene: True))
+        self.assertIs(self.novel.get_scene_index(), index)
+
+
+if __name__ == "__main__":
+    unittest.main()
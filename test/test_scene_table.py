@@ -0,0 +1,100 @@
+import unittest
+from datetime import date
+
+from test.synthetic_project import create_novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.scene import Scene
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, SCENE_PREFIX
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "requires NumPy")
+class SceneTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.novel = create_novel(chapters=3, scenesPerChapter=4)
+        self.table = self.novel.get_scene_table()
+
+    def _expected_words_per_chapter(self):
+        return [
+            sum(self.novel.scenes[scId].wordCount for scId in self.novel.chapters[chId].srtScenes)
+            for chId in self.novel.srtChapters
+        ]
+
+    def test_columns(self):
+        columns = self.table.get_columns()
+        scIds = self.table.get_scene_ids()
+        self.assertEqual(len(scIds), 12)
+        for i, scId in enumerate(scIds):
+            scene = self.novel.scenes[scId]
+            self.assertEqual(columns["wordCount"][i], scene.wordCount)
+            self.assertEqual(columns["letterCount"][i], scene.letterCount)
+            self.assertEqual(columns["status"][i], scene.status or 0)
+        self.assertEqual(list(columns["chapter"]), [0] * 4 + [1] * 4 + [2] * 4)
+        self.assertEqual(list(self.table.words_per_chapter()), self._expected_words_per_chapter())
+        with self.assertRaises(ValueError):
+            columns["status"][0] = 1
+
+    def test_scene_edits(self):
+        scId = self.table.get_scene_ids()[5]
+        scene = self.novel.scenes[scId]
+        scene.sceneContent = "Just three words."
+        scene.status = 5
+        scene.date = "2023-05-30"
+        scene.lastsDays = "2"
+        scene.lastsHours = "1"
+        columns = self.table.get_columns()
+        self.assertEqual(columns["wordCount"][5], 3)
+        self.assertEqual(columns["status"][5], 5)
+        self.assertEqual(columns["duration"][5], 2 * 1440 + 60)
+        self.assertEqual(self.table.status_distribution()[5], sum(
+            1 for scene in self.novel.scenes.values() if scene.status == 5))
+        self.assertEqual(self.table.timeline_span()[1], date(2023, 6, 1))
+        self.assertEqual(list(self.table.words_per_chapter()), self._expected_words_per_chapter())
+
+    def test_moved_scenes(self):
+        chapter = Chapter()
+        chapter.srtScenes = [self.novel.chapters["1"].srtScenes.pop(0)]
+        self.novel.chapters["99"] = chapter
+        self.novel.srtChapters.insert(0, "99")
+        self.novel.notify(CHAPTER_PREFIX, "99")
+        self.novel.notify(CHAPTER_PREFIX, "1")
+        self.assertEqual(self.table.get_scene_ids()[0], chapter.srtScenes[0])
+        self.assertEqual(list(self.table.words_per_chapter()), self._expected_words_per_chapter())
+
+        scId = self.novel.chapters["2"].srtScenes.pop()
+        del self.novel.scenes[scId]
+        self.novel.notify(SCENE_PREFIX, scId)
+        self.assertNotIn(scId, self.table.get_scene_ids())
+        self.assertEqual(len(self.table.get_columns()["status"]), 11)
+
+    def test_in_place_moves(self):
+        moved = self.novel.chapters["1"].srtScenes.pop(0)
+        self.novel.chapters["3"].srtScenes.append(moved)
+        self.assertEqual(self.table.get_scene_ids()[-1], moved)
+        self.assertEqual(list(self.table.words_per_chapter()), self._expected_words_per_chapter())
+
+        self.novel.srtChapters.reverse()
+        self.assertEqual(self.table.get_scene_ids()[:5], self.novel.chapters["3"].srtScenes)
+        self.assertEqual(list(self.table.words_per_chapter()), self._expected_words_per_chapter())
+
+        scId = self.novel.chapters["2"].srtScenes.pop()
+        del self.novel.scenes[scId]
+        self.assertNotIn(scId, self.table.get_scene_ids())
+
+    def test_no_scenes(self):
+        novel = create_novel(chapters=1, scenesPerChapter=1)
+        novel.chapters["1"].srtScenes = []
+        table = novel.get_scene_table()
+        self.assertEqual(list(table.words_per_chapter()), [0])
+        self.assertIsNone(table.timeline_span())
+        self.assertEqual(table.status_distribution().sum(), 0)
+        self.assertEqual(len(table.status_distribution()), len(Scene.STATUS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.splitter import Splitter
+
+
+class Import:
+
+    def __init__(self, novel):
+        self.novel = novel
+
+
+class SplitterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.novel = create_novel(chapters=2, scenesPerChapter=2)
+        self.file = Import(self.novel)
+
+    def _structure(self):
+        return [
+            (self.novel.chapters[chId].title, self.novel.chapters[chId].chLevel,
+             [(self.novel.scenes[scId].title, self.novel.scenes[scId].sceneContent)
+              for scId in self.novel.chapters[chId].srtScenes])
+            for chId in self.novel.srtChapters
+        ]
+
+    def test_no_dividers(self):
+        scene = self.novel.scenes["1"]
+        scene.wordCount = 42
+        self.assertFalse(Splitter().split_scenes(self.file))
+        # Scenes without dividers keep their contents and counts.
+        self.assertEqual(scene.wordCount, 42)
+
+    def test_split(self):
+        self.novel.scenes["2"].sceneContent = (
+            "A\n## Chapter A|About A\n### Scene B\nB1\nB2\n###\n# Part C\n\nC\n## \n### Scene D|About D"
+        )
+        self.assertTrue(Splitter().split_scenes(self.file))
+        self.assertEqual(
+            self._structure()[:5],
+            [
+                ("Chapter 1", 0, [("Scene 1", self.novel.scenes["1"].sceneContent), ("Scene 2", "A")]),
+                ("Chapter A", 0, [("Scene B", "B1\nB2"), ("Scene 2 Split: 2", "")]),
+                ("Part C", 1, [("Scene 2 Split: 1", "\nC")]),
+                ("New Chapter", 0, [("Scene D", "")]),
+                ("Chapter 2", 0, [("Scene 3", self.novel.scenes["3"].sceneContent),
+                                  ("Scene 4", self.novel.scenes["4"].sceneContent)]),
+            ],
+        )
+        self.assertEqual(self.novel.chapters["3"].desc, "About A")
+        self.assertEqual(self.novel.scenes["8"].desc, "About D")
+        self.assertTrue(self.novel.scenes["2"].desc.startswith("(!)"))
+        self.assertEqual(self.novel.scenes["2"].status, 2)
+        self.assertEqual(len(self.novel.scenes), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.scene import ADDITIONAL_WORD_LIMITS
+from ywriter7.model.scene import NO_WORD_LIMITS
+from ywriter7.model.scene import NON_LETTERS
+from ywriter7.model.scene import Scene
+from ywriter7.model.scene import count_words_and_letters
+
+
+def legacy_count(text):
+    """Count like the former sceneContent setter did."""
+    wordText = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+    wordText = NO_WORD_LIMITS.sub('', wordText)
+    return len(wordText.split()), len(NON_LETTERS.sub('', text))
+
+
+class CountWordsAndLettersTest(unittest.TestCase):
+    """The single-pass counter must count like the former regular expressions."""
+
+    SAMPLES = [
+        "",
+        "One two three.",
+        "well-known -- and—or–so",
+        "a-[i]x[/i]-b",
+        "---",
+        "[]] [a\rb] /**/ /* c */ /*x*/y",
+        "> quote\n->not\n >neither\r\nline",
+        "Text with \x00 null",
+        "[lang=de-DE]Wort[/lang=de-DE] und [i]mehr[/i].",
+    ]
+
+    def test_samples(self):
+        for text in self.SAMPLES:
+            self.assertEqual(count_words_and_letters(text), legacy_count(text), repr(text))
+
+    def test_random_texts(self):
+        rng = random.Random(42)
+        alphabet = ["a", " ", "-", "--", "—", "–", "[", "]", "/", "*", "\n", "\r", ">", "x"]
+        for __ in range(5000):
+            text = "".join(rng.choice(alphabet) for __ in range(rng.randint(0, 30)))
+            self.assertEqual(count_words_and_letters(text), legacy_count(text), repr(text))
+
+
+class SceneCountTest(unittest.TestCase):
+    """Scene counts are counted on access and cached until the content changes."""
+
+    def test_counted_on_access(self):
+        scene = Scene()
+        scene.sceneContent = "One two"
+        self.assertFalse(scene.contentCounted)
+        self.assertEqual(scene.wordCount, 2)
+        self.assertTrue(scene.contentCounted)
+        self.assertEqual(scene.letterCount, 7)
+        scene.sceneContent = "One two three"
+        self.assertFalse(scene.contentCounted)
+        self.assertEqual(scene.wordCount, 3)
+
+    def test_lazy_content(self):
+        scene = Scene()
+        scene.set_content_loader(lambda: "Loaded text here", 5, 50)
+        self.assertEqual(scene.wordCount, 5)
+        self.assertFalse(scene.contentLoaded)
+        self.assertEqual(scene.sceneContent, "Loaded text here")
+        self.assertEqual(scene.wordCount, 3)
+        scene.set_content_loader(lambda: "Loaded text")
+        self.assertEqual(scene.letterCount, 11)
+        self.assertTrue(scene.contentLoaded)
+
+
+class NovelRecountTest(unittest.TestCase):
+
+    def test_recount(self):
+        novel = create_novel(chapters=3, scenesPerChapter=4)
+        novel.scenes["1"].sceneContent = None
+        expected = (
+            sum(legacy_count(s.sceneContent or "")[0] for s in novel.scenes.values()),
+            sum(legacy_count(s.sceneContent or "")[1] for s in novel.scenes.values()),
+        )
+        self.assertEqual(novel.recount(), expected)
+        for scene in novel.scenes.values():
+            scene.sceneContent = scene.sceneContent
+        self.assertEqual(novel.recount(processes=2), expected)
+        self.assertTrue(all(scene.contentCounted for scene in novel.scenes.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tools.coordination import MergeConflictError, track_change
+from tools.project_cache import ProjectCache
+from tools.write_behind import WriteBehindSession
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.pywriter_globals import SCENE_PREFIX
+from ywriter7.yw.yw7_file import Yw7File
+
+
+class WriteBehindSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=2, scenesPerChapter=2)
+        yw7_file.write()
+        self.cache = ProjectCache()
+        self.session = WriteBehindSession(cache=self.cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read()
+        return yw7_file
+
+    def _write_scene(self, scene_id, content, on_commit=None, yw7_path=None):
+        yw7_file = self.cache.get(yw7_path or self.yw7_path)
+        track_change(yw7_file, SCENE_PREFIX, scene_id)
+        yw7_file.novel.scenes[scene_id].sceneContent = content
+        self.session.record(yw7_file, on_commit)
+
+    def _write_theirs(self, scene_id, content):
+        theirs = self._read()
+        theirs.novel.scenes[scene_id].sceneContent = content
+        theirs.write()
+
+    def test_on_commit(self):
+        committed = []
+        self._write_scene("1", "Our content.", lambda: committed.append(self._read().novel.scenes["1"].sceneContent))
+        self.assertEqual(committed, [])
+        self.session.flush()
+        self.assertEqual(committed, ["Our content."])
+
+        # Dropped changes are not committed.
+        self._write_scene("1", "Dropped content.", lambda: committed.append("dropped"))
+        self._write_theirs("1", "Their content.")
+        with self.assertRaises(MergeConflictError):
+            self.session.flush()
+        self.assertEqual(committed, ["Our content."])
+        self.session.flush()
+        self.assertEqual(committed, ["Our content."])
+
+    def test_conflict_during_flush(self):
+        other_path = os.path.join(self.temp_dir, "other.yw7")
+        shutil.copy(self.yw7_path, other_path)
+        self.session.flush_ops = 4
+        self._write_scene("1", "Dropped content.")
+        self._write_scene("1", "Other content.", yw7_path=other_path)
+        self._write_scene("2", "Other content.", yw7_path=other_path)
+        self._write_theirs("1", "Their content.")
+        with self.assertRaises(MergeConflictError):
+            self.session.flush()
+        # Only the operations on the other project are still pending.
+        self.assertEqual(self.session.pending_ops, 2)
+        self._write_scene("3", "Other content.", yw7_path=other_path)
+        self.assertEqual(self.session.pending_ops, 3)
+        self.session.flush()
+        self.assertEqual(self.session.pending_ops, 0)
+        other = Yw7File(other_path)
+        other.novel = Novel()
+        other.read()
+        self.assertEqual(other.novel.scenes["3"].sceneContent, "Other content.")
+
+
+if __name__ == "__main__":
+    unittest.main()
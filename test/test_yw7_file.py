@@ -0,0 +1,287 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from test.synthetic_project import create_novel
+from ywriter7.pywriter_globals import SCENE_PREFIX
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import Scene
+from ywriter7.yw.yw7_file import Yw7File
+
+
+class Yw7FileWriteTest(unittest.TestCase):
+    """The single-pass writer must produce the same bytes as ElementTree + postprocessing."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _legacy_write(self, yw7_file, path):
+        """Write the element tree the way Yw7File did before single-pass serialization."""
+        yw7_file.tree.write(path, xml_declaration=False, encoding="utf-8")
+        yw7_file._postprocess_xml_file(path)
+
+    def _assert_same_output(self, novel):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = novel
+        yw7_file.write()
+        legacy_path = os.path.join(self.temp_dir, "legacy.yw7")
+        self._legacy_write(yw7_file, legacy_path)
+        with open(self.yw7_path, "rb") as f:
+            streamed = f.read()
+        with open(legacy_path, "rb") as f:
+            legacy = f.read()
+        self.assertEqual(streamed, legacy)
+
+    def test_synthetic_project(self):
+        self._assert_same_output(create_novel(chapters=5, scenesPerChapter=4))
+
+    def test_edge_case_text(self):
+        novel = create_novel(chapters=1, scenesPerChapter=1)
+        scene = novel.scenes["1"]
+        scene.sceneContent = " \nStarts with a blank line\r\nand CR LF\rand CR ]] \n]] done\n"
+        scene.desc = "Ends with a line feed\n"
+        scene.notes = "[CDATA[ \n inside"
+        scene.field1 = "a & b < c"
+        scene.kwVar["Field_SceneArcs"] = "A & B"
+        self._assert_same_output(novel)
+
+    def test_empty_project(self):
+        self._assert_same_output(Novel())
+
+    def test_backup_and_no_temp_file(self):
+        novel = create_novel(chapters=1, scenesPerChapter=1)
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = novel
+        yw7_file.write()
+        yw7_file.write()
+        self.assertTrue(os.path.isfile(f"{self.yw7_path}.bak"))
+        self.assertFalse(os.path.isfile(f"{self.yw7_path}.tmp"))
+
+    def test_file_exists_while_replaced(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=1, scenesPerChapter=1)
+        yw7_file.write()
+        with open(self.yw7_path, "rb") as f:
+            before = f.read()
+        yw7_file.novel.scenes["1"].title = "Changed"
+        replace = os.replace
+
+        def checked_replace(src, dst):
+            # Readers must find the project file at any time.
+            self.assertTrue(os.path.isfile(self.yw7_path))
+            self.assertNotEqual(src, self.yw7_path)
+            replace(src, dst)
+
+        with mock.patch("os.replace", checked_replace):
+            yw7_file.write()
+        with open(f"{self.yw7_path}.bak", "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertFalse(os.path.isfile(f"{self.yw7_path}.bak.tmp"))
+
+    def test_backup_without_copy(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=1, scenesPerChapter=1)
+        yw7_file.write()
+        before = os.stat(self.yw7_path)
+        with mock.patch("shutil.copy2", side_effect=AssertionError("copied")):
+            yw7_file.write()
+        self.assertTrue(os.path.samestat(os.stat(f"{self.yw7_path}.bak"), before))
+
+        # Without hard links, the file is copied.
+        with open(self.yw7_path, "rb") as f:
+            before = f.read()
+        with mock.patch("os.link", side_effect=OSError):
+            yw7_file.write()
+        with open(f"{self.yw7_path}.bak", "rb") as f:
+            self.assertEqual(f.read(), before)
+        self.assertFalse(os.path.isfile(f"{self.yw7_path}.bak.tmp"))
+
+    def test_read_back(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=2, scenesPerChapter=3)
+        yw7_file.write()
+        reread = Yw7File(self.yw7_path)
+        reread.novel = Novel()
+        reread.read()
+        self.assertEqual(reread.novel.srtChapters, ["1", "2"])
+        self.assertEqual(
+            reread.novel.scenes["4"].sceneContent,
+            yw7_file.novel.scenes["4"].sceneContent.rstrip("\n"),
+        )
+
+
+class Yw7FileLazyReadTest(unittest.TestCase):
+    """Reading with lazy_content=True must give the same scenes as a complete read."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=3, scenesPerChapter=4)
+        yw7_file.novel.scenes["2"].sceneContent = "First line\r\nsecond line ]] and \x01 more"
+        yw7_file.write()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, **kwargs):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read(**kwargs)
+        return yw7_file
+
+    def test_same_content(self):
+        eager = self._read()
+        lazy = self._read(lazy_content=True, keep_tree=False)
+        self.assertEqual(set(eager.novel.scenes), set(lazy.novel.scenes))
+        for scId, scene in eager.novel.scenes.items():
+            lazyScene = lazy.novel.scenes[scId]
+            self.assertFalse(lazyScene.contentLoaded)
+            self.assertEqual(lazyScene.wordCount, scene.wordCount)
+            self.assertEqual(lazyScene.sceneContent, scene.sceneContent)
+            self.assertTrue(lazyScene.contentLoaded)
+            self.assertEqual(lazyScene.letterCount, scene.letterCount)
+
+    def test_small_chunks(self):
+        with mock.patch.object(Yw7File, "_CHUNK_SIZE", 7):
+            lazy = self._read(lazy_content=True)
+        eager = self._read()
+        for scId, scene in eager.novel.scenes.items():
+            self.assertEqual(lazy.novel.scenes[scId].sceneContent, scene.sceneContent)
+
+    def test_write_after_lazy_read(self):
+        lazy = self._read(lazy_content=True)
+        lazy.novel.scenes["1"].title = "Changed"
+        lazy.write()
+        eager = self._read()
+        self.assertEqual(eager.novel.scenes["1"].title, "Changed")
+        self.assertEqual(eager.novel.scenes["5"].sceneContent, lazy.novel.scenes["5"].sceneContent)
+
+
+HANDWRITTEN_PROJECT = """<?xml version="1.0" encoding="utf-8"?>
+<YWRITER7>
+<PROJECT><Ver>7</Ver><Title><![CDATA[Grüße]]></Title></PROJECT>
+<LOCATIONS />
+<ITEMS />
+<CHARACTERS />
+<SCENES>
+<SCENE><ID>1</ID><Title><![CDATA[Überschrift]]></Title><Desc><![CDATA[<b>not a tag</b>]]></Desc>
+<SceneContent><![CDATA[Grüße aus Köln — 日本語のテキスト 𝄞.
+A ]] and a [i]<markup>[/i] & more.]]></SceneContent></SCENE>
+<SCENE><ID>2</ID><SceneContent><![CDATA[Line one\r\nline two\rline\x01 three ä]]></SceneContent></SCENE>
+<SCENE><ID>3</ID><SceneContent>Tom &amp; Jerry &lt;3 — ü</SceneContent></SCENE>
+<SCENE><ID>4</ID><SceneContent><![CDATA[]]></SceneContent></SCENE>
+<SCENE><ID>5</ID><SceneContent /></SCENE>
+<SCENE><ID>6</ID><Desc>€</Desc><SceneContent><![CDATA[€€€ 𝄞𝄞 — Ende.]]></SceneContent></SCENE>
+</SCENES>
+<CHAPTERS>
+<CHAPTER><ID>1</ID><Title>Eins</Title><Scenes><ScID>1</ScID><ScID>2</ScID><ScID>3</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>2</ID><Title>Zwei</Title><Scenes><ScID>4</ScID><ScID>5</ScID><ScID>6</ScID></Scenes></CHAPTER>
+</CHAPTERS>
+</YWRITER7>
+"""
+
+
+class Yw7FilePullParserTest(unittest.TestCase):
+    """Scene contents skipped by the pull parser must be read back as parsed."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        with open(self.yw7_path, "wb") as f:
+            f.write(HANDWRITTEN_PROJECT.encode("utf-8"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, **kwargs):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read(**kwargs)
+        return yw7_file
+
+    def test_same_as_eager_read(self):
+        eager = self._read()
+        self.assertEqual(eager.novel.scenes["1"].desc, "<b>not a tag</b>")
+        self.assertIn("日本語", eager.novel.scenes["1"].sceneContent)
+        # Chunk sizes splitting the tags and the multi-byte characters.
+        for chunkSize in (1, 2, 3, 5, 7, 64, Yw7File._CHUNK_SIZE):
+            with self.subTest(chunkSize=chunkSize):
+                with mock.patch.object(Yw7File, "_CHUNK_SIZE", chunkSize):
+                    lazy = self._read(lazy_content=True, keep_tree=False)
+                self.assertEqual(lazy.novel.title, eager.novel.title)
+                self.assertEqual(list(lazy.novel.scenes), list(eager.novel.scenes))
+                for scId in ("1", "2", "6"):
+                    self.assertFalse(lazy.novel.scenes[scId].contentLoaded)
+                for scId, scene in eager.novel.scenes.items():
+                    lazyScene = lazy.novel.scenes[scId]
+                    self.assertEqual(lazyScene.title, scene.title)
+                    self.assertEqual(lazyScene.desc, scene.desc)
+                    self.assertEqual(lazyScene.sceneContent, scene.sceneContent, f"scene {scId}")
+                    self.assertEqual(lazyScene.wordCount, scene.wordCount)
+                self.assertEqual(lazy.novel.chapters["2"].srtScenes, ["4", "5", "6"])
+
+
+class Yw7FileIncrementalWriteTest(unittest.TestCase):
+    """Writing only the changed subtrees must give the same file as a complete rebuild."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=3, scenesPerChapter=4)
+        yw7_file.write()
+        self.yw7_file = Yw7File(self.yw7_path)
+        self.yw7_file.novel = Novel()
+        self.yw7_file.read()
+        self.yw7_file.write()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _assert_same_as_rebuild(self):
+        self.yw7_file.write()
+        with open(self.yw7_path, "rb") as f:
+            incremental = f.read()
+        self.yw7_file._syncTree = None
+        self.yw7_file.write()
+        with open(self.yw7_path, "rb") as f:
+            self.assertEqual(incremental, f.read())
+
+    def test_unchanged(self):
+        self._assert_same_as_rebuild()
+
+    def test_changes(self):
+        novel = self.yw7_file.novel
+        novel.scenes["2"].title = "Changed"
+        novel.scenes["3"].sceneContent = "New content."
+        novel.scenes["4"].characters.append(novel.srtCharacters[-1])
+        novel.chapters["1"].srtScenes.reverse()
+        novel.srtChapters.reverse()
+        novel.characters[novel.srtCharacters[0]].kwVar["Field_Custom"] = "x"
+        lcId = novel.srtLocations.pop()
+        del novel.locations[lcId]
+        self._assert_same_as_rebuild()
+
+    def test_new_scene(self):
+        novel = self.yw7_file.novel
+        scId = novel.get_id_allocator(SCENE_PREFIX).create_id()
+        novel.scenes[scId] = Scene()
+        novel.scenes[scId].title = "New scene"
+        novel.scenes[scId].sceneContent = "Added."
+        novel.chapters["1"].srtScenes.append(scId)
+        self._assert_same_as_rebuild()
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read()
+        self.assertEqual(yw7_file.novel.scenes[scId].sceneContent, "Added.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.novel import Novel
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_index import Yw7Index
+
+
+class Yw7IndexTest(unittest.TestCase):
+    """A project opened from the sidecar index must equal the parsed project."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=3, scenesPerChapter=4)
+        yw7_file.write()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _new_file(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        return yw7_file
+
+    def test_read_from_index(self):
+        Yw7Index(self.yw7_path).read_project(self._new_file())
+        self.assertTrue(os.path.isfile(f"{self.yw7_path}.idx"))
+        indexed = self._new_file()
+        self.assertTrue(Yw7Index(self.yw7_path).read(indexed))
+        parsed = self._new_file()
+        parsed.read()
+        for attribute in ("srtChapters", "srtCharacters", "srtLocations", "srtItems", "srtPrjNotes", "title"):
+            self.assertEqual(getattr(indexed.novel, attribute), getattr(parsed.novel, attribute))
+        self.assertEqual(indexed.novel.chapters["2"].srtScenes, parsed.novel.chapters["2"].srtScenes)
+        self.assertEqual(indexed.novel.characters["3"].tags, parsed.novel.characters["3"].tags)
+        for scId, scene in parsed.novel.scenes.items():
+            indexedScene = indexed.novel.scenes[scId]
+            self.assertFalse(indexedScene.contentLoaded)
+            self.assertEqual(indexedScene.wordCount, scene.wordCount)
+            self.assertEqual(indexedScene.characters, scene.characters)
+            self.assertEqual(indexedScene.sceneContent, scene.sceneContent)
+
+    def test_outdated_index(self):
+        yw7_file = self._new_file()
+        Yw7Index(self.yw7_path).read_project(yw7_file)
+        yw7_file.novel.scenes["1"].title = "Changed"
+        yw7_file.write()
+        self.assertFalse(Yw7Index(self.yw7_path).read(self._new_file()))
+        reread = self._new_file()
+        Yw7Index(self.yw7_path).read_project(reread)
+        self.assertEqual(reread.novel.scenes["1"].title, "Changed")
+        self.assertTrue(Yw7Index(self.yw7_path).read(self._new_file()))
+
+    def test_invalid_index(self):
+        with open(f"{self.yw7_path}.idx", "w") as f:
+            f.write("no database")
+        yw7_file = self._new_file()
+        self.assertFalse(Yw7Index(self.yw7_path).read(yw7_file))
+        Yw7Index(self.yw7_path).read_project(yw7_file)
+        self.assertEqual(len(yw7_file.novel.scenes), 12)
+
+    def test_write_keeps_unknown_elements(self):
+        with open(self.yw7_path, encoding="utf-8") as f:
+            text = f.read()
+        text = text.replace(
+            "</AuthorName>\n",
+            "</AuthorName>\n    <Fields><Field_ChapterHeadingPrefix>Chapter </Field_ChapterHeadingPrefix></Fields>\n",
+        )
+        text = text.replace(
+            "<PROJECTVARS>\n",
+            "<PROJECTVARS>\n    <PROJECTVAR><ID>9</ID><Title>Custom</Title><Desc>Value</Desc></PROJECTVAR>\n",
+        )
+        with open(self.yw7_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # First from the fallback parse, then from the valid index.
+        for title in ("Changed", "Changed again"):
+            yw7_file = self._new_file()
+            Yw7Index(self.yw7_path).read_project(yw7_file)
+            self.assertIsNone(yw7_file.tree)
+            yw7_file.novel.scenes["1"].title = title
+            yw7_file.write()
+            with open(self.yw7_path, encoding="utf-8") as f:
+                text = f.read()
+            self.assertIn("<Field_ChapterHeadingPrefix>Chapter </Field_ChapterHeadingPrefix>", text)
+            self.assertIn("Custom", text)
+            self.assertIn(title, text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from test.synthetic_project import create_novel
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.novel import Novel
+from ywriter7.model.project_note import ProjectNote
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, PRJ_NOTE_PREFIX, SCENE_PREFIX, Error
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_index import Yw7Index
+from ywriter7.yw.yw7_journal import Yw7Journal
+
+
+class Yw7JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+        self.journal_path = f"{self.yw7_path}{Yw7Journal.EXTENSION}"
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=2, scenesPerChapter=2)
+        yw7_file.write()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, **kwargs):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read(**kwargs)
+        return yw7_file
+
+    def _journal_changes(self, yw7_file):
+        novel = yw7_file.novel
+        novel.scenes["1"].sceneContent = "Journaled content."
+        yw7_file.journal_change(SCENE_PREFIX, "1")
+        chapter = Chapter()
+        chapter.title = "Journaled chapter"
+        chapter.srtScenes = ["2"]
+        novel.chapters["99"] = chapter
+        novel.srtChapters.append("99")
+        yw7_file.journal_change(CHAPTER_PREFIX, "99")
+        note = ProjectNote()
+        note.title = "Journaled note"
+        novel.projectNotes["7"] = note
+        novel.srtPrjNotes.append("7")
+        yw7_file.journal_change(PRJ_NOTE_PREFIX, "7")
+
+    def _assert_replayed(self, novel):
+        self.assertEqual(novel.scenes["1"].sceneContent, "Journaled content.")
+        self.assertEqual(novel.chapters["99"].title, "Journaled chapter")
+        self.assertEqual(novel.chapters["99"].srtScenes, ["2"])
+        self.assertEqual(novel.srtChapters[-1], "99")
+        self.assertEqual(novel.projectNotes["7"].title, "Journaled note")
+        self.assertEqual(novel.srtPrjNotes[-1], "7")
+
+    def test_replay(self):
+        with open(self.yw7_path, "rb") as f:
+            original = f.read()
+        yw7_file = self._read()
+        self._journal_changes(yw7_file)
+        with open(self.yw7_path, "rb") as f:
+            self.assertEqual(f.read(), original)
+        self._assert_replayed(self._read().novel)
+        self._assert_replayed(self._read(keep_tree=False, lazy_content=True).novel)
+
+    def test_write_compacts(self):
+        yw7_file = self._read()
+        self._journal_changes(yw7_file)
+        yw7_file.write()
+        self.assertFalse(os.path.exists(self.journal_path))
+        self._assert_replayed(self._read().novel)
+        yw7_file.novel.scenes["2"].sceneContent = "After compaction."
+        yw7_file.journal_change(SCENE_PREFIX, "2")
+        self.assertEqual(self._read().novel.scenes["2"].sceneContent, "After compaction.")
+
+    def test_torn_tail(self):
+        yw7_file = self._read()
+        yw7_file.novel.scenes["1"].sceneContent = "Complete."
+        yw7_file.journal_change(SCENE_PREFIX, "1")
+        with open(self.journal_path, "ab") as f:
+            f.write(b'["SC","2","Torn')
+        yw7_file = self._read()
+        self.assertEqual(yw7_file.novel.scenes["1"].sceneContent, "Complete.")
+        yw7_file.novel.scenes["3"].sceneContent = "Appended."
+        yw7_file.journal_change(SCENE_PREFIX, "3")
+        with open(self.journal_path, "rb") as f:
+            self.assertNotIn(b"Torn", f.read())
+        novel = self._read().novel
+        self.assertEqual(novel.scenes["1"].sceneContent, "Complete.")
+        self.assertEqual(novel.scenes["3"].sceneContent, "Appended.")
+
+    def test_stale_journal_set_aside(self):
+        yw7_file = self._read()
+        yw7_file.novel.scenes["1"].sceneContent = "Journaled content."
+        yw7_file.journal_change(SCENE_PREFIX, "1")
+        stat = os.stat(self.yw7_path)
+        os.utime(self.yw7_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertRaises(Error, yw7_file.journal_change, SCENE_PREFIX, "1")
+        novel = self._read().novel
+        self.assertNotEqual(novel.scenes["1"].sceneContent, "Journaled content.")
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertTrue(os.path.exists(f"{self.journal_path}.bak"))
+
+    def test_unsupported_change(self):
+        yw7_file = self._read()
+        self.assertRaises(Error, yw7_file.journal_change, "CR", "1")
+        self.assertFalse(os.path.exists(self.journal_path))
+
+    def test_index_replays(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = Novel()
+        Yw7Index(self.yw7_path).read_project(yw7_file)
+        self._journal_changes(yw7_file)
+        for __ in range(2):
+            # Without and with a valid index
+            yw7_file = Yw7File(self.yw7_path)
+            yw7_file.novel = Novel()
+            Yw7Index(self.yw7_path).read_project(yw7_file)
+            self._assert_replayed(yw7_file.novel)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,390 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from test.synthetic_project import create_novel
+from ywriter7.pywriter_globals import string_to_list
+from ywriter7.model.chapter import Chapter
+from ywriter7.model.novel import Novel
+from ywriter7.model.scene import Scene
+from ywriter7.yw.yw7_file import Yw7File
+
+EDGE_CASES = """<?xml version="1.0" encoding="utf-8"?>
+<YWRITER7>
+<PROJECT><Ver>7</Ver><Title>Edge cases</Title></PROJECT>
+<LOCATIONS><LOCATION><ID>1</ID><Title>Place</Title></LOCATION></LOCATIONS>
+<ITEMS />
+<CHARACTERS><CHARACTER><ID>1</ID><Title>Alice</Title></CHARACTER></CHARACTERS>
+<SCENES>
+<SCENE><ID>1</ID><Title>First title</Title><Title>Second title</Title><Unused>-1</Unused>
+<Fields><Field_SceneType>1</Field_SceneType><Field_SceneArcs>A</Field_SceneArcs></Fields>
+<Fields><Field_SceneArcs>B</Field_SceneArcs><Field_SceneArcs>C</Field_SceneArcs></Fields>
+<ExportCondSpecific>-1</ExportCondSpecific><Day>3</Day><Hour>7</Hour>
+<Tags>one; two ;one</Tags><Characters><CharID>1</CharID><CharID>9</CharID></Characters>
+<Locations><LocID>1</LocID></Locations><Items><ItemID>1</ItemID></Items>
+<SceneContent><![CDATA[Some text.]]></SceneContent><AppendToPrev>-1</AppendToPrev></SCENE>
+<SCENE><ID>2</ID><Unused>-1</Unused><SpecificDateTime>not a date</SpecificDateTime>
+<ExportCondSpecific>-1</ExportCondSpecific><ExportWhenRTF>-1</ExportWhenRTF><Status>3</Status>
+<Minute>5</Minute><ReactionScene>-1</ReactionScene><SubPlot>-1</SubPlot><Tags />
+<LastsDays>2</LastsDays><Goal>G</Goal><Conflict>C</Conflict><Outcome>O</Outcome></SCENE>
+<SCENE><ID>3</ID><SpecificDateTime>2023-04-05 06:07:08</SpecificDateTime><Day>x</Day>
+<Fields><Field_SceneType>2</Field_SceneType></Fields><Field1>f1</Field1><Field4>f4</Field4></SCENE>
+</SCENES>
+<CHAPTERS>
+<CHAPTER><ID>1</ID><Title>@Hidden</Title><Unused>-1</Unused><Type>0</Type><SectionStart>-1</SectionStart>
+<Fields><Field_IsTrash>1</Field_IsTrash></Fields><Scenes><ScID>1</ScID><ScID>7</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>2</ID><Title>Second</Title><ChapterType>2</ChapterType><Type>1</Type>
+<Fields><Field_SuppressChapterTitle>1</Field_SuppressChapterTitle><Field_SuppressChapterBreak>1</Field_SuppressChapterBreak></Fields>
+<Fields><Field_IsTrash>0</Field_IsTrash></Fields><Scenes><ScID>2</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>3</ID><Unused>-1</Unused><Type>1</Type><Desc>Old style</Desc><Scenes><ScID>3</ScID></Scenes></CHAPTER>
+<CHAPTER><ID>4</ID><Unused>-1</Unused><ChapterType>0</ChapterType></CHAPTER>
+</CHAPTERS>
+</YWRITER7>
+"""
+
+
+class LegacyYw7File(Yw7File):
+    """Yw7File with the former readers, calling find() for each attribute."""
+
+    def _read_scene(self, xmlScene):
+        """Read attributes at scene level from the xml element tree."""
+        scId = xmlScene.find('ID').text
+        self.novel.scenes[scId] = Scene()
+
+        if xmlScene.find('Title') is not None:
+            self.novel.scenes[scId].title = xmlScene.find('Title').text
+
+        if xmlScene.find('Desc') is not None:
+            self.novel.scenes[scId].desc = xmlScene.find('Desc').text
+
+        xmlSceneContent = xmlScene.find('SceneContent')
+        if xmlSceneContent is not None:
+            lazyContent = xmlSceneContent.attrib.pop('lazy', None)
+            if lazyContent is not None:
+                offset, length = lazyContent.split()
+                try:
+                    wordCount = int(xmlScene.find('WordCount').text)
+                    letterCount = int(xmlScene.find('LetterCount').text)
+                except:
+                    wordCount = None
+                    letterCount = None
+                self.set_lazy_content(scId, int(offset), int(length), wordCount, letterCount)
+            else:
+                sceneContent = xmlSceneContent.text
+                if sceneContent is not None:
+                    self.novel.scenes[scId].sceneContent = sceneContent
+
+        #--- Read scene type.
+
+        # This is how yWriter 7.1.3.0 reads the scene type:
+        #
+        # Type   |<Unused>|Field_SceneType>|scType
+        #--------+--------+----------------+------
+        # Notes  | x      | 1              | 1
+        # Todo   | x      | 2              | 2
+        # Unused | -1     | N/A            | 3
+        # Unused | -1     | 0              | 3
+        # Normal | N/A    | N/A            | 0
+        # Normal | N/A    | 0              | 0
+
+        self.novel.scenes[scId].scType = 0
+
+        #--- Initialize custom keyword variables.
+        for fieldName in self.SCN_KWVAR:
+            self.novel.scenes[scId].kwVar[fieldName] = None
+
+        for xmlSceneFields in xmlScene.findall('Fields'):
+            #--- Read scene custom fields.
+            for fieldName in self.SCN_KWVAR:
+                field = xmlSceneFields.find(fieldName)
+                if field is not None:
+                    self.novel.scenes[scId].kwVar[fieldName] = field.text
+
+            # Read scene type, if any.
+            if xmlSceneFields.find('Field_SceneType') is not None:
+                if xmlSceneFields.find('Field_SceneType').text == '1':
+                    self.novel.scenes[scId].scType = 1
+                elif xmlSceneFields.find('Field_SceneType').text == '2':
+                    self.novel.scenes[scId].scType = 2
+        if xmlScene.find('Unused') is not None:
+            if self.novel.scenes[scId].scType == 0:
+                self.novel.scenes[scId].scType = 3
+
+        # Export when RTF.
+        if xmlScene.find('ExportCondSpecific') is None:
+            self.novel.scenes[scId].doNotExport = False
+        elif xmlScene.find('ExportWhenRTF') is not None:
+            self.novel.scenes[scId].doNotExport = False
+        else:
+            self.novel.scenes[scId].doNotExport = True
+
+        if xmlScene.find('Status') is not None:
+            self.novel.scenes[scId].status = int(xmlScene.find('Status').text)
+
+        if xmlScene.find('Notes') is not None:
+            self.novel.scenes[scId].notes = xmlScene.find('Notes').text
+
+        if xmlScene.find('Tags') is not None:
+            if xmlScene.find('Tags').text is not None:
+                tags = string_to_list(xmlScene.find('Tags').text)
+                self.novel.scenes[scId].tags = self._strip_spaces(tags)
+
+        if xmlScene.find('Field1') is not None:
+            self.novel.scenes[scId].field1 = xmlScene.find('Field1').text
+
+        if xmlScene.find('Field2') is not None:
+            self.novel.scenes[scId].field2 = xmlScene.find('Field2').text
+
+        if xmlScene.find('Field3') is not None:
+            self.novel.scenes[scId].field3 = xmlScene.find('Field3').text
+
+        if xmlScene.find('Field4') is not None:
+            self.novel.scenes[scId].field4 = xmlScene.find('Field4').text
+
+        if xmlScene.find('AppendToPrev') is not None:
+            self.novel.scenes[scId].appendToPrev = True
+        else:
+            self.novel.scenes[scId].appendToPrev = False
+
+        #--- Scene start.
+        if xmlScene.find('SpecificDateTime') is not None:
+            dateTimeStr = xmlScene.find('SpecificDateTime').text
+
+            # Check SpecificDateTime for ISO compliance.
+            try:
+                dateTime = datetime.fromisoformat(dateTimeStr)
+            except:
+                self.novel.scenes[scId].date = ''
+                self.novel.scenes[scId].time = ''
+            else:
+                startDateTime = dateTime.isoformat().split('T')
+                self.novel.scenes[scId].date = startDateTime[0]
+                self.novel.scenes[scId].time = startDateTime[1]
+        else:
+            if xmlScene.find('Day') is not None:
+                day = xmlScene.find('Day').text
+
+                # Check if Day represents an integer.
+                try:
+                    int(day)
+                except ValueError:
+                    day = ''
+                self.novel.scenes[scId].day = day
+
+            hasUnspecificTime = False
+            if xmlScene.find('Hour') is not None:
+                hour = xmlScene.find('Hour').text.zfill(2)
+                hasUnspecificTime = True
+            else:
+                hour = '00'
+            if xmlScene.find('Minute') is not None:
+                minute = xmlScene.find('Minute').text.zfill(2)
+                hasUnspecificTime = True
+            else:
+                minute = '00'
+            if hasUnspecificTime:
+                self.novel.scenes[scId].time = f'{hour}:{minute}:00'
+
+        #--- Scene duration.
+        if xmlScene.find('LastsDays') is not None:
+            self.novel.scenes[scId].lastsDays = xmlScene.find('LastsDays').text
+
+        if xmlScene.find('LastsHours') is not None:
+            self.novel.scenes[scId].lastsHours = xmlScene.find('LastsHours').text
+
+        if xmlScene.find('LastsMinutes') is not None:
+            self.novel.scenes[scId].lastsMinutes = xmlScene.find('LastsMinutes').text
+
+        if xmlScene.find('ReactionScene') is not None:
+            self.novel.scenes[scId].isReactionScene = True
+        else:
+            self.novel.scenes[scId].isReactionScene = False
+
+        if xmlScene.find('SubPlot') is not None:
+            self.novel.scenes[scId].isSubPlot = True
+        else:
+            self.novel.scenes[scId].isSubPlot = False
+
+        if xmlScene.find('Goal') is not None:
+            self.novel.scenes[scId].goal = xmlScene.find('Goal').text
+
+        if xmlScene.find('Conflict') is not None:
+            self.novel.scenes[scId].conflict = xmlScene.find('Conflict').text
+
+        if xmlScene.find('Outcome') is not None:
+            self.novel.scenes[scId].outcome = xmlScene.find('Outcome').text
+
+        if xmlScene.find('ImageFile') is not None:
+            self.novel.scenes[scId].image = xmlScene.find('ImageFile').text
+
+        if xmlScene.find('Characters') is not None:
+            for characters in xmlScene.find('Characters').iter('CharID'):
+                crId = characters.text
+                if crId in self.novel.srtCharacters:
+                    if self.novel.scenes[scId].characters is None:
+                        self.novel.scenes[scId].characters = []
+                    self.novel.scenes[scId].characters.append(crId)
+
+        if xmlScene.find('Locations') is not None:
+            for locations in xmlScene.find('Locations').iter('LocID'):
+                lcId = locations.text
+                if lcId in self.novel.srtLocations:
+                    if self.novel.scenes[scId].locations is None:
+                        self.novel.scenes[scId].locations = []
+                    self.novel.scenes[scId].locations.append(lcId)
+
+        if xmlScene.find('Items') is not None:
+            for items in xmlScene.find('Items').iter('ItemID'):
+                itId = items.text
+                if itId in self.novel.srtItems:
+                    if self.novel.scenes[scId].items is None:
+                        self.novel.scenes[scId].items = []
+                    self.novel.scenes[scId].items.append(itId)
+
+    def _read_chapter(self, xmlChapter):
+        """Read attributes at chapter level from the xml element tree."""
+        chId = xmlChapter.find('ID').text
+        self.novel.chapters[chId] = Chapter()
+        self.novel.srtChapters.append(chId)
+
+        if xmlChapter.find('Title') is not None:
+            self.novel.chapters[chId].title = xmlChapter.find('Title').text
+
+        if xmlChapter.find('Desc') is not None:
+            self.novel.chapters[chId].desc = xmlChapter.find('Desc').text
+
+        if xmlChapter.find('SectionStart') is not None:
+            self.novel.chapters[chId].chLevel = 1
+        else:
+            self.novel.chapters[chId].chLevel = 0
+
+        # This is how yWriter 7.1.3.0 reads the chapter type:
+        #
+        # Type   |<Unused>|<Type>|<ChapterType>|chType
+        # -------+--------+------+--------------------
+        # Normal | N/A    | N/A  | N/A         | 0
+        # Normal | N/A    | 0    | N/A         | 0
+        # Notes  | x      | 1    | N/A         | 1
+        # Unused | -1     | 0    | N/A         | 3
+        # Normal | N/A    | x    | 0           | 0
+        # Notes  | x      | x    | 1           | 1
+        # Todo   | x      | x    | 2           | 2
+        # Unused | -1     | x    | x           | 3
+
+        self.novel.chapters[chId].chType = 0
+        if xmlChapter.find('Unused') is not None:
+            yUnused = True
+        else:
+            yUnused = False
+        if xmlChapter.find('ChapterType') is not None:
+            # The file may be created with yWriter version 7.0.7.2+
+            yChapterType = xmlChapter.find('ChapterType').text
+            if yChapterType == '2':
+                self.novel.chapters[chId].chType = 2
+            elif yChapterType == '1':
+                self.novel.chapters[chId].chType = 1
+            elif yUnused:
+                self.novel.chapters[chId].chType = 3
+        else:
+            # The file may be created with a yWriter version prior to 7.0.7.2
+            if xmlChapter.find('Type') is not None:
+                yType = xmlChapter.find('Type').text
+                if yType == '1':
+                    self.novel.chapters[chId].chType = 1
+                elif yUnused:
+                    self.novel.chapters[chId].chType = 3
+
+        self.novel.chapters[chId].suppressChapterTitle = False
+        if self.novel.chapters[chId].title is not None:
+            if self.novel.chapters[chId].title.startswith('@'):
+                self.novel.chapters[chId].suppressChapterTitle = True
+
+        #--- Initialize custom keyword variables.
+        for fieldName in self.CHP_KWVAR:
+            self.novel.chapters[chId].kwVar[fieldName] = None
+
+        #--- Read chapter fields.
+        for xmlChapterFields in xmlChapter.findall('Fields'):
+            if xmlChapterFields.find('Field_SuppressChapterTitle') is not None:
+                if xmlChapterFields.find('Field_SuppressChapterTitle').text == '1':
+                    self.novel.chapters[chId].suppressChapterTitle = True
+            self.novel.chapters[chId].isTrash = False
+            if xmlChapterFields.find('Field_IsTrash') is not None:
+                if xmlChapterFields.find('Field_IsTrash').text == '1':
+                    self.novel.chapters[chId].isTrash = True
+            self.novel.chapters[chId].suppressChapterBreak = False
+            if xmlChapterFields.find('Field_SuppressChapterBreak') is not None:
+                if xmlChapterFields.find('Field_SuppressChapterBreak').text == '1':
+                    self.novel.chapters[chId].suppressChapterBreak = True
+
+            #--- Read chapter custom fields.
+            for fieldName in self.CHP_KWVAR:
+                field = xmlChapterFields.find(fieldName)
+                if field is not None:
+                    self.novel.chapters[chId].kwVar[fieldName] = field.text
+
+        #--- Read chapter's scene list.
+        self.novel.chapters[chId].srtScenes = []
+        if xmlChapter.find('Scenes') is not None:
+            for scn in xmlChapter.find('Scenes').findall('ScID'):
+                scId = scn.text
+                if scId in self.novel.scenes:
+                    self.novel.chapters[chId].srtScenes.append(scId)
+
+
+class Yw7ReaderParityTest(unittest.TestCase):
+    """The single-pass scene and chapter readers must give the same result as the former ones."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.yw7_path = os.path.join(self.temp_dir, "project.yw7")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, fileClass, **kwargs):
+        yw7_file = fileClass(self.yw7_path)
+        yw7_file.novel = Novel()
+        yw7_file.read(**kwargs)
+        return yw7_file.novel
+
+    def _get_state(self, element):
+        state = element.get_state()
+        del state["_changeStamp"]
+        state.pop("_contentLoader", None)
+        return state
+
+    def _assert_same_novel(self, **kwargs):
+        legacy = self._read(LegacyYw7File, **kwargs)
+        novel = self._read(Yw7File, **kwargs)
+        self.assertEqual(novel.srtChapters, legacy.srtChapters)
+        for collection in ("scenes", "chapters"):
+            legacyElements = getattr(legacy, collection)
+            elements = getattr(novel, collection)
+            self.assertEqual(list(elements), list(legacyElements))
+            for elemId, element in elements.items():
+                self.assertEqual(self._get_state(element), self._get_state(legacyElements[elemId]),
+                                 f"{collection} {elemId}")
+
+    def test_synthetic_project(self):
+        yw7_file = Yw7File(self.yw7_path)
+        yw7_file.novel = create_novel(chapters=4, scenesPerChapter=5)
+        yw7_file.write()
+        self._assert_same_novel()
+        self._assert_same_novel(lazy_content=True)
+
+    def test_edge_cases(self):
+        with open(self.yw7_path, "w", encoding="utf-8") as f:
+            f.write(EDGE_CASES)
+        self._assert_same_novel()
+        novel = self._read(Yw7File)
+        self.assertEqual(novel.scenes["1"].title, "First title")
+        self.assertEqual(novel.scenes["1"].kwVar["Field_SceneArcs"], "B")
+        self.assertEqual(novel.scenes["1"].characters, ["1"])
+        self.assertEqual(novel.chapters["1"].srtScenes, ["1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
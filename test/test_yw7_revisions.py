@@ -0,0 +1,70 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from ywriter7.pywriter_globals import Error
+from ywriter7.yw.yw7_revisions import Yw7Revisions
+
+
+class Yw7RevisionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.revisions = Yw7Revisions(os.path.join(self.temp_dir, "project.yw7"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _count_chunks(self):
+        db = sqlite3.connect(self.revisions.filePath)
+        try:
+            return db.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        finally:
+            db.close()
+
+    def test_round_trip(self):
+        drafts = ["First draft.", "First draft.\n\nSecond paragraph.", "", "Ünïcödé\n" * 3 + "x" * 1000]
+        for i, draft in enumerate(drafts):
+            self.assertEqual(self.revisions.add("1", draft), i + 1)
+        for i, draft in enumerate(drafts):
+            self.assertEqual(self.revisions.get("1", i + 1), draft)
+        self.assertEqual(self.revisions.get("1"), drafts[-1])
+        self.assertEqual([revision for revision, __ in self.revisions.get_revisions("1")], [1, 2, 3, 4])
+        self.assertEqual(self.revisions.get_revisions("2"), [])
+
+    def test_unchanged_content(self):
+        self.assertEqual(self.revisions.add("1", "Text."), 1)
+        self.assertEqual(self.revisions.add("1", "Text."), 1)
+        self.assertEqual(self.revisions.add("2", "Text."), 1)
+        self.assertEqual(len(self.revisions.get_revisions("1")), 1)
+
+    def test_paragraphs_stored_once(self):
+        paragraphs = [f"Paragraph {i}." for i in range(10)]
+        self.revisions.add("1", "\n".join(paragraphs))
+        paragraphs[3] = "Changed."
+        self.revisions.add("1", "\n".join(paragraphs))
+        self.revisions.add("2", "\n".join(reversed(paragraphs)))
+        self.assertEqual(self._count_chunks(), 11)
+
+    def test_diff(self):
+        self.revisions.add("1", "a\nb\nc\nd")
+        self.revisions.add("1", "a\nB\nc\nd\ne")
+        self.revisions.add("1", "c\nd\ne")
+        self.assertEqual(self.revisions.diff("1", 1, 2), [
+            ("replace", 1, ["b"], 1, ["B"]),
+            ("insert", 4, [], 4, ["e"]),
+        ])
+        self.assertEqual(self.revisions.diff("1", 2), [("delete", 0, ["a", "B"], 0, [])])
+        self.assertEqual(self.revisions.diff("1", 3, 3), [])
+
+    def test_missing_revision(self):
+        self.assertRaises(Error, self.revisions.get, "1")
+        self.revisions.add("1", "Text.")
+        self.assertRaises(Error, self.revisions.get, "1", 2)
+        self.assertRaises(Error, self.revisions.diff, "1", 1, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
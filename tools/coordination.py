@@ -0,0 +1,446 @@
+import copy
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from ywriter7.model.novel import ELEMENT_COLLECTIONS, Novel
+from ywriter7.model.scene import Scene
+from ywriter7.pywriter_globals import (
+    CHAPTER_PREFIX,
+    CHARACTER_PREFIX,
+    ITEM_PREFIX,
+    LOCATION_PREFIX,
+    PRJ_NOTE_PREFIX,
+    Error,
+)
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_journal import Yw7Journal
+from ywriter7.yw.yw7_revisions import Yw7Revisions
+from tools.project_cache import ProjectCache, project_cache
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows.
+    fcntl = None
+    import msvcrt
+
+# Key of a project element: (element type prefix, element ID).
+ElementKey = Tuple[str, str]
+
+# Novel attributes holding the sort order of each element type.
+# Scenes are ordered by their chapters' srtScenes.
+SORT_ORDERS = {
+    CHAPTER_PREFIX: "srtChapters",
+    CHARACTER_PREFIX: "srtCharacters",
+    LOCATION_PREFIX: "srtLocations",
+    ITEM_PREFIX: "srtItems",
+    PRJ_NOTE_PREFIX: "srtPrjNotes",
+}
+
+# Suffix of the advisory lock file held while a project is written.
+# It differs from yWriter's own ".lock" file, which means "open in yWriter".
+LOCK_EXTENSION = ".agentlock"
+
+# Size of an edit journal, in bytes, from which on journal_change()
+# writes the project instead of appending to the journal.
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+
+class MergeConflictError(Error):
+    """Raised when concurrent changes to the same project element conflict."""
+
+
+class ProjectLock:
+    """
+    Advisory lock serializing the writers of a yWriter 7 project.
+
+    The lock is held on a sidecar file (project.yw7.agentlock), so writers in
+    other processes wait as well. Within a process, the lock is reentrant per
+    thread, across ProjectLock instances. Only writers using ProjectLock are
+    coordinated; yWriter is not.
+    """
+
+    # Per real path: [thread lock, lock depth of the owning thread, open lock file]
+    _paths: Dict[str, list] = {}
+    _guard = threading.Lock()
+
+    def __init__(self, file_path: str, timeout: float = 30.0, poll_interval: float = 0.05):
+        """
+        Initializes the lock.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+            timeout (float): Seconds to wait for the lock.
+            poll_interval (float): Seconds between attempts to get the file lock.
+        """
+        self.file_path = os.path.realpath(file_path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        with ProjectLock._guard:
+            self._state = ProjectLock._paths.setdefault(self.file_path, [threading.RLock(), 0, None])
+
+    def acquire(self) -> None:
+        """
+        Gets the lock, waiting at most the configured timeout.
+
+        Raises:
+            TimeoutError: If another writer holds the lock for too long.
+        """
+        deadline = time.monotonic() + self.timeout
+        thread_lock = self._state[0]
+        if not thread_lock.acquire(timeout=self.timeout):
+            raise TimeoutError(f"Project is locked by another writer: {self.file_path}")
+        if self._state[1] == 0:
+            try:
+                self._state[2] = self._lock_file_exclusively(deadline)
+            except BaseException:
+                thread_lock.release()
+                raise
+        self._state[1] += 1
+
+    def release(self) -> None:
+        """Releases the lock."""
+        self._state[1] -= 1
+        if self._state[1] == 0:
+            lock_file, self._state[2] = self._state[2], None
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                lock_file.close()
+        self._state[0].release()
+
+    def __enter__(self) -> "ProjectLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def _lock_file_exclusively(self, deadline: float):
+        """Opens the lock file and locks it, polling until the deadline."""
+        lock_file = open(f"{self.file_path}{LOCK_EXTENSION}", "a+b")
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                return lock_file
+            except OSError:
+                if time.monotonic() >= deadline:
+                    lock_file.close()
+                    raise TimeoutError(f"Project is locked by another writer: {self.file_path}")
+                time.sleep(self.poll_interval)
+
+
+# Base states of the elements changed in each loaded project, recorded
+# before the first change since the project was last read or written.
+# key = Yw7File, value = {ElementKey: element state, or None for new elements}
+_tracked: "weakref.WeakKeyDictionary[Yw7File, Dict[ElementKey, Optional[Dict[str, Any]]]]"
+_tracked = weakref.WeakKeyDictionary()
+_tracked_lock = threading.Lock()
+
+
+def element_state(element: Any) -> Dict[str, Any]:
+    """
+    Returns a copy of the public state of a project element.
+
+    Args:
+        element: A Chapter, Scene, Character, WorldElement or ProjectNote.
+
+    Returns:
+        Dict[str, Any]: The public attributes, plus the content of a scene.
+    """
+    state = {key: value for key, value in element.get_state().items() if not key.startswith("_")}
+    if isinstance(element, Scene):
+        state["sceneContent"] = element.sceneContent
+    return copy.deepcopy(state)
+
+
+def track_change(yw7_file: Yw7File, elem_type: str, elem_id: str) -> None:
+    """
+    Records the base state of an element that is about to be changed.
+
+    Call this before changing, adding or deleting an element of a project
+    loaded through the cache. Only tracked elements are merged when the
+    project file has been changed by another writer in the meantime.
+
+    Args:
+        yw7_file (Yw7File): The project holding the element.
+        elem_type (str): The element type prefix, e.g. SCENE_PREFIX.
+        elem_id (str): The element ID.
+    """
+    with _tracked_lock:
+        changes = _tracked.setdefault(yw7_file, {})
+        if (elem_type, elem_id) in changes:
+            return
+        element = getattr(yw7_file.novel, ELEMENT_COLLECTIONS[elem_type]).get(elem_id)
+        changes[elem_type, elem_id] = None if element is None else element_state(element)
+
+
+def forget_changes(yw7_file: Yw7File, keys: Optional[Iterable[ElementKey]] = None) -> None:
+    """
+    Drops tracked changes of a project, e.g. after writing it.
+
+    Args:
+        yw7_file (Yw7File): The project.
+        keys (Optional[Iterable[ElementKey]]): The changes to drop.
+            None means all changes.
+    """
+    with _tracked_lock:
+        if keys is None:
+            _tracked.pop(yw7_file, None)
+            return
+        changes = _tracked.get(yw7_file, {})
+        for key in keys:
+            changes.pop(key, None)
+
+
+def commit_project(yw7_file: Yw7File, cache: ProjectCache = project_cache) -> Dict[ElementKey, str]:
+    """
+    Writes a project, merging changes written by other writers since it was loaded.
+
+    Holds the project lock while checking the file and writing it. If the
+    file is as it was when the project was loaded, the project is written.
+    Otherwise, the file is read again, and the tracked element changes are
+    applied to it, element by element: an element changed by both writers
+    is a conflict, unless both made the same change. Elements added by both
+    writers with the same ID are kept both; this writer's element gets a
+    new ID.
+
+    Args:
+        yw7_file (Yw7File): The modified project, loaded through the cache.
+        cache (ProjectCache): The cache holding the project.
+
+    Returns:
+        Dict[ElementKey, str]: New IDs of the elements renumbered while
+            merging, keyed by their former type and ID.
+
+    Raises:
+        MergeConflictError: If changes conflict. Nothing is written, and the
+            project is dropped from the cache.
+        TimeoutError: If another writer holds the project lock for too long.
+        Error: If the project cannot be read or written.
+    """
+    with ProjectLock(yw7_file.filePath):
+        with _tracked_lock:
+            changes = dict(_tracked.get(yw7_file, {}))
+        if cache.is_current(yw7_file):
+            try:
+                yw7_file.write()
+            except Exception:
+                cache.invalidate(yw7_file.filePath)
+                raise
+            forget_changes(yw7_file, changes)
+            _forget_journal(yw7_file.filePath)
+            cache.refresh(yw7_file.filePath)
+            return {}
+
+        theirs = Yw7File(yw7_file.filePath)
+        theirs.novel = Novel()
+        theirs.read(lazy_content=True)
+        try:
+            renumbered = merge_changes(yw7_file.novel, theirs.novel, changes)
+        except MergeConflictError:
+            forget_changes(yw7_file)
+            cache.invalidate(yw7_file.filePath)
+            raise
+        theirs.write()
+        forget_changes(yw7_file, changes)
+        _forget_journal(yw7_file.filePath)
+        cache.replace(yw7_file.filePath, theirs)
+        return renumbered
+
+
+# Paths of the projects with journaled changes not yet written to the project file.
+_journaled_paths: Set[str] = set()
+_journal_lock = threading.Lock()
+
+
+def journal_change(
+    yw7_file: Yw7File,
+    change: ElementKey,
+    cache: ProjectCache = project_cache,
+    compact_bytes: int = JOURNAL_COMPACT_BYTES,
+) -> bool:
+    """
+    Appends a change to the project's edit journal instead of writing the project.
+
+    Holds the project lock. The change is only journaled if the project
+    file is as it was when the project was loaded, and if the change can be
+    journaled: a scene content update, a new chapter, or a new project note.
+    yWriter does not read the journal; call compact_projects() before handing
+    the projects over to yWriter.
+
+    Args:
+        yw7_file (Yw7File): The modified project, loaded through the cache.
+        change (ElementKey): (element type prefix, element ID) of the only
+            change made.
+        cache (ProjectCache): The cache holding the project.
+        compact_bytes (int): Journal size from which on the change is
+            reported as not journaled, so the caller writes the project.
+
+    Returns:
+        bool: True if the change has been journaled. False if the project
+            must be written with commit_project() instead.
+
+    Raises:
+        TimeoutError: If another writer holds the project lock for too long.
+    """
+    with ProjectLock(yw7_file.filePath):
+        if not cache.is_current(yw7_file):
+            return False
+
+        try:
+            yw7_file.journal_change(*change)
+        except Error:
+            return False
+
+        with _journal_lock:
+            _journaled_paths.add(yw7_file.filePath)
+        if os.path.getsize(f"{yw7_file.filePath}{Yw7Journal.EXTENSION}") >= compact_bytes:
+            return False
+
+        forget_changes(yw7_file, [change])
+        cache.refresh(yw7_file.filePath)
+        return True
+
+
+def compact_projects(cache: ProjectCache = project_cache) -> None:
+    """
+    Writes the projects with journaled changes, which removes their journals.
+
+    Nothing calls this automatically; call it when the projects are handed
+    over to yWriter, e.g. at the end of a run.
+
+    Args:
+        cache (ProjectCache): The cache to load the projects through.
+
+    Raises:
+        MergeConflictError: If a project has conflicting changes.
+        Error: If a project cannot be read or written.
+    """
+    with _journal_lock:
+        file_paths = list(_journaled_paths)
+    for file_path in file_paths:
+        if os.path.isfile(f"{file_path}{Yw7Journal.EXTENSION}"):
+            commit_project(cache.get(file_path), cache)
+        else:
+            _forget_journal(file_path)
+
+
+def _forget_journal(file_path: str) -> None:
+    with _journal_lock:
+        _journaled_paths.discard(file_path)
+
+
+def record_scene_revision(yw7_file: Yw7File, scene_id: str, previous: Optional[str]) -> int:
+    """
+    Records the content of a scene in the project's revision store.
+
+    Args:
+        yw7_file (Yw7File): The yWriter 7 project holding the scene.
+        scene_id (str): The ID of the scene.
+        previous (Optional[str]): The scene content before it was changed.
+            It is recorded first if the scene has no revisions yet, so the
+            draft read from the project file is kept as well.
+
+    Returns:
+        int: The revision number of the scene's current content.
+
+    Raises:
+        Error: If the revision store cannot be written.
+    """
+    revisions = Yw7Revisions(yw7_file.filePath)
+    if previous and not revisions.get_revisions(scene_id):
+        revisions.add(scene_id, previous)
+    return revisions.add(scene_id, yw7_file.novel.scenes[scene_id].sceneContent)
+
+
+def merge_changes(
+    ours: Novel, theirs: Novel, changes: Dict[ElementKey, Optional[Dict[str, Any]]]
+) -> Dict[ElementKey, str]:
+    """
+    Applies the tracked element changes of one novel to another novel.
+
+    Args:
+        ours (Novel): The novel holding the changes.
+        theirs (Novel): The novel read from the changed project file.
+        changes (Dict[ElementKey, Optional[Dict[str, Any]]]): The base states
+            of the changed elements, None for elements added.
+
+    Returns:
+        Dict[ElementKey, str]: New IDs of the elements renumbered.
+
+    Raises:
+        MergeConflictError: If an element has been changed in both novels.
+            theirs is left unchanged then.
+    """
+    actions = []
+    conflicts = []
+    for (elem_type, elem_id), base in changes.items():
+        our_element = getattr(ours, ELEMENT_COLLECTIONS[elem_type]).get(elem_id)
+        their_element = getattr(theirs, ELEMENT_COLLECTIONS[elem_type]).get(elem_id)
+        our_state = _merge_state(our_element, base)
+        their_state = None if their_element is None else element_state(their_element)
+        if our_state == base or our_state == their_state:
+            continue
+        if their_state == base:
+            actions.append(("apply", elem_type, elem_id, our_element, our_state))
+        elif base is None and our_state is not None:
+            actions.append(("add", elem_type, elem_id, our_element, our_state))
+        else:
+            conflicts.append(f"{elem_type}{elem_id}")
+    if conflicts:
+        raise MergeConflictError(f"Conflicting changes by another writer: {', '.join(conflicts)}.")
+
+    renumbered = {}
+    for action, elem_type, elem_id, our_element, our_state in actions:
+        elements = getattr(theirs, ELEMENT_COLLECTIONS[elem_type])
+        sort_order = getattr(theirs, SORT_ORDERS[elem_type]) if elem_type in SORT_ORDERS else None
+        if action == "add":
+            # Both writers added an element with this ID.
+            new_id = theirs.get_id_allocator(elem_type).create_id()
+            renumbered[elem_type, elem_id] = new_id
+            elements[new_id] = our_element
+            if sort_order is not None:
+                sort_order.append(new_id)
+        elif our_state is None:
+            del elements[elem_id]
+            if sort_order is not None and elem_id in sort_order:
+                sort_order.remove(elem_id)
+        elif elem_id in elements:
+            element = elements[elem_id]
+            for key, value in our_state.items():
+                setattr(element, key, value)
+        else:
+            elements[elem_id] = our_element
+            if sort_order is not None and elem_id not in sort_order:
+                sort_order.append(elem_id)
+        theirs.notify(elem_type, renumbered.get((elem_type, elem_id), elem_id))
+    return renumbered
+
+
+def _merge_state(element: Any, base: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the state of an element to be merged, or None for a deleted element.
+
+    A scene content not loaded since reading is unchanged, and its file has
+    been replaced; so the base content is used.
+    """
+    if element is None:
+        return None
+    if isinstance(element, Scene) and not element.contentLoaded and base is not None:
+        state = {key: value for key, value in element.get_state().items() if not key.startswith("_")}
+        state = copy.deepcopy(state)
+        state["sceneContent"] = base["sceneContent"]
+        return state
+    return element_state(element)
@@ -0,0 +1,237 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from ywriter7.model.novel import Novel
+from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_index import Yw7Index
+from ywriter7.yw.yw7_journal import Yw7Journal
+
+# (st_mtime_ns, st_size, st_ino) of a project file on disk.
+FileSignature = Tuple[int, int, int]
+
+# Signatures of a project file and of its edit journal, if any.
+ProjectSignature = Tuple[FileSignature, Optional[FileSignature]]
+
+
+def file_signature(file_path: str) -> FileSignature:
+    """
+    Returns the on-disk signature of a file.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        FileSignature: (mtime in ns, size, inode) of the file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def project_signature(file_path: str) -> ProjectSignature:
+    """
+    Returns the on-disk signature of a project, including its edit journal.
+
+    Args:
+        file_path (str): The path to the .yw7 file.
+
+    Returns:
+        ProjectSignature: The signatures of the project file and of its
+            journal, or None for a missing journal.
+
+    Raises:
+        FileNotFoundError: If the project file does not exist.
+    """
+    try:
+        journal = file_signature(f"{file_path}{Yw7Journal.EXTENSION}")
+    except FileNotFoundError:
+        journal = None
+    return (file_signature(file_path), journal)
+
+
+class ProjectCache:
+    """
+    In-process cache of parsed yWriter 7 projects.
+
+    Hands out the already-parsed Yw7File (and its Novel) for a project path,
+    as long as the file on disk has the same (mtime, size, inode) signature as
+    when it was parsed, and so has its edit journal (project.yw7.journal).
+    If either changed on disk, the project is parsed again.
+    The number of cached projects is bounded; the least recently used project
+    is dropped first. Scene contents are loaded lazily, on first access; a
+    project is written only after all of its scene contents are loaded.
+    With use_index, projects are opened from a sidecar index (project.yw7.idx)
+    that is rebuilt whenever the project file's content hash has changed.
+
+    The cached Yw7File instances are shared. Callers that mutate a project
+    must either write it and call refresh(), or call invalidate() on failure;
+    tools.coordination.commit_project() does both, merging concurrent writes.
+    Projects with unsaved changes can be pinned: a pinned project is neither
+    re-read nor evicted until it is unpinned.
+    """
+
+    def __init__(self, max_projects: int = 8, use_index: bool = False):
+        """
+        Initializes the cache.
+
+        Args:
+            max_projects (int): Maximum number of projects kept in memory.
+            use_index (bool): Whether to open projects via their sidecar index.
+        """
+        self.max_projects = max_projects
+        self.use_index = use_index
+        self._entries = OrderedDict()
+        # key = real path, value = (ProjectSignature, Yw7File)
+        self._pinned = set()
+        # real paths of projects holding unsaved changes
+        self._lock = threading.RLock()
+
+    def get(self, file_path: str) -> Yw7File:
+        """
+        Returns the parsed project, reading the file only if necessary.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+
+        Returns:
+            Yw7File: The loaded yWriter 7 project.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        key = os.path.realpath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and key in self._pinned:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            signature = project_signature(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            yw7_file = Yw7File(file_path)
+            yw7_file.novel = Novel()
+            if self.use_index:
+                Yw7Index(file_path).read_project(yw7_file)
+            else:
+                yw7_file.read(lazy_content=True)
+            self._store(key, signature, yw7_file)
+            return yw7_file
+
+    def refresh(self, file_path: str) -> None:
+        """
+        Re-validates a cached project after it has been written or journaled in-process.
+
+        The in-memory Novel is kept and the new file signature is recorded,
+        so the next get() does not parse the file again.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+        """
+        key = os.path.realpath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            try:
+                signature = project_signature(key)
+            except FileNotFoundError:
+                del self._entries[key]
+                return
+            self._entries[key] = (signature, entry[1])
+
+    def is_current(self, yw7_file: Yw7File) -> bool:
+        """
+        Checks whether a cached project still matches its file on disk.
+
+        Args:
+            yw7_file (Yw7File): A project handed out by get().
+
+        Returns:
+            bool: True if yw7_file is the cached project for its path, and
+                the project file has not been changed by another writer since.
+        """
+        key = os.path.realpath(yw7_file.filePath)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] is not yw7_file:
+                return False
+            try:
+                return entry[0] == project_signature(key)
+            except FileNotFoundError:
+                return False
+
+    def replace(self, file_path: str, yw7_file: Yw7File) -> None:
+        """
+        Caches another project instance for a path, e.g. after a merge was written.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+            yw7_file (Yw7File): The project as written to the file.
+        """
+        key = os.path.realpath(file_path)
+        with self._lock:
+            self._store(key, project_signature(key), yw7_file)
+
+    def invalidate(self, file_path: Optional[str] = None) -> None:
+        """
+        Drops a project from the cache, or all projects if no path is given.
+
+        Args:
+            file_path (Optional[str]): The path to the .yw7 file.
+        """
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._pinned.clear()
+            else:
+                key = os.path.realpath(file_path)
+                self._entries.pop(key, None)
+                self._pinned.discard(key)
+
+    def pin(self, file_path: str) -> None:
+        """
+        Keeps the in-memory project, regardless of changes on disk.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+        """
+        with self._lock:
+            self._pinned.add(os.path.realpath(file_path))
+
+    def unpin(self, file_path: str) -> None:
+        """
+        Validates the project against the file on disk again.
+
+        Args:
+            file_path (str): The path to the .yw7 file.
+        """
+        with self._lock:
+            self._pinned.discard(os.path.realpath(file_path))
+
+    def __contains__(self, file_path: str) -> bool:
+        return os.path.realpath(file_path) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, signature: ProjectSignature, yw7_file: Yw7File) -> None:
+        """Adds an entry, evicting the least recently used projects."""
+        self._entries[key] = (signature, yw7_file)
+        self._entries.move_to_end(key)
+        for old_key in list(self._entries):
+            if len(self._entries) <= self.max_projects:
+                break
+            if old_key not in self._pinned:
+                del self._entries[old_key]
+
+
+# Cache shared by all yWriter tools of this process.
+# Set YW7_INDEX=1 to open projects via the sidecar index.
+project_cache = ProjectCache(use_index=os.environ.get("YW7_INDEX", "0") == "1")
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from ywriter7.yw.yw7_file import Yw7File
+from tools.coordination import MergeConflictError, commit_project
+from tools.project_cache import ProjectCache, project_cache
+
+
+class WriteBehindSession:
+    """
+    Batches yWriter 7 project writes made by the tools.
+
+    Instead of writing the whole project after every mutation, mutated
+    projects are kept in the project cache and marked dirty. They are
+    written in one go when the configured number of operations or the
+    configured interval is reached, when flush() is called, and when the
+    session is closed.
+
+    The interval is checked whenever an operation is recorded; there is no
+    background thread writing a Novel while a tool may be mutating it.
+    """
+
+    def __init__(
+        self,
+        cache: ProjectCache = project_cache,
+        flush_interval: Optional[float] = None,
+        flush_ops: Optional[int] = None,
+    ):
+        """
+        Initializes the session.
+
+        Args:
+            cache (ProjectCache): The cache holding the loaded projects.
+            flush_interval (Optional[float]): Seconds after which pending
+                changes are written. None means no time limit.
+            flush_ops (Optional[int]): Number of pending operations after
+                which a project is written. None means no limit.
+        """
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self.flush_ops = flush_ops
+        self._dirty = {}
+        # key = real path, value = Yw7File with unsaved changes
+        self._on_commit = {}
+        # key = real path, value = list of callbacks to run once the project is written
+        self._pending = {}
+        # key = real path, value = [number of operations, time of the first operation]
+        self._pending_ops = 0
+        self._first_pending = None
+        # Totals over the pending projects
+        self._lock = threading.RLock()
+
+    @property
+    def pending_ops(self) -> int:
+        """Number of operations recorded since the last flush."""
+        return self._pending_ops
+
+    def record(self, yw7_file: Yw7File, on_commit: Optional[Callable[[], None]] = None) -> None:
+        """
+        Records a mutation of a project loaded through the cache.
+
+        Args:
+            yw7_file (Yw7File): The modified yWriter 7 project.
+            on_commit (Optional[Callable[[], None]]): Called once the project
+                has been written. Not called if its changes are dropped.
+
+        Raises:
+            Error: If a due flush fails. The changes are kept pending.
+        """
+        with self._lock:
+            key = os.path.realpath(yw7_file.filePath)
+            if key not in self._dirty:
+                self._dirty[key] = yw7_file
+                self.cache.pin(key)
+            if on_commit is not None:
+                self._on_commit.setdefault(key, []).append(on_commit)
+            if key in self._pending:
+                self._pending[key][0] += 1
+            else:
+                self._pending[key] = [1, time.monotonic()]
+            self._pending_ops += 1
+            if self._first_pending is None:
+                self._first_pending = self._pending[key][1]
+            if self._is_due():
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes all projects with pending changes.
+
+        Changes written by other writers in the meantime are merged; see
+        tools.coordination.commit_project(). The callbacks recorded for a
+        project are run after it has been written.
+
+        Raises:
+            MergeConflictError: If another writer changed the same element.
+                The conflicting project's changes are dropped.
+            Error: If a project cannot be written. Projects not written
+                yet are kept pending.
+        """
+        with self._lock:
+            try:
+                for key in list(self._dirty):
+                    yw7_file = self._dirty[key]
+                    try:
+                        commit_project(yw7_file, self.cache)
+                    except MergeConflictError:
+                        # Retrying would conflict again; the changes are dropped.
+                        self._discard(key)
+                        raise
+                    callbacks = self._on_commit.pop(key, ())
+                    self._discard(key)
+                    for on_commit in callbacks:
+                        on_commit()
+            finally:
+                # Count only what is still pending.
+                self._pending_ops = sum(ops for ops, __ in self._pending.values())
+                self._first_pending = min((first for __, first in self._pending.values()), default=None)
+
+    def close(self) -> None:
+        """Writes all pending changes and ends the session."""
+        global _active_session
+        try:
+            self.flush()
+        finally:
+            if _active_session is self:
+                _active_session = None
+
+    def __enter__(self) -> "WriteBehindSession":
+        return begin_session(self)
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _discard(self, key: str) -> None:
+        """Removes a project from the pending ones, after it has been written or its changes dropped."""
+        del self._dirty[key]
+        del self._pending[key]
+        self._on_commit.pop(key, None)
+        self.cache.unpin(key)
+
+    def _is_due(self) -> bool:
+        """Returns True if the pending changes are to be written now."""
+        if self.flush_ops is not None and self._pending_ops >= self.flush_ops:
+            return True
+        if self.flush_interval is not None:
+            return time.monotonic() - self._first_pending >= self.flush_interval
+        return False
+
+
+_active_session: Optional[WriteBehindSession] = None
+
+
+def begin_session(session: Optional[WriteBehindSession] = None, **kwargs) -> WriteBehindSession:
+    """
+    Makes a write-behind session the active one for the yWriter tools.
+
+    Args:
+        session (Optional[WriteBehindSession]): The session to activate.
+            If None, a new session is created from the keyword arguments.
+
+    Returns:
+        WriteBehindSession: The active session.
+    """
+    global _active_session
+    if session is None:
+        session = WriteBehindSession(**kwargs)
+    if _active_session is not None and _active_session is not session:
+        _active_session.close()
+    _active_session = session
+    return session
+
+
+def end_session() -> None:
+    """Writes all pending changes and deactivates the active session, if any."""
+    if _active_session is not None:
+        _active_session.close()
+
+
+def active_session() -> Optional[WriteBehindSession]:
+    """Returns the active write-behind session, or None."""
+    return _active_session
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 from uuid import uuid4
 
 from crewai.tools import BaseTool
@@ -13,14 +13,51 @@ from ywriter7.model.project_note import ProjectNote
 from ywriter7.model.character import Character
 from ywriter7.model.location import Location
 from ywriter7.model.item import Item
-from ywriter7.model.id_generator import create_id
+from ywriter7.model.scene_query import (
+    ChapterRange,
+    DateRange,
+    HasCharacter,
+    HasItem,
+    HasLocation,
+    HasTag,
+    Status,
+)
+from ywriter7.pywriter_globals import CHAPTER_PREFIX, PRJ_NOTE_PREFIX, SCENE_PREFIX, Error
 from ywriter7.yw.yw7_file import Yw7File
+from ywriter7.yw.yw7_revisions import Yw7Revisions
+from tools.coordination import (
+    JOURNAL_COMPACT_BYTES as DEFAULT_JOURNAL_COMPACT_BYTES,
+    ElementKey,
+    commit_project,
+    journal_change,
+    record_scene_revision,
+    track_change,
+)
+from tools.project_cache import project_cache
+from tools.write_behind import active_session
+
+# Set YW7_JOURNAL=1 to record scene content updates, new chapters and new
+# project notes in the project's edit journal instead of rewriting the
+# project file. yWriter does not read the journal; journaled projects are
+# compacted into the project file when the journal exceeds
+# YW7_JOURNAL_COMPACT_BYTES, and by tools.coordination.compact_projects(),
+# which the caller runs before handing the projects over to yWriter.
+JOURNAL_ENABLED = os.environ.get("YW7_JOURNAL", "0") == "1"
+JOURNAL_COMPACT_BYTES = int(os.environ.get("YW7_JOURNAL_COMPACT_BYTES", DEFAULT_JOURNAL_COMPACT_BYTES))
+
+# Set YW7_REVISIONS=1 to record every scene content written in the
+# project's revision store (project.yw7.revisions).
+REVISIONS_ENABLED = os.environ.get("YW7_REVISIONS", "0") == "1"
+
 
 # Helper function to load a yWriter 7 project
 def load_yw7_file(file_path: str) -> Yw7File:
     """
     Loads a yWriter 7 project file.
 
+    The parsed project is shared through the in-process project cache,
+    so the file is only parsed again if it has changed on disk.
+
     Args:
         file_path (str): The path to the .yw7 file.
 
@@ -37,9 +74,54 @@ def load_yw7_file(file_path: str) -> Yw7File:
     if not file_path.lower().endswith(".yw7"):
         raise ValueError("Invalid file type. Expected a .yw7 file.")
 
-    yw7_file = Yw7File(file_path)
-    yw7_file.read()
-    return yw7_file
+    return project_cache.get(file_path)
+
+# Helper function to save a yWriter 7 project
+def save_yw7_file(
+    yw7_file: Yw7File,
+    change: Optional[Tuple[str, str]] = None,
+    on_saved: Optional[Callable[[], None]] = None,
+) -> Dict[ElementKey, str]:
+    """
+    Writes a yWriter 7 project loaded with load_yw7_file().
+
+    If a write-behind session is active, the write is deferred to the
+    session's next flush. Otherwise, if journaling is enabled and the change
+    can be journaled, it is appended to the project's edit journal instead.
+    Changes tracked with track_change() are merged with the changes other
+    writers have written in the meantime; see commit_project().
+
+    Args:
+        yw7_file (Yw7File): The modified yWriter 7 project.
+        change (Optional[Tuple[str, str]]): (element type prefix, element ID)
+            of the only change made, if known. Scene content updates, new
+            chapters and new project notes can be journaled.
+        on_saved (Optional[Callable[[], None]]): Called once the change has
+            been written to the project file or its journal; with an active
+            write-behind session, when the session has written the project.
+
+    Returns:
+        Dict[ElementKey, str]: New IDs of the elements renumbered while
+            merging, keyed by their former type and ID.
+
+    Raises:
+        MergeConflictError: If another writer changed the same element.
+    """
+    session = active_session()
+    if session is not None:
+        session.record(yw7_file, on_saved)
+        return {}
+
+    if JOURNAL_ENABLED and change is not None:
+        if journal_change(yw7_file, change, project_cache, JOURNAL_COMPACT_BYTES):
+            if on_saved is not None:
+                on_saved()
+            return {}
+
+    renumbered = commit_project(yw7_file, project_cache)
+    if on_saved is not None:
+        on_saved()
+    return renumbered
 
 # --- Tools for reading data ---
 
@@ -208,6 +290,72 @@ class ReadSceneTool(BaseTool):
         except Exception as e:
             return f"Error reading scene: {e}"
 
+class FindScenesInput(BaseModel):
+    yw7_path: str = Field(..., description="Path to the .yw7 file")
+    status: Optional[str] = Field(
+        None, description="Scene status: Outline, Draft, 1st Edit, 2nd Edit, or Done"
+    )
+    first_chapter_id: Optional[str] = Field(None, description="ID of the first chapter to search")
+    last_chapter_id: Optional[str] = Field(
+        None, description="ID of the last chapter to search; defaults to the first chapter"
+    )
+    character_id: Optional[str] = Field(None, description="ID of a character featured in the scenes")
+    location_id: Optional[str] = Field(None, description="ID of a location of the scenes")
+    item_id: Optional[str] = Field(None, description="ID of an item featured in the scenes")
+    tag: Optional[str] = Field(None, description="Scene tag")
+    start_date: Optional[str] = Field(None, description="Earliest scene date (yyyy-mm-dd)")
+    end_date: Optional[str] = Field(None, description="Latest scene date (yyyy-mm-dd)")
+
+class FindScenesTool(BaseTool):
+    name: str = "Find Scenes"
+    description: str = (
+        "Find the scenes of a yWriter 7 project file matching all given criteria, in the novel's order."
+    )
+    args_schema: type[BaseModel] = FindScenesInput
+
+    def _run(
+        self,
+        yw7_path: str,
+        status: Optional[str] = None,
+        first_chapter_id: Optional[str] = None,
+        last_chapter_id: Optional[str] = None,
+        character_id: Optional[str] = None,
+        location_id: Optional[str] = None,
+        item_id: Optional[str] = None,
+        tag: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        try:
+            yw7_file = load_yw7_file(yw7_path)
+            predicates = []
+            if status is not None:
+                if status not in Scene.STATUS[1:]:
+                    return f"Error: unknown scene status '{status}'."
+                predicates.append(Status(Scene.STATUS.index(status)))
+            if first_chapter_id is not None:
+                predicates.append(ChapterRange(first_chapter_id, last_chapter_id or first_chapter_id))
+            if character_id is not None:
+                predicates.append(HasCharacter(character_id))
+            if location_id is not None:
+                predicates.append(HasLocation(location_id))
+            if item_id is not None:
+                predicates.append(HasItem(item_id))
+            if tag is not None:
+                predicates.append(HasTag(tag))
+            if start_date is not None or end_date is not None:
+                predicates.append(DateRange(start_date, end_date))
+            scene_data = []
+            for sc_id in yw7_file.novel.query_scenes(*predicates):
+                scene = yw7_file.novel.scenes[sc_id]
+                scene_data.append(json.dumps({"ID": sc_id, "Title": scene.title, "Description": scene.desc}))
+            return "\n".join(scene_data) or "No matching scenes found."
+        except FileNotFoundError:
+            return "Error: yWriter 7 project file not found."
+        except Exception as e:
+            return f"Error finding scenes: {e}"
+
 # --- Tools for writing data ---
 
 class WriteProjectNoteInput(BaseModel):
@@ -223,13 +371,16 @@ class WriteProjectNoteTool(BaseTool):
     def _run(self, yw7_path: str, title: str, content: str, **kwargs) -> str:
         try:
             yw7_file = load_yw7_file(yw7_path)
-            note_id = create_id(yw7_file.novel.projectNotes)
+            note_id = yw7_file.novel.get_id_allocator(PRJ_NOTE_PREFIX).create_id()
+            track_change(yw7_file, PRJ_NOTE_PREFIX, note_id)
             project_note = ProjectNote()
             project_note.title = title
             project_note.desc = content
             yw7_file.novel.projectNotes[note_id] = project_note
             yw7_file.novel.srtPrjNotes.append(note_id)
-            yw7_file.write()
+            yw7_file.novel.notify(PRJ_NOTE_PREFIX, note_id)
+            renumbered = save_yw7_file(yw7_file, (PRJ_NOTE_PREFIX, note_id))
+            note_id = renumbered.get((PRJ_NOTE_PREFIX, note_id), note_id)
             return f"Project note '{title}' written successfully with ID: {note_id}."
         except FileNotFoundError:
             return "Error: yWriter 7 project file not found."
@@ -251,7 +402,8 @@ class CreateChapterTool(BaseTool):
     ) -> str:
         try:
             yw7_file = load_yw7_file(yw7_path)
-            chapter_id = create_id(yw7_file.novel.chapters)
+            chapter_id = yw7_file.novel.get_id_allocator(CHAPTER_PREFIX).create_id()
+            track_change(yw7_file, CHAPTER_PREFIX, chapter_id)
             chapter = Chapter()
             chapter.title = title
             chapter.desc = description
@@ -260,7 +412,9 @@ class CreateChapterTool(BaseTool):
             chapter.srtScenes = []
             yw7_file.novel.chapters[chapter_id] = chapter
             yw7_file.novel.srtChapters.append(chapter_id)
-            yw7_file.write()
+            yw7_file.novel.notify(CHAPTER_PREFIX, chapter_id)
+            renumbered = save_yw7_file(yw7_file, (CHAPTER_PREFIX, chapter_id))
+            chapter_id = renumbered.get((CHAPTER_PREFIX, chapter_id), chapter_id)
             return f"Chapter '{title}' created successfully with ID: {chapter_id}."
         except FileNotFoundError:
             return "Error: yWriter 7 project file not found."
@@ -283,11 +437,71 @@ class WriteSceneContentTool(BaseTool):
             yw7_file = load_yw7_file(yw7_path)
             if scene_id in yw7_file.novel.scenes:
                 scene = yw7_file.novel.scenes[scene_id]
+                track_change(yw7_file, SCENE_PREFIX, scene_id)
+                previous = scene.sceneContent
                 scene.sceneContent = content
-                yw7_file.write()
+                outcome = {}
+
+                def record_revision():
+                    # Called once the content has been written, which may be deferred.
+                    try:
+                        outcome["revision"] = record_scene_revision(yw7_file, scene_id, previous)
+                    except Error as e:
+                        outcome["error"] = e
+
+                save_yw7_file(yw7_file, (SCENE_PREFIX, scene_id), record_revision if REVISIONS_ENABLED else None)
+                if "error" in outcome:
+                    return f"Content written to scene '{scene_id}' successfully, but no revision was recorded: {outcome['error']}"
+                if "revision" in outcome:
+                    return f"Content written to scene '{scene_id}' successfully as revision {outcome['revision']}."
                 return f"Content written to scene '{scene_id}' successfully."
             return "Scene not found."
         except FileNotFoundError:
             return "Error: yWriter 7 project file not found."
         except Exception as e:
-            return f"Error writing scene content: {e}"
\ No newline at end of file
+            return f"Error writing scene content: {e}"
+
+class CompareSceneRevisionsInput(BaseModel):
+    yw7_path: str = Field(..., description="Path to the .yw7 file")
+    scene_id: str = Field(..., description="ID of the scene")
+    from_revision: Optional[int] = Field(
+        None, description="Revision to compare from; defaults to the revision before the latest one"
+    )
+    to_revision: Optional[int] = Field(None, description="Revision to compare to; defaults to the latest one")
+
+class CompareSceneRevisionsTool(BaseTool):
+    name: str = "Compare Scene Revisions"
+    description: str = "List the paragraphs changed between two recorded revisions of a scene in a yWriter 7 project."
+    args_schema: type[BaseModel] = CompareSceneRevisionsInput
+
+    def _run(
+        self, yw7_path: str, scene_id: str, from_revision: Optional[int] = None,
+        to_revision: Optional[int] = None, **kwargs
+    ) -> str:
+        try:
+            revisions = Yw7Revisions(yw7_path)
+            numbers = [revision for revision, __ in revisions.get_revisions(scene_id)]
+            if not numbers:
+                return "No revisions recorded for this scene."
+            if to_revision is None:
+                to_revision = numbers[-1]
+            if from_revision is None:
+                earlier = [revision for revision in numbers if revision < to_revision]
+                if not earlier:
+                    return f"Revision {to_revision} is the first revision of this scene."
+                from_revision = earlier[-1]
+            changes = [
+                {
+                    "Change": tag,
+                    "Old paragraph": i + 1,
+                    "Old text": old,
+                    "New paragraph": j + 1,
+                    "New text": new,
+                }
+                for tag, i, old, j, new in revisions.diff(scene_id, from_revision, to_revision)
+            ]
+            return json.dumps(
+                {"From revision": from_revision, "To revision": to_revision, "Changes": changes}
+            )
+        except Exception as e:
+            return f"Error comparing scene revisions: {e}"
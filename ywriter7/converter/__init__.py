@@ -0,0 +1,10 @@
+"""Modules for conversion of Novel subclasses.
+
+Modules:
+
+batch_converter -- Provide a class for converting many yWriter projects at a time.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
@@ -0,0 +1,174 @@
+"""Provide a class for converting many yWriter projects at a time.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from ..pywriter_globals import *
+from ..model.novel import Novel
+from ..ui.ui import Ui
+from ..yw.yw7_file import Yw7File
+
+
+class BatchConverter:
+    """Converter for many yWriter projects into other file formats.
+
+    Each project is read once, and written to all target formats.
+    Projects are converted in a process pool, each in a fresh worker process.
+    A failing project does not abort the batch.
+
+    Public methods:
+        run(sources, targetClasses) -- convert the source projects; return the results.
+
+    Public instance variables:
+        ui -- Ui instance used for messaging.
+        processes: int -- number of worker processes.
+        memoryLimit: int -- address space limit per worker process in bytes, or None.
+        targetDir: str -- directory for the converted files, or None for the source directories.
+    """
+
+    def __init__(self, processes=None, memoryLimit=None, targetDir=None):
+        """Initialize instance variables.
+
+        Optional arguments:
+            processes: int -- number of worker processes. If 1, convert in this process.
+                              If None, use the number of CPUs.
+            memoryLimit: int -- address space limit per worker process in bytes, if supported by the OS.
+                                A worker exceeding it fails with a MemoryError on its project.
+            targetDir: str -- directory for the converted files.
+        """
+        self.ui = Ui('')
+        self.processes = processes or os.cpu_count() or 1
+        self.memoryLimit = memoryLimit
+        self.targetDir = targetDir
+
+    def run(self, sources, targetClasses):
+        """Convert the source projects; return the results.
+
+        Positional arguments:
+            sources -- iterable of .yw7 file paths or glob patterns.
+            targetClasses -- iterable of File subclasses to be written.
+
+        Return a list of tuples: (source path, duration in seconds, list of error messages),
+        in the order of the sources. An empty list of error messages means success.
+        """
+        sourcePaths = expand_sources(sources)
+        targetClasses = list(targetClasses)
+        results = {}
+        self.ui.set_info_what(f'{_("Converting")} {len(sourcePaths)} {_("projects")}')
+        if self.processes > 1 and len(sourcePaths) > 1:
+            with ProcessPoolExecutor(
+                    max_workers=min(self.processes, len(sourcePaths)),
+                    max_tasks_per_child=1,
+                    initializer=limit_memory,
+                    initargs=(self.memoryLimit,),
+                    ) as executor:
+                futures = {
+                    executor.submit(convert_project, sourcePath, targetClasses, self.targetDir): sourcePath
+                    for sourcePath in sourcePaths
+                    }
+                for future in as_completed(futures):
+                    sourcePath = futures[future]
+                    try:
+                        results[sourcePath] = future.result()
+                    except Exception as ex:
+                        # The worker process died.
+                        results[sourcePath] = (sourcePath, 0.0, [f'{_("Conversion aborted")}: {str(ex)}'])
+                    self._report(results[sourcePath])
+        else:
+            for sourcePath in sourcePaths:
+                results[sourcePath] = convert_project(sourcePath, targetClasses, self.targetDir)
+                self._report(results[sourcePath])
+        return [results[sourcePath] for sourcePath in sourcePaths]
+
+    def _report(self, result):
+        """Pass a project's result to the user interface."""
+        sourcePath, seconds, errors = result
+        if errors:
+            self.ui.set_info_how(f'!{norm_path(sourcePath)}: {"; ".join(errors)}')
+        else:
+            self.ui.set_info_how(f'{norm_path(sourcePath)}: {_("converted")} ({seconds:.2f} s)')
+
+
+def expand_sources(sources):
+    """Return a list of the .yw7 file paths, with the glob patterns expanded.
+
+    Positional arguments:
+        sources -- iterable of .yw7 file paths or glob patterns.
+
+    A path matching no file is kept, so its conversion fails with a message.
+    """
+    sourcePaths = []
+    for source in sources:
+        matches = sorted(glob.glob(source))
+        if not matches:
+            matches = [source]
+        for sourcePath in matches:
+            if not sourcePath in sourcePaths:
+                sourcePaths.append(sourcePath)
+    return sourcePaths
+
+
+def convert_project(sourcePath, targetClasses, targetDir=None):
+    """Read a yWriter project once, and write it to all target formats.
+
+    Positional arguments:
+        sourcePath: str -- path to the .yw7 file.
+        targetClasses -- list of File subclasses to be written.
+
+    Optional arguments:
+        targetDir: str -- directory for the converted files, or None for the source directory.
+
+    Return a tuple: (source path, duration in seconds, list of error messages).
+    """
+    startTime = time.perf_counter()
+    errors = []
+    try:
+        if not os.path.isfile(sourcePath):
+            raise Error(f'{_("File not found")}: "{norm_path(sourcePath)}".')
+
+        source = Yw7File(sourcePath)
+        if source.filePath is None:
+            raise Error(f'{_("File type is not supported")}: "{norm_path(sourcePath)}".')
+
+        source.novel = Novel()
+        source.read(keep_tree=False)
+        root, __ = os.path.splitext(sourcePath)
+        if targetDir is not None:
+            root = os.path.join(targetDir, os.path.basename(root))
+        for targetClass in targetClasses:
+            try:
+                target = targetClass(f'{root}{targetClass.SUFFIX or ""}{targetClass.EXTENSION}')
+                if os.path.realpath(target.filePath) == os.path.realpath(source.filePath):
+                    raise Error(f'{_("Source and target are the same file")}: "{norm_path(target.filePath)}".')
+
+                target.novel = source.novel
+                target.write()
+            except Exception as ex:
+                errors.append(f'{targetClass.DESCRIPTION}: {str(ex)}')
+    except Exception as ex:
+        errors.append(str(ex))
+    return sourcePath, time.perf_counter() - startTime, errors
+
+
+def limit_memory(maxBytes):
+    """Limit the address space of the current process, if supported by the OS.
+
+    Positional arguments:
+        maxBytes: int -- limit in bytes, or None for no limit.
+    """
+    if maxBytes is None:
+        return
+
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows.
+        return
+
+    resource.setrlimit(resource.RLIMIT_AS, (maxBytes, maxBytes))
@@ -9,6 +9,8 @@ https://github.com/peter88213/PyWriter/tree/main/src/pywriter/file#readme
 
 Modules:
 
+compiled_filter -- Provide filter classes precomputing the accepted scenes for template-based file export.
+compiled_template -- Provide classes for pre-compiled template substitution.
 doc_open -- Helper module for opening documents.
 file_export.py -- Provide a generic class for template-based file export.
 file -- Provide an abstract class for file representation.
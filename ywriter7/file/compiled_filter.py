@@ -0,0 +1,138 @@
+"""Provide filter classes precomputing the accepted scenes for template-based file export.
+
+The filters evaluate a scene predicate once per export against the
+novel's scene index, so checking an entity is a set lookup, and chapters
+without any accepted scene are skipped as a whole, e.g.:
+
+    exporter._sceneFilter = SceneFilter(HasTag('draft') & Viewpoint('1'))
+    exporter._chapterFilter = ChapterFilter(HasTag('draft') & Viewpoint('1'))
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from .filter import Filter
+from ..model.scene_query import ChapterRange
+from ..model.scene_query import HasArc
+from ..model.scene_query import HasTag
+from ..model.scene_query import Status
+from ..model.scene_query import Viewpoint
+
+
+class SceneFilter(Filter):
+    """Filter scenes by a scene predicate.
+
+    Public methods:
+        compile(source) -- select the accepted scenes of the novel to be exported.
+        accept(source, eId) -- check whether a scene is selected.
+        accept_chapter_scenes(source, chId) -- check whether a chapter has any selected scene.
+
+    Public instance variables:
+        predicate -- ScenePredicate instance selecting the scenes to accept.
+
+    The selection is made once per export, when the exporter compiles its filters;
+    if the filter is used without being compiled, it compiles itself on first check.
+    The selection is not updated when the novel changes during an export.
+    """
+
+    def __init__(self, predicate):
+        """Positional arguments:
+            predicate -- ScenePredicate instance selecting the scenes to accept.
+        """
+        self.predicate = predicate
+        self._scIds = None
+        # Set of the IDs of the accepted scenes
+        self._chIds = None
+        # Set of the IDs of the chapters with accepted scenes
+
+    def compile(self, source):
+        """Select the accepted scenes of the novel to be exported.
+
+        Positional arguments:
+            source -- FileExport instance to be written.
+
+        Overrides the superclass method.
+        """
+        novel = source.novel
+        self._scIds = self.predicate.select(novel.get_scene_index())
+        self._chIds = {chId for chId in novel.srtChapters
+                       if not self._scIds.isdisjoint(novel.chapters[chId].srtScenes)}
+
+    def accept(self, source, eId):
+        """Return True if the scene is selected.
+
+        Positional arguments:
+            source -- FileExport instance holding the scene to check.
+            eId -- ID of the scene to check.
+
+        Overrides the superclass method.
+        """
+        if self._scIds is None:
+            self.compile(source)
+        return eId in self._scIds
+
+    def accept_chapter_scenes(self, source, chId):
+        """Return True if the chapter has any selected scene.
+
+        Positional arguments:
+            source -- FileExport instance holding the chapter to check.
+            chId -- ID of the chapter to check.
+
+        Overrides the superclass method.
+        """
+        if self._chIds is None:
+            self.compile(source)
+        return chId in self._chIds
+
+
+class ChapterFilter(SceneFilter):
+    """Filter chapters by a scene predicate, accepting the chapters with any matching scene.
+
+    Use it as chapter filter, so chapters without accepted scenes are omitted with their headings.
+    """
+
+    def accept(self, source, eId):
+        """Return True if the chapter has any selected scene.
+
+        Positional arguments:
+            source -- FileExport instance holding the chapter to check.
+            eId -- ID of the chapter to check.
+
+        Overrides the superclass method.
+        """
+        return self.accept_chapter_scenes(source, eId)
+
+
+class TagFilter(SceneFilter):
+    """Accept the scenes tagged with any of the tags given."""
+
+    def __init__(self, *tags):
+        super().__init__(HasTag(*tags))
+
+
+class StatusFilter(SceneFilter):
+    """Accept the scenes with any of the status values given (1 - Outline, ..., 5 - Done)."""
+
+    def __init__(self, *status):
+        super().__init__(Status(*status))
+
+
+class ViewpointFilter(SceneFilter):
+    """Accept the scenes with any of the characters given by ID as viewpoint character."""
+
+    def __init__(self, *crIds):
+        super().__init__(Viewpoint(*crIds))
+
+
+class ChapterRangeFilter(SceneFilter):
+    """Accept the scenes in the chapters from the first to the last chapter given by ID."""
+
+    def __init__(self, firstId, lastId):
+        super().__init__(ChapterRange(firstId, lastId))
+
+
+class ArcFilter(SceneFilter):
+    """Accept the scenes belonging to any of the arcs given by title."""
+
+    def __init__(self, *arcs):
+        super().__init__(HasArc(*arcs))
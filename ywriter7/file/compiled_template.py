@@ -0,0 +1,111 @@
+"""Provide classes for pre-compiled template substitution.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from string import Template
+
+
+class CompiledTemplate:
+    """string.Template, split into literal text and placeholders once.
+
+    Public methods:
+        safe_substitute(mapping) -- Return the template text with the placeholders substituted.
+
+    Public instance variables:
+        template: str -- the template text.
+        placeholders: frozenset -- names of the placeholders used by the template.
+    """
+
+    def __init__(self, template):
+        """Split the template text into literal text and placeholders.
+
+        Positional arguments:
+            template: str -- template text with placeholders in string.Template syntax.
+        """
+        self.template = template
+        self._parts = []
+        # Literal text, with None where a placeholder is to be inserted
+        self._slots = []
+        # (index in self._parts, placeholder name, placeholder text)
+        literal = []
+        start = 0
+        for match in Template.pattern.finditer(template):
+            literal.append(template[start:match.start()])
+            start = match.end()
+            name = match.group('named') or match.group('braced')
+            if name is not None:
+                self._parts.append(''.join(literal))
+                literal = []
+                self._slots.append((len(self._parts), name, match.group()))
+                self._parts.append(None)
+            elif match.group('escaped') is not None:
+                literal.append(match.group('escaped'))
+                # "$$" is the escaped delimiter.
+            else:
+                literal.append(match.group())
+                # Invalid placeholder; safe_substitute() leaves it as it is.
+        literal.append(template[start:])
+        self._parts.append(''.join(literal))
+        self.placeholders = frozenset(name for __, name, __ in self._slots)
+
+    def safe_substitute(self, mapping):
+        """Return the template text with the placeholders substituted.
+
+        Positional arguments:
+            mapping -- dictionary with the placeholder names as keys.
+
+        Placeholders missing in the mapping are left as they are,
+        like string.Template.safe_substitute() does.
+        """
+        if not self._slots:
+            return self._parts[0]
+
+        parts = self._parts.copy()
+        for i, name, placeholder in self._slots:
+            try:
+                parts[i] = str(mapping[name])
+            except KeyError:
+                parts[i] = placeholder
+        return ''.join(parts)
+
+
+class Deferred:
+    """Value of a LazyMapping entry, to be computed on first access.
+
+    Public instance variables:
+        function -- function computing the value.
+        args -- positional arguments passed to the function.
+    """
+    __slots__ = ('function', 'args')
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __call__(self):
+        return self.function(*self.args)
+
+
+class LazyMapping(dict):
+    """Dictionary computing Deferred values on first access.
+
+    Entries are computed when accessed by subscription or get(),
+    so substituting a template computes only the values of the placeholders used.
+    Other dictionary methods, such as items() or values(), return the Deferred instances
+    of values not yet computed.
+    """
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, Deferred):
+            value = value()
+            self[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+
+        return default
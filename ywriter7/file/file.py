@@ -9,6 +9,7 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 from abc import ABC
 from urllib.parse import quote
 import os
+import shutil
 from ..pywriter_globals import *
 
 
@@ -120,6 +121,52 @@ class File(ABC):
         """
         raise NotImplementedError
 
+    def _replace_file(self, tempPath, filePath, backup=True):
+        """Replace a file by a completely written temporary file.
+        
+        Positional arguments:
+            tempPath: str -- path to the temporary file.
+            filePath: str -- path to the file to replace.
+        
+        Optional arguments:
+            backup: bool -- if True, keep a copy of the replaced file as a backup.
+        
+        The backup is a hard link to the replaced file, so the file exists all 
+        the time, and replacing it is a single atomic rename, without copying. 
+        Where hard links are not supported, the file is copied. 
+        On error, the temporary file is removed.
+        Raise the "Error" exception in case of error.
+        """
+        if backup and os.path.isfile(filePath):
+            backupPath = f'{filePath}.bak'
+            try:
+                try:
+                    os.remove(f'{backupPath}.tmp')
+                    # Left by an interrupted backup.
+                except FileNotFoundError:
+                    pass
+                try:
+                    os.link(filePath, f'{backupPath}.tmp')
+                except OSError:
+                    shutil.copy2(filePath, f'{backupPath}.tmp')
+                os.replace(f'{backupPath}.tmp', backupPath)
+            except OSError:
+                for path in (tempPath, f'{backupPath}.tmp'):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(filePath)}".')
+
+        try:
+            os.replace(tempPath, filePath)
+        except OSError:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
+
     def _convert_from_yw(self, text, quick=False):
         """Return text, converted from yw7 markup to target format.
         
@@ -8,11 +8,13 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from ..pywriter_globals import *
 from ..model.character import Character
 from ..model.scene import Scene
 from .file import File
 from .filter import Filter
+from .compiled_template import CompiledTemplate, Deferred, LazyMapping
 
 
 class FileExport(File):
@@ -20,8 +22,16 @@ class FileExport(File):
     
     Public methods:
         write() -- write instance variables to the export file.
+        iter_text() -- generate the export text chunk by chunk.
+    
+    Public instance variables:
+        processes: int -- number of worker processes rendering the chapters.
     
     This class is generic and contains no conversion algorithm and no templates.
+    
+    The templates are compiled once per instance. The mapping methods return
+    LazyMapping instances, where the converted values are Deferred; so only the
+    values of the placeholders a template actually uses are computed.
     """
     SUFFIX = ''
     _fileHeader = ''
@@ -65,54 +75,95 @@ class FileExport(File):
             
         Optional arguments:
             kwargs -- keyword arguments to be used by subclasses.            
+                      processes: int -- number of worker processes rendering the chapters.
+                      If greater than 1, the exporter is copied to a process pool, 
+                      so it must be picklable. Default: 1.
 
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
+        self.processes = kwargs.get('processes', 1)
         self._sceneFilter = Filter()
         self._chapterFilter = Filter()
         self._characterFilter = Filter()
         self._locationFilter = Filter()
         self._itemFilter = Filter()
+        self._templates = {}
+        # key: template text, value: CompiledTemplate instance
+        self._countingOnly = False
+        # If True, _get_template() returns a template substituting nothing.
 
     def write(self):
         """Write instance variables to the export file.
         
         Create a template-based output file. 
-        Return a message in case of success.
+        The text is written chunk by chunk to a temporary file, 
+        which then replaces the export file with a single rename. 
+        An existing export file is backed up.
         Raise the "Error" exception in case of error. 
         """
-        text = self._get_text()
-        backedUp = False
-        if os.path.isfile(self.filePath):
-            try:
-                os.replace(self.filePath, f'{self.filePath}.bak')
-            except:
-                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(self.filePath)}".')
-            else:
-                backedUp = True
+        tempPath = f'{self.filePath}.tmp'
         try:
-            with open(self.filePath, 'w', encoding='utf-8') as f:
-                f.write(text)
-        except:
-            if backedUp:
-                os.replace(f'{self.filePath}.bak', self.filePath)
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                for chunk in self.iter_text():
+                    f.write(chunk)
+        except OSError:
+            self._remove_file(tempPath)
             raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}".')
 
+        except:
+            self._remove_file(tempPath)
+            raise
+
+        self._replace_file(tempPath, self.filePath)
+
+    def iter_text(self):
+        """Generate the export text chunk by chunk.
+        
+        Yield strings: the file header, each chapter with its scenes, the characters, 
+        locations, items, and project notes, and the file footer.
+        Joined, the chunks are the complete text of the export file. 
+        If a subclass overrides _get_text() or _get_chapters(), 
+        yield the result as a single chunk.
+        The filters are compiled before any entity is checked.
+        """
+        self._compile_filters()
+        if type(self)._get_text is not FileExport._get_text:
+            yield self._get_text()
+            return
+
+        yield ''.join(self._get_fileHeader())
+        if type(self)._get_chapters is FileExport._get_chapters:
+            for chapterLines in self._iter_chapters():
+                yield ''.join(chapterLines)
+        else:
+            yield ''.join(self._get_chapters())
+        yield ''.join(self._get_characters())
+        yield ''.join(self._get_locations())
+        yield ''.join(self._get_items())
+        yield ''.join(self._get_projectNotes())
+        yield self._fileFooter
+
+    def _compile_filters(self):
+        """Prepare the filters for the export, e.g. precompute the accepted entities."""
+        for entityFilter in (self._sceneFilter, self._chapterFilter, self._characterFilter,
+                             self._locationFilter, self._itemFilter):
+            entityFilter.compile(self)
+
     def _get_fileHeaderMapping(self):
         """Return a mapping dictionary for the project section.
         
         This is a template method that can be extended or overridden by subclasses.
         """
-        projectTemplateMapping = dict(
-            Title=self._convert_from_yw(self.novel.title, True),
-            Desc=self._convert_from_yw(self.novel.desc),
-            AuthorName=self._convert_from_yw(self.novel.authorName, True),
-            AuthorBio=self._convert_from_yw(self.novel.authorBio, True),
-            FieldTitle1=self._convert_from_yw(self.novel.fieldTitle1, True),
-            FieldTitle2=self._convert_from_yw(self.novel.fieldTitle2, True),
-            FieldTitle3=self._convert_from_yw(self.novel.fieldTitle3, True),
-            FieldTitle4=self._convert_from_yw(self.novel.fieldTitle4, True),
+        projectTemplateMapping = LazyMapping(
+            Title=Deferred(self._convert_from_yw, self.novel.title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.desc),
+            AuthorName=Deferred(self._convert_from_yw, self.novel.authorName, True),
+            AuthorBio=Deferred(self._convert_from_yw, self.novel.authorBio, True),
+            FieldTitle1=Deferred(self._convert_from_yw, self.novel.fieldTitle1, True),
+            FieldTitle2=Deferred(self._convert_from_yw, self.novel.fieldTitle2, True),
+            FieldTitle3=Deferred(self._convert_from_yw, self.novel.fieldTitle3, True),
+            FieldTitle4=Deferred(self._convert_from_yw, self.novel.fieldTitle4, True),
             Language=self.novel.languageCode,
             Country=self.novel.countryCode,
         )
@@ -145,12 +196,12 @@ class FileExport(File):
         if chapterNumber == 0:
             chapterNumber = ''
 
-        chapterMapping = dict(
+        chapterMapping = LazyMapping(
             ID=chId,
             ChapterNumber=chapterNumber,
-            Title=self._convert_from_yw(self.novel.chapters[chId].title, True),
-            Desc=self._convert_from_yw(self.novel.chapters[chId].desc),
-            ProjectName=self._convert_from_yw(self.projectName, True),
+            Title=Deferred(self._convert_from_yw, self.novel.chapters[chId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.chapters[chId].desc),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName, True),
             ProjectPath=self.projectPath,
             Language=self.novel.languageCode,
             Country=self.novel.countryCode,
@@ -160,92 +211,181 @@ class FileExport(File):
     def _get_chapters(self):
         """Process the chapters and nested scenes.
         
-        Iterate through the sorted chapter list and apply the templates, 
-        substituting placeholders according to the chapter mapping dictionary.
-        For each chapter call the processing of its included scenes.
-        Skip chapters not accepted by the chapter filter.
         Return a list of strings.
         This is a template method that can be extended or overridden by subclasses.
         """
         lines = []
-        chapterNumber = 0
+        for chapterLines in self._iter_chapters():
+            lines.extend(chapterLines)
+        return lines
+
+    def _iter_chapters(self):
+        """Process the chapters and nested scenes one chapter at a time.
+        
+        Skip chapters not accepted by the chapter filter.
+        Yield a list of strings per chapter, in chapter order.
+        
+        The numbers and totals returned by _get_scenes() are passed on to the next chapter.
+        If self.processes is greater than 1, the chapters are rendered in a process pool instead.
+        """
+        if self.processes > 1:
+            chapterStarts = self._get_chapter_starts()
+            if len(chapterStarts) > 1:
+                yield from self._iter_chapters_parallel(chapterStarts)
+                return
+
         sceneNumber = 0
         wordsTotal = 0
         lettersTotal = 0
+        for chId, chapterNumber, doNotExport in self._iter_chapter_numbers():
+            chapterLines, sceneNumber, wordsTotal, lettersTotal = self._get_chapter(
+                chId, chapterNumber, doNotExport, sceneNumber, wordsTotal, lettersTotal)
+            yield chapterLines
+
+    def _iter_chapters_parallel(self, chapterStarts):
+        """Render the chapters in a process pool; yield a list of strings per chapter, in chapter order.
+        
+        Positional arguments:
+            chapterStarts: list of tuples, as returned by _get_chapter_starts().
+        """
+        for scene in self.novel.scenes.values():
+            scene.sceneContent
+            # Scene content loaders are bound to the source file; don't pass them to the workers.
+        chunkSize = max(1, len(chapterStarts) // (self.processes * 4))
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker, initargs=(self,)) as executor:
+            for text in executor.map(_render_chapter, chapterStarts, chunksize=chunkSize):
+                yield [text]
+
+    def _iter_chapter_numbers(self):
+        """Iterate through the sorted chapter list, skipping chapters not accepted by the chapter filter.
+        
+        Yield a tuple per chapter: (chapter ID, chapter number, doNotExport flag).
+        The chapter number is 0 for unnumbered chapters.
+        """
+        chapterNumber = 0
         for chId in self.novel.srtChapters:
-            dispNumber = 0
             if not self._chapterFilter.accept(self, chId):
                 continue
 
-            # The order counts; be aware that "Todo" and "Notes" chapters are
-            # always unused.
-            # Has the chapter only scenes not to be exported?
-            sceneCount = 0
-            notExportCount = 0
-            doNotExport = False
-            template = None
-            for scId in self.novel.chapters[chId].srtScenes:
-                sceneCount += 1
-                if self.novel.scenes[scId].doNotExport:
-                    notExportCount += 1
-            if sceneCount > 0 and notExportCount == sceneCount:
-                doNotExport = True
-            if self.novel.chapters[chId].chType == 2:
-                # Chapter is "Todo" type.
-                if self.novel.chapters[chId].chLevel == 1:
-                    # Chapter is "Todo Part" type.
-                    if self._todoPartTemplate:
-                        template = Template(self._todoPartTemplate)
-                elif self._todoChapterTemplate:
-                    template = Template(self._todoChapterTemplate)
-            elif self.novel.chapters[chId].chType == 1:
-                # Chapter is "Notes" type.
-                if self.novel.chapters[chId].chLevel == 1:
-                    # Chapter is "Notes Part" type.
-                    if self._notesPartTemplate:
-                        template = Template(self._notesPartTemplate)
-                elif self._notesChapterTemplate:
-                    template = Template(self._notesChapterTemplate)
-            elif self.novel.chapters[chId].chType == 3:
-                # Chapter is "unused" type.
-                if self._unusedChapterTemplate:
-                    template = Template(self._unusedChapterTemplate)
-            elif doNotExport:
-                if self._notExportedChapterTemplate:
-                    template = Template(self._notExportedChapterTemplate)
-            elif self.novel.chapters[chId].chLevel == 1 and self._partTemplate:
-                template = Template(self._partTemplate)
-            else:
-                template = Template(self._chapterTemplate)
+            chapter = self.novel.chapters[chId]
+            doNotExport = self._is_not_exported(chId)
+            dispNumber = 0
+            if chapter.chType not in (1, 2, 3) and not doNotExport and not (chapter.chLevel == 1 and self._partTemplate):
                 chapterNumber += 1
                 dispNumber = chapterNumber
-            if template is not None:
-                lines.append(template.safe_substitute(self._get_chapterMapping(chId, dispNumber)))
-
-            #--- Process scenes.
-            sceneLines, sceneNumber, wordsTotal, lettersTotal = self._get_scenes(
-                chId, sceneNumber, wordsTotal, lettersTotal, doNotExport)
-            lines.extend(sceneLines)
-
-            #--- Process chapter ending.
-            template = None
-            if self.novel.chapters[chId].chType == 2:
-                if self._todoChapterEndTemplate:
-                    template = Template(self._todoChapterEndTemplate)
-            elif self.novel.chapters[chId].chType == 1:
-                if self._notesChapterEndTemplate:
-                    template = Template(self._notesChapterEndTemplate)
-            elif self.novel.chapters[chId].chType == 3:
-                if self._unusedChapterEndTemplate:
-                    template = Template(self._unusedChapterEndTemplate)
-            elif doNotExport:
-                if self._notExportedChapterEndTemplate:
-                    template = Template(self._notExportedChapterEndTemplate)
-            elif self._chapterEndTemplate:
-                template = Template(self._chapterEndTemplate)
-            if template is not None:
-                lines.append(template.safe_substitute(self._get_chapterMapping(chId, dispNumber)))
-        return lines
+            yield chId, dispNumber, doNotExport
+
+    def _get_chapter_starts(self):
+        """Return the chapter and scene numbers and the totals each chapter starts with.
+        
+        Process the scenes of all chapters with _get_scenes(), but without applying 
+        any template, and collect the numbers and totals it returns. 
+        Return a list of tuples, one per chapter, to be passed to _get_chapter():
+            (chapter ID, chapter number, doNotExport flag, 
+             number of previous scenes, words of previous scenes, letters of previous scenes)
+        """
+        chapterStarts = []
+        sceneNumber = 0
+        wordsTotal = 0
+        lettersTotal = 0
+        self._countingOnly = True
+        try:
+            for chId, chapterNumber, doNotExport in self._iter_chapter_numbers():
+                chapterStarts.append((chId, chapterNumber, doNotExport, sceneNumber, wordsTotal, lettersTotal))
+                __, sceneNumber, wordsTotal, lettersTotal = self._get_scenes(
+                    chId, sceneNumber, wordsTotal, lettersTotal, doNotExport)
+        finally:
+            self._countingOnly = False
+        return chapterStarts
+
+    def _is_not_exported(self, chId):
+        """Return True, if the chapter has only scenes not to be exported."""
+        srtScenes = self.novel.chapters[chId].srtScenes
+        if not srtScenes:
+            return False
+
+        for scId in srtScenes:
+            if not self.novel.scenes[scId].doNotExport:
+                return False
+
+        return True
+
+    def _get_chapter(self, chId, chapterNumber, doNotExport, sceneNumber, wordsTotal, lettersTotal):
+        """Process a chapter and its scenes.
+        
+        Positional arguments:
+            chId: str -- chapter ID.
+            chapterNumber: int -- chapter number; 0 for unnumbered chapters.
+            doNotExport: bool -- the chapter has only scenes not to be exported.
+            sceneNumber: int -- number of the scenes of the previous chapters.
+            wordsTotal: int -- accumulated wordcount of the previous chapters.
+            lettersTotal: int -- accumulated lettercount of the previous chapters.
+        
+        Apply the templates, substituting placeholders according to the chapter mapping dictionary.
+        Return a tuple:
+            lines: list of strings -- the lines of the processed chapter.
+            sceneNumber: int -- number of all processed scenes.
+            wordsTotal: int -- accumulated wordcount of all processed scenes.
+            lettersTotal: int -- accumulated lettercount of all processed scenes.
+        """
+        lines = []
+        # The order counts; be aware that "Todo" and "Notes" chapters are
+        # always unused.
+        template = None
+        if self.novel.chapters[chId].chType == 2:
+            # Chapter is "Todo" type.
+            if self.novel.chapters[chId].chLevel == 1:
+                # Chapter is "Todo Part" type.
+                if self._todoPartTemplate:
+                    template = self._get_template(self._todoPartTemplate)
+            elif self._todoChapterTemplate:
+                template = self._get_template(self._todoChapterTemplate)
+        elif self.novel.chapters[chId].chType == 1:
+            # Chapter is "Notes" type.
+            if self.novel.chapters[chId].chLevel == 1:
+                # Chapter is "Notes Part" type.
+                if self._notesPartTemplate:
+                    template = self._get_template(self._notesPartTemplate)
+            elif self._notesChapterTemplate:
+                template = self._get_template(self._notesChapterTemplate)
+        elif self.novel.chapters[chId].chType == 3:
+            # Chapter is "unused" type.
+            if self._unusedChapterTemplate:
+                template = self._get_template(self._unusedChapterTemplate)
+        elif doNotExport:
+            if self._notExportedChapterTemplate:
+                template = self._get_template(self._notExportedChapterTemplate)
+        elif self.novel.chapters[chId].chLevel == 1 and self._partTemplate:
+            template = self._get_template(self._partTemplate)
+        else:
+            template = self._get_template(self._chapterTemplate)
+        if template is not None:
+            lines.append(template.safe_substitute(self._get_chapterMapping(chId, chapterNumber)))
+
+        #--- Process scenes.
+        sceneLines, sceneNumber, wordsTotal, lettersTotal = self._get_scenes(
+            chId, sceneNumber, wordsTotal, lettersTotal, doNotExport)
+        lines.extend(sceneLines)
+
+        #--- Process chapter ending.
+        template = None
+        if self.novel.chapters[chId].chType == 2:
+            if self._todoChapterEndTemplate:
+                template = self._get_template(self._todoChapterEndTemplate)
+        elif self.novel.chapters[chId].chType == 1:
+            if self._notesChapterEndTemplate:
+                template = self._get_template(self._notesChapterEndTemplate)
+        elif self.novel.chapters[chId].chType == 3:
+            if self._unusedChapterEndTemplate:
+                template = self._get_template(self._unusedChapterEndTemplate)
+        elif doNotExport:
+            if self._notExportedChapterEndTemplate:
+                template = self._get_template(self._notExportedChapterEndTemplate)
+        elif self._chapterEndTemplate:
+            template = self._get_template(self._chapterEndTemplate)
+        if template is not None:
+            lines.append(template.safe_substitute(self._get_chapterMapping(chId, chapterNumber)))
+        return lines, sceneNumber, wordsTotal, lettersTotal
 
     def _get_characterMapping(self, crId):
         """Return a mapping dictionary for a character section.
@@ -264,19 +404,19 @@ class FileExport(File):
         else:
             characterStatus = Character.MINOR_MARKER
 
-        characterMapping = dict(
+        characterMapping = LazyMapping(
             ID=crId,
-            Title=self._convert_from_yw(self.novel.characters[crId].title, True),
-            Desc=self._convert_from_yw(self.novel.characters[crId].desc),
-            Tags=self._convert_from_yw(tags),
+            Title=Deferred(self._convert_from_yw, self.novel.characters[crId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.characters[crId].desc),
+            Tags=Deferred(self._convert_from_yw, tags),
             Image=self.novel.characters[crId].image,
-            AKA=self._convert_from_yw(self.novel.characters[crId].aka, True),
-            Notes=self._convert_from_yw(self.novel.characters[crId].notes),
-            Bio=self._convert_from_yw(self.novel.characters[crId].bio),
-            Goals=self._convert_from_yw(self.novel.characters[crId].goals),
-            FullName=self._convert_from_yw(self.novel.characters[crId].fullName, True),
+            AKA=Deferred(self._convert_from_yw, self.novel.characters[crId].aka, True),
+            Notes=Deferred(self._convert_from_yw, self.novel.characters[crId].notes),
+            Bio=Deferred(self._convert_from_yw, self.novel.characters[crId].bio),
+            Goals=Deferred(self._convert_from_yw, self.novel.characters[crId].goals),
+            FullName=Deferred(self._convert_from_yw, self.novel.characters[crId].fullName, True),
             Status=characterStatus,
-            ProjectName=self._convert_from_yw(self.projectName),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName),
             ProjectPath=self.projectPath,
         )
         return characterMapping
@@ -294,7 +434,7 @@ class FileExport(File):
             lines = [self._characterSectionHeading]
         else:
             lines = []
-        template = Template(self._characterTemplate)
+        template = self._get_template(self._characterTemplate)
         for crId in self.novel.srtCharacters:
             if self._characterFilter.accept(self, crId):
                 lines.append(template.safe_substitute(self._get_characterMapping(crId)))
@@ -310,10 +450,30 @@ class FileExport(File):
         This is a template method that can be extended or overridden by subclasses.
         """
         lines = []
-        template = Template(self._fileHeader)
+        template = self._get_template(self._fileHeader)
         lines.append(template.safe_substitute(self._get_fileHeaderMapping()))
         return lines
 
+    def _get_template(self, template):
+        """Return a compiled template.
+        
+        Positional arguments:
+            template: str -- template text.
+        
+        Each template text is compiled only once per exporter instance.
+        While the chapter starts are collected, return a template substituting nothing.
+        """
+        if self._countingOnly:
+            return _NULL_TEMPLATE
+
+        try:
+            return self._templates[template]
+
+        except KeyError:
+            compiledTemplate = CompiledTemplate(template)
+            self._templates[template] = compiledTemplate
+            return compiledTemplate
+
     def _get_itemMapping(self, itId):
         """Return a mapping dictionary for an item section.
         
@@ -327,14 +487,14 @@ class FileExport(File):
         else:
             tags = ''
 
-        itemMapping = dict(
+        itemMapping = LazyMapping(
             ID=itId,
-            Title=self._convert_from_yw(self.novel.items[itId].title, True),
-            Desc=self._convert_from_yw(self.novel.items[itId].desc),
-            Tags=self._convert_from_yw(tags, True),
+            Title=Deferred(self._convert_from_yw, self.novel.items[itId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.items[itId].desc),
+            Tags=Deferred(self._convert_from_yw, tags, True),
             Image=self.novel.items[itId].image,
-            AKA=self._convert_from_yw(self.novel.items[itId].aka, True),
-            ProjectName=self._convert_from_yw(self.projectName, True),
+            AKA=Deferred(self._convert_from_yw, self.novel.items[itId].aka, True),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName, True),
             ProjectPath=self.projectPath,
         )
         return itemMapping
@@ -352,7 +512,7 @@ class FileExport(File):
             lines = [self._itemSectionHeading]
         else:
             lines = []
-        template = Template(self._itemTemplate)
+        template = self._get_template(self._itemTemplate)
         for itId in self.novel.srtItems:
             if self._itemFilter.accept(self, itId):
                 lines.append(template.safe_substitute(self._get_itemMapping(itId)))
@@ -371,14 +531,14 @@ class FileExport(File):
         else:
             tags = ''
 
-        locationMapping = dict(
+        locationMapping = LazyMapping(
             ID=lcId,
-            Title=self._convert_from_yw(self.novel.locations[lcId].title, True),
-            Desc=self._convert_from_yw(self.novel.locations[lcId].desc),
-            Tags=self._convert_from_yw(tags, True),
+            Title=Deferred(self._convert_from_yw, self.novel.locations[lcId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.locations[lcId].desc),
+            Tags=Deferred(self._convert_from_yw, tags, True),
             Image=self.novel.locations[lcId].image,
-            AKA=self._convert_from_yw(self.novel.locations[lcId].aka, True),
-            ProjectName=self._convert_from_yw(self.projectName, True),
+            AKA=Deferred(self._convert_from_yw, self.novel.locations[lcId].aka, True),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName, True),
             ProjectPath=self.projectPath,
         )
         return locationMapping
@@ -396,7 +556,7 @@ class FileExport(File):
             lines = [self._locationSectionHeading]
         else:
             lines = []
-        template = Template(self._locationTemplate)
+        template = self._get_template(self._locationTemplate)
         for lcId in self.novel.srtLocations:
             if self._locationFilter.accept(self, lcId):
                 lines.append(template.safe_substitute(self._get_locationMapping(lcId)))
@@ -422,36 +582,39 @@ class FileExport(File):
         else:
             tags = ''
 
-        #--- Create a comma separated character list.
-        try:
-            # Note: Due to a bug, yWriter scenes might hold invalid
-            # viepoint characters
-            sChList = []
-            for crId in self.novel.scenes[scId].characters:
-                sChList.append(self.novel.characters[crId].title)
-            sceneChars = list_to_string(sChList, divider=self._DIVIDER)
-            viewpointChar = sChList[0]
-        except:
-            sceneChars = ''
-            viewpointChar = ''
-
-        #--- Create a comma separated location list.
-        if self.novel.scenes[scId].locations is not None:
-            sLcList = []
-            for lcId in self.novel.scenes[scId].locations:
-                sLcList.append(self.novel.locations[lcId].title)
-            sceneLocs = list_to_string(sLcList, divider=self._DIVIDER)
-        else:
-            sceneLocs = ''
-
-        #--- Create a comma separated item list.
-        if self.novel.scenes[scId].items is not None:
-            sItList = []
-            for itId in self.novel.scenes[scId].items:
-                sItList.append(self.novel.items[itId].title)
-            sceneItems = list_to_string(sItList, divider=self._DIVIDER)
-        else:
-            sceneItems = ''
+        #--- Create comma separated character, location, and item lists on demand.
+        def get_characters():
+            """Return a tuple: (comma separated character list, viewpoint character)."""
+            try:
+                # Note: Due to a bug, yWriter scenes might hold invalid
+                # viepoint characters
+                sChList = []
+                for crId in self.novel.scenes[scId].characters:
+                    sChList.append(self.novel.characters[crId].title)
+                return list_to_string(sChList, divider=self._DIVIDER), sChList[0]
+
+            except:
+                return '', ''
+
+        def get_locations():
+            """Return a comma separated location list."""
+            if self.novel.scenes[scId].locations is not None:
+                sLcList = []
+                for lcId in self.novel.scenes[scId].locations:
+                    sLcList.append(self.novel.locations[lcId].title)
+                return list_to_string(sLcList, divider=self._DIVIDER)
+
+            return ''
+
+        def get_items():
+            """Return a comma separated item list."""
+            if self.novel.scenes[scId].items is not None:
+                sItList = []
+                for itId in self.novel.scenes[scId].items:
+                    sItList.append(self.novel.items[itId].title)
+                return list_to_string(sItList, divider=self._DIVIDER)
+
+            return ''
 
         #--- Create A/R marker string.
         if self.novel.scenes[scId].isReactionScene:
@@ -501,21 +664,21 @@ class FileExport(File):
             minutes = ''
         duration = f'{days}{hours}{minutes}'
 
-        sceneMapping = dict(
+        sceneMapping = LazyMapping(
             ID=scId,
             SceneNumber=sceneNumber,
-            Title=self._convert_from_yw(self.novel.scenes[scId].title, True),
-            Desc=self._convert_from_yw(self.novel.scenes[scId].desc),
+            Title=Deferred(self._convert_from_yw, self.novel.scenes[scId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.scenes[scId].desc),
             WordCount=str(self.novel.scenes[scId].wordCount),
             WordsTotal=wordsTotal,
             LetterCount=str(self.novel.scenes[scId].letterCount),
             LettersTotal=lettersTotal,
             Status=Scene.STATUS[self.novel.scenes[scId].status],
-            SceneContent=self._convert_from_yw(self.novel.scenes[scId].sceneContent),
-            FieldTitle1=self._convert_from_yw(self.novel.fieldTitle1, True),
-            FieldTitle2=self._convert_from_yw(self.novel.fieldTitle2, True),
-            FieldTitle3=self._convert_from_yw(self.novel.fieldTitle3, True),
-            FieldTitle4=self._convert_from_yw(self.novel.fieldTitle4, True),
+            SceneContent=Deferred(self._convert_from_yw, self.novel.scenes[scId].sceneContent),
+            FieldTitle1=Deferred(self._convert_from_yw, self.novel.fieldTitle1, True),
+            FieldTitle2=Deferred(self._convert_from_yw, self.novel.fieldTitle2, True),
+            FieldTitle3=Deferred(self._convert_from_yw, self.novel.fieldTitle3, True),
+            FieldTitle4=Deferred(self._convert_from_yw, self.novel.fieldTitle4, True),
             Field1=self.novel.scenes[scId].field1,
             Field2=self.novel.scenes[scId].field2,
             Field3=self.novel.scenes[scId].field3,
@@ -529,17 +692,17 @@ class FileExport(File):
             LastsMinutes=lastsMinutes,
             Duration=duration,
             ReactionScene=reactionScene,
-            Goal=self._convert_from_yw(self.novel.scenes[scId].goal),
-            Conflict=self._convert_from_yw(self.novel.scenes[scId].conflict),
-            Outcome=self._convert_from_yw(self.novel.scenes[scId].outcome),
-            Tags=self._convert_from_yw(tags, True),
+            Goal=Deferred(self._convert_from_yw, self.novel.scenes[scId].goal),
+            Conflict=Deferred(self._convert_from_yw, self.novel.scenes[scId].conflict),
+            Outcome=Deferred(self._convert_from_yw, self.novel.scenes[scId].outcome),
+            Tags=Deferred(self._convert_from_yw, tags, True),
             Image=self.novel.scenes[scId].image,
-            Characters=sceneChars,
-            Viewpoint=viewpointChar,
-            Locations=sceneLocs,
-            Items=sceneItems,
-            Notes=self._convert_from_yw(self.novel.scenes[scId].notes),
-            ProjectName=self._convert_from_yw(self.projectName, True),
+            Characters=Deferred(lambda: get_characters()[0]),
+            Viewpoint=Deferred(lambda: get_characters()[1]),
+            Locations=Deferred(get_locations),
+            Items=Deferred(get_items),
+            Notes=Deferred(self._convert_from_yw, self.novel.scenes[scId].notes),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName, True),
             ProjectPath=self.projectPath,
             Language=self.novel.languageCode,
             Country=self.novel.countryCode,
@@ -558,7 +721,8 @@ class FileExport(File):
         
         Iterate through a sorted scene list and apply the templates, 
         substituting placeholders according to the scene mapping dictionary.
-        Skip scenes not accepted by the scene filter.
+        Skip scenes not accepted by the scene filter; if the filter rejects
+        all scenes of the chapter, skip the chapter's scenes as a whole.
         
         Return a tuple:
             lines: list of strings -- the lines of the processed scene.
@@ -569,6 +733,9 @@ class FileExport(File):
         This is a template method that can be extended or overridden by subclasses.
         """
         lines = []
+        if not self._sceneFilter.accept_chapter_scenes(self, chId):
+            return lines, sceneNumber, wordsTotal, lettersTotal
+
         firstSceneInChapter = True
         for scId in self.novel.chapters[chId].srtScenes:
             dispNumber = 0
@@ -583,26 +750,26 @@ class FileExport(File):
             # always unused.
             if self.novel.scenes[scId].scType == 2:
                 if self._todoSceneTemplate:
-                    template = Template(self._todoSceneTemplate)
+                    template = self._get_template(self._todoSceneTemplate)
                 else:
                     continue
 
             elif self.novel.scenes[scId].scType == 1:
                 # Scene is "Notes" type.
                 if self._notesSceneTemplate:
-                    template = Template(self._notesSceneTemplate)
+                    template = self._get_template(self._notesSceneTemplate)
                 else:
                     continue
 
             elif self.novel.scenes[scId].scType == 3 or self.novel.chapters[chId].chType == 3:
                 if self._unusedSceneTemplate:
-                    template = Template(self._unusedSceneTemplate)
+                    template = self._get_template(self._unusedSceneTemplate)
                 else:
                     continue
 
             elif self.novel.scenes[scId].doNotExport or doNotExport:
                 if self._notExportedSceneTemplate:
-                    template = Template(self._notExportedSceneTemplate)
+                    template = self._get_template(self._notExportedSceneTemplate)
                 else:
                     continue
 
@@ -617,13 +784,13 @@ class FileExport(File):
                 dispNumber = sceneNumber
                 wordsTotal += self.novel.scenes[scId].wordCount
                 lettersTotal += self.novel.scenes[scId].letterCount
-                template = Template(self._sceneTemplate)
+                template = self._get_template(self._sceneTemplate)
                 if not firstSceneInChapter and self.novel.scenes[scId].appendToPrev and self._appendedSceneTemplate:
-                    template = Template(self._appendedSceneTemplate)
+                    template = self._get_template(self._appendedSceneTemplate)
             if not (firstSceneInChapter or self.novel.scenes[scId].appendToPrev):
                 lines.append(self._sceneDivider)
             if firstSceneInChapter and self._firstSceneTemplate:
-                template = Template(self._firstSceneTemplate)
+                template = self._get_template(self._firstSceneTemplate)
             lines.append(template.safe_substitute(self._get_sceneMapping(
                         scId, dispNumber, wordsTotal, lettersTotal)))
             firstSceneInChapter = False
@@ -637,11 +804,11 @@ class FileExport(File):
         
         This is a template method that can be extended or overridden by subclasses.
         """
-        itemMapping = dict(
+        itemMapping = LazyMapping(
             ID=pnId,
-            Title=self._convert_from_yw(self.novel.projectNotes[pnId].title, True),
-            Desc=self._convert_from_yw(self.novel.projectNotes[pnId].desc, True),
-            ProjectName=self._convert_from_yw(self.projectName, True),
+            Title=Deferred(self._convert_from_yw, self.novel.projectNotes[pnId].title, True),
+            Desc=Deferred(self._convert_from_yw, self.novel.projectNotes[pnId].desc, True),
+            ProjectName=Deferred(self._convert_from_yw, self.projectName, True),
             ProjectPath=self.projectPath,
         )
         return itemMapping
@@ -656,7 +823,7 @@ class FileExport(File):
         This is a template method that can be extended or overridden by subclasses.
         """
         lines = []
-        template = Template(self._projectNoteTemplate)
+        template = self._get_template(self._projectNoteTemplate)
         for pnId in self.novel.srtPrjNotes:
             map = self._get_prjNoteMapping(pnId)
             lines.append(template.safe_substitute(map))
@@ -677,6 +844,13 @@ class FileExport(File):
         lines.append(self._fileFooter)
         return ''.join(lines)
 
+    def _remove_file(self, filePath):
+        """Remove a file, if possible."""
+        try:
+            os.remove(filePath)
+        except OSError:
+            pass
+
     def _remove_inline_code(self, text):
         """Remove inline raw code from text and return the result."""
         if text:
@@ -687,3 +861,27 @@ class FileExport(File):
         else:
             text = ''
         return text
+
+
+class _NullTemplate:
+    """Template substituting nothing, for processing scenes without rendering them."""
+
+    def safe_substitute(self, mapping):
+        return ''
+
+
+_NULL_TEMPLATE = _NullTemplate()
+
+_workerExporter = None
+# FileExport instance of a chapter rendering worker process
+
+
+def _init_worker(exporter):
+    """Keep the exporter passed to a chapter rendering worker process."""
+    global _workerExporter
+    _workerExporter = exporter
+
+
+def _render_chapter(chapterStart):
+    """Return a chapter rendered by the worker process's exporter."""
+    return ''.join(_workerExporter._get_chapter(*chapterStart)[0])
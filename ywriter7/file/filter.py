@@ -12,12 +12,25 @@ class Filter:
     """Filter an entity (chapter/scene/character/location/item) by filter criteria.
     
     Public methods:
+        compile(source) -- prepare the filter for an export.
         accept(source, eId) -- check whether an entity matches the filter criteria.
+        accept_chapter_scenes(source, chId) -- check whether any scene of a chapter may match the filter criteria.
     
     Strategy class, implementing filtering criteria for template-based export.
     This is a stub with no filter criteria specified.
     """
 
+    def compile(self, source):
+        """Prepare the filter for an export.
+        
+        Positional arguments:
+            source -- FileExport instance to be written.
+        
+        Called once at the beginning of each export, before any entity is checked.
+        This is a stub to be overridden by subclass methods precomputing the filter results.
+        """
+        pass
+
     def accept(self, source, eId):
         """Check whether an entity matches the filter criteria.
         
@@ -29,3 +42,16 @@ class Filter:
         This is a stub to be overridden by subclass methods implementing filters.
         """
         return True
+
+    def accept_chapter_scenes(self, source, chId):
+        """Check whether any scene of a chapter may match the filter criteria.
+        
+        Positional arguments:
+            source -- FileExport instance holding the chapter to check.
+            chId -- ID of the chapter to check.       
+        
+        Return False if all scenes of the chapter are to be filtered out.
+        This lets the exporter skip the chapter's scenes without checking each of them.
+        This is a stub to be overridden by subclass methods implementing scene filters.
+        """
+        return True
@@ -4,11 +4,15 @@ Modules:
 
 novel -- Provide a generic class for yWriter project representation.
 basic_element -- Provide a generic class for yWriter element representation.
+change_tracking -- Provide classes for tracking the changes of a novel's elements.
 chapter -- Provide a class for yWriter chapter representation.
 scene -- Provide a class for yWriter scene representation.
 world_element -- Provide a generic class for yWriter story world element representation.
 character -- Provide a class for yWriter character representation.
 cross_references -- Provide a class for yWriter cross reference generation.
+scene_table -- Provide a class for a columnar view of a novel's scene metadata.
+scene_index -- Provide a class for secondary indexes over a novel's scenes.
+scene_query -- Provide composable predicates for querying a novel's scenes.
 splitter -- Provide a helper class for scene and chapter splitting.
 id_generator -- Helper module for ID generation.
 
@@ -4,19 +4,49 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+from itertools import count
+
+CHANGE_COUNTER = count(1)
+# Source of change stamps, increasing over all elements.
 
 
 class BasicElement:
     """Basic element representation (may be a project note).
     
+    Public methods:
+        touch() -- Mark the element as changed.
+        get_state() -- Return a dictionary with the instance variables.
+        set_state(state) -- Set instance variables from a dictionary, without a change stamp.
+    
     Public instance variables:
         title: str -- title (name).
         desc: str -- description.
         kwVar: dict -- custom keyword variables.
+        changeStamp: int -- stamp of the last change (read-only property).
+        
+    Setting a public instance variable gets a new change stamp from CHANGE_COUNTER,
+    so writers can tell which elements have changed since a stamp they have taken.
+    Lists assigned to public instance variables are kept as ElementList copies, 
+    so changing them in place gets a change stamp as well. 
+    Changing a dictionary in place does not; call touch() in this case,
+    or assign the changed value.
+    
+    The changes of an element stored in an ElementCollection, e.g. the scenes 
+    of a novel, are reported to the collection; see the change_tracking module.
+    
+    The instance variables are slots, so elements have no instance dictionary.
+    Subclasses declare their instance variables in __slots__; use get_state() instead of vars().
     """
+    __slots__ = ('title', 'desc', 'kwVar', '_changeStamp', '_owner')
+
+    _slotNames = {}
+    # key: class, value: tuple of the slot names of the class and its superclasses
 
     def __init__(self):
         """Initialize instance variables."""
+        self._owner = None
+        # (ElementCollection instance, key) the changes are reported to
+
         self.title = None
         # xml: <Title>
 
@@ -25,3 +55,170 @@ class BasicElement:
 
         self.kwVar = {}
         # Optional key/value instance variables for customization.
+
+    def __setattr__(self, name, value):
+        """Set an instance variable; get a change stamp, if it is public.
+        
+        Extends the superclass method.
+        The stamp is set via the slot descriptor directly, because this is called very often.
+        """
+        if name[0] == '_':
+            object.__setattr__(self, name, value)
+            return
+
+        if value.__class__ is list or value.__class__ is ElementList and value._element is not self:
+            value = _new_element_list(self, value)
+        object.__setattr__(self, name, value)
+        _set_change_stamp(self, next(CHANGE_COUNTER))
+        try:
+            owner = self._owner
+        except AttributeError:
+            return
+
+        if owner is not None:
+            owner[0].mark_changed(owner[1])
+
+    def __getstate__(self):
+        """Return the instance variables to be pickled or copied."""
+        return self.get_state()
+
+    def __setstate__(self, state):
+        """Restore the instance variables of an unpickled or copied instance."""
+        self.set_state(state)
+
+    @property
+    def changeStamp(self):
+        return getattr(self, '_changeStamp', 0)
+
+    def touch(self):
+        """Mark the element as changed."""
+        _set_change_stamp(self, next(CHANGE_COUNTER))
+        try:
+            owner = self._owner
+        except AttributeError:
+            # Not initialized yet, or unpickled.
+            return
+
+        if owner is not None:
+            owner[0].mark_changed(owner[1])
+
+    def get_state(self):
+        """Return a dictionary with the instance variables, including the private ones.
+        
+        Slots not set are omitted, and so is the collection the changes are reported to.
+        Instance variables of subclasses without __slots__ are included as well.
+        """
+        state = {}
+        for name in self._get_slot_names():
+            if name == '_owner':
+                continue
+
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def set_state(self, state):
+        """Set instance variables from a dictionary, as returned by get_state().
+        
+        Positional arguments:
+            state: dict -- key: instance variable name, value: instance variable value.
+            
+        Like updating the instance dictionary, this gets no change stamp.
+        Lists are kept as ElementList copies, like with setting the instance variables.
+        """
+        for name, value in state.items():
+            if name[0] != '_' and value.__class__ is list:
+                value = _new_element_list(self, value)
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def _get_slot_names(cls):
+        """Return a tuple with the slot names of the class and its superclasses."""
+        try:
+            return BasicElement._slotNames[cls]
+
+        except KeyError:
+            names = []
+            for klass in reversed(cls.__mro__):
+                for name in klass.__dict__.get('__slots__', ()):
+                    if name not in ('__dict__', '__weakref__'):
+                        names.append(name)
+            BasicElement._slotNames[cls] = tuple(names)
+            return BasicElement._slotNames[cls]
+
+
+_set_change_stamp = BasicElement._changeStamp.__set__
+# Slot descriptor setter of the change stamp.
+
+
+class ElementList(list):
+    """List held by a model element; changing it in place marks the element as changed.
+    
+    Copies and pickles are plain lists.
+    The methods are written out, because the readers fill the lists item by item.
+    """
+    __slots__ = ('_element',)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def __setitem__(self, index, value):
+        list.__setitem__(self, index, value)
+        self._element.touch()
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        self._element.touch()
+
+    def __iadd__(self, other):
+        list.extend(self, other)
+        self._element.touch()
+        return self
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._element.touch()
+        return self
+
+    def append(self, item):
+        list.append(self, item)
+        self._element.touch()
+
+    def extend(self, iterable):
+        list.extend(self, iterable)
+        self._element.touch()
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self._element.touch()
+
+    def pop(self, index=-1):
+        item = list.pop(self, index)
+        self._element.touch()
+        return item
+
+    def remove(self, item):
+        list.remove(self, item)
+        self._element.touch()
+
+    def clear(self):
+        list.clear(self)
+        self._element.touch()
+
+    def reverse(self):
+        list.reverse(self)
+        self._element.touch()
+
+    def sort(self, *, key=None, reverse=False):
+        list.sort(self, key=key, reverse=reverse)
+        self._element.touch()
+
+
+def _new_element_list(element, items):
+    """Return an ElementList copy of items, held by element."""
+    elementList = ElementList(items)
+    elementList._element = element
+    return elementList
@@ -0,0 +1,183 @@
+"""Provide classes for tracking the changes of a novel's elements.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import weakref
+
+
+class ElementCollection(dict):
+    """Dictionary of model elements, collecting the keys of changed elements for its observers.
+
+    Public methods:
+        observe() -- Return a set collecting the keys of the elements changed from now on.
+        mark_changed(key) -- Add a key to the observers' sets.
+
+    An element stored in the collection reports changes of its public instance variables
+    to the collection, including changes of its lists in place. Storing or deleting
+    an element is a change as well. An element stored in several collections reports
+    its changes to the last one only.
+    Copies and pickles have no observers.
+    """
+    __slots__ = ('_changeSets',)
+
+    def __init__(self, *args, **kwargs):
+        """Store the elements given like for a dict.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self._changeSets = []
+        # Weak references to the sets returned by observe()
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        return (self.__class__, (dict(self),))
+
+    def __setitem__(self, key, element):
+        oldElement = self.get(key)
+        super().__setitem__(key, element)
+        if oldElement is not None and oldElement is not element:
+            self._unlink(oldElement)
+        try:
+            object.__setattr__(element, '_owner', (self, key))
+        except (AttributeError, TypeError):
+            # Not a BasicElement instance.
+            pass
+        self.mark_changed(key)
+
+    def __delitem__(self, key):
+        element = self[key]
+        super().__delitem__(key)
+        self._unlink(element)
+        self.mark_changed(key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *default):
+        if not key in self:
+            return super().pop(key, *default)
+
+        element = self[key]
+        del self[key]
+        return element
+
+    def popitem(self):
+        key, element = super().popitem()
+        self._unlink(element)
+        self.mark_changed(key)
+        return key, element
+
+    def clear(self):
+        for key, element in self.items():
+            self._unlink(element)
+            self.mark_changed(key)
+        super().clear()
+
+    def update(self, *args, **kwargs):
+        for key, element in dict(*args, **kwargs).items():
+            self[key] = element
+
+    def setdefault(self, key, default=None):
+        if not key in self:
+            self[key] = default
+        return self[key]
+
+    def observe(self):
+        """Return a set collecting the keys of the elements changed from now on.
+
+        The observer may clear the set after processing the keys.
+        The set is filled as long as the observer keeps it.
+        """
+        changeSet = set()
+        self._changeSets = [ref for ref in self._changeSets if ref() is not None]
+        self._changeSets.append(weakref.ref(changeSet))
+        return changeSet
+
+    def mark_changed(self, key):
+        """Add a key to the observers' sets.
+
+        Positional arguments:
+            key: str -- ID of a changed, added, or deleted element.
+        """
+        for ref in self._changeSets:
+            changeSet = ref()
+            if changeSet is not None:
+                changeSet.add(key)
+
+    def _unlink(self, element):
+        """Stop an element removed from the collection reporting its changes."""
+        owner = getattr(element, '_owner', None)
+        if owner is not None and owner[0] is self:
+            object.__setattr__(element, '_owner', None)
+
+
+class ChangeObserver:
+    """Collect the IDs of a novel's elements changed since the last check.
+
+    Public methods:
+        reset() -- Start observing anew.
+        get_changes() -- Return the changes since the last call.
+
+    Public instance variables:
+        novel -- Novel instance observed.
+
+    This is for views of the novel, e.g. indexes, kept in sync with the elements:
+    after processing the changes, a view is up to date, without scanning all elements.
+    """
+
+    def __init__(self, novel, collections):
+        """Start observing the novel's element collections.
+
+        Positional arguments:
+            novel -- Novel instance to observe.
+            collections -- iterable of Novel attribute names, e.g. ('chapters', 'scenes').
+        """
+        self.novel = novel
+        self._names = tuple(collections)
+        self._collections = {}
+        # key: Novel attribute name, value: ElementCollection instance observed
+        self._changeSets = {}
+        # key: Novel attribute name, value: set of the keys of changed elements
+        self._novelStamp = None
+        # Change stamp of the novel at the last check
+        self.reset()
+
+    def reset(self):
+        """Start observing anew, e.g. after rebuilding a view of the novel.
+
+        Discard the changes collected so far.
+        """
+        for name in self._names:
+            collection = getattr(self.novel, name)
+            self._collections[name] = collection
+            self._changeSets[name] = collection.observe()
+        self._novelStamp = self.novel.changeStamp
+
+    def get_changes(self):
+        """Return the changes since the last call.
+
+        Return a tuple: (novelChanged, changes)
+            novelChanged: bool -- True, if the novel's own instance variables have changed,
+                                  e.g. the list of its chapters.
+            changes: dict -- key: Novel attribute name, value: set of the keys
+                             of the changed, added, or deleted elements.
+        Return None, if an element collection has been replaced.
+        In this case, observing starts anew.
+        """
+        for name, collection in self._collections.items():
+            if getattr(self.novel, name) is not collection:
+                self.reset()
+                return None
+
+        novelStamp = self.novel.changeStamp
+        novelChanged = novelStamp != self._novelStamp
+        self._novelStamp = novelStamp
+        changes = {}
+        for name, changeSet in self._changeSets.items():
+            changes[name] = set(changeSet)
+            changeSet.clear()
+        return novelChanged, changes
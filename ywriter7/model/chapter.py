@@ -18,6 +18,7 @@ class Chapter(BasicElement):
         suppressChapterBreak: bool -- Suppress chapter break when exporting.
         srtScenes: list of str -- the chapter's sorted scene IDs.        
     """
+    __slots__ = ('chLevel', 'chType', 'suppressChapterTitle', 'isTrash', 'suppressChapterBreak', 'srtScenes')
 
     def __init__(self):
         """Initialize instance variables.
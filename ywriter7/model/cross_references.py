@@ -4,6 +4,8 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+from ..pywriter_globals import *
+from .change_tracking import ChangeObserver
 
 
 class CrossReferences:
@@ -12,7 +14,17 @@ class CrossReferences:
     Public methods:
         generate_xref(novel) -- Generate cross references for a novel.
 
-    Public instance variables:
+    After generate_xref(), the instance observes the novel's element collections.
+    Before the cross references are read, the changes collected since are applied, 
+    updating only the affected cross references:
+    - a changed scene is re-referenced; 
+    - a changed chapter is re-referenced with its scenes;
+    - a changed character, location, or item is re-referenced with its tags.
+    Changes of the elements' lists in place are collected as well, see the change_tracking module.
+    If chapters have been reordered without a change of them being collected, 
+    e.g. notified, the cross references are generated anew.
+
+    Public instance variables (read-only properties):
         scnPerChr -- scenes per character.
         scnPerLoc -- scenes per location.
         scnPerItm -- scenes per item.
@@ -29,40 +41,117 @@ class CrossReferences:
 
         # Cross reference dictionaries:
 
-        self.scnPerChr = {}
+        self._scnPerChr = {}
         # key = character ID, value: list of scene IDs
         # Scenes per character
 
-        self.scnPerLoc = {}
+        self._scnPerLoc = {}
         # key = location ID, value: list of scene IDs
         # Scenes per location
 
-        self.scnPerItm = {}
+        self._scnPerItm = {}
         # key = item ID, value: list of scene IDs
         # Scenes per item
 
-        self.scnPerTag = {}
+        self._scnPerTag = {}
         # key = tag, value: list of scene IDs
         # Scenes per tag
 
-        self.chrPerTag = {}
+        self._chrPerTag = {}
         # key = tag, value: list of character IDs
         # Characters per tag
 
-        self.locPerTag = {}
+        self._locPerTag = {}
         # key = tag, value: list of location IDs
         # Locations per tag
 
-        self.itmPerTag = {}
+        self._itmPerTag = {}
         # key = tag, value: list of item IDs
         # Items per tag
 
-        self.chpPerScn = {}
+        self._chpPerScn = {}
         # key = scene ID, value: chapter ID
         # Chapter to which the scene belongs
 
-        self.srtScenes = None
-        # Scene IDs in the overall order
+        self._novel = None
+        # Novel instance the cross references are generated for
+
+        self._observer = None
+        # ChangeObserver instance collecting the changes of the novel's elements
+
+        self._srtElements = {}
+        # key = element type prefix, value: the novel's sorted element IDs as cross-referenced
+
+        self._srtChapters = None
+        # The novel's chapter IDs in the order as cross-referenced
+
+        self._chpPositions = {}
+        # key = chapter ID, value: index in _srtChapters
+
+        self._chpScenes = {}
+        # key = chapter ID, value: the chapter's scene IDs as cross-referenced
+
+        self._scnIndexes = {}
+        # key = scene ID, value: index in the chapter's scene IDs
+
+        self._srtScenes = None
+        # Scene IDs in the overall order; None, if to be collected on access
+
+        self._scnRefs = {}
+        # key = scene ID, value: (characters, locations, items, tags) as cross-referenced
+
+        self._elemTags = {}
+        # key = (element type prefix, element ID), value: tags as cross-referenced
+
+    @property
+    def scnPerChr(self):
+        self._sync()
+        return self._scnPerChr
+
+    @property
+    def scnPerLoc(self):
+        self._sync()
+        return self._scnPerLoc
+
+    @property
+    def scnPerItm(self):
+        self._sync()
+        return self._scnPerItm
+
+    @property
+    def scnPerTag(self):
+        self._sync()
+        return self._scnPerTag
+
+    @property
+    def chrPerTag(self):
+        self._sync()
+        return self._chrPerTag
+
+    @property
+    def locPerTag(self):
+        self._sync()
+        return self._locPerTag
+
+    @property
+    def itmPerTag(self):
+        self._sync()
+        return self._itmPerTag
+
+    @property
+    def chpPerScn(self):
+        self._sync()
+        return self._chpPerScn
+
+    @property
+    def srtScenes(self):
+        """The novel's sorted scene IDs; None, if no cross references are generated."""
+        self._sync()
+        if self._srtScenes is None and self._srtChapters is not None:
+            self._srtScenes = [scId for chId in self._srtChapters for scId in self._chpScenes.get(chId, ())
+                               if self._chpPerScn.get(scId) == chId]
+            # A scene listed in two chapters belongs to the chapter it has been assigned to last.
+        return self._srtScenes
 
     def generate_xref(self, novel):
         """Generate cross references for a novel.
@@ -70,68 +159,281 @@ class CrossReferences:
         Positional argument:
             novel -- Novel instance to process.
         """
-        self.scnPerChr = {}
-        self.scnPerLoc = {}
-        self.scnPerItm = {}
-        self.scnPerTag = {}
-        self.chrPerTag = {}
-        self.locPerTag = {}
-        self.itmPerTag = {}
-        self.chpPerScn = {}
-        self.srtScenes = []
+        self._novel = novel
+        self._observer = ChangeObserver(novel, ('chapters', 'scenes', 'characters', 'locations', 'items'))
+        self._srtElements = {
+            CHARACTER_PREFIX: list(novel.srtCharacters),
+            LOCATION_PREFIX: list(novel.srtLocations),
+            ITEM_PREFIX: list(novel.srtItems),
+            }
+        self._scnPerChr = {}
+        self._scnPerLoc = {}
+        self._scnPerItm = {}
+        self._scnPerTag = {}
+        self._chrPerTag = {}
+        self._locPerTag = {}
+        self._itmPerTag = {}
+        self._chpPerScn = {}
+        self._srtChapters = list(novel.srtChapters)
+        self._chpPositions = {chId: i for i, chId in enumerate(self._srtChapters)}
+        self._chpScenes = {}
+        self._scnIndexes = {}
+        self._srtScenes = None
+        self._scnRefs = {}
+        self._elemTags = {}
 
         #--- Characters per tag.
         for crId in novel.srtCharacters:
-            self.scnPerChr[crId] = []
-            if novel.characters[crId].tags:
-                for tag in novel.characters[crId].tags:
-                    if not tag in self.chrPerTag:
-                        self.chrPerTag[tag] = []
-                    self.chrPerTag[tag].append(crId)
+            self._scnPerChr[crId] = []
+            self._add_element(CHARACTER_PREFIX, crId, novel.characters[crId].tags, None)
 
         #--- Locations per tag.
         for lcId in novel.srtLocations:
-            self.scnPerLoc[lcId] = []
-            if novel.locations[lcId].tags:
-                for tag in novel.locations[lcId].tags:
-                    if not tag in self.locPerTag:
-                        self.locPerTag[tag] = []
-                    self.locPerTag[tag].append(lcId)
+            self._scnPerLoc[lcId] = []
+            self._add_element(LOCATION_PREFIX, lcId, novel.locations[lcId].tags, None)
 
         #--- Items per tag.
         for itId in novel.srtItems:
-            self.scnPerItm[itId] = []
-            if novel.items[itId].tags:
-                for tag in novel.items[itId].tags:
-                    if not tag in self.itmPerTag:
-                        self.itmPerTag[tag] = []
-                    self.itmPerTag[tag].append(itId)
+            self._scnPerItm[itId] = []
+            self._add_element(ITEM_PREFIX, itId, novel.items[itId].tags, None)
 
         #--- Process chapters and scenes.
         for chId in novel.srtChapters:
+            self._chpScenes[chId] = list(novel.chapters[chId].srtScenes)
+            for i, scId in enumerate(self._chpScenes[chId]):
+                self._chpPerScn[scId] = chId
+                self._scnIndexes[scId] = i
+                self._add_scene(scId, novel.scenes[scId])
+
+    def _sync(self):
+        """Apply the changes of the novel's elements collected since the last call."""
+        if self._observer is None:
+            return
+
+        observed = self._observer.get_changes()
+        if observed is None:
+            # An element collection has been replaced.
+            self.generate_xref(self._novel)
+            return
+
+        novelChanged, changes = observed
+        novel = self._novel
+        chapterChanges = changes['chapters']
+        if novelChanged and novel.srtChapters != self._srtChapters:
+            if not self._update_chapter_order(novel, chapterChanges):
+                self.generate_xref(novel)
+                return
+
+        # Remove all scenes to be re-referenced first, so the remaining scenes
+        # are in order when inserting the re-referenced ones.
+        for chId in chapterChanges:
+            self._remove_chapter(chId)
+        for scId in changes['scenes']:
+            self._remove_scene(scId)
+        scenes = set()
+        for chId in chapterChanges:
+            scenes.update(self._assign_scenes(novel, chId))
+        scenes.update(scId for scId in changes['scenes'] if scId in self._chpPerScn and scId in novel.scenes)
+        for scId in scenes:
+            self._add_scene(scId, novel.scenes[scId])
+        if chapterChanges:
+            self._srtScenes = None
+        for elemType, elemChanges, elements, srtElements, scnPerElem in (
+                (CHARACTER_PREFIX, changes['characters'], novel.characters, novel.srtCharacters, self._scnPerChr),
+                (LOCATION_PREFIX, changes['locations'], novel.locations, novel.srtLocations, self._scnPerLoc),
+                (ITEM_PREFIX, changes['items'], novel.items, novel.srtItems, self._scnPerItm),
+                ):
+            if novelChanged and srtElements != self._srtElements[elemType]:
+                self._update_element_order(elemType, elements, srtElements, scnPerElem)
+            for elemId in elemChanges:
+                self._update_element(elemType, elemId, elements, srtElements, scnPerElem)
+
+    def _update_chapter_order(self, novel, chapterChanges):
+        """Take over a changed order of the chapters.
+        
+        Positional arguments:
+            novel -- Novel instance processed.
+            chapterChanges: set -- IDs of the chapters to be re-referenced. 
+            
+        Added and removed chapters are added to the chapters to be re-referenced.
+        Return True on success.
+        Return False, if chapters not to be re-referenced have been reordered.
+        """
+        oldChapters = set(self._srtChapters)
+        newChapters = set(novel.srtChapters)
+        oldOrder = [chId for chId in self._srtChapters if chId in newChapters and not chId in chapterChanges]
+        newOrder = [chId for chId in novel.srtChapters if chId in oldChapters and not chId in chapterChanges]
+        if oldOrder != newOrder:
+            return False
+
+        chapterChanges.update(oldChapters.symmetric_difference(newChapters))
+        self._srtChapters = list(novel.srtChapters)
+        self._chpPositions = {chId: i for i, chId in enumerate(self._srtChapters)}
+        return True
+
+    def _add_scene(self, scId, scene):
+        """Add a scene to the cross references, keeping the scene order."""
+        refs = (
+            list(scene.characters or []),
+            list(scene.locations or []),
+            list(scene.items or []),
+            list(scene.tags or []),
+            )
+        self._scnRefs[scId] = refs
+        for scnPerRef, refIds in zip((self._scnPerChr, self._scnPerLoc, self._scnPerItm, self._scnPerTag), refs):
+            for refId in refIds:
+                if not refId in scnPerRef:
+                    scnPerRef[refId] = []
+                self._insert_sorted(scnPerRef[refId], scId, self._get_scene_position)
+
+    def _remove_scene(self, scId):
+        """Remove a scene from the cross references."""
+        refs = self._scnRefs.pop(scId, None)
+        if refs is None:
+            return
+
+        for scnPerRef, refIds in zip((self._scnPerChr, self._scnPerLoc, self._scnPerItm, self._scnPerTag), refs):
+            for refId in refIds:
+                self._remove_sorted(scnPerRef[refId], scId, self._get_scene_position)
+        for tag in refs[3]:
+            if not self._scnPerTag.get(tag, True):
+                del self._scnPerTag[tag]
+
+    def _remove_chapter(self, chId):
+        """Remove the scenes of a changed chapter from the cross references."""
+        for scId in self._chpScenes.pop(chId, ()):
+            if self._chpPerScn.get(scId) == chId:
+                self._remove_scene(scId)
+                del self._chpPerScn[scId]
+                del self._scnIndexes[scId]
+
+    def _assign_scenes(self, novel, chId):
+        """Assign the scenes of a changed chapter to the chapter.
+        
+        Scenes moved here from a chapter not changed are removed from the cross references.
+        Return a list with the IDs of the scenes to be cross-referenced.
+        """
+        if not (chId in self._chpPositions and chId in novel.chapters):
+            return []
+
+        srtScenes = list(novel.chapters[chId].srtScenes)
+        self._chpScenes[chId] = srtScenes
+        for i, scId in enumerate(srtScenes):
+            if scId in self._chpPerScn:
+                self._remove_scene(scId)
+            self._chpPerScn[scId] = chId
+            self._scnIndexes[scId] = i
+        return srtScenes
+
+    def _get_scene_position(self, scId):
+        """Return a tuple: (chapter position, position within the chapter) of a cross-referenced scene."""
+        return self._chpPositions.get(self._chpPerScn.get(scId), -1), self._scnIndexes.get(scId, -1)
 
-            for scId in novel.chapters[chId].srtScenes:
-                self.srtScenes.append(scId)
-                self.chpPerScn[scId] = chId
-
-                #--- Scenes per character.
-                if novel.scenes[scId].characters:
-                    for crId in novel.scenes[scId].characters:
-                        self.scnPerChr[crId].append(scId)
-
-                #--- Scenes per location.
-                if novel.scenes[scId].locations:
-                    for lcId in novel.scenes[scId].locations:
-                        self.scnPerLoc[lcId].append(scId)
-
-                #--- Scenes per item.
-                if novel.scenes[scId].items:
-                    for itId in novel.scenes[scId].items:
-                        self.scnPerItm[itId].append(scId)
-
-                #--- Scenes per tag.
-                if novel.scenes[scId].tags:
-                    for tag in novel.scenes[scId].tags:
-                        if not tag in self.scnPerTag:
-                            self.scnPerTag[tag] = []
-                        self.scnPerTag[tag].append(scId)
+    def _update_element(self, elemType, elemId, elements, srtElements, scnPerElem):
+        """Re-reference the tags of a character, location, or item."""
+        elemPerTag = self._get_elem_per_tag(elemType)
+        oldTags = self._elemTags.pop((elemType, elemId), [])
+        for tag in oldTags:
+            elemPerTag[tag].remove(elemId)
+        for tag in oldTags:
+            if not elemPerTag.get(tag, True):
+                del elemPerTag[tag]
+        if elemId in srtElements:
+            if not elemId in scnPerElem:
+                scnPerElem[elemId] = []
+            positions = {srtId: i for i, srtId in enumerate(srtElements)}
+            self._add_element(elemType, elemId, elements[elemId].tags, lambda srtId: positions.get(srtId, -1))
+        elif not scnPerElem.get(elemId, True):
+            del scnPerElem[elemId]
+
+    def _update_element_order(self, elemType, elements, srtElements, scnPerElem):
+        """Re-reference the tags of all characters, locations, or items, if their order has changed."""
+        oldElements = self._srtElements[elemType]
+        self._srtElements[elemType] = list(srtElements)
+        self._get_elem_per_tag(elemType).clear()
+        for elemId in oldElements:
+            self._elemTags.pop((elemType, elemId), None)
+            if not scnPerElem.get(elemId, True):
+                del scnPerElem[elemId]
+        for elemId in srtElements:
+            if not elemId in scnPerElem:
+                scnPerElem[elemId] = []
+            self._add_element(elemType, elemId, elements[elemId].tags, None)
+
+    def _add_element(self, elemType, elemId, tags, positions):
+        """Add a character, location, or item to the tag cross references.
+        
+        Positional arguments:
+            elemType: str -- element type prefix.
+            elemId: str -- element ID.
+            tags: list -- the element's tags.
+            positions -- function returning the index of an element ID in the sort order. 
+            
+        If positions is None, append the element ID to the tag lists. 
+        """
+        tags = list(tags or [])
+        self._elemTags[(elemType, elemId)] = tags
+        elemPerTag = self._get_elem_per_tag(elemType)
+        for tag in tags:
+            if not tag in elemPerTag:
+                elemPerTag[tag] = []
+            if positions is None:
+                elemPerTag[tag].append(elemId)
+            else:
+                self._insert_sorted(elemPerTag[tag], elemId, positions)
+
+    def _get_elem_per_tag(self, elemType):
+        """Return the cross reference dictionary of tags for the element type."""
+        return {
+            CHARACTER_PREFIX: self._chrPerTag,
+            LOCATION_PREFIX: self._locPerTag,
+            ITEM_PREFIX: self._itmPerTag,
+            }[elemType]
+
+    def _insert_sorted(self, bucket, elemId, positions):
+        """Insert an element ID into a list of element IDs, sorted by position.
+        
+        Positional arguments:
+            bucket: list -- element IDs sorted by position.
+            elemId: str -- element ID to insert.
+            positions -- function returning the position of an element ID.
+        """
+        position = positions(elemId)
+        if not bucket or positions(bucket[-1]) <= position:
+            bucket.append(elemId)
+            return
+
+        lo = 0
+        hi = len(bucket) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if positions(bucket[mid]) > position:
+                hi = mid
+            else:
+                lo = mid + 1
+        bucket.insert(lo, elemId)
+
+    def _remove_sorted(self, bucket, elemId, positions):
+        """Remove an element ID from a list of element IDs, sorted by position.
+        
+        Positional arguments:
+            bucket: list -- element IDs sorted by position.
+            elemId: str -- element ID to remove.
+            positions -- function returning the position of an element ID.
+            
+        If the element ID is not found at its position, e.g. because its chapter 
+        has been moved, the list is searched.
+        """
+        position = positions(elemId)
+        lo = 0
+        hi = len(bucket)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if positions(bucket[mid]) < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(bucket) and bucket[lo] == elemId:
+            del bucket[lo]
+        else:
+            bucket.remove(elemId)
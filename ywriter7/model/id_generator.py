@@ -4,6 +4,7 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+from heapq import heappop
 
 
 def create_id(elements):
@@ -17,3 +18,76 @@ def create_id(elements):
         i += 1
     return str(i)
 
+
+
+class IdAllocator:
+    """Allocator of unused IDs for the elements of a collection.
+
+    Public methods:
+        allocate(n) -- Return a list of n unused IDs.
+        create_id() -- Return an unused ID.
+
+    Public instance variables:
+        elements -- list or dictionary containing all existing IDs.
+
+    The allocator returns the same IDs as repeated create_id() calls would, if
+    each allocated ID is added to the elements before the next allocation. 
+    Changes made to the elements without the allocator, e.g. deletions or re-reading,
+    are detected by the number of elements, and the allocator is resynchronized. 
+    Each ID is checked against the elements before it is returned, so an 
+    undetected change can never produce an ID already in use.
+    """
+
+    def __init__(self, elements):
+        """Initialize instance variables.
+        
+        Positional arguments:
+            elements -- list or dictionary containing all existing IDs
+        """
+        self.elements = elements
+        self._free = []
+        # Heap of the unused numbers below self._next
+        self._next = 1
+        # Lowest number above all numbers in use
+        self._size = None
+        # Expected number of elements; None means "synchronize"
+
+    def create_id(self):
+        """Return an unused ID for a new element."""
+        return self.allocate(1)[0]
+
+    def allocate(self, n):
+        """Return a list of n unused IDs for new elements, in ascending order.
+        
+        Positional arguments:
+            n: int -- number of IDs.
+        """
+        if len(self.elements) != self._size:
+            self._synchronize()
+        ids = []
+        while len(ids) < n:
+            if self._free:
+                i = heappop(self._free)
+            else:
+                i = self._next
+                self._next += 1
+            elemId = str(i)
+            if not elemId in self.elements:
+                ids.append(elemId)
+        self._size = len(self.elements) + n
+        return ids
+
+    def _synchronize(self):
+        """Determine the unused numbers from the existing IDs."""
+        used = set()
+        for elemId in self.elements:
+            try:
+                i = int(elemId)
+            except (ValueError, TypeError):
+                continue
+
+            if i > 0 and str(i) == elemId:
+                used.add(i)
+        self._next = max(used, default=0) + 1
+        self._free = [i for i in range(1, self._next) if not i in used]
+        # An ascending list is a heap.
@@ -16,6 +16,7 @@ class Location(WorldElement):
         tags -- list of tags.
         image: str -- image file path.
     """
+    __slots__ = ()
 
     def __init__(self):
         """Initialize instance variables.
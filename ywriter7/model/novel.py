@@ -5,11 +5,29 @@ For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import locale
-import re
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 from ..pywriter_globals import *
 from .basic_element import BasicElement
-
-LANGUAGE_TAG = re.compile(r'\[lang=(.*?)\]')
+from .change_tracking import ElementCollection
+from .id_generator import IdAllocator
+from .scene import count_words_and_letters
+from .scene import LANGUAGE_TAG
+from .scene_table import SceneTable
+from .scene_index import SceneIndex
+from .scene_query import And
+
+ELEMENT_COLLECTIONS = {
+    CHAPTER_PREFIX: 'chapters',
+    SCENE_PREFIX: 'scenes',
+    CHARACTER_PREFIX: 'characters',
+    LOCATION_PREFIX: 'locations',
+    ITEM_PREFIX: 'items',
+    PRJ_NOTE_PREFIX: 'projectNotes',
+    }
+# key: element type prefix, value: name of the Novel attribute holding the elements
+
+_COLLECTION_NAMES = frozenset(ELEMENT_COLLECTIONS.values())
 
 
 class Novel(BasicElement):
@@ -22,6 +40,14 @@ class Novel(BasicElement):
     Public methods:
         get_languages() -- Determine the languages used in the document.
         check_locale() -- Check the document's locale (language code and country code).
+        get_id_allocator(elemType) -- Return the ID allocator for an element collection.
+        register_client(client) -- Add a client to be notified about element changes.
+        unregister_client(client) -- Remove a client from the notification list.
+        notify(elemType, elemId) -- Notify the clients about an element change.
+        recount(processes=1) -- Count words and letters of all scenes; return the totals.
+        get_scene_table() -- Return a columnar view of the scene metadata (requires NumPy).
+        get_scene_index() -- Return the secondary indexes over the scenes.
+        query_scenes(*predicates) -- Return a list with the IDs of the scenes matching all predicates.
 
     Public instance variables:
         authorName -- author's name.
@@ -41,6 +67,9 @@ class Novel(BasicElement):
         srtCharacters: list -- the novel's sorted character IDs.
         projectNotes: dict --  (key: ID, value: projectNote instance).
         srtPrjNotes: list -- the novel's sorted project notes.
+        
+    The element dictionaries are kept as ElementCollection instances, 
+    which collect the IDs of changed elements for views like the scene index.
     """
 
     def __init__(self):
@@ -135,36 +164,67 @@ class Novel(BasicElement):
         self.countryCode = None
         # Country code acc. to ISO 3166-2.
 
-    def get_languages(self):
+        self._clients = []
+        # Weak references to objects with an on_element_change(novel, elemType, elemId) method.
+
+        self._idAllocators = {}
+        # key: element type prefix, value: IdAllocator instance
+
+        self._sceneTable = None
+        # SceneTable instance, created on demand
+
+        self._sceneIndex = None
+        # SceneIndex instance, created on demand
+
+    def __setattr__(self, name, value):
+        """Set an instance variable; keep element dictionaries as ElementCollection copies.
+        
+        Extends the superclass method.
+        """
+        if name in _COLLECTION_NAMES and value.__class__ is not ElementCollection:
+            value = ElementCollection(value)
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        """Return the instance variables to be pickled, without the clients.
+        
+        The clients observe this instance only; a copy, e.g. in a worker process, has none.
+        The same applies to the scene table and the scene index, which are clients.
+        """
+        state = super().__getstate__()
+        state['_clients'] = []
+        state['_sceneTable'] = None
+        state['_sceneIndex'] = None
+        return state
+
+    def get_languages(self, load=True):
         """Determine the languages used in the document.
         
-        Populate the self.languages list with all language codes found in the scene contents.        
+        Optional arguments:
+            load: bool -- if False, do not load lazily read scene contents.
+        
+        Populate the self.languages list with all language codes found in the scene contents,
+        in order of appearance. The scenes cache their language codes until their content changes, 
+        so only changed scenes are scanned again.
+        If load is False and scene contents are not loaded yet, the language codes 
+        listed before, e.g. read from the project file, are kept for these scenes, 
+        so the list may contain codes no longer in use.
         Example:
         - language markup: 'Standard text [lang=en-AU]Australian text[/lang=en-AU].'
         - language code: 'en-AU'
         """
-
-        def languages(text):
-            """Return the language codes appearing in text.
-            
-            Example:
-            - language markup: 'Standard text [lang=en-AU]Australian text[/lang=en-AU].'
-            - language code: 'en-AU'
-            """
-            if text:
-                m = LANGUAGE_TAG.search(text)
-                while m:
-                    text = text[m.span()[1]:]
-                    yield m.group(1)
-                    m = LANGUAGE_TAG.search(text)
-
-        self.languages = []
-        for scId in self.scenes:
-            text = self.scenes[scId].sceneContent
-            if text:
-                for language in languages(text):
-                    if not language in self.languages:
-                        self.languages.append(language)
+        languages = {}
+        # Used as an ordered set.
+        for scene in self.scenes.values():
+            if not (load or scene.contentLoaded):
+                languages = dict.fromkeys(self.languages or ())
+                break
+
+        for scene in self.scenes.values():
+            if load or scene.contentLoaded:
+                for language in scene.languages:
+                    languages[language] = None
+        self.languages = list(languages)
 
     def check_locale(self):
         """Check the document's locale (language code and country code).
@@ -196,3 +256,136 @@ class Novel(BasicElement):
         self.languageCode = 'zxx'
         self.countryCode = 'none'
 
+    def get_id_allocator(self, elemType):
+        """Return the ID allocator for an element collection.
+        
+        Positional arguments:
+            elemType: str -- element type prefix, e.g. SCENE_PREFIX.
+            
+        The allocator is bound to the collection, e.g. the scenes dictionary.
+        If the collection has been replaced, a new allocator is returned.
+        """
+        elements = getattr(self, ELEMENT_COLLECTIONS[elemType])
+        allocator = self._idAllocators.get(elemType, None)
+        if allocator is None or allocator.elements is not elements:
+            allocator = IdAllocator(elements)
+            self._idAllocators[elemType] = allocator
+        return allocator
+
+    def register_client(self, client):
+        """Add a client to be notified about element changes.
+        
+        Positional arguments:
+            client -- object with an on_element_change(novel, elemType, elemId) method.
+            
+        The client is referenced weakly, so it is unregistered when discarded.
+        """
+        clientRef = weakref.ref(client)
+        if not clientRef in self._clients:
+            self._clients.append(clientRef)
+
+    def unregister_client(self, client):
+        """Remove a client from the notification list.
+        
+        Positional arguments:
+            client -- registered object.
+        """
+        clientRef = weakref.ref(client)
+        if clientRef in self._clients:
+            self._clients.remove(clientRef)
+
+    def notify(self, elemType, elemId):
+        """Notify the clients about an element change.
+        
+        Positional arguments:
+            elemType: str -- element type prefix, e.g. SCENE_PREFIX.
+            elemId: str -- ID of the element.
+            
+        To be called after an element has been added, changed, moved, or deleted.
+        For scenes, relevant changes are the characters, locations, items, and tags.
+        Moving or adding scenes is notified as a change of the chapters involved.
+        
+        Setting the elements' instance variables, changing their lists in place,
+        and storing or deleting elements is collected by the element collections 
+        without notification. The notification is collected as well, e.g. for views 
+        kept in sync with the elements, so changing a dictionary in place, e.g. kwVar, 
+        can be made known.
+        """
+        getattr(self, ELEMENT_COLLECTIONS[elemType]).mark_changed(elemId)
+        for clientRef in self._clients[:]:
+            client = clientRef()
+            if client is None:
+                self._clients.remove(clientRef)
+            else:
+                client.on_element_change(self, elemType, elemId)
+
+    def recount(self, processes=1):
+        """Count words and letters of all scenes; return the totals.
+        
+        Optional arguments:
+            processes: int -- number of worker processes. If greater than 1, 
+                              the scene contents are counted in a process pool.
+        
+        Only scenes whose counts are not known yet are counted; 
+        their contents are loaded, if necessary.
+        Return a tuple: (total word count, total letter count).
+        """
+        scenes = []
+        texts = []
+        for scene in self.scenes.values():
+            if not scene.contentCounted:
+                text = scene.sceneContent
+                if text is None:
+                    scene.set_counts(0, 0)
+                else:
+                    scenes.append(scene)
+                    texts.append(text)
+        if processes > 1 and len(texts) > 1:
+            chunkSize = max(1, len(texts) // (processes * 4))
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                counts = list(executor.map(count_words_and_letters, texts, chunksize=chunkSize))
+        else:
+            counts = map(count_words_and_letters, texts)
+        for scene, (wordCount, letterCount) in zip(scenes, counts):
+            scene.set_counts(wordCount, letterCount)
+
+        wordsTotal = 0
+        lettersTotal = 0
+        for scene in self.scenes.values():
+            wordsTotal += scene.wordCount
+            lettersTotal += scene.letterCount
+        return wordsTotal, lettersTotal
+
+    def get_scene_table(self):
+        """Return a columnar view of the scene metadata.
+        
+        The SceneTable instance is created on first call, and kept in sync with the scenes.
+        See the scene_table module.
+        Raise the "Error" exception, if NumPy is not installed.
+        """
+        if self._sceneTable is None:
+            self._sceneTable = SceneTable(self)
+        return self._sceneTable
+
+    def get_scene_index(self):
+        """Return the secondary indexes over the scenes.
+        
+        The SceneIndex instance is created on first call, and kept in sync with the scenes.
+        See the scene_index module.
+        """
+        if self._sceneIndex is None:
+            self._sceneIndex = SceneIndex(self)
+        return self._sceneIndex
+
+    def query_scenes(self, *predicates):
+        """Return a list with the IDs of the scenes matching all predicates.
+        
+        Positional arguments:
+            predicates -- ScenePredicate instances, see the scene_query module.
+            
+        The scene IDs are in the novel's order of the scenes. 
+        Only scenes in the novel's chapters are selected; without predicates, all of them.
+        Indexed predicates are evaluated by index lookups, without a scan over the scenes.
+        """
+        index = self.get_scene_index()
+        return index.sort(And(*predicates).select(index))
@@ -14,6 +14,7 @@ class ProjectNote(BasicElement):
         desc: str -- project note description.
         kwVar: dict -- custom keyword variables.
     """
+    __slots__ = ()
 
     def __init__(self):
         """Initialize instance variables.
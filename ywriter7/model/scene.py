@@ -22,14 +22,66 @@ NON_LETTERS = re.compile(r'\[.+?\]|\/\*.+?\*\/|\n|\r')
 # this is to be replaced by empty strings, thus excluding markup, comments, and linefeeds
 # from letter counting
 
+MARKUP = re.compile(r'\[.+?\]|\/\*.+?\*\/')
+# markup and comments, to be excluded from counting
+
+QUOTE_MARKS = re.compile(r'^\>', re.MULTILINE)
+# this is to be removed, thus excluding quote marks from word counting
+
+_MARKUP_PLACEHOLDER = '\x00'
+
+LANGUAGE_TAG = re.compile(r'\[lang=(.*?)\]')
+
+
+def count_words_and_letters(text):
+    """Return a tuple: (word count, letter count) of a scene content.
+    
+    Positional arguments:
+        text: str -- scene content with yWriter raw markup.
+    
+    Count like ADDITIONAL_WORD_LIMITS, NO_WORD_LIMITS, and NON_LETTERS do, 
+    but with a single regular expression pass for markup and comments.
+    Markup is replaced by a placeholder first, so the letter count can be taken
+    from the same string, and removing it does not join dashes.
+    All other replacements are plain string operations, skipped if not needed.
+    """
+    if _MARKUP_PLACEHOLDER in text:
+        wordText = ADDITIONAL_WORD_LIMITS.sub(' ', text)
+        wordText = NO_WORD_LIMITS.sub('', wordText)
+        return len(wordText.split()), len(NON_LETTERS.sub('', text))
+
+    if '[' in text or '/*' in text:
+        text = MARKUP.sub(_MARKUP_PLACEHOLDER, text)
+        markup = text.count(_MARKUP_PLACEHOLDER)
+    else:
+        markup = 0
+    letterCount = len(text) - markup - text.count('\n') - text.count('\r')
+    for wordLimit in ('--', '—', '–'):
+        if wordLimit in text:
+            text = text.replace(wordLimit, ' ')
+    if '>' in text:
+        text = QUOTE_MARKS.sub('', text)
+    if '-' in text:
+        text = text.replace('-', '')
+    if markup:
+        text = text.replace(_MARKUP_PLACEHOLDER, '')
+    return len(text.split()), letterCount
+
 
 class Scene(BasicElement):
     """yWriter scene representation.
     
+    Public methods:
+        set_content_loader(loader, wordCount=None, letterCount=None) -- defer loading the scene content.
+        set_counts(wordCount, letterCount) -- set the counts of the current scene content.
+    
     Public instance variables:
         sceneContent: str -- scene content (property with getter and setter).
-        wordCount: int -- word count (derived; updated by the sceneContent setter).
-        letterCount: int -- letter count (derived; updated by the sceneContent setter).
+        wordCount: int -- word count (derived; counted on first access after the content has changed).
+        letterCount: int -- letter count (derived; counted on first access after the content has changed).
+        contentLoaded: bool -- False, if the scene content is yet to be loaded (read-only property).
+        contentCounted: bool -- False, if words or letters are yet to be counted (read-only property).
+        languages: tuple -- language codes of the scene content's language markup (read-only property).
         scType: int -- Scene type (Normal/Notes/Todo/Unused).
         doNotExport: bool -- True if the scene is not to be exported to RTF.
         status: int -- scene status (Outline/Draft/1st Edit/2nd Edit/Done).
@@ -60,6 +112,15 @@ class Scene(BasicElement):
         scnArcs: str -- Semicolon-separated arc titles.
         scnMode: str -- Mode of discourse (Narration/Dramatic action/Dialogue/Description/Exposition).
     """
+    __slots__ = ('_sceneContent', '_contentLoader', '_languages', '_wordCount', '_letterCount',
+                 'scType', 'doNotExport', 'status', 'notes', 'tags',
+                 'field1', 'field2', 'field3', 'field4',
+                 'appendToPrev', 'isReactionScene', 'isSubPlot', 'goal', 'conflict', 'outcome',
+                 'characters', 'locations', 'items',
+                 'date', 'time', 'minute', 'hour', 'day', 'lastsMinutes', 'lastsHours', 'lastsDays',
+                 'image', 'scnArcs', 'scnMode')
+    # minute and hour are not initialized.
+
     STATUS = [None,
                     'Outline',
                     'Draft',
@@ -87,13 +148,19 @@ class Scene(BasicElement):
         # xml: <SceneContent>
         # Scene text with yW7 raw markup.
 
-        self.wordCount = 0
+        self._contentLoader = None
+        # Function returning the scene content, if not loaded yet.
+
+        self._languages = None
+        # Language codes found in the scene content; None, if to be scanned on access
+
+        self._wordCount = 0
         # xml: <WordCount>
-        # To be updated by the sceneContent setter
+        # None, if to be counted on access
 
-        self.letterCount = 0
+        self._letterCount = 0
         # xml: <LetterCount>
-        # To be updated by the sceneContent setter
+        # None, if to be counted on access
 
         self.scType = None
         # Scene type (Normal/Notes/Todo/Unused).
@@ -216,15 +283,121 @@ class Scene(BasicElement):
 
     @property
     def sceneContent(self):
+        if self._contentLoader is not None:
+            self._load_content()
         return self._sceneContent
 
     @sceneContent.setter
     def sceneContent(self, text: str):
-        """Set sceneContent updating word count and letter count."""
+        """Set sceneContent, invalidating word count and letter count."""
+        self._set_content(text)
+
+    @property
+    def wordCount(self):
+        if self._wordCount is None:
+            self._count()
+        return self._wordCount
+
+    @wordCount.setter
+    def wordCount(self, count: int):
+        self._wordCount = count
+
+    @property
+    def letterCount(self):
+        if self._letterCount is None:
+            self._count()
+        return self._letterCount
+
+    @letterCount.setter
+    def letterCount(self, count: int):
+        self._letterCount = count
+
+    @property
+    def contentLoaded(self):
+        return self._contentLoader is None
+
+    @property
+    def contentCounted(self):
+        return self._wordCount is not None and self._letterCount is not None
+
+    @property
+    def languages(self):
+        """Return the language codes of the scene content's language markup.
+        
+        The codes are unique and in order of appearance.
+        Example:
+        - language markup: 'Standard text [lang=en-AU]Australian text[/lang=en-AU].'
+        - language code: 'en-AU'
+        The result is cached until the scene content changes.
+        """
+        if self._languages is None:
+            text = self.sceneContent
+            if text:
+                self._languages = tuple(dict.fromkeys(m.group(1) for m in LANGUAGE_TAG.finditer(text)))
+            else:
+                self._languages = ()
+        return self._languages
+
+    def set_content_loader(self, loader, wordCount=None, letterCount=None):
+        """Defer loading the scene content until it is accessed.
+        
+        Positional arguments:
+            loader -- function without arguments, returning the scene content.
+            
+        Optional arguments:
+            wordCount: int -- known word count of the scene content.
+            letterCount: int -- known letter count of the scene content.
+            
+        If the counts are not given, reading them loads and counts the scene content.
+        """
+        self._contentLoader = loader
+        self._sceneContent = None
+        self._wordCount = wordCount
+        self._letterCount = letterCount
+        self._languages = None
+
+    def set_counts(self, wordCount, letterCount):
+        """Set the counts of the current scene content.
+        
+        Positional arguments:
+            wordCount: int -- word count, as returned by count_words_and_letters().
+            letterCount: int -- letter count, as returned by count_words_and_letters().
+            
+        This is for counts determined elsewhere, e.g. in a worker process.
+        Unlike setting the wordCount and letterCount attributes, this is no change of the scene.
+        """
+        self._wordCount = wordCount
+        self._letterCount = letterCount
+
+    def _load_content(self):
+        """Load the scene content by calling the content loader.
+        
+        The word count and letter count are to be counted from the loaded content.
+        """
+        text = self._contentLoader()
+        if text is None:
+            self._contentLoader = None
+            self._sceneContent = None
+            self._wordCount = 0
+            self._letterCount = 0
+            self._languages = ()
+        else:
+            self._set_content(text)
+            # Loading is no change.
+
+    def _set_content(self, text):
+        """Set the scene content; count words and letters, and scan languages on access."""
+        self._contentLoader = None
         self._sceneContent = text
-        text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
-        text = NO_WORD_LIMITS.sub('', text)
-        wordList = text.split()
-        self.wordCount = len(wordList)
-        text = NON_LETTERS.sub('', self._sceneContent)
-        self.letterCount = len(text)
+        self._wordCount = None
+        self._letterCount = None
+        self._languages = None
+
+    def _count(self):
+        """Count words and letters of the scene content, loading it if necessary."""
+        text = self.sceneContent
+        if text is None:
+            self._wordCount = 0
+            self._letterCount = 0
+        else:
+            self._wordCount, self._letterCount = count_words_and_letters(text)
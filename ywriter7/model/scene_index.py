@@ -0,0 +1,237 @@
+"""Provide a class for secondary indexes over a novel's scenes.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from bisect import bisect_left
+from bisect import bisect_right
+from bisect import insort
+from ..pywriter_globals import *
+from .change_tracking import ChangeObserver
+
+MAX_ID = '\U0010ffff'
+# Sorts after any scene ID.
+
+
+class SceneIndex:
+    """Secondary indexes over a novel's scenes, kept in sync with the scenes.
+
+    Public methods:
+        select(key, values) -- Return a set with the IDs of the scenes having any of the values.
+        get_buckets(key, values) -- Return a list with the index sets of the values.
+        select_dates(start, end) -- Return a set with the IDs of the scenes starting within a date range.
+        count_dates(start, end) -- Return the number of scenes starting within a date range.
+        get_scene_ids() -- Return a set with the IDs of all scenes in the novel's chapters.
+        sort(scIds) -- Return a list with scene IDs in the novel's order of the scenes.
+
+    Public instance variables:
+        novel -- Novel instance the indexes are maintained for.
+
+    Index keys:
+        status -- scene status.
+        scType -- scene type; None is indexed as 0 (Normal).
+        chapter -- ID of the scene's chapter.
+        tags -- scene tags.
+        characters -- IDs of the characters related to the scene.
+        viewpoint -- ID of the viewpoint character, i.e. the first related character.
+        locations -- IDs of the locations related to the scene.
+        items -- IDs of the items related to the scene.
+        arcs -- arc titles of the scene.
+    Scenes are indexed by their specific start dates as well.
+
+    Before a selection, the index takes the IDs of the chapters and scenes changed
+    since the last selection from a ChangeObserver, and re-indexes the changed scenes.
+    If scenes have been moved, added, or deleted, the index is rebuilt.
+    """
+    KEYS = ('status', 'scType', 'chapter', 'tags', 'characters', 'viewpoint', 'locations', 'items', 'arcs')
+
+    def __init__(self, novel):
+        """Positional arguments:
+            novel -- Novel instance to index.
+        """
+        self.novel = novel
+        self._indexes = {}
+        # key: index key, value: dict (key: indexed value, value: set of scene IDs)
+        self._dates = []
+        # Sorted list of (date, scene ID) tuples of the scenes with a specific start date
+        self._positions = {}
+        # key: scene ID, value: index in the novel's order of the scenes
+        self._chpPerScn = {}
+        # key: scene ID, value: chapter ID
+        self._sceneKeys = {}
+        # key: scene ID, value: (indexed values per index key, date) as indexed
+        self._srtChapters = []
+        # Chapter IDs as indexed
+        self._srtScenes = {}
+        # key: chapter ID, value: scene IDs as indexed
+        self._observer = None
+        # ChangeObserver instance of the novel's chapters and scenes; None, if to be rebuilt
+
+    def select(self, key, values):
+        """Return a set with the IDs of the scenes having any of the values.
+
+        Positional arguments:
+            key: str -- index key, see the class docstring.
+            values -- iterable of the values to look up.
+
+        The returned set may be changed by the caller.
+        """
+        return set().union(*self.get_buckets(key, values))
+
+    def get_buckets(self, key, values):
+        """Return a list with the index sets of the values.
+
+        Positional arguments:
+            key: str -- index key, see the class docstring.
+            values -- iterable of the values to look up.
+
+        Each set contains the IDs of the scenes having the value.
+        The sets belong to the index; they must not be changed.
+        """
+        self._sync()
+        index = self._indexes[key]
+        return [index[value] for value in values if value in index]
+
+    def select_dates(self, start=None, end=None):
+        """Return a set with the IDs of the scenes starting within a date range.
+
+        Optional arguments:
+            start: str -- first date in ISO format (yyyy-mm-dd); None for no lower limit.
+            end: str -- last date in ISO format; None for no upper limit.
+        """
+        first, last = self._get_date_range(start, end)
+        return {scId for __, scId in self._dates[first:last]}
+
+    def count_dates(self, start=None, end=None):
+        """Return the number of scenes starting within a date range.
+
+        Optional arguments:
+            start: str -- first date in ISO format (yyyy-mm-dd); None for no lower limit.
+            end: str -- last date in ISO format; None for no upper limit.
+        """
+        first, last = self._get_date_range(start, end)
+        return max(last - first, 0)
+
+    def get_scene_ids(self):
+        """Return a set with the IDs of all scenes in the novel's chapters."""
+        self._sync()
+        return set(self._positions)
+
+    def __len__(self):
+        """Return the number of scenes in the novel's chapters."""
+        self._sync()
+        return len(self._positions)
+
+    def sort(self, scIds):
+        """Return a list with scene IDs in the novel's order of the scenes.
+
+        Positional arguments:
+            scIds -- iterable of IDs of indexed scenes.
+        """
+        self._sync()
+        return sorted(scIds, key=self._positions.__getitem__)
+
+    def _get_date_range(self, start, end):
+        """Return a tuple: (first, last) slice limits of the date list for a date range."""
+        self._sync()
+        first = 0 if start is None else bisect_left(self._dates, (start,))
+        last = len(self._dates) if end is None else bisect_right(self._dates, (end, MAX_ID))
+        return first, last
+
+    def _sync(self):
+        """Rebuild the indexes, or re-index the scenes changed since the last synchronization."""
+        if self._observer is None:
+            self._build()
+            return
+
+        changes = self._observer.get_changes()
+        if changes is None:
+            # An element dictionary has been replaced.
+            self._build()
+            return
+
+        novelChanged, changes = changes
+        if novelChanged and self.novel.srtChapters != self._srtChapters:
+            self._build()
+            return
+
+        for chId in changes['chapters']:
+            if chId in self._srtScenes:
+                chapter = self.novel.chapters.get(chId)
+                if chapter is None or chapter.srtScenes != self._srtScenes[chId]:
+                    self._build()
+                    return
+
+        for scId in changes['scenes']:
+            if scId in self._positions:
+                if not scId in self.novel.scenes:
+                    self._build()
+                    return
+
+                self._remove_scene(scId)
+                self._add_scene(scId)
+
+    def _build(self):
+        """Index all scenes in the novel's chapters."""
+        self._observer = None
+        self._indexes = {key: {} for key in self.KEYS}
+        self._dates = []
+        self._positions = {}
+        self._chpPerScn = {}
+        self._sceneKeys = {}
+        self._srtChapters = self.novel.srtChapters[:]
+        self._srtScenes = {}
+        for chId in self._srtChapters:
+            self._srtScenes[chId] = self.novel.chapters[chId].srtScenes[:]
+            for scId in self._srtScenes[chId]:
+                self._positions[scId] = len(self._positions)
+                self._chpPerScn[scId] = chId
+                self._add_scene(scId)
+        self._dates.sort()
+        self._observer = ChangeObserver(self.novel, ('chapters', 'scenes'))
+
+    def _add_scene(self, scId):
+        """Add a scene to the indexes.
+
+        While building, the dates are appended, to be sorted afterwards.
+        """
+        scene = self.novel.scenes[scId]
+        characters = scene.characters or []
+        values = (
+            (scene.status,),
+            (scene.scType or 0,),
+            (self._chpPerScn[scId],),
+            frozenset(scene.tags or ()),
+            frozenset(characters),
+            tuple(characters[:1]),
+            frozenset(scene.locations or ()),
+            frozenset(scene.items or ()),
+            frozenset(string_to_list(scene.scnArcs or '')),
+            )
+        # Sets, because lists may contain duplicates.
+        for key, keyValues in zip(self.KEYS, values):
+            index = self._indexes[key]
+            for value in keyValues:
+                if not value in index:
+                    index[value] = set()
+                index[value].add(scId)
+        if scene.date:
+            if self._observer is None:
+                self._dates.append((scene.date, scId))
+            else:
+                insort(self._dates, (scene.date, scId))
+        self._sceneKeys[scId] = (values, scene.date)
+
+    def _remove_scene(self, scId):
+        """Remove a scene from the indexes."""
+        values, date = self._sceneKeys.pop(scId)
+        for key, keyValues in zip(self.KEYS, values):
+            index = self._indexes[key]
+            for value in keyValues:
+                index[value].discard(scId)
+                if not index[value]:
+                    del index[value]
+        if date:
+            i = bisect_left(self._dates, (date, scId))
+            del self._dates[i]
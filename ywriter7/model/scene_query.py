@@ -0,0 +1,260 @@
+"""Provide composable predicates for querying a novel's scenes.
+
+Predicates are combined with & (and), | (or), and ~ (not), and evaluated
+against a SceneIndex, e.g.:
+
+    novel.query_scenes(Status(2) & ChapterRange('3', '7') & HasCharacter('1'))
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class ScenePredicate:
+    """Abstract predicate selecting scenes.
+
+    Public methods:
+        select(index, candidates=None) -- Return a set with the IDs of the matching scenes.
+        estimate(index) -- Return the estimated number of matching scenes.
+
+    Public class constants:
+        INDEXED: bool -- True, if the predicate is evaluated by index lookups, without a scan.
+
+    Subclasses implement _select(index), returning the set of all matching scene IDs,
+    or override select().
+    """
+    INDEXED = True
+
+    def estimate(self, index):
+        """Return the estimated number of matching scenes, for ordering the predicates of a conjunction.
+
+        Positional arguments:
+            index -- SceneIndex instance of the novel.
+        """
+        return len(index)
+
+    def select(self, index, candidates=None):
+        """Return a set with the IDs of the matching scenes.
+
+        Positional arguments:
+            index -- SceneIndex instance of the novel.
+
+        Optional arguments:
+            candidates: set -- IDs of the scenes to select from; None for all indexed scenes.
+        """
+        selected = self._select(index)
+        if candidates is not None:
+            selected.intersection_update(candidates)
+        return selected
+
+    def _select(self, index):
+        raise NotImplementedError
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class And(ScenePredicate):
+    """Scenes matching all predicates.
+
+    Indexed predicates are evaluated first; the others filter their result.
+    """
+
+    def __init__(self, *predicates):
+        self.predicates = []
+        for predicate in predicates:
+            if isinstance(predicate, And):
+                self.predicates.extend(predicate.predicates)
+            else:
+                self.predicates.append(predicate)
+        self.INDEXED = all(predicate.INDEXED for predicate in self.predicates)
+
+    def estimate(self, index):
+        return min((predicate.estimate(index) for predicate in self.predicates if predicate.INDEXED),
+                   default=len(index))
+
+    def select(self, index, candidates=None):
+        """Evaluate the most selective indexed predicate first, and narrow its result down."""
+        indexed = sorted((predicate.estimate(index), i) for i, predicate in enumerate(self.predicates)
+                         if predicate.INDEXED)
+        order = [self.predicates[i] for __, i in indexed]
+        order.extend(predicate for predicate in self.predicates if not predicate.INDEXED)
+        for predicate in order:
+            candidates = predicate.select(index, candidates)
+            if not candidates:
+                break
+
+        if candidates is None:
+            return index.get_scene_ids()
+
+        return candidates
+
+
+class Or(ScenePredicate):
+    """Scenes matching any of the predicates."""
+
+    def __init__(self, *predicates):
+        self.predicates = predicates
+        self.INDEXED = all(predicate.INDEXED for predicate in predicates)
+
+    def estimate(self, index):
+        return sum(predicate.estimate(index) for predicate in self.predicates)
+
+    def select(self, index, candidates=None):
+        selected = set()
+        for predicate in self.predicates:
+            selected.update(predicate.select(index, candidates))
+        return selected
+
+
+class Not(ScenePredicate):
+    """Scenes not matching the predicate."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+        self.INDEXED = predicate.INDEXED
+
+    def select(self, index, candidates=None):
+        if candidates is None:
+            candidates = index.get_scene_ids()
+        return candidates - self.predicate.select(index, candidates)
+
+
+class Where(ScenePredicate):
+    """Scenes for which a function returns True.
+
+    This needs a scan over the candidates; combine it with indexed predicates
+    using & to narrow them down first.
+    """
+    INDEXED = False
+
+    def __init__(self, function):
+        """Positional arguments:
+            function -- function with a Scene instance argument, returning True for matching scenes.
+        """
+        self.function = function
+
+    def select(self, index, candidates=None):
+        if candidates is None:
+            candidates = index.get_scene_ids()
+        scenes = index.novel.scenes
+        return {scId for scId in candidates if self.function(scenes[scId])}
+
+
+class _IndexLookup(ScenePredicate):
+    """Scenes having any of the values in a SceneIndex index."""
+    KEY = None
+
+    def __init__(self, *values):
+        self.values = values
+
+    def estimate(self, index):
+        return sum(map(len, self._get_buckets(index)))
+
+    def select(self, index, candidates=None):
+        """Look up the values, or test the candidates, whichever is fewer set operations."""
+        buckets = self._get_buckets(index)
+        if candidates is None:
+            return set().union(*buckets)
+
+        if len(buckets) == 1:
+            return candidates & buckets[0]
+
+        if len(candidates) * len(buckets) < sum(map(len, buckets)):
+            return {scId for scId in candidates if any(scId in bucket for bucket in buckets)}
+
+        return candidates.intersection(set().union(*buckets))
+
+    def _get_buckets(self, index):
+        return index.get_buckets(self.KEY, self.values)
+
+
+class Status(_IndexLookup):
+    """Scenes with any of the status values given (1 - Outline, ..., 5 - Done)."""
+    KEY = 'status'
+
+
+class SceneType(_IndexLookup):
+    """Scenes of any of the types given (0 - Normal, 1 - Notes, 2 - Todo, 3 - Unused)."""
+    KEY = 'scType'
+
+
+class InChapters(_IndexLookup):
+    """Scenes in any of the chapters given by ID."""
+    KEY = 'chapter'
+
+
+class HasTag(_IndexLookup):
+    """Scenes tagged with any of the tags given."""
+    KEY = 'tags'
+
+
+class HasCharacter(_IndexLookup):
+    """Scenes related to any of the characters given by ID."""
+    KEY = 'characters'
+
+
+class Viewpoint(_IndexLookup):
+    """Scenes with any of the characters given by ID as viewpoint character."""
+    KEY = 'viewpoint'
+
+
+class HasLocation(_IndexLookup):
+    """Scenes related to any of the locations given by ID."""
+    KEY = 'locations'
+
+
+class HasItem(_IndexLookup):
+    """Scenes related to any of the items given by ID."""
+    KEY = 'items'
+
+
+class HasArc(_IndexLookup):
+    """Scenes belonging to any of the arcs given by title."""
+    KEY = 'arcs'
+
+
+class ChapterRange(ScenePredicate):
+    """Scenes in the chapters from the first to the last chapter given by ID, in the novel's order."""
+
+    def __init__(self, firstId, lastId):
+        self.firstId = firstId
+        self.lastId = lastId
+
+    def estimate(self, index):
+        return InChapters(*self._get_chapters(index)).estimate(index)
+
+    def select(self, index, candidates=None):
+        return InChapters(*self._get_chapters(index)).select(index, candidates)
+
+    def _get_chapters(self, index):
+        """Return a list with the IDs of the chapters in the range."""
+        srtChapters = index.novel.srtChapters
+        try:
+            first = srtChapters.index(self.firstId)
+            last = srtChapters.index(self.lastId)
+        except ValueError:
+            return []
+
+        return srtChapters[first:last + 1]
+
+
+class DateRange(ScenePredicate):
+    """Scenes with a specific start date within a range (ISO format, limits included)."""
+
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+
+    def estimate(self, index):
+        return index.count_dates(self.start, self.end)
+
+    def _select(self, index):
+        return index.select_dates(self.start, self.end)
@@ -0,0 +1,207 @@
+"""Provide a class for a columnar view of a novel's scene metadata.
+
+Requires NumPy, which is an optional dependency.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from datetime import date
+from ..pywriter_globals import *
+from .change_tracking import ChangeObserver
+from .scene import Scene
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MINUTES_PER_DAY = 1440
+
+
+class SceneTable:
+    """Columnar view of a novel's scene metadata, kept in sync with the scenes.
+
+    Public methods:
+        get_scene_ids() -- Return a list with the scene IDs, in the novel's order of the scenes.
+        get_columns() -- Return a dictionary with the columns, in the novel's order of the scenes.
+        words_per_chapter() -- Return an array with the word count of each chapter.
+        status_distribution() -- Return an array with the number of scenes per status.
+        timeline_span() -- Return a tuple: (first date, last date) of the dated scenes.
+
+    Columns (one NumPy array element per scene of the novel's chapters):
+        wordCount -- word count.
+        letterCount -- letter count.
+        status -- scene status; 0 if not set.
+        scType -- scene type; 0 if not set.
+        chapter -- index of the scene's chapter in the novel's srtChapters.
+        date -- proleptic Gregorian ordinal of the specific start date; 0 if not set.
+        duration -- scene duration in minutes.
+
+    Before the columns are handed out, the table takes the IDs of the chapters and scenes
+    changed since then from a ChangeObserver, and updates the rows of the changed scenes.
+    If scenes have been moved, added, or deleted, the table is rebuilt.
+    Reading the word and letter counts of scenes not counted yet counts their contents.
+    """
+    COLUMNS = (
+        ('wordCount', 'int64'),
+        ('letterCount', 'int64'),
+        ('status', 'int8'),
+        ('scType', 'int8'),
+        ('chapter', 'int32'),
+        ('date', 'int64'),
+        ('duration', 'int64'),
+        )
+    # Column names and NumPy data types, in row order.
+
+    def __init__(self, novel):
+        """Positional arguments:
+            novel -- Novel instance to view.
+
+        Raise the "Error" exception, if NumPy is not installed.
+        """
+        if np is None:
+            raise Error(f'{_("The scene table requires NumPy")}.')
+
+        self._novel = novel
+        self._scIds = []
+        self._rows = {}
+        # key: scene ID, value: row index
+        self._columns = {}
+        self._srtChapters = []
+        # Chapter IDs as viewed
+        self._srtScenes = {}
+        # key: chapter ID, value: scene IDs as viewed
+        self._observer = None
+        # ChangeObserver instance of the novel's chapters and scenes; None, if to be rebuilt
+
+    def get_scene_ids(self):
+        """Return a list with the scene IDs, in the novel's order of the scenes.
+
+        The index of a scene ID is the scene's row index in the columns.
+        """
+        self._sync()
+        return list(self._scIds)
+
+    def get_columns(self):
+        """Return a dictionary with the columns, in the novel's order of the scenes.
+
+        key: column name, value: read-only NumPy array. See the class docstring.
+        The arrays are views of the table; they may change with the next call.
+        """
+        self._sync()
+        columns = {}
+        for name, array in self._columns.items():
+            column = array.view()
+            column.flags.writeable = False
+            columns[name] = column
+        return columns
+
+    def words_per_chapter(self):
+        """Return an array with the word count of each chapter, in the novel's order of the chapters."""
+        self._sync()
+        return np.bincount(
+            self._columns['chapter'],
+            weights=self._columns['wordCount'],
+            minlength=len(self._novel.srtChapters),
+            ).astype('int64')
+
+    def status_distribution(self):
+        """Return an array with the number of scenes per status.
+
+        The index is the status; index 0 counts the scenes without a status.
+        """
+        self._sync()
+        return np.bincount(self._columns['status'], minlength=len(Scene.STATUS))
+
+    def timeline_span(self):
+        """Return a tuple: (first date, last date) of the dated scenes.
+
+        The last date is the date on which the last scene ends, according to its duration.
+        Return None, if no scene has a specific start date.
+        """
+        self._sync()
+        dates = self._columns['date']
+        dated = dates > 0
+        if not dated.any():
+            return None
+
+        ends = dates[dated] + self._columns['duration'][dated] // MINUTES_PER_DAY
+        return date.fromordinal(int(dates[dated].min())), date.fromordinal(int(ends.max()))
+
+    def _sync(self):
+        """Rebuild the table, or update the rows of the scenes changed since the last synchronization."""
+        if self._observer is None:
+            self._build()
+            return
+
+        changes = self._observer.get_changes()
+        if changes is None:
+            # An element dictionary has been replaced.
+            self._build()
+            return
+
+        novelChanged, changes = changes
+        if novelChanged and self._novel.srtChapters != self._srtChapters:
+            self._build()
+            return
+
+        for chId in changes['chapters']:
+            if chId in self._srtScenes:
+                chapter = self._novel.chapters.get(chId)
+                if chapter is None or chapter.srtScenes != self._srtScenes[chId]:
+                    self._build()
+                    return
+
+        for scId in changes['scenes']:
+            i = self._rows.get(scId)
+            if i is not None:
+                if not scId in self._novel.scenes:
+                    self._build()
+                    return
+
+                row = self._get_row(self._novel.scenes[scId], self._columns['chapter'][i])
+                for (name, __), value in zip(self.COLUMNS, row):
+                    self._columns[name][i] = value
+
+    def _build(self):
+        """Collect the rows of all scenes in the novel's chapters."""
+        self._scIds = []
+        self._rows = {}
+        self._srtChapters = self._novel.srtChapters[:]
+        self._srtScenes = {}
+        rows = []
+        for chIndex, chId in enumerate(self._srtChapters):
+            self._srtScenes[chId] = self._novel.chapters[chId].srtScenes[:]
+            for scId in self._srtScenes[chId]:
+                self._rows[scId] = len(self._scIds)
+                self._scIds.append(scId)
+                rows.append(self._get_row(self._novel.scenes[scId], chIndex))
+        columns = zip(*rows) if rows else ([] for __ in self.COLUMNS)
+        self._columns = {name: np.array(values, dtype=dtype) for (name, dtype), values in zip(self.COLUMNS, columns)}
+        self._observer = ChangeObserver(self._novel, ('chapters', 'scenes'))
+
+    def _get_row(self, scene, chIndex):
+        """Return a tuple with the column values of a scene."""
+        dateOrdinal = 0
+        if scene.date:
+            try:
+                dateOrdinal = date.fromisoformat(scene.date).toordinal()
+            except ValueError:
+                pass
+        duration = 0
+        for value, minutes in ((scene.lastsDays, MINUTES_PER_DAY), (scene.lastsHours, 60), (scene.lastsMinutes, 1)):
+            if value:
+                try:
+                    duration += int(value) * minutes
+                except ValueError:
+                    pass
+        return (
+            scene.wordCount,
+            scene.letterCount,
+            scene.status or 0,
+            scene.scType or 0,
+            chIndex,
+            dateOrdinal,
+            duration,
+            )
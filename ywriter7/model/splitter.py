@@ -4,10 +4,10 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import re
 from ..pywriter_globals import *
 from .chapter import Chapter
 from .scene import Scene
-from .id_generator import create_id
 
 
 class Splitter:
@@ -31,6 +31,10 @@ class Splitter:
     DESC_SEPARATOR = '|'
     _CLIP_TITLE = 20
     # Maximum length of newly generated scene titles.
+    _DIVIDER = re.compile(r'\n#[^\n]*')
+    # Matches the lines beginning with a separator, with the preceding line break.
+    _WARNING = '(!)'
+    # Marker prepended to the metadata of split scenes.
 
     def split_scenes(self, file):
         """Split scenes by inserted chapter and scene dividers.
@@ -43,150 +47,181 @@ class Splitter:
         
         Return True if the sructure has changed, 
         otherwise return False.        
+        
+        The dividers of a scene are found in a single regex pass. The IDs of the new
+        chapters and scenes are allocated in bulk, and each resulting scene content is 
+        assigned once; scenes without dividers are left unchanged.
         """
-
-        def create_chapter(chapterId: str, title: str, desc: str, level: int):
-            """Create a new chapter and add it to the file.novel.
-            
-            Positional arguments:
-                chapterId -- str: ID of the chapter to create.
-                title -- str: title of the chapter to create.
-                desc -- str: description of the chapter to create.
-                level -- int: chapter level (part/chapter).           
-            """
-            newChapter = Chapter()
-            newChapter.title = title
-            newChapter.desc = desc
-            newChapter.chLevel = level
-            newChapter.chType = 0
-            file.novel.chapters[chapterId] = newChapter
-
-        def create_scene(sceneId: str, parent: str, splitCount: int, title: str, desc: str):
-            """Create a new scene and add it to the file.novel.
-            
-            Positional arguments:
-                sceneId -- str: ID of the scene to create.
-                parent -- Scene instance: parent scene.
-                splitCount -- int: number of parent's splittings.
-                title -- str: title of the scene to create.
-                desc -- str: description of the scene to create.
-            """
-            WARNING = '(!)'
-
-            # Mark metadata of split scenes.
-            newScene = Scene()
-            if title:
-                newScene.title = title
-            elif parent.title:
-                if len(parent.title) > self._CLIP_TITLE:
-                    title = f'{parent.title[:self._CLIP_TITLE]}...'
-                else:
-                    title = parent.title
-                newScene.title = f'{title} Split: {splitCount}'
-            else:
-                newScene.title = f'{_("New Scene")} Split: {splitCount}'
-            if desc:
-                newScene.desc = desc
-            if parent.desc and not parent.desc.startswith(WARNING):
-                parent.desc = f'{WARNING}{parent.desc}'
-            if parent.goal and not parent.goal.startswith(WARNING):
-                parent.goal = f'{WARNING}{parent.goal}'
-            if parent.conflict and not parent.conflict.startswith(WARNING):
-                parent.conflict = f'{WARNING}{parent.conflict}'
-            if parent.outcome and not parent.outcome.startswith(WARNING):
-                parent.outcome = f'{WARNING}{parent.outcome}'
-
-            # Reset the parent's status to Draft, if not Outline.
-            if parent.status > 2:
-                parent.status = 2
-            newScene.status = parent.status
-            newScene.scType = parent.scType
-            newScene.date = parent.date
-            newScene.time = parent.time
-            newScene.day = parent.day
-            newScene.lastsDays = parent.lastsDays
-            newScene.lastsHours = parent.lastsHours
-            newScene.lastsMinutes = parent.lastsMinutes
-            file.novel.scenes[sceneId] = newScene
-
-        # Process chapters and scenes.
+        novel = file.novel
         scenesSplit = False
         srtChapters = []
-        for chId in file.novel.srtChapters:
+        for chId in novel.srtChapters:
             srtChapters.append(chId)
             chapterId = chId
             srtScenes = []
-            for scId in file.novel.chapters[chId].srtScenes:
+            for scId in novel.chapters[chId].srtScenes:
                 srtScenes.append(scId)
-                if not file.novel.scenes[scId].sceneContent:
+                sceneContent = novel.scenes[scId].sceneContent
+                if not sceneContent:
                     continue
 
-                sceneId = scId
-                lines = file.novel.scenes[scId].sceneContent.split('\n')
-                newLines = []
-                inScene = True
-                sceneSplitCount = 0
+                segments = self._tokenize(sceneContent)
+                if len(segments) == 1:
+                    continue
+
+                # Allocate the IDs of the chapters and scenes to create.
+                newChapters = 0
+                newScenes = 0
+                for separator, __, __, text in segments[1:]:
+                    if separator == self.SCENE_SEPARATOR:
+                        newScenes += 1
+                    else:
+                        newChapters += 1
+                        if text is not None:
+                            newScenes += 1
+                chapterIds = iter(novel.get_id_allocator(CHAPTER_PREFIX).allocate(newChapters))
+                sceneIds = iter(novel.get_id_allocator(SCENE_PREFIX).allocate(newScenes))
 
-                # Search scene content for dividers.
-                for line in lines:
-                    heading = line.strip('# ').split(self.DESC_SEPARATOR)
-                    title = heading[0]
-                    try:
-                        desc = heading[1]
-                    except:
-                        desc = ''
-                    if line.startswith(self.SCENE_SEPARATOR):
+                parent = novel.scenes[scId]
+                parent.sceneContent = segments[0][3] or ''
+                sceneSplitCount = 0
+                for separator, title, desc, text in segments[1:]:
+                    if separator == self.SCENE_SEPARATOR:
                         # Split the scene.
-                        file.novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
-                        newLines = []
                         sceneSplitCount += 1
-                        sceneId = create_id(file.novel.scenes)
-                        create_scene(sceneId, file.novel.scenes[scId], sceneSplitCount, title, desc)
+                        sceneId = next(sceneIds)
+                        self._create_scene(novel, sceneId, parent, sceneSplitCount, title, desc, text or '')
                         srtScenes.append(sceneId)
                         scenesSplit = True
-                        inScene = True
-                    elif line.startswith(self.CHAPTER_SEPARATOR):
-                        # Start a new chapter.
-                        if inScene:
-                            file.novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
-                            newLines = []
-                            sceneSplitCount = 0
-                            inScene = False
-                        file.novel.chapters[chapterId].srtScenes = srtScenes
-                        srtScenes = []
-                        chapterId = create_id(file.novel.chapters)
-                        if not title:
-                            title = _('New Chapter')
-                        create_chapter(chapterId, title, desc, 0)
-                        srtChapters.append(chapterId)
+                        continue
+
+                    # Start a new chapter or part.
+                    sceneSplitCount = 0
+                    novel.chapters[chapterId].srtScenes = srtScenes
+                    srtScenes = []
+                    chapterId = next(chapterIds)
+                    if separator == self.CHAPTER_SEPARATOR:
+                        self._create_chapter(novel, chapterId, title or _('New Chapter'), desc, 0)
                         scenesSplit = True
-                    elif line.startswith(self.PART_SEPARATOR):
-                        # start a new part.
-                        if inScene:
-                            file.novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
-                            newLines = []
-                            sceneSplitCount = 0
-                            inScene = False
-                        file.novel.chapters[chapterId].srtScenes = srtScenes
-                        srtScenes = []
-                        chapterId = create_id(file.novel.chapters)
-                        if not title:
-                            title = _('New Part')
-                        create_chapter(chapterId, title, desc, 1)
-                        srtChapters.append(chapterId)
-                    elif not inScene:
-                        # Append a scene without heading to a new chapter or part.
-                        newLines.append(line)
+                    else:
+                        self._create_chapter(novel, chapterId, title or _('New Part'), desc, 1)
+                    srtChapters.append(chapterId)
+                    if text is not None:
+                        # Append a scene without heading to the new chapter or part.
                         sceneSplitCount += 1
-                        sceneId = create_id(file.novel.scenes)
-                        create_scene(sceneId, file.novel.scenes[scId], sceneSplitCount, '', '')
+                        sceneId = next(sceneIds)
+                        self._create_scene(novel, sceneId, parent, sceneSplitCount, '', '', text)
                         srtScenes.append(sceneId)
                         scenesSplit = True
-                        inScene = True
-                    else:
-                        newLines.append(line)
-                if inScene:
-                    file.novel.scenes[sceneId].sceneContent = '\n'.join(newLines)
-            file.novel.chapters[chapterId].srtScenes = srtScenes
-        file.novel.srtChapters = srtChapters
+            novel.chapters[chapterId].srtScenes = srtScenes
+        novel.srtChapters = srtChapters
         return scenesSplit
+
+    def _tokenize(self, text):
+        """Return a list of segments of a scene content, divided by the separator lines.
+        
+        Positional arguments:
+            text: str -- scene content.
+            
+        Each segment is a tuple: (separator, title, desc, text).
+        The first segment is the text before the first divider, with no separator.
+        text is the lines between the divider and the next one; None, if there are no lines.
+        """
+        segments = []
+        separator = title = desc = None
+        start = 0
+        for match in self._DIVIDER.finditer(f'\n{text}'):
+            # Searching for line breaks is much faster than for line beginnings.
+            # With the line break prepended, the match positions are the positions in text.
+            segments.append((separator, title, desc, self._get_lines(text, start, match.start())))
+            line = match.group()[1:]
+            if line.startswith(self.SCENE_SEPARATOR):
+                separator = self.SCENE_SEPARATOR
+            elif line.startswith(self.CHAPTER_SEPARATOR):
+                separator = self.CHAPTER_SEPARATOR
+            else:
+                separator = self.PART_SEPARATOR
+            heading = line.strip('# ').split(self.DESC_SEPARATOR)
+            title = heading[0]
+            if len(heading) > 1:
+                desc = heading[1]
+            else:
+                desc = ''
+            start = match.end()
+            # Skip the line break.
+        segments.append((separator, title, desc, self._get_lines(text, start, len(text) + 1)))
+        return segments
+
+    def _get_lines(self, text, start, end):
+        """Return the lines from start to the line break before end; None, if there are no lines."""
+        if end > start:
+            return text[start:end - 1]
+
+        return None
+
+    def _create_chapter(self, novel, chapterId, title, desc, level):
+        """Create a new chapter and add it to the novel.
+        
+        Positional arguments:
+            novel -- Novel instance to update.
+            chapterId: str -- ID of the chapter to create.
+            title: str -- title of the chapter to create.
+            desc: str -- description of the chapter to create.
+            level: int -- chapter level (part/chapter).           
+        """
+        newChapter = Chapter()
+        newChapter.title = title
+        newChapter.desc = desc
+        newChapter.chLevel = level
+        newChapter.chType = 0
+        novel.chapters[chapterId] = newChapter
+
+    def _create_scene(self, novel, sceneId, parent, splitCount, title, desc, text):
+        """Create a new scene and add it to the novel.
+        
+        Positional arguments:
+            novel -- Novel instance to update.
+            sceneId: str -- ID of the scene to create.
+            parent -- Scene instance: parent scene.
+            splitCount: int -- number of parent's splittings.
+            title: str -- title of the scene to create.
+            desc: str -- description of the scene to create.
+            text: str -- content of the scene to create.
+        """
+
+        # Mark metadata of split scenes.
+        newScene = Scene()
+        if title:
+            newScene.title = title
+        elif parent.title:
+            if len(parent.title) > self._CLIP_TITLE:
+                title = f'{parent.title[:self._CLIP_TITLE]}...'
+            else:
+                title = parent.title
+            newScene.title = f'{title} Split: {splitCount}'
+        else:
+            newScene.title = f'{_("New Scene")} Split: {splitCount}'
+        if desc:
+            newScene.desc = desc
+        if parent.desc and not parent.desc.startswith(self._WARNING):
+            parent.desc = f'{self._WARNING}{parent.desc}'
+        if parent.goal and not parent.goal.startswith(self._WARNING):
+            parent.goal = f'{self._WARNING}{parent.goal}'
+        if parent.conflict and not parent.conflict.startswith(self._WARNING):
+            parent.conflict = f'{self._WARNING}{parent.conflict}'
+        if parent.outcome and not parent.outcome.startswith(self._WARNING):
+            parent.outcome = f'{self._WARNING}{parent.outcome}'
+
+        # Reset the parent's status to Draft, if not Outline.
+        if parent.status > 2:
+            parent.status = 2
+        newScene.status = parent.status
+        newScene.scType = parent.scType
+        newScene.date = parent.date
+        newScene.time = parent.time
+        newScene.day = parent.day
+        newScene.lastsDays = parent.lastsDays
+        newScene.lastsHours = parent.lastsHours
+        newScene.lastsMinutes = parent.lastsMinutes
+        newScene.sceneContent = text
+        novel.scenes[sceneId] = newScene
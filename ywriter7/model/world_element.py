@@ -15,6 +15,7 @@ class WorldElement(BasicElement):
         tags -- list of tags.
         aka: str -- alternate name.
     """
+    __slots__ = ('image', 'tags', 'aka')
 
     def __init__(self):
         """Initialize instance variables.
@@ -16,8 +16,22 @@ __all__ = ['Error',
            'norm_path',
            'string_to_list',
            'list_to_string',
+           'CHAPTER_PREFIX',
+           'SCENE_PREFIX',
+           'CHARACTER_PREFIX',
+           'LOCATION_PREFIX',
+           'ITEM_PREFIX',
+           'PRJ_NOTE_PREFIX',
            ]
 
+#--- Element type prefixes.
+CHAPTER_PREFIX = 'ch'
+SCENE_PREFIX = 'sc'
+CHARACTER_PREFIX = 'cr'
+LOCATION_PREFIX = 'lc'
+ITEM_PREFIX = 'it'
+PRJ_NOTE_PREFIX = 'pn'
+
 
 class Error(Exception):
     """Base class for exceptions."""
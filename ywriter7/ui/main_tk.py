@@ -12,6 +12,7 @@ from ..pywriter_globals import *
 from .ui import Ui
 from ..model.novel import Novel
 from ..yw.yw7_file import Yw7File
+from ..yw.yw7_index import Yw7Index
 
 
 class MainTk(Ui):
@@ -59,6 +60,7 @@ class MainTk(Ui):
          
         Processed keyword arguments:
             yw_last_open: str -- initial file.
+            yw_index: bool -- if True, open yWriter 7 projects using a sidecar index.
             root_geometry: str -- geometry of the root window.
         
         Operation:
@@ -168,7 +170,10 @@ class MainTk(Ui):
         self.novel = Novel()
         self.prjFile.novel = self.novel
         try:
-            self.prjFile.read()
+            if self.kwargs.get('yw_index', False) and isinstance(self.prjFile, Yw7File):
+                Yw7Index(fileName).read_project(self.prjFile)
+            else:
+                self.prjFile.read()
         except Error as ex:
             self.close_project()
             self.set_info_how(f'!{str(ex)}')
@@ -5,7 +5,10 @@ Modules:
 data_files -- Provide a class for yWriter XML data files.
 xml_indent -- Helper module for xml pretty printing.
 yw7_file -- Provide a class for yWriter 7 project import and export.
+yw7_index -- Provide a class for a yWriter 7 project's sidecar index.
+yw7_journal -- Provide a class for a yWriter 7 project's edit journal.
 yw7_purge -- Helper module for removing PyWriter specific data.
+yw7_revisions -- Provide a class for a yWriter 7 project's scene revision store.
 
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
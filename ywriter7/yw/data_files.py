@@ -5,7 +5,7 @@ For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from ..pywriter_globals import *
 from .yw7_file import Yw7File
 
@@ -16,27 +16,32 @@ class DataFiles(Yw7File):
     yWriter can import or export characters, locations and items as separate
     xml files. This class represents a set of three xml files generated from
     a yWriter 7 project.
+
+    Public instance variables:
+        concurrent: bool -- if True, write the three xml files concurrently.
     """
     DESCRIPTION = _('yWriter XML data files')
     EXTENSION = '.xml'
+    _DATA_FILES = (
+        ('CHARACTERS', '_Characters.xml'),
+        ('LOCATIONS', '_Locations.xml'),
+        ('ITEMS', '_Items.xml'),
+        )
+    # (xml subtree tag, file name suffix)
 
-    def _postprocess_xml_file(self, filePath):
-        '''Postprocess three xml files created by ElementTree.
-        
-        Positional argument:
-            filePath: str -- path to .yw7 xml file.
+    def __init__(self, filePath, **kwargs):
+        """Initialize instance variables.
+
+        Positional arguments:
+            filePath: str -- path to the file represented by the DataFiles instance.
             
-        Generate the xml file paths from the .yw7 path. 
-        Read, postprocess and write the characters, locations, and items xml files.        
-        Extends the superclass method.
-        '''
-        path, __ = os.path.splitext(filePath)
-        characterPath = f'{path}_Characters.xml'
-        super()._postprocess_xml_file(characterPath)
-        locationPath = f'{path}_Locations.xml'
-        super()._postprocess_xml_file(locationPath)
-        itemPath = f'{path}_Items.xml'
-        super()._postprocess_xml_file(itemPath)
+        Optional arguments:
+            concurrent: bool -- if True, write the three xml files concurrently. Default: False.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(filePath, **kwargs)
+        self.concurrent = kwargs.get('concurrent', False)
 
     def _write_element_tree(self, ywProject):
         """Save the characters/locations/items subtrees as separate xml files
@@ -45,31 +50,19 @@ class DataFiles(Yw7File):
             ywProject -- Yw7File instance.
             
         Extract the characters/locations/items xml subtrees from a yWriter project.
-        Generate the xml file paths from the .yw7 path and write each subtree to an xml file.
+        Generate the xml file paths from the .yw7 path and serialize each subtree 
+        in a single pass to a temporary file, which then replaces the xml file. 
         Raise the "Error" exception in case of error. 
+        Overrides the superclass method.
         """
         path, __ = os.path.splitext(ywProject.filePath)
-        characterPath = f'{path}_Characters.xml'
-        characterSubtree = ywProject.tree.find('CHARACTERS')
-        characterTree = ET.ElementTree(characterSubtree)
-        try:
-            characterTree.write(characterPath, xml_declaration=False, encoding='utf-8')
-        except(PermissionError):
-            raise Error(f'{_("File is write protected")}: "{norm_path(characterPath)}".')
-
-        locationPath = f'{path}_Locations.xml'
-        locationSubtree = ywProject.tree.find('LOCATIONS')
-        locationTree = ET.ElementTree(locationSubtree)
-        try:
-            locationTree.write(locationPath, xml_declaration=False, encoding='utf-8')
-        except(PermissionError):
-            raise Error(f'{_("File is write protected")}: "{norm_path(locationPath)}".')
-
-        itemPath = f'{path}_Items.xml'
-        itemSubtree = ywProject.tree.find('ITEMS')
-        itemTree = ET.ElementTree(itemSubtree)
-        try:
-            itemTree.write(itemPath, xml_declaration=False, encoding='utf-8')
-        except(PermissionError):
-            raise Error(f'{_("File is write protected")}: "{norm_path(itemPath)}".')
-
+        dataFiles = [(ywProject.tree.find(tag), f'{path}{suffix}') for tag, suffix in self._DATA_FILES]
+        if self.concurrent:
+            with ThreadPoolExecutor(max_workers=len(dataFiles)) as executor:
+                futures = [executor.submit(self._write_xml_file, subtree, filePath, False)
+                           for subtree, filePath in dataFiles]
+                for future in futures:
+                    future.result()
+        else:
+            for subtree, filePath in dataFiles:
+                self._write_xml_file(subtree, filePath, backup=False)
@@ -6,20 +6,22 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 
 
-def indent(elem, level=0):
+def indent(elem, level=0, depth=None):
     """xml pretty printer
 
     Kudos to to Fredrik Lundh. 
     Source: http://effbot.org/zone/element-lib.htm#prettyprint
+    
+    If depth is given, the children of elements at this level are left as they are.
     """
     i = f'\n{level * "  "}'
-    if len(elem):
+    if len(elem) and (depth is None or level < depth):
         if not elem.text or not elem.text.strip():
             elem.text = f'{i}  '
         if not elem.tail or not elem.tail.strip():
             elem.tail = i
         for elem in elem:
-            indent(elem, level + 1)
+            indent(elem, level + 1, depth)
         if not elem.tail or not elem.tail.strip():
             elem.tail = i
     else:
@@ -8,6 +8,8 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import re
+from functools import partial
+from sys import intern
 from html import unescape
 from datetime import datetime
 import xml.etree.ElementTree as ET
@@ -15,11 +17,24 @@ from ..pywriter_globals import *
 from ..file.file import File
 from ..file.file_export import FileExport
 from ..model.novel import Novel
+from ..model.basic_element import BasicElement
+from ..model.basic_element import CHANGE_COUNTER
 from ..model.chapter import Chapter
 from ..model.scene import Scene
 from ..model.character import Character
 from ..model.world_element import WorldElement
 from ..model.project_note import ProjectNote
+from ..model.id_generator import create_id
+from .xml_indent import indent
+from .yw7_journal import Yw7Journal
+
+CONTROL_CHARACTERS = re.compile('[\x00-\x08|\x0b-\x0c|\x0e-\x1f]')
+CONTROL_BYTES = re.compile(b'[\x00-\x08|\x0b-\x0c|\x0e-\x1f]')
+# to be removed from the xml data before parsing
+
+SCENE_CONTENT_START = b'<SceneContent><![CDATA['
+SCENE_CONTENT_END = b']]></SceneContent>'
+# Scene content as written by yWriter and by the Yw7File class
 
 
 class Yw7File(File):
@@ -27,12 +42,18 @@ class Yw7File(File):
 
     Public methods:
         adjust_scene_types() -- Make sure that scenes in non-"Normal" chapters inherit the chapter's type.
+        discard_tree() -- release the xml element tree until the next write.
         is_locked() -- check whether the yw7 file is locked by yWriter.
+        journal_change(elemType, elemId) -- append an element change to the edit journal.
         read() -- parse the yWriter xml file and get the instance variables.
+        replay_journal() -- apply the changes recorded in the edit journal.
+        set_lazy_content(scId, offset, length) -- make a scene read its content from the file on first access.
         write() -- write instance variables to the yWriter xml file.
 
     Public instance variables:
         tree -- xml element tree of the yWriter project
+        contentSource -- tuple: (path, (mtime, size)) of the file the lazy scene contents are read from.
+        contentOffsets -- dict: key: scene ID, value: (byte offset, byte length) of a lazy scene content.
         
     Public class constants:
         PRJ_KWVAR -- List of the names of the project keyword variables.
@@ -40,6 +61,10 @@ class Yw7File(File):
     """
     DESCRIPTION = _('yWriter 7 project')
     EXTENSION = '.yw7'
+    _CHUNK_SIZE = 0x40000
+    # Number of characters to be parsed at a time.
+    _SYNC_CONTAINERS = ('kwVar', 'tags', 'characters', 'locations', 'items', 'srtScenes')
+    # Element attributes that may be changed in place
     _CDATA_TAGS = [
         'Title',
         'AuthorName',
@@ -85,6 +110,34 @@ class Yw7File(File):
         'Field_SceneArcs',
         'Field_SceneMode',
         ]
+    _SCN_TEXT_TAGS = {
+        'Title': 'title',
+        'Desc': 'desc',
+        'Notes': 'notes',
+        'Field1': 'field1',
+        'Field2': 'field2',
+        'Field3': 'field3',
+        'Field4': 'field4',
+        'LastsDays': 'lastsDays',
+        'LastsHours': 'lastsHours',
+        'LastsMinutes': 'lastsMinutes',
+        'Goal': 'goal',
+        'Conflict': 'conflict',
+        'Outcome': 'outcome',
+        'ImageFile': 'image',
+        }
+    # key: xml tag, value: Scene attribute set to the element's text
+    _SCN_FLAG_TAGS = {
+        'AppendToPrev': 'appendToPrev',
+        'ReactionScene': 'isReactionScene',
+        'SubPlot': 'isSubPlot',
+        }
+    # key: xml tag, value: Scene attribute set to True if the element exists
+    _CHP_TEXT_TAGS = {
+        'Title': 'title',
+        'Desc': 'desc',
+        }
+    # key: xml tag, value: Chapter attribute set to the element's text
     CRT_KWVAR = [
         'Field_Link',
         'Field_BirthDate',
@@ -110,6 +163,30 @@ class Yw7File(File):
         """
         super().__init__(filePath)
         self.tree = None
+        self._treeDiscarded = False
+        # True, if the xml element tree is to be parsed again before writing
+        self.contentSource = None
+        self.contentOffsets = {}
+        self._syncTree = None
+        self._syncNovel = None
+        self._syncStamp = 0
+        self._syncRecords = {}
+        # The state of the elements when the xml tree was last built
+        self._journal = None
+        self._journalBase = None
+        # Signature of the file the novel's journaled changes apply to
+        self._sceneReaders = {
+            'Status': self._read_scene_status,
+            'Tags': self._read_scene_tags,
+            'Characters': self._read_scene_characters,
+            'Locations': self._read_scene_locations,
+            'Items': self._read_scene_items,
+            }
+        self._chapterReaders = {
+            'SectionStart': self._read_chapter_section_start,
+            'Scenes': self._read_chapter_scenes,
+            }
+        # Readers of the scene and chapter child elements; key: xml tag
 
     def adjust_scene_types(self):
         """Make sure that scenes in non-"Normal" chapters inherit the chapter's type."""
@@ -118,6 +195,15 @@ class Yw7File(File):
                 for scId in self.novel.chapters[chId].srtScenes:
                     self.novel.scenes[scId].scType = self.novel.chapters[chId].chType
 
+    def discard_tree(self):
+        """Release the xml element tree of the novel just read.
+        
+        The tree is parsed again from the yw7 file before the next write, so the 
+        data not represented by the novel, e.g. unknown xml elements, is kept.
+        """
+        self.tree = None
+        self._treeDiscarded = True
+
     def is_locked(self):
         """Check whether the yw7 file is locked by yWriter.
         
@@ -126,9 +212,29 @@ class Yw7File(File):
         """
         return os.path.isfile(f'{self.filePath}.lock')
 
-    def read(self):
+    def read(self, keep_tree=True, lazy_content=False, replay_journal=True):
         """Parse the yWriter xml file and get the instance variables.
         
+        Optional arguments:
+            keep_tree: bool -- if False, discard the xml elements once they are read.
+            lazy_content: bool -- if True, load the scene contents on first access.
+            replay_journal: bool -- if True, apply the changes recorded in the edit journal.
+        
+        The file is parsed incrementally, and the model elements are built while
+        their xml elements are being closed. With keep_tree=False, the parsed xml 
+        elements are discarded, so the peak memory does not depend on the project size.
+        In this case, the tree attribute is None, and the tree is parsed again
+        before the next write(); see discard_tree().
+        
+        With lazy_content=True, the scene contents of an utf-8 encoded file are skipped
+        when parsing; only their positions in the file are recorded. The word and letter
+        counts are taken from the xml file, if available. A scene's content is read from
+        the file when it is accessed for the first time. If the file has changed since,
+        accessing the scene content raises the "Error" exception.
+        
+        Changes recorded in the edit journal are applied after reading, 
+        so the novel is as it was when the last change was journaled.
+        
         Raise the "Error" exception in case of error. 
         Overrides the superclass method.
         """
@@ -139,32 +245,29 @@ class Yw7File(File):
         if self.is_locked():
             raise Error(f'{_("yWriter seems to be open. Please close first")}.')
         try:
-            try:
-                with open(self.filePath, 'r', encoding='utf-8') as f:
-                    xmlText = f.read()
-            except:
-                # yw7 file may be UTF-16 encoded, with a wrong XML header (yWriter for iOS)
-                with open(self.filePath, 'r', encoding='utf-16') as f:
-                    xmlText = f.read()
-        except:
-            try:
-                self.tree = ET.parse(self.filePath)
-            except Exception as ex:
-                raise Error(f'{_("Can not process file")} - {str(ex)}')
-
-        xmlText = re.sub('[\x00-\x08|\x0b-\x0c|\x0e-\x1f]', '', xmlText)
-        root = ET.fromstring(xmlText)
-        xmlText = None
-        # saving memory
-        self.tree = ET.ElementTree(root)
-        self._read_project(root)
-        self._read_locations(root)
-        self._read_items(root)
-        self._read_characters(root)
-        self._read_projectvars(root)
-        self._read_projectnotes(root)
-        self._read_scenes(root)
-        self._read_chapters(root)
+            root = None
+            if lazy_content:
+                try:
+                    root = self._parse_xml_file(None, keep_tree)
+                except ET.ParseError:
+                    # The file may not be utf-8 encoded; try again with complete parsing.
+                    pass
+            if root is None:
+                try:
+                    root = self._parse_xml_file('utf-8', keep_tree)
+                except UnicodeError:
+                    # yw7 file may be UTF-16 encoded, with a wrong XML header (yWriter for iOS)
+                    root = self._parse_xml_file('utf-16', keep_tree)
+        except Error:
+            raise
+        except Exception as ex:
+            raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        if keep_tree:
+            self.tree = ET.ElementTree(root)
+            self._treeDiscarded = False
+        else:
+            self.discard_tree()
         self.adjust_scene_types()
 
         #--- Set custom instance variables.
@@ -176,19 +279,60 @@ class Yw7File(File):
             except:
                 self.novel.scenes[scId].scnMode = None
 
+        if replay_journal:
+            self.replay_journal()
+
+    def replay_journal(self):
+        """Apply the changes recorded in the edit journal to the novel just read.
+        
+        If the journal applies to another version of the yw7 file, it is kept as a backup and ignored.
+        Return the number of changes applied.
+        Raise the "Error" exception in case of error. 
+        """
+        self._journalBase = self._get_file_signature()
+        return self._get_journal().replay(self.novel, self._journalBase)
+
+    def journal_change(self, elemType, elemId):
+        """Append an element change to the edit journal instead of rewriting the yw7 file.
+        
+        Positional arguments:
+            elemType: str -- SCENE_PREFIX for a scene content update,
+                             CHAPTER_PREFIX for a chapter added,
+                             PRJ_NOTE_PREFIX for a project note added.
+            elemId: str -- ID of the element.
+        
+        The novel must have been read or written by this instance.
+        The journal is replayed when reading, and discarded when writing the yw7 file.
+        Raise the "Error" exception, if the change cannot be journaled, 
+        or if the yw7 file has changed since reading.
+        """
+        if self.is_locked():
+            raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+
+        if self._journalBase is None or self._get_file_signature() != self._journalBase:
+            raise Error(f'{_("The file has changed since reading")}: "{norm_path(self.filePath)}".')
+
+        self._get_journal().append(self.novel, elemType, elemId, self._journalBase)
+
     def write(self):
         """Write instance variables to the yWriter xml file.
         
         Open the yWriter xml file located at filePath and replace the instance variables 
         not being None. Create new XML elements if necessary.
+        If the xml element tree has been discarded after reading, parse it again first.
         Raise the "Error" exception in case of error. 
         Overrides the superclass method.
         """
         if self.is_locked():
             raise Error(f'{_("yWriter seems to be open. Please close first")}.')
 
-        if self.novel.languages is None:
-            self.novel.get_languages()
+        if self._treeDiscarded and self.tree is None and os.path.isfile(self.filePath):
+            self.tree = self._read_tree()
+        self._treeDiscarded = False
+
+        self.novel.get_languages(load=False)
+        # Scene contents not loaded yet are not loaded for this;
+        # scenes not changed since the last call are not scanned again.
 
         #--- Get custom instance variables.
         for scId in self.novel.scenes:
@@ -202,10 +346,13 @@ class Yw7File(File):
             self.novel.scenes[scId].kwVar['Field_SceneStyle'] = None
         self._build_element_tree()
         self._write_element_tree(self)
-        self._postprocess_xml_file(self.filePath)
 
     def _build_element_tree(self):
-        """Modify the yWriter project attributes of an existing xml element tree."""
+        """Modify the yWriter project attributes of an existing xml element tree.
+        
+        If the tree was built by this method before, only the subtrees of elements 
+        changed since then are rebuilt. Otherwise, all subtrees are rebuilt.
+        """
 
         def set_element(parent, tag, text, index):
             subelement = parent.find(tag)
@@ -895,9 +1042,64 @@ class Yw7File(File):
             except:
                 pass
 
+        def build_scene(xmlScene, prjScn):
+            build_scene_subtree(xmlScene, prjScn)
+
+            # Modify the scene contents of an existing xml element tree.
+            if prjScn.sceneContent is not None:
+                xmlScene.find('SceneContent').text = prjScn.sceneContent
+            for tag in ('WordCount', 'LetterCount', 'RTFFile', 'BelongsToChID'):
+                try:
+                    xmlScene.remove(xmlScene.find(tag))
+                except:
+                    pass
+
+        def update_section(xmlSection, tag, elemType, srtIds, elements, build_subtree, reuse=False):
+            """Put the element subtrees into the section in sort order. 
+            
+            Positional arguments:
+                xmlSection -- xml section element.
+                tag: str -- xml tag of the section's element subtrees.
+                elemType: str -- element type prefix.
+                srtIds -- element IDs in sort order.
+                elements: dict -- element instances with element IDs as keys.
+                build_subtree -- function that writes an element to its xml subtree.
+                
+            Optional arguments:
+                reuse: bool -- if True, update changed subtrees instead of replacing them.
+            
+            Keep the subtrees of elements not changed since the last write.
+            """
+            xmlOldElements = {}
+            xmlOthers = []
+            for xmlElement in xmlSection:
+                if xmlElement.tag == tag:
+                    xmlOldElements[xmlElement.find('ID').text] = xmlElement
+                else:
+                    xmlOthers.append(xmlElement)
+            xmlSection[:] = xmlOthers
+            for elemId in srtIds:
+                element = elements[elemId]
+                xmlElement = xmlOldElements.get(elemId)
+                if xmlElement is not None and self._is_synced(elemType, elemId, element):
+                    syncRecords[elemType, elemId] = self._syncRecords[elemType, elemId]
+                else:
+                    if xmlElement is None or not reuse:
+                        xmlElement = ET.Element(tag)
+                        ET.SubElement(xmlElement, 'ID').text = elemId
+                    build_subtree(xmlElement, element)
+                    syncRecords[elemType, elemId] = self._get_sync_record(element)
+                    rebuilt.append(xmlElement)
+                xmlSection.append(xmlElement)
+
         TAG = 'YWRITER7'
-        xmlNewScenes = {}
-        xmlNewChapters = {}
+        syncTree = (self.tree is not None and self.tree is self._syncTree and self.novel is self._syncNovel)
+        if not syncTree:
+            self._syncRecords = {}
+        syncStamp = next(CHANGE_COUNTER)
+        syncRecords = {}
+        rebuilt = []
+        # The element subtrees built from scratch or updated
         try:
             # Try processing an existing tree.
             root = self.tree.getroot()
@@ -924,61 +1126,26 @@ class Yw7File(File):
         build_project_subtree(xmlProject)
 
         #--- Process Locations.
-
-        # Remove LOCATION entries in order to rewrite
-        # the LOCATIONS section in a modified sort order.
-        for xmlLoc in xmlLocations.findall('LOCATION'):
-            xmlLocations.remove(xmlLoc)
-
-        # Add the new XML location subtrees to the project tree.
-        for lcId in self.novel.srtLocations:
-            xmlLoc = ET.SubElement(xmlLocations, 'LOCATION')
-            ET.SubElement(xmlLoc, 'ID').text = lcId
-            build_location_subtree(xmlLoc, self.novel.locations[lcId])
+        update_section(xmlLocations, 'LOCATION', LOCATION_PREFIX,
+                       self.novel.srtLocations, self.novel.locations, build_location_subtree)
 
         #--- Process Items.
-
-        # Remove ITEM entries in order to rewrite
-        # the ITEMS section in a modified sort order.
-        for xmlItm in xmlItems.findall('ITEM'):
-            xmlItems.remove(xmlItm)
-
-        # Add the new XML item subtrees to the project tree.
-        for itId in self.novel.srtItems:
-            xmlItm = ET.SubElement(xmlItems, 'ITEM')
-            ET.SubElement(xmlItm, 'ID').text = itId
-            build_item_subtree(xmlItm, self.novel.items[itId])
+        update_section(xmlItems, 'ITEM', ITEM_PREFIX,
+                       self.novel.srtItems, self.novel.items, build_item_subtree)
 
         #--- Process Characters.
-
-        # Remove CHARACTER entries in order to rewrite
-        # the CHARACTERS section in a modified sort order.
-        for xmlCrt in xmlCharacters.findall('CHARACTER'):
-            xmlCharacters.remove(xmlCrt)
-
-        # Add the new XML character subtrees to the project tree.
-        for crId in self.novel.srtCharacters:
-            xmlCrt = ET.SubElement(xmlCharacters, 'CHARACTER')
-            ET.SubElement(xmlCrt, 'ID').text = crId
-            build_character_subtree(xmlCrt, self.novel.characters[crId])
+        update_section(xmlCharacters, 'CHARACTER', CHARACTER_PREFIX,
+                       self.novel.srtCharacters, self.novel.characters, build_character_subtree)
 
         #--- Process project notes.
-
-        # Remove PROJECTNOTE entries in order to rewrite
-        # the PROJECTNOTES section in a modified sort order.
         if xmlProjectnotes is not None:
-            for xmlProjectnote in xmlProjectnotes.findall('PROJECTNOTE'):
-                xmlProjectnotes.remove(xmlProjectnote)
             if not self.novel.srtPrjNotes:
                 root.remove(xmlProjectnotes)
         elif self.novel.srtPrjNotes:
             xmlProjectnotes = ET.SubElement(root, 'PROJECTNOTES')
         if self.novel.srtPrjNotes:
-            # Add the new XML prjNote subtrees to the project tree.
-            for pnId in self.novel.srtPrjNotes:
-                xmlProjectnote = ET.SubElement(xmlProjectnotes, 'PROJECTNOTE')
-                ET.SubElement(xmlProjectnote, 'ID').text = pnId
-                build_prjNote_subtree(xmlProjectnote, self.novel.projectNotes[pnId])
+            update_section(xmlProjectnotes, 'PROJECTNOTE', PRJ_NOTE_PREFIX,
+                           self.novel.srtPrjNotes, self.novel.projectNotes, build_prjNote_subtree)
 
         #--- Process project variables.
         xmlProjectvars = root.find('PROJECTVARS')
@@ -1034,63 +1201,28 @@ class Yw7File(File):
                 # adding new IDs to the prjVars list
 
         #--- Process scenes.
-
-        # Save the original XML scene subtrees
-        # and remove them from the project tree.
-        for xmlScene in xmlScenes.findall('SCENE'):
-            scId = xmlScene.find('ID').text
-            xmlNewScenes[scId] = xmlScene
-            xmlScenes.remove(xmlScene)
-
-        # Add the new XML scene subtrees to the project tree.
-        for scId in self.novel.scenes:
-            if not scId in xmlNewScenes:
-                xmlNewScenes[scId] = ET.Element('SCENE')
-                ET.SubElement(xmlNewScenes[scId], 'ID').text = scId
-            build_scene_subtree(xmlNewScenes[scId], self.novel.scenes[scId])
-            xmlScenes.append(xmlNewScenes[scId])
+        update_section(xmlScenes, 'SCENE', SCENE_PREFIX,
+                       self.novel.scenes, self.novel.scenes, build_scene, True)
 
         #--- Process chapters.
-
-        # Save the original XML chapter subtree
-        # and remove it from the project tree.
-        for xmlChapter in xmlChapters.findall('CHAPTER'):
-            chId = xmlChapter.find('ID').text
-            xmlNewChapters[chId] = xmlChapter
-            xmlChapters.remove(xmlChapter)
-
-        # Add the new XML chapter subtrees to the project tree.
-        for chId in self.novel.srtChapters:
-            if not chId in xmlNewChapters:
-                xmlNewChapters[chId] = ET.Element('CHAPTER')
-                ET.SubElement(xmlNewChapters[chId], 'ID').text = chId
-            build_chapter_subtree(xmlNewChapters[chId], self.novel.chapters[chId])
-            xmlChapters.append(xmlNewChapters[chId])
-
-        # Modify the scene contents of an existing xml element tree.
-        for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            if self.novel.scenes[scId].sceneContent is not None:
-                xmlScene.find('SceneContent').text = self.novel.scenes[scId].sceneContent
-            try:
-                xmlScene.remove(xmlScene.find('WordCount'))
-            except:
-                pass
-            try:
-                xmlScene.remove(xmlScene.find('LetterCount'))
-            except:
-                pass
-            try:
-                xmlScene.remove(xmlScene.find('RTFFile'))
-            except:
-                pass
-            try:
-                xmlScene.remove(xmlScene.find('BelongsToChID'))
-            except:
-                pass
-
-        indent(root)
+        update_section(xmlChapters, 'CHAPTER', CHAPTER_PREFIX,
+                       self.novel.srtChapters, self.novel.chapters, build_chapter_subtree, True)
+
+        if syncTree:
+            # Only the rebuilt subtrees need full indentation.
+            indent(xmlProject, 1)
+            if xmlProjectvars is not None:
+                indent(xmlProjectvars, 1)
+            for xmlElement in rebuilt:
+                indent(xmlElement, 2)
+            indent(root, depth=2)
+        else:
+            indent(root)
         self.tree = ET.ElementTree(root)
+        self._syncTree = self.tree
+        self._syncNovel = self.novel
+        self._syncStamp = syncStamp
+        self._syncRecords = syncRecords
 
     def _convert_from_yw(self, text, quick=False):
         """Return text without markup, converted to target format.
@@ -1153,6 +1285,218 @@ class Yw7File(File):
         except:
             raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
 
+    def _parse_xml_file(self, encoding, keepTree):
+        """Parse the yWriter xml file incrementally and get the instance variables.
+        
+        Positional arguments:
+            encoding: str -- the file's encoding. If None, skip the scene contents of an utf-8 file.
+            keepTree: bool -- if False, discard the xml elements once they are read.
+            
+        Read the file in chunks, remove control characters, and build the novel's 
+        elements as soon as the corresponding xml elements are complete.
+        Return the xml root element.
+        """
+        sectionReaders = {
+            'PROJECT': self._read_project,
+            'PROJECTVARS': self._read_projectvars,
+            }
+        elementReaders = {
+            'LOCATION': self._read_location,
+            'ITEM': self._read_item,
+            'CHARACTER': self._read_character,
+            'PROJECTNOTE': self._read_projectnote,
+            'SCENE': self._read_scene,
+            'CHAPTER': self._read_chapter,
+            }
+        self.novel.srtLocations = []
+        self.novel.srtItems = []
+        self.novel.srtCharacters = []
+        self.novel.srtPrjNotes = []
+        self.novel.srtChapters = []
+        # This is necessary for re-reading.
+        self.contentSource = None
+        self.contentOffsets = {}
+        self._syncTree = None
+        self._syncRecords = {}
+
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        xmlPath = []
+        # The open elements, beginning with the root element.
+        root = None
+        if encoding is None:
+            chunks = self._get_lazy_xml_chunks()
+        else:
+            chunks = self._get_xml_chunks(encoding)
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    if root is None:
+                        root = element
+                    xmlPath.append(element)
+                    continue
+
+                xmlPath.pop()
+                depth = len(xmlPath)
+                if depth == 1:
+                    if element.tag in sectionReaders:
+                        sectionReaders[element.tag](root)
+                elif depth == 2:
+                    if element.tag in elementReaders:
+                        elementReaders[element.tag](element)
+                        if not keepTree:
+                            xmlPath[-1].remove(element)
+        parser.close()
+        if root is None:
+            raise Error(_('No xml data found'))
+
+        return root
+
+    def _read_tree(self):
+        """Parse the yWriter xml file without getting the instance variables.
+        
+        Return the xml element tree.
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            try:
+                root = self._parse_tree('utf-8')
+            except UnicodeError:
+                # yw7 file may be UTF-16 encoded, with a wrong XML header (yWriter for iOS)
+                root = self._parse_tree('utf-16')
+        except Exception as ex:
+            raise Error(f'{_("Can not process file")} - {str(ex)}')
+
+        return ET.ElementTree(root)
+
+    def _parse_tree(self, encoding):
+        """Parse the yWriter xml file in chunks and return the xml root element."""
+        parser = ET.XMLParser()
+        for chunk in self._get_xml_chunks(encoding):
+            parser.feed(chunk)
+        return parser.close()
+
+    def _get_xml_chunks(self, encoding):
+        """Read the yWriter xml file in chunks and remove control characters.
+        
+        Positional arguments:
+            encoding: str -- the file's encoding.
+        
+        Yield strings to be parsed.
+        """
+        with open(self.filePath, 'r', encoding=encoding) as f:
+            while True:
+                chunk = f.read(self._CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                yield CONTROL_CHARACTERS.sub('', chunk)
+
+    def _get_lazy_xml_chunks(self):
+        """Read the yWriter xml file in chunks, skipping the scene contents.
+        
+        Yield utf-8 encoded chunks to be parsed, with control characters removed.
+        Each CDATA scene content is replaced by an empty SceneContent element 
+        with a "lazy" attribute, holding the content's byte offset and length.
+        """
+        stat = os.stat(self.filePath)
+        fileSignature = (stat.st_mtime_ns, stat.st_size)
+        self.contentSource = (self.filePath, fileSignature)
+        with open(self.filePath, 'rb') as f:
+            header = f.read(100)
+            if header[:2] in (b'\xff\xfe', b'\xfe\xff'):
+                raise ET.ParseError('utf-16 byte order mark')
+
+            declaration = re.match(rb'<\?xml[^>]*encoding=["\']([^"\']+)', header)
+            if declaration and declaration.group(1).lower() not in (b'utf-8', b'utf8'):
+                raise ET.ParseError('not utf-8 encoded')
+
+            f.seek(0)
+            buffer = b''
+            position = 0
+            # File position of the buffer start
+            eof = False
+            while not eof:
+                data = f.read(self._CHUNK_SIZE)
+                eof = not data
+                buffer += data
+                chunks = []
+                while True:
+                    start = buffer.find(SCENE_CONTENT_START)
+                    if start < 0:
+                        # Keep a possibly incomplete start tag in the buffer.
+                        if eof:
+                            keep = 0
+                        else:
+                            keep = min(len(buffer), len(SCENE_CONTENT_START) - 1)
+                        cut = len(buffer) - keep
+                        break
+
+                    contentStart = start + len(SCENE_CONTENT_START)
+                    end = buffer.find(SCENE_CONTENT_END, contentStart)
+                    if end < 0:
+                        # Keep the incomplete scene content in the buffer.
+                        if eof:
+                            cut = len(buffer)
+                        else:
+                            cut = start
+                        break
+
+                    chunks.append(buffer[:start])
+                    chunks.append(b'<SceneContent lazy="%d %d"/>' % (position + contentStart, end - contentStart))
+                    consumed = end + len(SCENE_CONTENT_END)
+                    position += consumed
+                    buffer = buffer[consumed:]
+                chunks.append(buffer[:cut])
+                position += cut
+                buffer = buffer[cut:]
+                yield CONTROL_BYTES.sub(b'', b''.join(chunks))
+
+    def set_lazy_content(self, scId, offset, length, wordCount=None, letterCount=None):
+        """Make a scene read its content from the file on first access.
+        
+        Positional arguments:
+            scId: str -- scene ID.
+            offset: int -- byte offset of the scene content in the file.
+            length: int -- byte length of the scene content.
+            
+        Optional arguments:
+            wordCount: int -- known word count of the scene content.
+            letterCount: int -- known letter count of the scene content.
+        
+        The content is read from the file specified by contentSource.
+        """
+        self.contentOffsets[scId] = (offset, length)
+        if length:
+            loader = partial(self._read_lazy_content, self.contentSource, offset, length)
+            self.novel.scenes[scId].set_content_loader(loader, wordCount, letterCount)
+
+    def _read_lazy_content(self, source, offset, length):
+        """Return a scene content skipped when parsing.
+        
+        Positional arguments:
+            source -- tuple: (path, (mtime, size)) of the parsed file.
+            offset: int -- byte offset of the scene content.
+            length: int -- byte length of the scene content.
+        
+        Raise the "Error" exception, if the file has changed since parsing.
+        """
+        filePath, fileSignature = source
+        try:
+            stat = os.stat(filePath)
+            if (stat.st_mtime_ns, stat.st_size) != fileSignature:
+                raise ValueError
+
+            with open(filePath, 'rb') as f:
+                f.seek(offset)
+                text = f.read(length).decode('utf-8')
+        except:
+            raise Error(f'{_("Cannot read scene content; the file has changed")}: "{norm_path(filePath)}".')
+
+        text = CONTROL_CHARACTERS.sub('', text)
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+        # Apply the xml parser's line end normalization.
+
     def _read_project(self, root):
         """Read attributes at project level from the xml element tree."""
         xmlProject = root.find('PROJECT')
@@ -1210,161 +1554,148 @@ class Yw7File(File):
         if self.novel.kwVar['Field_CountryCode']:
             self.novel.countryCode = self.novel.kwVar['Field_CountryCode']
 
-    def _read_locations(self, root):
-        """Read locations from the xml element tree."""
-        self.novel.srtLocations = []
-        # This is necessary for re-reading.
-        for xmlLocation in root.find('LOCATIONS'):
-            lcId = xmlLocation.find('ID').text
-            self.novel.srtLocations.append(lcId)
-            self.novel.locations[lcId] = WorldElement()
+    def _read_location(self, xmlLocation):
+        """Read a location from the xml element tree."""
+        lcId = intern(xmlLocation.find('ID').text)
+        self.novel.srtLocations.append(lcId)
+        self.novel.locations[lcId] = WorldElement()
 
-            if xmlLocation.find('Title') is not None:
-                self.novel.locations[lcId].title = xmlLocation.find('Title').text
+        if xmlLocation.find('Title') is not None:
+            self.novel.locations[lcId].title = xmlLocation.find('Title').text
 
-            if xmlLocation.find('ImageFile') is not None:
-                self.novel.locations[lcId].image = xmlLocation.find('ImageFile').text
+        if xmlLocation.find('ImageFile') is not None:
+            self.novel.locations[lcId].image = xmlLocation.find('ImageFile').text
 
-            if xmlLocation.find('Desc') is not None:
-                self.novel.locations[lcId].desc = xmlLocation.find('Desc').text
+        if xmlLocation.find('Desc') is not None:
+            self.novel.locations[lcId].desc = xmlLocation.find('Desc').text
 
-            if xmlLocation.find('AKA') is not None:
-                self.novel.locations[lcId].aka = xmlLocation.find('AKA').text
+        if xmlLocation.find('AKA') is not None:
+            self.novel.locations[lcId].aka = xmlLocation.find('AKA').text
 
-            if xmlLocation.find('Tags') is not None:
-                if xmlLocation.find('Tags').text is not None:
-                    tags = string_to_list(xmlLocation.find('Tags').text)
-                    self.novel.locations[lcId].tags = self._strip_spaces(tags)
+        if xmlLocation.find('Tags') is not None:
+            if xmlLocation.find('Tags').text is not None:
+                tags = string_to_list(xmlLocation.find('Tags').text)
+                self.novel.locations[lcId].tags = self._strip_spaces(tags)
 
-            #--- Initialize custom keyword variables.
+        #--- Initialize custom keyword variables.
+        for fieldName in self.LOC_KWVAR:
+            self.novel.locations[lcId].kwVar[fieldName] = None
+
+        #--- Read location custom fields.
+        for xmlLocationFields in xmlLocation.findall('Fields'):
             for fieldName in self.LOC_KWVAR:
-                self.novel.locations[lcId].kwVar[fieldName] = None
+                field = xmlLocationFields.find(fieldName)
+                if field is not None:
+                    self.novel.locations[lcId].kwVar[fieldName] = field.text
 
-            #--- Read location custom fields.
-            for xmlLocationFields in xmlLocation.findall('Fields'):
-                for fieldName in self.LOC_KWVAR:
-                    field = xmlLocationFields.find(fieldName)
-                    if field is not None:
-                        self.novel.locations[lcId].kwVar[fieldName] = field.text
+    def _read_item(self, xmlItem):
+        """Read an item from the xml element tree."""
+        itId = intern(xmlItem.find('ID').text)
+        self.novel.srtItems.append(itId)
+        self.novel.items[itId] = WorldElement()
 
-    def _read_items(self, root):
-        """Read items from the xml element tree."""
-        self.novel.srtItems = []
-        # This is necessary for re-reading.
-        for xmlItem in root.find('ITEMS'):
-            itId = xmlItem.find('ID').text
-            self.novel.srtItems.append(itId)
-            self.novel.items[itId] = WorldElement()
+        if xmlItem.find('Title') is not None:
+            self.novel.items[itId].title = xmlItem.find('Title').text
 
-            if xmlItem.find('Title') is not None:
-                self.novel.items[itId].title = xmlItem.find('Title').text
+        if xmlItem.find('ImageFile') is not None:
+            self.novel.items[itId].image = xmlItem.find('ImageFile').text
 
-            if xmlItem.find('ImageFile') is not None:
-                self.novel.items[itId].image = xmlItem.find('ImageFile').text
+        if xmlItem.find('Desc') is not None:
+            self.novel.items[itId].desc = xmlItem.find('Desc').text
 
-            if xmlItem.find('Desc') is not None:
-                self.novel.items[itId].desc = xmlItem.find('Desc').text
+        if xmlItem.find('AKA') is not None:
+            self.novel.items[itId].aka = xmlItem.find('AKA').text
 
-            if xmlItem.find('AKA') is not None:
-                self.novel.items[itId].aka = xmlItem.find('AKA').text
+        if xmlItem.find('Tags') is not None:
+            if xmlItem.find('Tags').text is not None:
+                tags = string_to_list(xmlItem.find('Tags').text)
+                self.novel.items[itId].tags = self._strip_spaces(tags)
 
-            if xmlItem.find('Tags') is not None:
-                if xmlItem.find('Tags').text is not None:
-                    tags = string_to_list(xmlItem.find('Tags').text)
-                    self.novel.items[itId].tags = self._strip_spaces(tags)
+        #--- Initialize custom keyword variables.
+        for fieldName in self.ITM_KWVAR:
+            self.novel.items[itId].kwVar[fieldName] = None
 
-            #--- Initialize custom keyword variables.
+        #--- Read item custom fields.
+        for xmlItemFields in xmlItem.findall('Fields'):
             for fieldName in self.ITM_KWVAR:
-                self.novel.items[itId].kwVar[fieldName] = None
+                field = xmlItemFields.find(fieldName)
+                if field is not None:
+                    self.novel.items[itId].kwVar[fieldName] = field.text
 
-            #--- Read item custom fields.
-            for xmlItemFields in xmlItem.findall('Fields'):
-                for fieldName in self.ITM_KWVAR:
-                    field = xmlItemFields.find(fieldName)
-                    if field is not None:
-                        self.novel.items[itId].kwVar[fieldName] = field.text
+    def _read_character(self, xmlCharacter):
+        """Read a character from the xml element tree."""
+        crId = intern(xmlCharacter.find('ID').text)
+        self.novel.srtCharacters.append(crId)
+        self.novel.characters[crId] = Character()
 
-    def _read_characters(self, root):
-        """Read characters from the xml element tree."""
-        self.novel.srtCharacters = []
-        # This is necessary for re-reading.
-        for xmlCharacter in root.find('CHARACTERS'):
-            crId = xmlCharacter.find('ID').text
-            self.novel.srtCharacters.append(crId)
-            self.novel.characters[crId] = Character()
+        if xmlCharacter.find('Title') is not None:
+            self.novel.characters[crId].title = xmlCharacter.find('Title').text
 
-            if xmlCharacter.find('Title') is not None:
-                self.novel.characters[crId].title = xmlCharacter.find('Title').text
+        if xmlCharacter.find('ImageFile') is not None:
+            self.novel.characters[crId].image = xmlCharacter.find('ImageFile').text
 
-            if xmlCharacter.find('ImageFile') is not None:
-                self.novel.characters[crId].image = xmlCharacter.find('ImageFile').text
+        if xmlCharacter.find('Desc') is not None:
+            self.novel.characters[crId].desc = xmlCharacter.find('Desc').text
 
-            if xmlCharacter.find('Desc') is not None:
-                self.novel.characters[crId].desc = xmlCharacter.find('Desc').text
+        if xmlCharacter.find('AKA') is not None:
+            self.novel.characters[crId].aka = xmlCharacter.find('AKA').text
 
-            if xmlCharacter.find('AKA') is not None:
-                self.novel.characters[crId].aka = xmlCharacter.find('AKA').text
+        if xmlCharacter.find('Tags') is not None:
+            if xmlCharacter.find('Tags').text is not None:
+                tags = string_to_list(xmlCharacter.find('Tags').text)
+                self.novel.characters[crId].tags = self._strip_spaces(tags)
 
-            if xmlCharacter.find('Tags') is not None:
-                if xmlCharacter.find('Tags').text is not None:
-                    tags = string_to_list(xmlCharacter.find('Tags').text)
-                    self.novel.characters[crId].tags = self._strip_spaces(tags)
+        if xmlCharacter.find('Notes') is not None:
+            self.novel.characters[crId].notes = xmlCharacter.find('Notes').text
 
-            if xmlCharacter.find('Notes') is not None:
-                self.novel.characters[crId].notes = xmlCharacter.find('Notes').text
+        if xmlCharacter.find('Bio') is not None:
+            self.novel.characters[crId].bio = xmlCharacter.find('Bio').text
 
-            if xmlCharacter.find('Bio') is not None:
-                self.novel.characters[crId].bio = xmlCharacter.find('Bio').text
+        if xmlCharacter.find('Goals') is not None:
+            self.novel.characters[crId].goals = xmlCharacter.find('Goals').text
 
-            if xmlCharacter.find('Goals') is not None:
-                self.novel.characters[crId].goals = xmlCharacter.find('Goals').text
+        if xmlCharacter.find('FullName') is not None:
+            self.novel.characters[crId].fullName = xmlCharacter.find('FullName').text
 
-            if xmlCharacter.find('FullName') is not None:
-                self.novel.characters[crId].fullName = xmlCharacter.find('FullName').text
+        if xmlCharacter.find('Major') is not None:
+            self.novel.characters[crId].isMajor = True
+        else:
+            self.novel.characters[crId].isMajor = False
 
-            if xmlCharacter.find('Major') is not None:
-                self.novel.characters[crId].isMajor = True
-            else:
-                self.novel.characters[crId].isMajor = False
+        #--- Initialize custom keyword variables.
+        for fieldName in self.CRT_KWVAR:
+            self.novel.characters[crId].kwVar[fieldName] = None
 
-            #--- Initialize custom keyword variables.
+        #--- Read character custom fields.
+        for xmlCharacterFields in xmlCharacter.findall('Fields'):
             for fieldName in self.CRT_KWVAR:
-                self.novel.characters[crId].kwVar[fieldName] = None
-
-            #--- Read character custom fields.
-            for xmlCharacterFields in xmlCharacter.findall('Fields'):
-                for fieldName in self.CRT_KWVAR:
-                    field = xmlCharacterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.characters[crId].kwVar[fieldName] = field.text
-
-    def _read_projectnotes(self, root):
-        """Read project notes from the xml element tree."""
-        self.novel.srtPrjNotes = []
-        # This is necessary for re-reading.
-
-        try:
-            for xmlProjectnote in root.find('PROJECTNOTES'):
-                if xmlProjectnote.find('ID') is not None:
-                    pnId = xmlProjectnote.find('ID').text
-                    self.novel.srtPrjNotes.append(pnId)
-                    self.novel.projectNotes[pnId] = BasicElement()
-                    if xmlProjectnote.find('Title') is not None:
-                        self.novel.projectNotes[pnId].title = xmlProjectnote.find('Title').text
-                    if xmlProjectnote.find('Desc') is not None:
-                        self.novel.projectNotes[pnId].desc = xmlProjectnote.find('Desc').text
-
-                #--- Initialize project note custom fields.
-                for fieldName in self.PNT_KWVAR:
-                    self.novel.projectNotes[pnId].kwVar[fieldName] = None
-
-                #--- Read project note custom fields.
-                for pnFields in xmlProjectnote.findall('Fields'):
-                    field = pnFields.find(fieldName)
-                    if field is not None:
-                        self.novel.projectNotes[pnId].kwVar[fieldName] = field.text
-        except:
-            pass
+                field = xmlCharacterFields.find(fieldName)
+                if field is not None:
+                    self.novel.characters[crId].kwVar[fieldName] = field.text
+
+    def _read_projectnote(self, xmlProjectnote):
+        """Read a project note from the xml element tree."""
+        if xmlProjectnote.find('ID') is None:
+            return
+
+        pnId = intern(xmlProjectnote.find('ID').text)
+        self.novel.srtPrjNotes.append(pnId)
+        self.novel.projectNotes[pnId] = BasicElement()
+        if xmlProjectnote.find('Title') is not None:
+            self.novel.projectNotes[pnId].title = xmlProjectnote.find('Title').text
+        if xmlProjectnote.find('Desc') is not None:
+            self.novel.projectNotes[pnId].desc = xmlProjectnote.find('Desc').text
+
+        #--- Initialize project note custom fields.
+        for fieldName in self.PNT_KWVAR:
+            self.novel.projectNotes[pnId].kwVar[fieldName] = None
+
+        #--- Read project note custom fields.
+        for pnFields in xmlProjectnote.findall('Fields'):
+            for fieldName in self.PNT_KWVAR:
+                field = pnFields.find(fieldName)
+                if field is not None:
+                    self.novel.projectNotes[pnId].kwVar[fieldName] = field.text
 
     def _read_projectvars(self, root):
         """Read relevant project variables from the xml element tree."""
@@ -1391,282 +1722,272 @@ class Yw7File(File):
         except:
             pass
 
-    def _read_scenes(self, root):
-        """ Read attributes at scene level from the xml element tree."""
-        for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            self.novel.scenes[scId] = Scene()
-
-            if xmlScene.find('Title') is not None:
-                self.novel.scenes[scId].title = xmlScene.find('Title').text
-
-            if xmlScene.find('Desc') is not None:
-                self.novel.scenes[scId].desc = xmlScene.find('Desc').text
-
-            if xmlScene.find('SceneContent') is not None:
-                sceneContent = xmlScene.find('SceneContent').text
-                if sceneContent is not None:
-                    self.novel.scenes[scId].sceneContent = sceneContent
-
-            #--- Read scene type.
-
-            # This is how yWriter 7.1.3.0 reads the scene type:
-            #
-            # Type   |<Unused>|Field_SceneType>|scType
-            #--------+--------+----------------+------
-            # Notes  | x      | 1              | 1
-            # Todo   | x      | 2              | 2
-            # Unused | -1     | N/A            | 3
-            # Unused | -1     | 0              | 3
-            # Normal | N/A    | N/A            | 0
-            # Normal | N/A    | 0              | 0
-
-            self.novel.scenes[scId].scType = 0
-
-            #--- Initialize custom keyword variables.
-            for fieldName in self.SCN_KWVAR:
-                self.novel.scenes[scId].kwVar[fieldName] = None
-
-            for xmlSceneFields in xmlScene.findall('Fields'):
-                #--- Read scene custom fields.
-                for fieldName in self.SCN_KWVAR:
-                    field = xmlSceneFields.find(fieldName)
-                    if field is not None:
-                        self.novel.scenes[scId].kwVar[fieldName] = field.text
-
-                # Read scene type, if any.
-                if xmlSceneFields.find('Field_SceneType') is not None:
-                    if xmlSceneFields.find('Field_SceneType').text == '1':
-                        self.novel.scenes[scId].scType = 1
-                    elif xmlSceneFields.find('Field_SceneType').text == '2':
-                        self.novel.scenes[scId].scType = 2
-            if xmlScene.find('Unused') is not None:
-                if self.novel.scenes[scId].scType == 0:
-                    self.novel.scenes[scId].scType = 3
-
-            # Export when RTF.
-            if xmlScene.find('ExportCondSpecific') is None:
-                self.novel.scenes[scId].doNotExport = False
-            elif xmlScene.find('ExportWhenRTF') is not None:
-                self.novel.scenes[scId].doNotExport = False
-            else:
-                self.novel.scenes[scId].doNotExport = True
-
-            if xmlScene.find('Status') is not None:
-                self.novel.scenes[scId].status = int(xmlScene.find('Status').text)
-
-            if xmlScene.find('Notes') is not None:
-                self.novel.scenes[scId].notes = xmlScene.find('Notes').text
-
-            if xmlScene.find('Tags') is not None:
-                if xmlScene.find('Tags').text is not None:
-                    tags = string_to_list(xmlScene.find('Tags').text)
-                    self.novel.scenes[scId].tags = self._strip_spaces(tags)
-
-            if xmlScene.find('Field1') is not None:
-                self.novel.scenes[scId].field1 = xmlScene.find('Field1').text
-
-            if xmlScene.find('Field2') is not None:
-                self.novel.scenes[scId].field2 = xmlScene.find('Field2').text
-
-            if xmlScene.find('Field3') is not None:
-                self.novel.scenes[scId].field3 = xmlScene.find('Field3').text
-
-            if xmlScene.find('Field4') is not None:
-                self.novel.scenes[scId].field4 = xmlScene.find('Field4').text
-
-            if xmlScene.find('AppendToPrev') is not None:
-                self.novel.scenes[scId].appendToPrev = True
-            else:
-                self.novel.scenes[scId].appendToPrev = False
-
-            #--- Scene start.
-            if xmlScene.find('SpecificDateTime') is not None:
-                dateTimeStr = xmlScene.find('SpecificDateTime').text
+    def _read_scene(self, xmlScene):
+        """Read attributes at scene level from the xml element tree.
+        
+        Iterate over the scene's child elements once, and dispatch them by tag.
+        Attributes that depend on several xml elements are set afterwards.
+        Like ElementTree's find(), use the first of several child elements with the same tag.
+        """
+        scene = Scene()
+
+        # This is how yWriter 7.1.3.0 reads the scene type:
+        #
+        # Type   |<Unused>|Field_SceneType>|scType
+        #--------+--------+----------------+------
+        # Notes  | x      | 1              | 1
+        # Todo   | x      | 2              | 2
+        # Unused | -1     | N/A            | 3
+        # Unused | -1     | 0              | 3
+        # Normal | N/A    | N/A            | 0
+        # Normal | N/A    | 0              | 0
+
+        scene.scType = 0
+        scene.appendToPrev = False
+        scene.isReactionScene = False
+        scene.isSubPlot = False
 
-                # Check SpecificDateTime for ISO compliance.
+        #--- Initialize custom keyword variables.
+        for fieldName in self.SCN_KWVAR:
+            scene.kwVar[fieldName] = None
+
+        xmlChildren = {}
+        for xmlChild in xmlScene:
+            tag = xmlChild.tag
+            if tag == 'Fields':
+                self._read_scene_fields(scene, xmlChild)
+            elif tag not in xmlChildren:
+                xmlChildren[tag] = xmlChild
+                if tag in self._SCN_TEXT_TAGS:
+                    setattr(scene, self._SCN_TEXT_TAGS[tag], xmlChild.text)
+                elif tag in self._SCN_FLAG_TAGS:
+                    setattr(scene, self._SCN_FLAG_TAGS[tag], True)
+                elif tag in self._sceneReaders:
+                    self._sceneReaders[tag](scene, xmlChild)
+
+        scId = intern(xmlChildren['ID'].text)
+        self.novel.scenes[scId] = scene
+
+        xmlSceneContent = xmlChildren.get('SceneContent')
+        if xmlSceneContent is not None:
+            lazyContent = xmlSceneContent.attrib.pop('lazy', None)
+            if lazyContent is not None:
+                offset, length = lazyContent.split()
                 try:
-                    dateTime = datetime.fromisoformat(dateTimeStr)
+                    wordCount = int(xmlChildren['WordCount'].text)
+                    letterCount = int(xmlChildren['LetterCount'].text)
                 except:
-                    self.novel.scenes[scId].date = ''
-                    self.novel.scenes[scId].time = ''
-                else:
-                    startDateTime = dateTime.isoformat().split('T')
-                    self.novel.scenes[scId].date = startDateTime[0]
-                    self.novel.scenes[scId].time = startDateTime[1]
+                    wordCount = None
+                    letterCount = None
+                self.set_lazy_content(scId, int(offset), int(length), wordCount, letterCount)
             else:
-                if xmlScene.find('Day') is not None:
-                    day = xmlScene.find('Day').text
-
-                    # Check if Day represents an integer.
-                    try:
-                        int(day)
-                    except ValueError:
-                        day = ''
-                    self.novel.scenes[scId].day = day
-
-                hasUnspecificTime = False
-                if xmlScene.find('Hour') is not None:
-                    hour = xmlScene.find('Hour').text.zfill(2)
-                    hasUnspecificTime = True
-                else:
-                    hour = '00'
-                if xmlScene.find('Minute') is not None:
-                    minute = xmlScene.find('Minute').text.zfill(2)
-                    hasUnspecificTime = True
-                else:
-                    minute = '00'
-                if hasUnspecificTime:
-                    self.novel.scenes[scId].time = f'{hour}:{minute}:00'
+                sceneContent = xmlSceneContent.text
+                if sceneContent is not None:
+                    scene.sceneContent = sceneContent
 
-            #--- Scene duration.
-            if xmlScene.find('LastsDays') is not None:
-                self.novel.scenes[scId].lastsDays = xmlScene.find('LastsDays').text
+        if 'Unused' in xmlChildren:
+            if scene.scType == 0:
+                scene.scType = 3
 
-            if xmlScene.find('LastsHours') is not None:
-                self.novel.scenes[scId].lastsHours = xmlScene.find('LastsHours').text
+        # Export when RTF.
+        if not 'ExportCondSpecific' in xmlChildren:
+            scene.doNotExport = False
+        elif 'ExportWhenRTF' in xmlChildren:
+            scene.doNotExport = False
+        else:
+            scene.doNotExport = True
 
-            if xmlScene.find('LastsMinutes') is not None:
-                self.novel.scenes[scId].lastsMinutes = xmlScene.find('LastsMinutes').text
+        #--- Scene start.
+        if 'SpecificDateTime' in xmlChildren:
+            dateTimeStr = xmlChildren['SpecificDateTime'].text
 
-            if xmlScene.find('ReactionScene') is not None:
-                self.novel.scenes[scId].isReactionScene = True
+            # Check SpecificDateTime for ISO compliance.
+            try:
+                dateTime = datetime.fromisoformat(dateTimeStr)
+            except:
+                scene.date = ''
+                scene.time = ''
             else:
-                self.novel.scenes[scId].isReactionScene = False
+                startDateTime = dateTime.isoformat().split('T')
+                scene.date = startDateTime[0]
+                scene.time = startDateTime[1]
+        else:
+            if 'Day' in xmlChildren:
+                day = xmlChildren['Day'].text
 
-            if xmlScene.find('SubPlot') is not None:
-                self.novel.scenes[scId].isSubPlot = True
+                # Check if Day represents an integer.
+                try:
+                    int(day)
+                except ValueError:
+                    day = ''
+                scene.day = day
+
+            hasUnspecificTime = False
+            if 'Hour' in xmlChildren:
+                hour = xmlChildren['Hour'].text.zfill(2)
+                hasUnspecificTime = True
             else:
-                self.novel.scenes[scId].isSubPlot = False
-
-            if xmlScene.find('Goal') is not None:
-                self.novel.scenes[scId].goal = xmlScene.find('Goal').text
-
-            if xmlScene.find('Conflict') is not None:
-                self.novel.scenes[scId].conflict = xmlScene.find('Conflict').text
-
-            if xmlScene.find('Outcome') is not None:
-                self.novel.scenes[scId].outcome = xmlScene.find('Outcome').text
-
-            if xmlScene.find('ImageFile') is not None:
-                self.novel.scenes[scId].image = xmlScene.find('ImageFile').text
-
-            if xmlScene.find('Characters') is not None:
-                for characters in xmlScene.find('Characters').iter('CharID'):
-                    crId = characters.text
-                    if crId in self.novel.srtCharacters:
-                        if self.novel.scenes[scId].characters is None:
-                            self.novel.scenes[scId].characters = []
-                        self.novel.scenes[scId].characters.append(crId)
-
-            if xmlScene.find('Locations') is not None:
-                for locations in xmlScene.find('Locations').iter('LocID'):
-                    lcId = locations.text
-                    if lcId in self.novel.srtLocations:
-                        if self.novel.scenes[scId].locations is None:
-                            self.novel.scenes[scId].locations = []
-                        self.novel.scenes[scId].locations.append(lcId)
-
-            if xmlScene.find('Items') is not None:
-                for items in xmlScene.find('Items').iter('ItemID'):
-                    itId = items.text
-                    if itId in self.novel.srtItems:
-                        if self.novel.scenes[scId].items is None:
-                            self.novel.scenes[scId].items = []
-                        self.novel.scenes[scId].items.append(itId)
-
-    def _read_chapters(self, root):
-        """Read attributes at chapter level from the xml element tree."""
-        self.novel.srtChapters = []
-        # This is necessary for re-reading.
-        for xmlChapter in root.find('CHAPTERS'):
-            chId = xmlChapter.find('ID').text
-            self.novel.chapters[chId] = Chapter()
-            self.novel.srtChapters.append(chId)
-
-            if xmlChapter.find('Title') is not None:
-                self.novel.chapters[chId].title = xmlChapter.find('Title').text
-
-            if xmlChapter.find('Desc') is not None:
-                self.novel.chapters[chId].desc = xmlChapter.find('Desc').text
-
-            if xmlChapter.find('SectionStart') is not None:
-                self.novel.chapters[chId].chLevel = 1
+                hour = '00'
+            if 'Minute' in xmlChildren:
+                minute = xmlChildren['Minute'].text.zfill(2)
+                hasUnspecificTime = True
             else:
-                self.novel.chapters[chId].chLevel = 0
+                minute = '00'
+            if hasUnspecificTime:
+                scene.time = f'{hour}:{minute}:00'
+
+    def _read_scene_fields(self, scene, xmlSceneFields):
+        """Read the scene's custom fields and the scene type from a "Fields" element."""
+        fields = {}
+        for field in xmlSceneFields:
+            fields.setdefault(field.tag, field.text)
+
+        #--- Read scene custom fields.
+        for fieldName in self.SCN_KWVAR:
+            if fieldName in fields:
+                scene.kwVar[fieldName] = fields[fieldName]
+
+        # Read scene type, if any.
+        if fields.get('Field_SceneType') == '1':
+            scene.scType = 1
+        elif fields.get('Field_SceneType') == '2':
+            scene.scType = 2
+
+    def _read_scene_status(self, scene, xmlStatus):
+        scene.status = int(xmlStatus.text)
+
+    def _read_scene_tags(self, scene, xmlTags):
+        if xmlTags.text is not None:
+            tags = string_to_list(xmlTags.text)
+            scene.tags = self._strip_spaces(tags)
+
+    def _read_scene_characters(self, scene, xmlCharacters):
+        characters = []
+        for xmlCharID in xmlCharacters.iter('CharID'):
+            crId = xmlCharID.text
+            if crId in self.novel.srtCharacters:
+                characters.append(intern(crId))
+        if characters:
+            scene.characters = characters
+
+    def _read_scene_locations(self, scene, xmlLocations):
+        locations = []
+        for xmlLocID in xmlLocations.iter('LocID'):
+            lcId = xmlLocID.text
+            if lcId in self.novel.srtLocations:
+                locations.append(intern(lcId))
+        if locations:
+            scene.locations = locations
+
+    def _read_scene_items(self, scene, xmlItems):
+        items = []
+        for xmlItemID in xmlItems.iter('ItemID'):
+            itId = xmlItemID.text
+            if itId in self.novel.srtItems:
+                items.append(intern(itId))
+        if items:
+            scene.items = items
+
+    def _read_chapter(self, xmlChapter):
+        """Read attributes at chapter level from the xml element tree.
+        
+        Iterate over the chapter's child elements once, and dispatch them by tag.
+        Attributes that depend on several xml elements are set afterwards.
+        Like ElementTree's find(), use the first of several child elements with the same tag.
+        """
+        chapter = Chapter()
+        chapter.chLevel = 0
+        chapter.srtScenes = []
 
-            # This is how yWriter 7.1.3.0 reads the chapter type:
-            #
-            # Type   |<Unused>|<Type>|<ChapterType>|chType
-            # -------+--------+------+--------------------
-            # Normal | N/A    | N/A  | N/A         | 0
-            # Normal | N/A    | 0    | N/A         | 0
-            # Notes  | x      | 1    | N/A         | 1
-            # Unused | -1     | 0    | N/A         | 3
-            # Normal | N/A    | x    | 0           | 0
-            # Notes  | x      | x    | 1           | 1
-            # Todo   | x      | x    | 2           | 2
-            # Unused | -1     | x    | x           | 3
-
-            self.novel.chapters[chId].chType = 0
-            if xmlChapter.find('Unused') is not None:
-                yUnused = True
-            else:
-                yUnused = False
-            if xmlChapter.find('ChapterType') is not None:
-                # The file may be created with yWriter version 7.0.7.2+
-                yChapterType = xmlChapter.find('ChapterType').text
-                if yChapterType == '2':
-                    self.novel.chapters[chId].chType = 2
-                elif yChapterType == '1':
-                    self.novel.chapters[chId].chType = 1
+        #--- Initialize custom keyword variables.
+        for fieldName in self.CHP_KWVAR:
+            chapter.kwVar[fieldName] = None
+
+        xmlChildren = {}
+        xmlFields = []
+        for xmlChild in xmlChapter:
+            tag = xmlChild.tag
+            if tag == 'Fields':
+                xmlFields.append(xmlChild)
+            elif tag not in xmlChildren:
+                xmlChildren[tag] = xmlChild
+                if tag in self._CHP_TEXT_TAGS:
+                    setattr(chapter, self._CHP_TEXT_TAGS[tag], xmlChild.text)
+                elif tag in self._chapterReaders:
+                    self._chapterReaders[tag](chapter, xmlChild)
+
+        chId = intern(xmlChildren['ID'].text)
+        self.novel.chapters[chId] = chapter
+        self.novel.srtChapters.append(chId)
+
+        # This is how yWriter 7.1.3.0 reads the chapter type:
+        #
+        # Type   |<Unused>|<Type>|<ChapterType>|chType
+        # -------+--------+------+--------------------
+        # Normal | N/A    | N/A  | N/A         | 0
+        # Normal | N/A    | 0    | N/A         | 0
+        # Notes  | x      | 1    | N/A         | 1
+        # Unused | -1     | 0    | N/A         | 3
+        # Normal | N/A    | x    | 0           | 0
+        # Notes  | x      | x    | 1           | 1
+        # Todo   | x      | x    | 2           | 2
+        # Unused | -1     | x    | x           | 3
+
+        chapter.chType = 0
+        yUnused = 'Unused' in xmlChildren
+        if 'ChapterType' in xmlChildren:
+            # The file may be created with yWriter version 7.0.7.2+
+            yChapterType = xmlChildren['ChapterType'].text
+            if yChapterType == '2':
+                chapter.chType = 2
+            elif yChapterType == '1':
+                chapter.chType = 1
+            elif yUnused:
+                chapter.chType = 3
+        else:
+            # The file may be created with a yWriter version prior to 7.0.7.2
+            if 'Type' in xmlChildren:
+                yType = xmlChildren['Type'].text
+                if yType == '1':
+                    chapter.chType = 1
                 elif yUnused:
-                    self.novel.chapters[chId].chType = 3
-            else:
-                # The file may be created with a yWriter version prior to 7.0.7.2
-                if xmlChapter.find('Type') is not None:
-                    yType = xmlChapter.find('Type').text
-                    if yType == '1':
-                        self.novel.chapters[chId].chType = 1
-                    elif yUnused:
-                        self.novel.chapters[chId].chType = 3
-
-            self.novel.chapters[chId].suppressChapterTitle = False
-            if self.novel.chapters[chId].title is not None:
-                if self.novel.chapters[chId].title.startswith('@'):
-                    self.novel.chapters[chId].suppressChapterTitle = True
-
-            #--- Initialize custom keyword variables.
-            for fieldName in self.CHP_KWVAR:
-                self.novel.chapters[chId].kwVar[fieldName] = None
-
-            #--- Read chapter fields.
-            for xmlChapterFields in xmlChapter.findall('Fields'):
-                if xmlChapterFields.find('Field_SuppressChapterTitle') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterTitle').text == '1':
-                        self.novel.chapters[chId].suppressChapterTitle = True
-                self.novel.chapters[chId].isTrash = False
-                if xmlChapterFields.find('Field_IsTrash') is not None:
-                    if xmlChapterFields.find('Field_IsTrash').text == '1':
-                        self.novel.chapters[chId].isTrash = True
-                self.novel.chapters[chId].suppressChapterBreak = False
-                if xmlChapterFields.find('Field_SuppressChapterBreak') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterBreak').text == '1':
-                        self.novel.chapters[chId].suppressChapterBreak = True
-
-                #--- Read chapter custom fields.
-                for fieldName in self.CHP_KWVAR:
-                    field = xmlChapterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.chapters[chId].kwVar[fieldName] = field.text
-
-            #--- Read chapter's scene list.
-            self.novel.chapters[chId].srtScenes = []
-            if xmlChapter.find('Scenes') is not None:
-                for scn in xmlChapter.find('Scenes').findall('ScID'):
-                    scId = scn.text
-                    if scId in self.novel.scenes:
-                        self.novel.chapters[chId].srtScenes.append(scId)
+                    chapter.chType = 3
+
+        chapter.suppressChapterTitle = False
+        if chapter.title is not None:
+            if chapter.title.startswith('@'):
+                chapter.suppressChapterTitle = True
+
+        #--- Read chapter fields.
+        for xmlChapterFields in xmlFields:
+            self._read_chapter_fields(chapter, xmlChapterFields)
+
+    def _read_chapter_fields(self, chapter, xmlChapterFields):
+        """Read the chapter's fields and custom fields from a "Fields" element."""
+        fields = {}
+        for field in xmlChapterFields:
+            fields.setdefault(field.tag, field.text)
+        if fields.get('Field_SuppressChapterTitle') == '1':
+            chapter.suppressChapterTitle = True
+        chapter.isTrash = fields.get('Field_IsTrash') == '1'
+        chapter.suppressChapterBreak = fields.get('Field_SuppressChapterBreak') == '1'
+
+        #--- Read chapter custom fields.
+        for fieldName in self.CHP_KWVAR:
+            if fieldName in fields:
+                chapter.kwVar[fieldName] = fields[fieldName]
+
+    def _read_chapter_section_start(self, chapter, xmlSectionStart):
+        chapter.chLevel = 1
+
+    def _read_chapter_scenes(self, chapter, xmlScenes):
+        """Read the chapter's scene list."""
+        srtScenes = []
+        for scn in xmlScenes.findall('ScID'):
+            scId = scn.text
+            if scId in self.novel.scenes:
+                srtScenes.append(intern(scId))
+        chapter.srtScenes = srtScenes
 
     def _strip_spaces(self, lines):
         """Local helper method.
@@ -1675,29 +1996,134 @@ class Yw7File(File):
             lines -- list of strings
 
         Return lines with leading and trailing spaces removed.
+        The lines are tags, so they are interned: scenes and world elements share them.
         """
         stripped = []
         for line in lines:
-            stripped.append(line.strip())
+            stripped.append(intern(line.strip()))
         return stripped
 
+    def _get_sync_record(self, element):
+        """Return the element's state to be compared by _is_synced().
+        
+        The record holds copies of the element's lists and dictionaries,
+        because changing them in place does not update the change stamp.
+        """
+        containers = []
+        for name in self._SYNC_CONTAINERS:
+            value = getattr(element, name, None)
+            if value is not None:
+                value = value.copy()
+            containers.append(value)
+        return element, tuple(containers)
+
+    def _is_synced(self, elemType, elemId, element):
+        """Return True if the element has not changed since its xml subtree was built."""
+        record = self._syncRecords.get((elemType, elemId))
+        if record is None or record[0] is not element or element.changeStamp > self._syncStamp:
+            return False
+
+        for name, value in zip(self._SYNC_CONTAINERS, record[1]):
+            if getattr(element, name, None) != value:
+                return False
+
+        return True
+
     def _write_element_tree(self, ywProject):
         """Write back the xml element tree to a .yw7 xml file located at filePath.
         
+        The written file includes all journaled changes, so the edit journal is discarded.
         Raise the "Error" exception in case of error. 
         """
-        backedUp = False
-        if os.path.isfile(ywProject.filePath):
-            try:
-                os.replace(ywProject.filePath, f'{ywProject.filePath}.bak')
-            except:
-                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(ywProject.filePath)}".')
+        self._write_xml_file(ywProject.tree.getroot(), ywProject.filePath)
+        self._get_journal().discard()
+        self._journalBase = self._get_file_signature()
+
+    def _get_journal(self):
+        """Return the edit journal of the yw7 file."""
+        if self._journal is None or self._journal.filePath != f'{self.filePath}{Yw7Journal.EXTENSION}':
+            self._journal = Yw7Journal(self.filePath)
+        return self._journal
+
+    def _get_file_signature(self):
+        """Return a tuple: (modification time, size) of the yw7 file."""
+        try:
+            stat = os.stat(self.filePath)
+        except OSError as ex:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _write_xml_file(self, root, filePath, backup=True):
+        """Serialize an xml element tree as a yWriter xml file.
+        
+        Positional arguments:
+            root -- root element of the xml tree to write.
+            filePath: str -- path to the xml file.
+        
+        Optional arguments:
+            backup: bool -- if True, keep the replaced xml file as a backup.
+        
+        Put a header on top and enclose the text of the _CDATA_TAGS elements in CDATA sections,
+        all in a single pass. The output is the same as if the tree was written by ElementTree
+        and then processed by _postprocess_xml_file().
+        Write to a temporary file first, then replace the xml file with a single rename.
+        Raise the "Error" exception in case of error. 
+        """
+
+        def fix_text(text):
+            # Apply the line feed translation and the replacements of _postprocess_xml_file().
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+            return text.replace('[CDATA[ \n', '[CDATA[').replace('\n]]', ']]')
+
+        def write_element(elem, closing=''):
+            # "closing" is markup that immediately follows the element's tail.
+            tag = elem.tag
+            if elem.attrib:
+                attributes = ''.join(f' {key}="{value}"' for key, value in elem.attrib.items())
             else:
-                backedUp = True
+                attributes = ''
+            text = elem.text
+            if text or len(elem):
+                isCdata = tag in cdataTags and not attributes
+                if isCdata:
+                    write(f'<{tag}{attributes}><!')
+                    if len(elem):
+                        write(fix_text(f'[CDATA[{text or ""}'))
+                        for child in elem[:-1]:
+                            write_element(child)
+                        write_element(elem[-1], ']]')
+                        write('>')
+                    else:
+                        write(fix_text(f'[CDATA[{text}]]'))
+                        write('>')
+                else:
+                    write(f'<{tag}{attributes}>')
+                    if text:
+                        write(fix_text(text))
+                    for child in elem:
+                        write_element(child)
+                write(f'</{tag}>')
+            elif tag == 'CHAPTERS' and not self.novel.chapters:
+                write('<CHAPTERS></CHAPTERS>')
+                # otherwise, yWriter fails to parse the file if there are no chapters.
+            else:
+                write(f'<{tag}{attributes} />')
+            if elem.tail or closing:
+                write(fix_text(f'{elem.tail or ""}{closing}'))
+
+        cdataTags = set(self._CDATA_TAGS)
+        tempPath = f'{filePath}.tmp'
         try:
-            ywProject.tree.write(ywProject.filePath, xml_declaration=False, encoding='utf-8')
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                write = f.write
+                write('<?xml version="1.0" encoding="utf-8"?>\n')
+                write_element(root)
         except:
-            if backedUp:
-                os.replace(f'{ywProject.filePath}.bak', ywProject.filePath)
-            raise Error(f'{_("Cannot write file")}: "{norm_path(ywProject.filePath)}".')
+            try:
+                os.remove(tempPath)
+            except:
+                pass
+            raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
 
+        self._replace_file(tempPath, filePath, backup)
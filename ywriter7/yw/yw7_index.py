@@ -0,0 +1,236 @@
+"""Provide a class for a yWriter 7 project's sidecar index.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from ..pywriter_globals import *
+from ..model.chapter import Chapter
+from ..model.scene import Scene
+from ..model.character import Character
+from ..model.world_element import WorldElement
+from ..model.project_note import ProjectNote
+
+
+class Yw7Index:
+    """yWriter 7 project sidecar index representation.
+
+    The index is a SQLite database next to the .yw7 file. It holds the novel's
+    attributes without the scene contents, the sort orders, and the byte positions
+    of the scene contents in the .yw7 file. It is valid as long as the .yw7 file's
+    content hash matches the hash stored in the index.
+
+    Public methods:
+        read(yw7File) -- get the yWriter project's instance variables from the index.
+        read_project(yw7File) -- read the yWriter project, using the index if possible.
+        write(yw7File) -- write the index of a yWriter project that has just been read.
+
+    Public instance variables:
+        filePath: str -- path to the index file.
+
+    Public class constants:
+        EXTENSION: str -- suffix appended to the .yw7 file path.
+        VERSION: int -- index format version.
+    """
+    EXTENSION = '.idx'
+    VERSION = 1
+    _CHUNK_SIZE = 0x100000
+    # Number of bytes to be hashed at a time.
+    _ELEMENTS = {
+        'CH': ('chapters', 'srtChapters', Chapter),
+        'SC': ('scenes', None, Scene),
+        'CR': ('characters', 'srtCharacters', Character),
+        'LC': ('locations', 'srtLocations', WorldElement),
+        'IT': ('items', 'srtItems', WorldElement),
+        'PN': ('projectNotes', 'srtPrjNotes', ProjectNote),
+        }
+    # key: element kind, value: (Novel collection, Novel sort order, element class)
+    _VOLATILE = ('_sceneContent', '_contentLoader', '_changeStamp', '_languages')
+    # Element attributes not stored in the index
+    _NOVEL_COLLECTIONS = (
+        'chapters', 'scenes', 'characters', 'locations', 'items', 'projectNotes',
+        'srtChapters', 'srtCharacters', 'srtLocations', 'srtItems', 'srtPrjNotes',
+        '_clients', '_idAllocators', '_sceneTable', '_sceneIndex', '_changeStamp',
+        )
+    # Novel attributes stored as elements, or not at all
+
+    def __init__(self, yw7Path):
+        """Set the index file path.
+
+        Positional arguments:
+            yw7Path: str -- path to the .yw7 file.
+        """
+        self.filePath = f'{yw7Path}{self.EXTENSION}'
+
+    def read_project(self, yw7File):
+        """Read the yWriter project, using the index if possible.
+
+        Positional arguments:
+            yw7File -- Yw7File instance with a Novel instance assigned.
+
+        If the index is missing or outdated, parse the .yw7 file with lazy scene
+        content loading, and write a new index. Failing to write the index is ignored.
+        The changes recorded in the .yw7 file's edit journal are applied afterwards, 
+        because the index represents the .yw7 file only.
+        Raise the "Error" exception in case of error.
+        """
+        if not self.read(yw7File):
+            yw7File.read(keep_tree=False, lazy_content=True, replay_journal=False)
+            try:
+                self.write(yw7File)
+            except Error:
+                pass
+        yw7File.replay_journal()
+
+    def read(self, yw7File):
+        """Get the yWriter project's instance variables from the index.
+
+        Positional arguments:
+            yw7File -- Yw7File instance with a Novel instance assigned.
+
+        The scene contents are read from the .yw7 file on first access.
+        The xml element tree is parsed from the .yw7 file before the next write.
+        Return True on success.
+        Return False, if the index is missing, invalid, or outdated.
+        Raise the "Error" exception, if the .yw7 file is locked by yWriter.
+        """
+        if yw7File.is_locked():
+            raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+
+        if not os.path.isfile(self.filePath):
+            return False
+
+        try:
+            stat = os.stat(yw7File.filePath)
+            fileHash = self._hash_file(yw7File.filePath)
+            db = sqlite3.connect(self.filePath)
+            try:
+                meta = dict(db.execute('SELECT key, value FROM meta'))
+                if meta.get('version') != str(self.VERSION) or meta.get('hash') != fileHash:
+                    return False
+
+                elements = db.execute('SELECT kind, id, position, state FROM elements').fetchall()
+                contents = db.execute('SELECT id, offset, length, content FROM contents').fetchall()
+            finally:
+                db.close()
+        except (OSError, sqlite3.Error):
+            return False
+
+        novel = yw7File.novel
+        self._set_state(novel, json.loads(meta['novel']))
+        sortOrders = {}
+        for kind, elemId, position, state in elements:
+            collection, sortOrder, elementClass = self._ELEMENTS[kind]
+            element = elementClass()
+            self._set_state(element, json.loads(state))
+            getattr(novel, collection)[elemId] = element
+            if sortOrder is not None:
+                sortOrders.setdefault(sortOrder, []).append((position, elemId))
+        for collection, sortOrder, __ in self._ELEMENTS.values():
+            if sortOrder is not None:
+                setattr(novel, sortOrder, [elemId for __, elemId in sorted(sortOrders.get(sortOrder, []))])
+
+        yw7File.discard_tree()
+        yw7File.contentSource = (yw7File.filePath, (stat.st_mtime_ns, stat.st_size))
+        yw7File.contentOffsets = {}
+        for scId, offset, length, content in contents:
+            scene = novel.scenes[scId]
+            if offset is None:
+                if content is not None:
+                    scene.sceneContent = content
+            else:
+                yw7File.set_lazy_content(scId, offset, length, scene.wordCount, scene.letterCount)
+        return True
+
+    def write(self, yw7File):
+        """Write the index of a yWriter project that has just been read.
+
+        Positional arguments:
+            yw7File -- Yw7File instance with a Novel instance assigned.
+
+        The novel must represent the .yw7 file as it is on disk.
+        Unknown word and letter counts are determined by loading the scene contents.
+        Raise the "Error" exception in case of error.
+        """
+        novel = yw7File.novel
+        if yw7File.contentSource is not None:
+            stat = os.stat(yw7File.filePath)
+            if (stat.st_mtime_ns, stat.st_size) != yw7File.contentSource[1]:
+                raise Error(f'{_("The file has changed since reading")}: "{norm_path(yw7File.filePath)}".')
+
+        elements = []
+        for kind, (collection, sortOrder, __) in self._ELEMENTS.items():
+            if sortOrder is None:
+                positions = {}
+            else:
+                positions = {elemId: i for i, elemId in enumerate(getattr(novel, sortOrder))}
+            for elemId, element in getattr(novel, collection).items():
+                if kind == 'SC' and elemId in yw7File.contentOffsets:
+                    # Unknown counts load the content; release it after counting.
+                    wordCount = element.wordCount
+                    letterCount = element.letterCount
+                    if element.contentLoaded:
+                        offset, length = yw7File.contentOffsets[elemId]
+                        yw7File.set_lazy_content(elemId, offset, length, wordCount, letterCount)
+                state = self._get_state(element, self._VOLATILE)
+                elements.append((kind, elemId, positions.get(elemId), json.dumps(state)))
+
+        contents = []
+        for scId, scene in novel.scenes.items():
+            if scId in yw7File.contentOffsets:
+                offset, length = yw7File.contentOffsets[scId]
+                contents.append((scId, offset, length, None))
+            else:
+                contents.append((scId, None, None, scene.sceneContent))
+
+        meta = [
+            ('version', str(self.VERSION)),
+            ('novel', json.dumps(self._get_state(novel, self._NOVEL_COLLECTIONS))),
+            ]
+        tempPath = f'{self.filePath}.tmp'
+        try:
+            meta.append(('hash', self._hash_file(yw7File.filePath)))
+            if os.path.isfile(tempPath):
+                os.remove(tempPath)
+            db = sqlite3.connect(tempPath)
+            try:
+                db.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+                db.execute('CREATE TABLE elements (kind TEXT, id TEXT, position INTEGER, state TEXT, PRIMARY KEY (kind, id))')
+                db.execute('CREATE TABLE contents (id TEXT PRIMARY KEY, offset INTEGER, length INTEGER, content TEXT)')
+                db.executemany('INSERT INTO meta VALUES (?, ?)', meta)
+                db.executemany('INSERT INTO elements VALUES (?, ?, ?, ?)', elements)
+                db.executemany('INSERT INTO contents VALUES (?, ?, ?, ?)', contents)
+                db.commit()
+            finally:
+                db.close()
+            os.replace(tempPath, self.filePath)
+        except (OSError, sqlite3.Error) as ex:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+    def _get_state(self, element, exclude):
+        """Return a dictionary with the element's attributes, except the excluded ones."""
+        return {key: value for key, value in element.get_state().items() if key not in exclude}
+
+    def _set_state(self, element, state):
+        """Set the element's attributes from a stored dictionary."""
+        element.set_state(state)
+
+    def _hash_file(self, filePath):
+        """Return the hex digest of the file's content."""
+        fileHash = hashlib.sha256()
+        with open(filePath, 'rb') as f:
+            while True:
+                chunk = f.read(self._CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                fileHash.update(chunk)
+        return fileHash.hexdigest()
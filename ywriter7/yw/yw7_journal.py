@@ -0,0 +1,223 @@
+"""Provide a class for a yWriter 7 project's edit journal.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+import os
+from ..pywriter_globals import *
+from ..model.chapter import Chapter
+from ..model.project_note import ProjectNote
+
+
+class Yw7Journal:
+    """yWriter 7 project edit journal representation.
+
+    The journal is an append-only file next to the .yw7 file. It records changes
+    made since the .yw7 file was written, one JSON line per change:
+    - scene content updates,
+    - chapters added,
+    - project notes added.
+    The first line holds the signature (modification time, size) of the .yw7 file
+    the changes apply to. The journal is valid as long as the .yw7 file has this signature.
+    Rewriting the .yw7 file includes the changes, so the journal is discarded then.
+
+    Each record is written with a single write call and synced to disk, so a crash
+    can at most leave an incomplete last line, which is ignored when replaying.
+
+    Public methods:
+        append(novel, elemType, elemId, base) -- append an element change to the journal.
+        replay(novel, base) -- apply the journal's changes to a novel.
+        discard() -- close and remove the journal file.
+        close() -- close the journal file.
+
+    Public instance variables:
+        filePath: str -- path to the journal file.
+        base: tuple -- signature of the .yw7 file the changes apply to, or None.
+
+    Public class constants:
+        EXTENSION: str -- suffix appended to the .yw7 file path.
+        VERSION: int -- journal format version.
+    """
+    EXTENSION = '.journal'
+    VERSION = 1
+    _ELEMENTS = {
+        CHAPTER_PREFIX: ('chapters', 'srtChapters', Chapter),
+        PRJ_NOTE_PREFIX: ('projectNotes', 'srtPrjNotes', ProjectNote),
+        }
+    # Element types added by the journal.
+    # key: element type prefix, value: (Novel collection, Novel sort order, element class)
+
+    def __init__(self, yw7Path):
+        """Set the journal file path.
+
+        Positional arguments:
+            yw7Path: str -- path to the .yw7 file.
+        """
+        self.filePath = f'{yw7Path}{self.EXTENSION}'
+        self.base = None
+        self._file = None
+        # Journal file open for appending
+
+    def append(self, novel, elemType, elemId, base):
+        """Append an element change to the journal.
+
+        Positional arguments:
+            novel -- Novel instance holding the changed element.
+            elemType: str -- SCENE_PREFIX for a scene content update,
+                             CHAPTER_PREFIX for a chapter added,
+                             PRJ_NOTE_PREFIX for a project note added.
+            elemId: str -- ID of the element.
+            base: tuple -- signature of the .yw7 file the novel was read from.
+
+        Raise the "Error" exception, if the change cannot be journaled,
+        or if the journal applies to another state of the .yw7 file.
+        """
+        if elemType == SCENE_PREFIX:
+            record = [elemType, elemId, novel.scenes[elemId].sceneContent]
+        elif elemType in self._ELEMENTS:
+            collection, __, __ = self._ELEMENTS[elemType]
+            element = getattr(novel, collection)[elemId]
+            record = [elemType, elemId, self._get_state(element)]
+        else:
+            raise Error(f'{_("Change cannot be journaled")}: "{elemType}{elemId}".')
+
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        try:
+            if self._file is None:
+                self._open(base)
+            elif self.base != base:
+                raise Error(f'{_("The journal applies to another file version")}: "{norm_path(self.filePath)}".')
+
+            self._file.write(f'{line}\n'.encode('utf-8'))
+            self._file.flush()
+            self._sync()
+        except OSError as ex:
+            self.close()
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+    def replay(self, novel, base):
+        """Apply the journal's changes to a novel.
+
+        Positional arguments:
+            novel -- Novel instance read from the .yw7 file.
+            base: tuple -- signature of the .yw7 file the novel was read from.
+
+        If the journal applies to another state of the .yw7 file, e.g. because
+        the file was rewritten after the last change, keep it as a backup and ignore it.
+        Return the number of changes applied.
+        Raise the "Error" exception in case of error.
+        """
+        self.close()
+        try:
+            records, __ = self._read()
+        except FileNotFoundError:
+            return 0
+
+        except OSError as ex:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+        if self.base != base:
+            try:
+                os.replace(self.filePath, f'{self.filePath}.bak')
+            except OSError:
+                pass
+            self.base = None
+            return 0
+
+        for elemType, elemId, value in records:
+            if elemType == SCENE_PREFIX:
+                if elemId in novel.scenes:
+                    novel.scenes[elemId].sceneContent = value
+            elif elemType in self._ELEMENTS:
+                collection, sortOrder, elementClass = self._ELEMENTS[elemType]
+                element = elementClass()
+                for key, attribute in value.items():
+                    setattr(element, key, attribute)
+                getattr(novel, collection)[elemId] = element
+                if not elemId in getattr(novel, sortOrder):
+                    getattr(novel, sortOrder).append(elemId)
+        return len(records)
+
+    def discard(self):
+        """Close and remove the journal file, if any."""
+        self.close()
+        self.base = None
+        try:
+            os.remove(self.filePath)
+        except FileNotFoundError:
+            pass
+        except OSError as ex:
+            raise Error(f'{_("Cannot remove file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+    def close(self):
+        """Close the journal file, if open."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self, base):
+        """Open the journal file for appending; create it, if necessary.
+
+        Cut off an incomplete last record left by a crash.
+        """
+        try:
+            __, validLength = self._read()
+        except FileNotFoundError:
+            validLength = None
+        if validLength is None:
+            self._file = open(self.filePath, 'wb')
+            header = json.dumps({'version': self.VERSION, 'base': list(base)}, separators=(',', ':'))
+            self._file.write(f'{header}\n'.encode('utf-8'))
+            self.base = base
+        else:
+            if self.base != base:
+                raise Error(f'{_("The journal applies to another file version")}: "{norm_path(self.filePath)}".')
+
+            self._file = open(self.filePath, 'r+b')
+            self._file.truncate(validLength)
+            self._file.seek(validLength)
+
+    def _read(self):
+        """Read the journal file.
+
+        Set the base signature from the header.
+        Return a tuple: (list of records, length of the valid part in bytes).
+        The valid part ends with the last complete record.
+        """
+        with open(self.filePath, 'rb') as f:
+            data = f.read()
+        records = []
+        validLength = 0
+        self.base = None
+        for line in data.split(b'\n')[:-1]:
+            # An incomplete last line has no line break.
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+
+            if self.base is None:
+                if not isinstance(entry, dict) or entry.get('version') != self.VERSION:
+                    break
+
+                self.base = tuple(entry['base'])
+            else:
+                records.append(entry)
+            validLength += len(line) + 1
+        if self.base is None:
+            validLength = None
+        return records, validLength
+
+    def _get_state(self, element):
+        """Return a dictionary with the element's public attributes."""
+        return {key: value for key, value in element.get_state().items() if not key.startswith('_')}
+
+    def _sync(self):
+        """Force the appended record to disk."""
+        try:
+            os.fdatasync(self._file.fileno())
+        except AttributeError:
+            # Not available on all platforms.
+            os.fsync(self._file.fileno())
@@ -0,0 +1,249 @@
+"""Provide a class for a yWriter 7 project's scene revision store.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import hashlib
+import os
+import sqlite3
+import time
+import zlib
+from difflib import SequenceMatcher
+from ..pywriter_globals import *
+
+
+class Yw7Revisions:
+    """yWriter 7 project scene revision store representation.
+
+    The store is a SQLite database next to the .yw7 file. It keeps every revision
+    of every scene content recorded. Scene contents are split into paragraphs,
+    and each distinct paragraph is stored once, compressed, under its digest.
+    A revision is the sequence of its paragraph digests, so a revision changing
+    a few paragraphs adds only these paragraphs to the store.
+
+    Public methods:
+        add(scId, text) -- record a scene content revision.
+        get(scId, revision) -- return the scene content of a revision.
+        get_revisions(scId) -- return the recorded revisions of a scene.
+        diff(scId, fromRevision, toRevision) -- return the paragraph changes between two revisions.
+
+    Public instance variables:
+        filePath: str -- path to the revision store file.
+
+    Public class constants:
+        EXTENSION: str -- suffix appended to the .yw7 file path.
+        VERSION: int -- store format version.
+    """
+    EXTENSION = '.revisions'
+    VERSION = 1
+    _DIGEST_SIZE = 16
+    # Bytes per paragraph digest
+    _RAW = b'\x00'
+    _DEFLATED = b'\x01'
+    # Chunk data prefixes
+
+    def __init__(self, yw7Path):
+        """Set the revision store file path.
+
+        Positional arguments:
+            yw7Path: str -- path to the .yw7 file.
+        """
+        self.filePath = f'{yw7Path}{self.EXTENSION}'
+
+    def add(self, scId, text):
+        """Record a scene content revision.
+
+        Positional arguments:
+            scId: str -- scene ID.
+            text: str -- scene content.
+
+        If the text is the same as the scene's latest revision, no revision is added.
+        Return the revision number, starting with 1.
+        Raise the "Error" exception in case of error.
+        """
+        chunks = {}
+        digests = []
+        for paragraph in (text or '').split('\n'):
+            data = paragraph.encode('utf-8')
+            digest = hashlib.blake2b(data, digest_size=self._DIGEST_SIZE).digest()
+            chunks[digest] = data
+            digests.append(digest)
+        digests = b''.join(digests)
+        try:
+            db = self._connect()
+            try:
+                with db:
+                    latest = db.execute(
+                        'SELECT revision, digests FROM revisions WHERE scId = ? ORDER BY revision DESC LIMIT 1',
+                        (scId,)).fetchone()
+                    if latest is not None and latest[1] == digests:
+                        return latest[0]
+
+                    known = self._get_known(db, list(chunks))
+                    db.executemany('INSERT INTO chunks VALUES (?, ?)',
+                                   [(digest, self._compress(data)) for digest, data in chunks.items() if not digest in known])
+                    revision = 1 if latest is None else latest[0] + 1
+                    db.execute('INSERT INTO revisions VALUES (?, ?, ?, ?)', (scId, revision, time.time(), digests))
+                    return revision
+
+            finally:
+                db.close()
+        except sqlite3.Error as ex:
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+    def get(self, scId, revision=None):
+        """Return the scene content of a revision.
+
+        Positional arguments:
+            scId: str -- scene ID.
+
+        Optional arguments:
+            revision: int -- revision number. If None, return the latest revision.
+
+        Raise the "Error" exception, if the revision does not exist.
+        """
+        db = self._open()
+        try:
+            digests = self._split_digests(self._get_digests(db, scId, revision))
+            paragraphs = self._get_paragraphs(db, digests)
+        finally:
+            db.close()
+        return '\n'.join(paragraphs[digest] for digest in digests)
+
+    def get_revisions(self, scId):
+        """Return the recorded revisions of a scene.
+
+        Positional arguments:
+            scId: str -- scene ID.
+
+        Return a list of tuples: (revision number, creation time in seconds since the epoch),
+        oldest revision first.
+        """
+        if not os.path.isfile(self.filePath):
+            return []
+
+        db = self._open()
+        try:
+            return db.execute('SELECT revision, created FROM revisions WHERE scId = ? ORDER BY revision', (scId,)).fetchall()
+
+        finally:
+            db.close()
+
+    def diff(self, scId, fromRevision, toRevision=None):
+        """Return the paragraph changes between two revisions.
+
+        Positional arguments:
+            scId: str -- scene ID.
+            fromRevision: int -- revision number of the old scene content.
+
+        Optional arguments:
+            toRevision: int -- revision number of the new scene content. If None, use the latest revision.
+
+        The revisions are compared by paragraph digests, and only the changed
+        paragraphs are decompressed.
+        Return a list of tuples: (tag, old paragraph index, old paragraphs, new paragraph index, new paragraphs)
+        with tag being 'replace', 'delete', or 'insert', like difflib.SequenceMatcher.get_opcodes().
+        Raise the "Error" exception, if a revision does not exist.
+        """
+        db = self._open()
+        try:
+            old = self._split_digests(self._get_digests(db, scId, fromRevision))
+            new = self._split_digests(self._get_digests(db, scId, toRevision))
+            opcodes = [opcode for opcode in SequenceMatcher(None, old, new, autojunk=False).get_opcodes()
+                       if opcode[0] != 'equal']
+            changed = set()
+            for __, i1, i2, j1, j2 in opcodes:
+                changed.update(old[i1:i2])
+                changed.update(new[j1:j2])
+            paragraphs = self._get_paragraphs(db, changed)
+        finally:
+            db.close()
+        return [(tag, i1, [paragraphs[digest] for digest in old[i1:i2]], j1, [paragraphs[digest] for digest in new[j1:j2]])
+                for tag, i1, i2, j1, j2 in opcodes]
+
+    def _connect(self):
+        """Return a connection to the store; create the store, if necessary."""
+        db = sqlite3.connect(self.filePath)
+        try:
+            with db:
+                db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+                db.execute('CREATE TABLE IF NOT EXISTS chunks (digest BLOB PRIMARY KEY, data BLOB) WITHOUT ROWID')
+                db.execute('CREATE TABLE IF NOT EXISTS revisions '
+                           '(scId TEXT, revision INTEGER, created REAL, digests BLOB, PRIMARY KEY (scId, revision)) WITHOUT ROWID')
+                db.execute('INSERT OR IGNORE INTO meta VALUES (?, ?)', ('version', str(self.VERSION)))
+                version = db.execute('SELECT value FROM meta WHERE key = ?', ('version',)).fetchone()[0]
+        except:
+            db.close()
+            raise
+
+        if version != str(self.VERSION):
+            db.close()
+            raise Error(f'{_("Unknown file format version")}: "{norm_path(self.filePath)}".')
+
+        return db
+
+    def _open(self):
+        """Return a connection to an existing store."""
+        if not os.path.isfile(self.filePath):
+            raise Error(f'{_("File not found")}: "{norm_path(self.filePath)}".')
+
+        try:
+            return self._connect()
+
+        except sqlite3.Error as ex:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}" - {str(ex)}.')
+
+    def _get_digests(self, db, scId, revision):
+        """Return the concatenated paragraph digests of a revision."""
+        if revision is None:
+            row = db.execute('SELECT digests FROM revisions WHERE scId = ? ORDER BY revision DESC LIMIT 1',
+                             (scId,)).fetchone()
+        else:
+            row = db.execute('SELECT digests FROM revisions WHERE scId = ? AND revision = ?',
+                             (scId, revision)).fetchone()
+        if row is None:
+            raise Error(f'{_("Revision not found")}: "{scId}" #{revision}.')
+
+        return row[0]
+
+    def _split_digests(self, digests):
+        """Return a list of paragraph digests."""
+        size = self._DIGEST_SIZE
+        return [digests[i:i + size] for i in range(0, len(digests), size)]
+
+    def _get_known(self, db, digests):
+        """Return the set of digests already stored."""
+        known = set()
+        for i in range(0, len(digests), 500):
+            # Keep below SQLite's limit of host parameters.
+            batch = digests[i:i + 500]
+            query = f'SELECT digest FROM chunks WHERE digest IN ({",".join("?" * len(batch))})'
+            known.update(digest for digest, in db.execute(query, batch))
+        return known
+
+    def _get_paragraphs(self, db, digests):
+        """Return a dictionary: key = digest, value = paragraph text."""
+        digests = list(set(digests))
+        paragraphs = {}
+        for i in range(0, len(digests), 500):
+            batch = digests[i:i + 500]
+            query = f'SELECT digest, data FROM chunks WHERE digest IN ({",".join("?" * len(batch))})'
+            for digest, data in db.execute(query, batch):
+                paragraphs[digest] = self._decompress(data).decode('utf-8')
+        return paragraphs
+
+    def _compress(self, data):
+        """Return the chunk data to be stored; deflate it, if this saves space."""
+        deflated = zlib.compress(data, 9)
+        if len(deflated) < len(data):
+            return self._DEFLATED + deflated
+
+        return self._RAW + data
+
+    def _decompress(self, data):
+        """Return the paragraph bytes of stored chunk data."""
+        if data[:1] == self._DEFLATED:
+            return zlib.decompress(data[1:])
+
+        return data[1:]